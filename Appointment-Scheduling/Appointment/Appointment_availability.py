@@ -0,0 +1,216 @@
+"""
+Appointment Entity - Availability
+Pure functions that expand doctor schedules into slots and subtract busy intervals.
+Callers load schedules, blocked slots, booked appointments and slot calendar rows once
+for the whole date range and pass them in; nothing here touches the database.
+"""
+from bisect import bisect_left
+from collections import defaultdict
+from heapq import merge
+from datetime import date, datetime, time, timedelta
+from typing import Callable, Dict, Iterable, Iterator, List, Optional, Tuple
+
+from Doctor_Schedule.Doctor_Schedule_config import generate_time_slots
+from Doctor_Schedule.Doctor_Schedule_model import DayOfWeekEnum
+
+
+# date.weekday() -> day_of_week_enum value
+WEEKDAY_TO_ENUM = [
+    DayOfWeekEnum.mon,
+    DayOfWeekEnum.tue,
+    DayOfWeekEnum.wed,
+    DayOfWeekEnum.thu,
+    DayOfWeekEnum.fri,
+    DayOfWeekEnum.sat,
+    DayOfWeekEnum.sun,
+]
+
+# (start_time, end_time)
+Interval = Tuple[time, time]
+
+# (date, start_time, end_time)
+FreeSlot = Tuple[date, time, time]
+
+# (doctor_id, date, start_time, end_time)
+DoctorFreeSlot = Tuple[int, date, time, time]
+
+# (date, start_time, end_time, remaining, is_blocked) of a doctor_slot row
+CalendarRow = Tuple[date, time, time, int, bool]
+
+# (start_date, end_date) -> (schedules, blocked rows, booked rows, calendar rows) for every
+# searched doctor; each row starts with doctor_id, blocked and booked rows are
+# (doctor_id, date, start_time, end_time) and calendar rows (doctor_id, *CalendarRow)
+WindowLoader = Callable[[date, date], Tuple[Iterable, Iterable[tuple], Iterable[tuple], Iterable[tuple]]]
+
+
+# ============ SCHEDULE EXPANSION ============
+
+def is_schedule_effective(schedule, check_date: date) -> bool:
+    """Check if a schedule row applies on a date"""
+    if schedule.effective_from and check_date < schedule.effective_from:
+        return False
+    if schedule.effective_to and check_date > schedule.effective_to:
+        return False
+    return True
+
+
+def group_schedules_by_weekday(schedules: Iterable) -> Dict[DayOfWeekEnum, List]:
+    """Group active schedule rows by day of week"""
+    grouped = defaultdict(list)
+    for schedule in schedules:
+        if schedule.is_active:
+            grouped[schedule.day_of_week].append(schedule)
+    return grouped
+
+
+def expand_day_slots(schedules_by_weekday: Dict[DayOfWeekEnum, List], check_date: date) -> List[Interval]:
+    """Expand the schedules effective on a date into sorted, de-duplicated slots"""
+    slots = set()
+    for schedule in schedules_by_weekday.get(WEEKDAY_TO_ENUM[check_date.weekday()], []):
+        if is_schedule_effective(schedule, check_date):
+            slots.update(generate_time_slots(schedule.start_time, schedule.end_time, schedule.slot_duration))
+    return sorted(slots)
+
+
+# ============ BUSY INTERVALS ============
+
+def merge_intervals(intervals: Iterable[Interval]) -> List[Interval]:
+    """Merge overlapping or touching intervals into a sorted, disjoint list"""
+    merged: List[list] = []
+    for start, end in sorted(intervals):
+        if merged and start <= merged[-1][1]:
+            merged[-1][1] = max(merged[-1][1], end)
+        else:
+            merged.append([start, end])
+    return [(start, end) for start, end in merged]
+
+
+def group_busy_by_date(rows: Iterable[Tuple[date, time, time]]) -> Dict[date, List[Interval]]:
+    """Group (date, start, end) rows into merged busy intervals per date"""
+    grouped = defaultdict(list)
+    for busy_date, start, end in rows:
+        grouped[busy_date].append((start, end))
+    return {busy_date: merge_intervals(intervals) for busy_date, intervals in grouped.items()}
+
+
+def subtract_busy(slots: List[Interval], busy: List[Interval]) -> List[Interval]:
+    """
+    Keep the slots that overlap none of the busy intervals
+    `busy` must be sorted and disjoint (see merge_intervals)
+    """
+    if not busy:
+        return list(slots)
+
+    busy_starts = [start for start, _ in busy]
+    free = []
+    for slot_start, slot_end in slots:
+        # Last busy interval starting before the slot ends is the only candidate
+        position = bisect_left(busy_starts, slot_end) - 1
+        if position >= 0 and busy[position][1] > slot_start:
+            continue
+        free.append((slot_start, slot_end))
+    return free
+
+
+# ============ SLOT CALENDAR ============
+
+def open_calendar_slots(calendar_rows: Iterable[CalendarRow]) -> Dict[date, List[Interval]]:
+    """
+    Group slot calendar rows into the slots that can be booked per date
+    A slot can be booked when no slot it overlaps (itself included) is blocked or has no
+    place left, which is what DoctorSlotRepository.claim requires; so a group slot stays
+    open until its remaining capacity is used up. Every date in the calendar gets an entry,
+    also when nothing is open on it
+    """
+    slots_by_date = defaultdict(set)
+    closed = []
+    for slot_date, start, end, remaining, is_blocked in calendar_rows:
+        slots_by_date[slot_date].add((start, end))
+        if is_blocked or remaining <= 0:
+            closed.append((slot_date, start, end))
+    closed_by_date = group_busy_by_date(closed)
+    return {
+        slot_date: subtract_busy(sorted(slots), closed_by_date.get(slot_date, []))
+        for slot_date, slots in slots_by_date.items()
+    }
+
+
+# ============ FREE SLOTS ============
+
+def iter_free_slots(
+    schedules: Iterable,
+    blocked_rows: Iterable[Tuple[date, time, time]],
+    booked_rows: Iterable[Tuple[date, time, time]],
+    start_date: date,
+    end_date: date,
+    not_before: Optional[datetime] = None,
+    calendar_rows: Iterable[CalendarRow] = ()
+) -> Iterator[FreeSlot]:
+    """
+    Yield free (date, start_time, end_time) slots in chronological order
+    Dates in the slot calendar are answered from its remaining capacity (see
+    open_calendar_slots), other dates from the schedules minus blocked and booked time.
+    Slots starting before `not_before` are skipped
+    """
+    schedules_by_weekday = group_schedules_by_weekday(schedules)
+    busy_by_date = group_busy_by_date(list(blocked_rows) + list(booked_rows))
+    calendar = open_calendar_slots(calendar_rows)
+
+    current_date = start_date
+    while current_date <= end_date:
+        if current_date in calendar:
+            free = calendar[current_date]
+        else:
+            free = subtract_busy(expand_day_slots(schedules_by_weekday, current_date), busy_by_date.get(current_date, []))
+        for slot_start, slot_end in free:
+            if not_before and datetime.combine(current_date, slot_start) < not_before:
+                continue
+            yield (current_date, slot_start, slot_end)
+        current_date += timedelta(days=1)
+
+
+def _tag_doctor(doctor_id: int, slots: Iterator[FreeSlot]) -> Iterator[DoctorFreeSlot]:
+    for slot_date, slot_start, slot_end in slots:
+        yield (doctor_id, slot_date, slot_start, slot_end)
+
+
+def iter_earliest_free_slots(
+    load_window: WindowLoader,
+    doctor_ids: List[int],
+    start_date: date,
+    end_date: date,
+    window_days: int = 7,
+    not_before: Optional[datetime] = None
+) -> Iterator[DoctorFreeSlot]:
+    """
+    Yield free slots of several doctors in chronological order
+    The range is walked window by window; each window is loaded for all doctors at once
+    and the per-doctor free-slot generators are k-way merged, so a consumer that stops
+    early never loads the later windows
+    """
+    window_start = start_date
+    while window_start <= end_date:
+        window_end = min(window_start + timedelta(days=window_days - 1), end_date)
+        schedules, blocked_rows, booked_rows, calendar_rows = load_window(window_start, window_end)
+
+        schedules_by_doctor = defaultdict(list)
+        for schedule in schedules:
+            schedules_by_doctor[schedule.doctor_id].append(schedule)
+        busy_by_doctor = defaultdict(list)
+        for doctor_id, busy_date, start, end in list(blocked_rows) + list(booked_rows):
+            busy_by_doctor[doctor_id].append((busy_date, start, end))
+        calendar_by_doctor = defaultdict(list)
+        for doctor_id, *calendar_row in calendar_rows:
+            calendar_by_doctor[doctor_id].append(calendar_row)
+
+        generators = [
+            _tag_doctor(doctor_id, iter_free_slots(
+                schedules_by_doctor[doctor_id], busy_by_doctor[doctor_id], [],
+                window_start, window_end, not_before, calendar_by_doctor[doctor_id]
+            ))
+            for doctor_id in doctor_ids
+            if doctor_id in schedules_by_doctor or doctor_id in calendar_by_doctor
+        ]
+        yield from merge(*generators, key=lambda slot: (slot[1], slot[2], slot[0]))
+
+        window_start = window_end + timedelta(days=1)
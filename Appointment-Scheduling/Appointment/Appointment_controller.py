@@ -2,8 +2,10 @@ from fastapi import APIRouter, Depends, HTTPException, Query
 from sqlalchemy.orm import Session
 from typing import List, Optional
 from datetime import date, time
-from Appointment.Appointment_config import get_db
+from Appointment.Appointment_config import get_db, TimeSlotConflictException
 from Appointment.Appointment_service import AppointmentService
+from pagination import DEFAULT_PAGE_SIZE, MAX_PAGE_SIZE, InvalidCursorException
+from export import export_response
 from pydantic import BaseModel, Field
 
 router = APIRouter()
@@ -49,6 +51,9 @@ class AvailabilityCheck(BaseModel):
     start_time: str = Field(..., description="Start time (HH:MM:SS)")
     end_time: str = Field(..., description="End time (HH:MM:SS)")
 
+class AppointmentBulkCreate(BaseModel):
+    appointments: List[AppointmentCreate] = Field(..., description="Appointments to book")
+
 
 @router.post("/", status_code=201)
 def create_appointment(payload: AppointmentCreate, db: Session = Depends(get_db)):
@@ -62,6 +67,51 @@ def create_appointment(payload: AppointmentCreate, db: Session = Depends(get_db)
             "appointment_id": appointment.appointment_id,
             "appointment": appointment
         }
+    except TimeSlotConflictException as e:
+        raise HTTPException(status_code=409, detail=str(e))
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Internal server error: {str(e)}")
+
+
+@router.post("/bulk", status_code=201)
+def create_appointments_bulk(payload: AppointmentBulkCreate, db: Session = Depends(get_db)):
+    """
+    Book many appointments at once; each item is reported as created or failed
+    """
+    try:
+        result = AppointmentService.create_appointments_bulk(
+            db, [item.dict() for item in payload.appointments]
+        )
+        return {
+            "message": f"{result['created']} of {result['total']} appointments created",
+            **result
+        }
+    except TimeSlotConflictException as e:
+        raise HTTPException(status_code=409, detail=str(e))
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Internal server error: {str(e)}")
+
+
+@router.get("/export")
+def export_appointments(
+    export_format: str = Query("ndjson", alias="format", description="ndjson or csv"),
+    doctor_id: Optional[int] = Query(None, description="Only this doctor's appointments"),
+    start_date: Optional[str] = Query(None, description="From date (YYYY-MM-DD)"),
+    end_date: Optional[str] = Query(None, description="To date (YYYY-MM-DD)"),
+    status: Optional[str] = Query(None, description="scheduled, completed, cancelled or no_show"),
+    db: Session = Depends(get_db)
+):
+    """
+    Download every matching appointment as NDJSON or CSV
+    Rows are streamed as they are read, so the range may be as large as needed
+    """
+    try:
+        fields, rows = AppointmentService.export_appointments(db, doctor_id, start_date, end_date, status)
+        return export_response(rows, fields, export_format, "appointments")
     except ValueError as e:
         raise HTTPException(status_code=400, detail=str(e))
     except Exception as e:
@@ -84,83 +134,94 @@ def get_appointment(appointment_id: int, db: Session = Depends(get_db)):
 
 @router.get("/")
 def list_appointments(
-    skip: int = Query(0, ge=0),
-    limit: int = Query(100, ge=1, le=1000),
+    cursor: Optional[str] = Query(None, description="next_cursor of the previous page"),
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
     db: Session = Depends(get_db)
 ):
     """
-    List all appointments with pagination
+    List all appointments, one page at a time (pass next_cursor to get the next page)
     """
     try:
-        appointments = AppointmentService.list_appointments(db, skip, limit)
-        return {
-            "count": len(appointments),
-            "appointments": appointments
-        }
+        page = AppointmentService.list_appointments(db, cursor, limit)
+        return page.as_response("appointments")
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Internal server error: {str(e)}")
 
 
 @router.get("/patient/{patient_id}")
-def get_patient_appointments(patient_id: int, db: Session = Depends(get_db)):
+def get_patient_appointments(
+    patient_id: int,
+    cursor: Optional[str] = Query(None, description="next_cursor of the previous page"),
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+    db: Session = Depends(get_db)
+):
     """
     Get all appointments for a specific patient
     """
     try:
-        appointments = AppointmentService.get_patient_appointments(db, patient_id)
-        return {
-            "patient_id": patient_id,
-            "count": len(appointments),
-            "appointments": appointments
-        }
+        page = AppointmentService.get_patient_appointments(db, patient_id, cursor, limit)
+        return {"patient_id": patient_id, **page.as_response("appointments")}
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Internal server error: {str(e)}")
 
 
 @router.get("/patient/{patient_id}/upcoming")
-def get_patient_upcoming_appointments(patient_id: int, db: Session = Depends(get_db)):
+def get_patient_upcoming_appointments(
+    patient_id: int,
+    cursor: Optional[str] = Query(None, description="next_cursor of the previous page"),
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+    db: Session = Depends(get_db)
+):
     """
     Get upcoming appointments for a patient
     """
     try:
-        appointments = AppointmentService.get_upcoming_appointments_for_patient(db, patient_id)
-        return {
-            "patient_id": patient_id,
-            "count": len(appointments),
-            "appointments": appointments
-        }
+        page = AppointmentService.get_upcoming_appointments_for_patient(db, patient_id, cursor, limit)
+        return {"patient_id": patient_id, **page.as_response("appointments")}
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Internal server error: {str(e)}")
 
 
 @router.get("/patient/{patient_id}/past")
-def get_patient_past_appointments(patient_id: int, db: Session = Depends(get_db)):
+def get_patient_past_appointments(
+    patient_id: int,
+    cursor: Optional[str] = Query(None, description="next_cursor of the previous page"),
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+    db: Session = Depends(get_db)
+):
     """
     Get past appointments for a patient
     """
     try:
-        appointments = AppointmentService.get_past_appointments_for_patient(db, patient_id)
-        return {
-            "patient_id": patient_id,
-            "count": len(appointments),
-            "appointments": appointments
-        }
+        page = AppointmentService.get_past_appointments_for_patient(db, patient_id, cursor, limit)
+        return {"patient_id": patient_id, **page.as_response("appointments")}
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Internal server error: {str(e)}")
 
 
 @router.get("/doctor/{doctor_id}")
-def get_doctor_appointments(doctor_id: int, db: Session = Depends(get_db)):
+def get_doctor_appointments(
+    doctor_id: int,
+    cursor: Optional[str] = Query(None, description="next_cursor of the previous page"),
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+    db: Session = Depends(get_db)
+):
     """
     Get all appointments for a specific doctor
     """
     try:
-        appointments = AppointmentService.get_doctor_appointments(db, doctor_id)
-        return {
-            "doctor_id": doctor_id,
-            "count": len(appointments),
-            "appointments": appointments
-        }
+        page = AppointmentService.get_doctor_appointments(db, doctor_id, cursor, limit)
+        return {"doctor_id": doctor_id, **page.as_response("appointments")}
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Internal server error: {str(e)}")
 
@@ -182,6 +243,42 @@ def get_doctor_today_appointments(doctor_id: int, db: Session = Depends(get_db))
         raise HTTPException(status_code=500, detail=f"Internal server error: {str(e)}")
 
 
+@router.get("/doctor/{doctor_id}/free-slots")
+def get_doctor_free_slots(
+    doctor_id: int,
+    start_date: str = Query(..., description="Start date (YYYY-MM-DD)"),
+    end_date: str = Query(..., description="End date (YYYY-MM-DD)"),
+    db: Session = Depends(get_db)
+):
+    """
+    Get all free slots for a doctor within a date range
+    """
+    try:
+        return AppointmentService.get_free_slots(db, doctor_id, start_date, end_date)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Internal server error: {str(e)}")
+
+
+@router.get("/specialization/{specialization_id}/earliest")
+def get_earliest_slots_by_specialization(
+    specialization_id: int,
+    limit: int = Query(10, ge=1, le=100),
+    from_date: Optional[str] = Query(None, description="Search from date (YYYY-MM-DD), defaults to today"),
+    db: Session = Depends(get_db)
+):
+    """
+    Get the earliest free slots across all doctors of a specialization
+    """
+    try:
+        return AppointmentService.find_earliest_slots_by_specialization(db, specialization_id, limit, from_date)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Internal server error: {str(e)}")
+
+
 @router.get("/doctor/{doctor_id}/date/{appointment_date}")
 def get_doctor_appointments_by_date(
     doctor_id: int, 
@@ -208,25 +305,59 @@ def get_doctor_appointments_by_date(
 
 
 @router.get("/date/{appointment_date}")
-def get_appointments_by_date(appointment_date: str, db: Session = Depends(get_db)):
+def get_appointments_by_date(
+    appointment_date: str,
+    cursor: Optional[str] = Query(None, description="next_cursor of the previous page"),
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+    db: Session = Depends(get_db)
+):
     """
-    Get all appointments on a specific date (YYYY-MM-DD)
+    Get all appointments on a specific date (YYYY-MM-DD), one page at a time
     """
     try:
         from datetime import datetime
         date_obj = datetime.strptime(appointment_date, "%Y-%m-%d").date()
-        appointments = AppointmentService.get_appointments_by_date(db, date_obj)
-        return {
-            "date": appointment_date,
-            "count": len(appointments),
-            "appointments": appointments
-        }
+        page = AppointmentService.get_appointments_by_date(db, date_obj, cursor, limit)
+        return {"date": appointment_date, **page.as_response("appointments")}
+    except InvalidCursorException as e:
+        raise HTTPException(status_code=400, detail=str(e))
     except ValueError as e:
         raise HTTPException(status_code=400, detail=f"Invalid date format. Use YYYY-MM-DD: {str(e)}")
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Internal server error: {str(e)}")
 
 
+@router.get("/date/{appointment_date}/load")
+def get_daily_load_by_date(appointment_date: str, db: Session = Depends(get_db)):
+    """
+    Get how full each doctor is on a date (YYYY-MM-DD), for dashboards
+    """
+    try:
+        return AppointmentService.get_daily_load(db, appointment_date)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Internal server error: {str(e)}")
+
+
+@router.get("/doctor/{doctor_id}/load")
+def get_doctor_daily_load(
+    doctor_id: int,
+    start_date: str = Query(..., description="Start date (YYYY-MM-DD)"),
+    end_date: Optional[str] = Query(None, description="End date (YYYY-MM-DD), defaults to start_date"),
+    db: Session = Depends(get_db)
+):
+    """
+    Get a doctor's booked count per day against the daily limit
+    """
+    try:
+        return AppointmentService.get_daily_load(db, start_date, end_date, doctor_id)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Internal server error: {str(e)}")
+
+
 @router.put("/{appointment_id}")
 def update_appointment(
     appointment_id: int, 
@@ -248,6 +379,8 @@ def update_appointment(
             "message": "Appointment updated successfully",
             "appointment": appointment
         }
+    except TimeSlotConflictException as e:
+        raise HTTPException(status_code=409, detail=str(e))
     except ValueError as e:
         raise HTTPException(status_code=404, detail=str(e))
     except Exception as e:
@@ -353,6 +486,8 @@ def reschedule_appointment(
             "message": "Appointment rescheduled successfully",
             "appointment": appointment
         }
+    except TimeSlotConflictException as e:
+        raise HTTPException(status_code=409, detail=str(e))
     except ValueError as e:
         raise HTTPException(status_code=400, detail=str(e))
     except Exception as e:
@@ -0,0 +1,47 @@
+"""
+Appointment Entity - Events
+In-process hooks other modules subscribe to. A listener runs inside the caller's
+transaction (under a savepoint), so its writes commit or roll back with the change
+that raised the event, and a failing listener never blocks that change.
+"""
+import logging
+from datetime import date, time
+from typing import Callable, List
+
+from sqlalchemy.orm import Session
+
+logger = logging.getLogger(__name__)
+
+# listener(db, doctor_id, slot_date, start_time, end_time)
+SlotFreedListener = Callable[[Session, int, date, time, time], None]
+
+_slot_freed_listeners: List[SlotFreedListener] = []
+
+
+def on_slot_freed(listener: SlotFreedListener) -> SlotFreedListener:
+    """Register a listener called when a booked slot frees up (usable as a decorator)"""
+    if listener not in _slot_freed_listeners:
+        _slot_freed_listeners.append(listener)
+    return listener
+
+
+def remove_slot_freed_listener(listener: SlotFreedListener) -> None:
+    """Unregister a slot-freed listener"""
+    if listener in _slot_freed_listeners:
+        _slot_freed_listeners.remove(listener)
+
+
+def emit_slot_freed(db: Session, doctor_id: int, slot_date: date, start_time: time, end_time: time) -> None:
+    """
+    Tell every listener that a doctor's time window has freed up (not committed)
+    Each listener gets its own savepoint; one that fails is rolled back, logged and skipped
+    """
+    for listener in list(_slot_freed_listeners):
+        try:
+            with db.begin_nested():
+                listener(db, doctor_id, slot_date, start_time, end_time)
+        except Exception:
+            logger.exception(
+                "Slot-freed listener %s failed for doctor %s on %s %s-%s",
+                getattr(listener, "__qualname__", listener), doctor_id, slot_date, start_time, end_time
+            )
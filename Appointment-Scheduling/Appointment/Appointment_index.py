@@ -0,0 +1,222 @@
+"""
+Appointment Entity - Slot Index
+In-memory interval index of scheduled appointments per (doctor_id, appointment_date)
+"""
+from bisect import bisect_left, bisect_right
+from collections import OrderedDict
+from datetime import date, time
+from threading import RLock
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
+import time as _clock
+
+from Appointment.Appointment_config import get_appointment_settings
+
+
+# ============ HELPERS ============
+
+def time_to_seconds(value: time) -> int:
+    """Convert a time of day to seconds since midnight"""
+    return value.hour * 3600 + value.minute * 60 + value.second
+
+
+# (doctor_id, appointment_date)
+DayKey = Tuple[int, date]
+
+# (appointment_id, start_time, end_time)
+IntervalRow = Tuple[int, time, time]
+
+DayLoader = Callable[[], Iterable[IntervalRow]]
+
+
+# ============ DAY INTERVALS ============
+
+class DayIntervals:
+    """
+    Sorted intervals of one doctor on one day.
+    Intervals are kept ordered by start; the longest interval ever added bounds how
+    far back an overlap search has to look, so lookups stay O(log n + k) even when
+    intervals overlap each other.
+    """
+
+    def __init__(self, rows: Iterable[IntervalRow] = (), version: Optional[int] = None):
+        self.starts: List[int] = []
+        self.entries: List[Tuple[int, int, int]] = []  # (start, end, appointment_id)
+        self.max_length = 0
+        self.loaded_at = _clock.monotonic()
+        self.version = version
+        for appointment_id, start_time, end_time in rows:
+            self.add(appointment_id, start_time, end_time)
+
+    def add(self, appointment_id: int, start_time: time, end_time: time) -> None:
+        start = time_to_seconds(start_time)
+        end = time_to_seconds(end_time)
+        entry = (start, end, appointment_id)
+        position = bisect_right(self.entries, entry)
+        self.entries.insert(position, entry)
+        self.starts.insert(position, start)
+        self.max_length = max(self.max_length, end - start)
+
+    def remove(self, appointment_id: int) -> bool:
+        for position, entry in enumerate(self.entries):
+            if entry[2] == appointment_id:
+                del self.entries[position]
+                del self.starts[position]
+                return True
+        return False
+
+    def conflicts(
+        self,
+        start_time: time,
+        end_time: time,
+        exclude_appointment_id: Optional[int] = None
+    ) -> List[int]:
+        """Return ids of intervals overlapping [start_time, end_time)"""
+        start = time_to_seconds(start_time)
+        end = time_to_seconds(end_time)
+        low = bisect_right(self.starts, start - self.max_length)
+        high = bisect_left(self.starts, end)
+        return [
+            appointment_id
+            for entry_start, entry_end, appointment_id in self.entries[low:high]
+            if entry_end > start and appointment_id != exclude_appointment_id
+        ]
+
+    def __len__(self) -> int:
+        return len(self.entries)
+
+
+# ============ SLOT INDEX ============
+
+class AppointmentSlotIndex:
+    """
+    Process-wide cache of scheduled appointment intervals keyed by (doctor_id, date).
+    A day is loaded from the database on first use (or once its TTL has elapsed) and
+    is then kept in sync by AppointmentRepository.create/update/delete.
+
+    Other worker processes book too: callers pass the doctor-day's version from the
+    database (doctor_daily_load.version, bumped by every change to the day's scheduled
+    appointments) and a cached day loaded at another version is reloaded. A local commit
+    moves its cached days to the versions it wrote (advance), so they stay current.
+    """
+
+    def __init__(self, ttl_seconds: Optional[int] = None, max_days: Optional[int] = None):
+        settings = get_appointment_settings()
+        self.ttl_seconds = ttl_seconds if ttl_seconds is not None else settings.SLOT_INDEX_TTL_SECONDS
+        self.max_days = max_days if max_days is not None else settings.SLOT_INDEX_MAX_DAYS
+        self._days: "OrderedDict[DayKey, DayIntervals]" = OrderedDict()
+        self._locations: Dict[int, DayKey] = {}
+        self._generation = 0  # Bumped by every local change, so a load that raced one is not cached
+        self._lock = RLock()
+
+    def _is_fresh(self, day: DayIntervals, version: Optional[int] = None) -> bool:
+        if version is not None and day.version != version:
+            return False
+        return self.ttl_seconds <= 0 or _clock.monotonic() - day.loaded_at < self.ttl_seconds
+
+    def _drop(self, key: DayKey) -> None:
+        day = self._days.pop(key, None)
+        if day is not None:
+            for _, _, appointment_id in day.entries:
+                self._locations.pop(appointment_id, None)
+
+    def get_day(
+        self,
+        doctor_id: int,
+        appointment_date: date,
+        loader: DayLoader,
+        version: Optional[int] = None
+    ) -> DayIntervals:
+        """
+        Return the intervals for a day, loading them through `loader` on a miss or when
+        the cached day was loaded at another version
+        The loader runs outside the lock; its rows are only cached if no add, discard or
+        invalidate happened meanwhile (otherwise they are returned once, uncached)
+        """
+        key = (doctor_id, appointment_date)
+        with self._lock:
+            day = self._days.get(key)
+            if day is not None and self._is_fresh(day, version):
+                self._days.move_to_end(key)
+                return day
+            generation = self._generation
+
+        rows = list(loader())
+        day = DayIntervals(rows, version)
+
+        with self._lock:
+            if self._generation != generation:
+                return day
+            self._drop(key)
+            self._days[key] = day
+            for appointment_id, _, _ in rows:
+                self._locations[appointment_id] = key
+            while len(self._days) > self.max_days:
+                oldest_key = next(iter(self._days))
+                self._drop(oldest_key)
+            return day
+
+    def is_available(
+        self,
+        doctor_id: int,
+        appointment_date: date,
+        start_time: time,
+        end_time: time,
+        loader: DayLoader,
+        exclude_appointment_id: Optional[int] = None,
+        version: Optional[int] = None
+    ) -> bool:
+        day = self.get_day(doctor_id, appointment_date, loader, version)
+        with self._lock:
+            return not day.conflicts(start_time, end_time, exclude_appointment_id)
+
+    def add(
+        self,
+        appointment_id: int,
+        doctor_id: int,
+        appointment_date: date,
+        start_time: time,
+        end_time: time
+    ) -> None:
+        """Record a scheduled appointment; days that are not cached are left to load lazily"""
+        key = (doctor_id, appointment_date)
+        with self._lock:
+            self.discard(appointment_id)
+            self._generation += 1
+            day = self._days.get(key)
+            if day is None:
+                return
+            day.add(appointment_id, start_time, end_time)
+            self._locations[appointment_id] = key
+
+    def discard(self, appointment_id: int) -> None:
+        with self._lock:
+            self._generation += 1
+            key = self._locations.pop(appointment_id, None)
+            if key is not None and key in self._days:
+                self._days[key].remove(appointment_id)
+
+    def advance(self, versions: Dict[DayKey, Tuple[int, int]]) -> None:
+        """
+        Move cached days to the version a local commit left them at, after its add/discard
+        versions maps (doctor_id, date) to (version before, version after) the commit; a day
+        cached at another version missed someone else's change and is left to reload
+        """
+        with self._lock:
+            for key, (before, after) in versions.items():
+                day = self._days.get(key)
+                if day is not None and day.version == before:
+                    day.version = after
+
+    def invalidate(self, doctor_id: int, appointment_date: date) -> None:
+        with self._lock:
+            self._generation += 1
+            self._drop((doctor_id, appointment_date))
+
+    def clear(self) -> None:
+        with self._lock:
+            self._generation += 1
+            self._days.clear()
+            self._locations.clear()
+
+
+appointment_slot_index = AppointmentSlotIndex()
@@ -1,6 +1,7 @@
-from sqlalchemy import Column, Integer, String, Date, Time, DateTime, Text, Enum, Numeric
+from sqlalchemy import Column, Integer, BigInteger, String, Date, Time, DateTime, Text, Enum, Numeric, Boolean, CheckConstraint, Index, text
+from sqlalchemy.dialects.postgresql import ExcludeConstraint
 from sqlalchemy.sql import func
-from Appointment.Appointment_config import Base
+from Appointment.Appointment_config import Base, APPOINTMENT_NO_OVERLAP_CONSTRAINT
 import enum
 
 
@@ -29,7 +30,22 @@ class AppointmentStatusEnum(enum.Enum):
 
 class Appointment(Base):
     __tablename__ = "appointment"
-    __table_args__ = {"schema": "hms"}
+    __table_args__ = (
+        # Keyset pagination of the per-patient, per-doctor and per-date listings
+        Index("ix_appointment_patient_date_time_id", "patient_id", "appointment_date", "start_time", "appointment_id"),
+        Index("ix_appointment_doctor_date_time_id", "doctor_id", "appointment_date", "start_time", "appointment_id"),
+        Index("ix_appointment_date_time_id", "appointment_date", "start_time", "appointment_id"),
+        # No two scheduled appointments of a doctor may overlap, except bookings in group
+        # slots (migrations/017_appointment_overlap_backstop.sql)
+        ExcludeConstraint(
+            ("doctor_id", "="),
+            (text("tsrange(appointment_date + start_time, appointment_date + end_time)"), "&&"),
+            name=APPOINTMENT_NO_OVERLAP_CONSTRAINT,
+            using="gist",
+            where=text("status = 'scheduled' AND NOT shares_slot")
+        ),
+        {"schema": "hms"}
+    )
 
     appointment_id = Column(Integer, primary_key=True, autoincrement=True)
 
@@ -59,7 +75,35 @@ class Appointment(Base):
 
     consultation_fee = Column(Numeric(10, 2))
 
-    booking_date = Column(DateTime, nullable=False, server_default=func.now())
+    booking_date = Column(DateTime, nullable=False, server_default=func.now(), index=True)
+
+    # Booked into a group slot (max_patients_per_slot > 1), where overlapping bookings are expected
+    shares_slot = Column(Boolean, nullable=False, default=False)
+
+    def __repr__(self):
+        return f"<Appointment {self.appointment_id} - {self.status.value}>"
+
+
+class DoctorDailyLoad(Base):
+    """
+    Number of scheduled appointments per doctor per day
+    Maintained in the same transaction as every booking, cancellation and status change,
+    so MAX_APPOINTMENTS_PER_DAY_PER_DOCTOR is enforced without counting appointments.
+    version goes up with every change to the day's scheduled appointments (including a
+    move to another time on the same day); the slot index reloads a day on a new version
+    """
+    __tablename__ = "doctor_daily_load"
+
+    doctor_id = Column(Integer, primary_key=True)
+    load_date = Column(Date, primary_key=True)
+    booked = Column(Integer, nullable=False, default=0)
+    version = Column(BigInteger, nullable=False, default=0)
+    updated_at = Column(DateTime, nullable=False, server_default=func.now())
+
+    __table_args__ = (
+        CheckConstraint("booked >= 0", name="doctor_daily_load_booked_check"),
+        {"schema": "hms"}
+    )
 
     def __repr__(self):
-        return f"<Appointment {self.appointment_id} - {self.status.value}>"
\ No newline at end of file
+        return f"<DoctorDailyLoad Dr.{self.doctor_id} on {self.load_date}: {self.booked}>"
@@ -1,8 +1,46 @@
 from sqlalchemy.orm import Session
-from sqlalchemy import and_, or_
+from sqlalchemy import and_, or_, insert, update, tuple_, text, func, event
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.exc import IntegrityError
 from datetime import date, time, datetime
-from typing import List, Optional
-from Appointment.Appointment_model import Appointment, AppointmentStatusEnum
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+from Appointment.Appointment_model import Appointment, AppointmentStatusEnum, DoctorDailyLoad
+from Appointment.Appointment_index import appointment_slot_index
+from Appointment.Appointment_config import TimeSlotConflictException, is_slot_conflict_error
+from Appointment_History.Appointment_History_capture import build_history_record, stage_history
+from pagination import DEFAULT_PAGE_SIZE, Page, paginate
+from export import stream_query
+
+# Sort key of per-patient, per-doctor and per-date listings (see migrations/015)
+APPOINTMENT_ORDER = (Appointment.appointment_date, Appointment.start_time, Appointment.appointment_id)
+
+# Columns of an appointment export, in output order
+APPOINTMENT_EXPORT_COLUMNS = (
+    Appointment.appointment_id,
+    Appointment.patient_id,
+    Appointment.doctor_id,
+    Appointment.appointment_date,
+    Appointment.start_time,
+    Appointment.end_time,
+    Appointment.appointment_type,
+    Appointment.status,
+    Appointment.reason_for_visit,
+    Appointment.consultation_fee,
+    Appointment.booking_date
+)
+
+# session.info key: {(doctor_id, date): (version before, version after)} of the doctor-days
+# whose version the session's open transaction bumped, handed to the slot index on commit
+DAY_VERSIONS_KEY = "appointment_day_versions"
+
+
+def record_day_versions(db: Session, rows: Iterable[tuple]) -> None:
+    """Note the (doctor_id, load_date, version) rows a counter write returned"""
+    versions = db.info.setdefault(DAY_VERSIONS_KEY, {})
+    for doctor_id, load_date, version in rows:
+        before, _ = versions.get((doctor_id, load_date), (version - 1, None))
+        versions[(doctor_id, load_date)] = (before, version)
+
 
 class AppointmentRepository:
 
@@ -12,24 +50,42 @@ class AppointmentRepository:
         return db.query(Appointment).filter(Appointment.appointment_id == appointment_id).first()
 
     @staticmethod
-    def get_all(db: Session, skip: int = 0, limit: int = 100) -> List[Appointment]:
-        """Get all appointments with pagination"""
-        return db.query(Appointment).offset(skip).limit(limit).all()
+    def get_all(db: Session, cursor: Optional[str] = None, limit: int = DEFAULT_PAGE_SIZE) -> Page:
+        """Get a page of all appointments (by ID)"""
+        return paginate(db.query(Appointment), [Appointment.appointment_id], cursor, limit)
 
     @staticmethod
-    def get_by_patient_id(db: Session, patient_id: int) -> List[Appointment]:
-        """Get all appointments for a specific patient"""
-        return db.query(Appointment).filter(Appointment.patient_id == patient_id).all()
+    def get_by_patient_id(
+        db: Session,
+        patient_id: int,
+        cursor: Optional[str] = None,
+        limit: int = DEFAULT_PAGE_SIZE
+    ) -> Page:
+        """Get a page of a patient's appointments (by date and time)"""
+        query = db.query(Appointment).filter(Appointment.patient_id == patient_id)
+        return paginate(query, APPOINTMENT_ORDER, cursor, limit)
 
     @staticmethod
-    def get_by_doctor_id(db: Session, doctor_id: int) -> List[Appointment]:
-        """Get all appointments for a specific doctor"""
-        return db.query(Appointment).filter(Appointment.doctor_id == doctor_id).all()
+    def get_by_doctor_id(
+        db: Session,
+        doctor_id: int,
+        cursor: Optional[str] = None,
+        limit: int = DEFAULT_PAGE_SIZE
+    ) -> Page:
+        """Get a page of a doctor's appointments (by date and time)"""
+        query = db.query(Appointment).filter(Appointment.doctor_id == doctor_id)
+        return paginate(query, APPOINTMENT_ORDER, cursor, limit)
 
     @staticmethod
-    def get_by_date(db: Session, appointment_date: date) -> List[Appointment]:
-        """Get all appointments on a specific date"""
-        return db.query(Appointment).filter(Appointment.appointment_date == appointment_date).all()
+    def get_by_date(
+        db: Session,
+        appointment_date: date,
+        cursor: Optional[str] = None,
+        limit: int = DEFAULT_PAGE_SIZE
+    ) -> Page:
+        """Get a page of the appointments on a specific date (by time)"""
+        query = db.query(Appointment).filter(Appointment.appointment_date == appointment_date)
+        return paginate(query, APPOINTMENT_ORDER, cursor, limit)
 
     @staticmethod
     def get_by_doctor_and_date(db: Session, doctor_id: int, appointment_date: date) -> List[Appointment]:
@@ -46,6 +102,83 @@ class AppointmentRepository:
         """Get all appointments with a specific status"""
         return db.query(Appointment).filter(Appointment.status == status).all()
 
+    @staticmethod
+    def get_scheduled_intervals(db: Session, doctor_id: int, appointment_date: date) -> List[tuple]:
+        """Get (appointment_id, start_time, end_time) of scheduled appointments for a doctor on a date"""
+        return db.query(
+            Appointment.appointment_id,
+            Appointment.start_time,
+            Appointment.end_time
+        ).filter(
+            and_(
+                Appointment.doctor_id == doctor_id,
+                Appointment.appointment_date == appointment_date,
+                Appointment.status == AppointmentStatusEnum.scheduled
+            )
+        ).order_by(Appointment.start_time).all()
+
+    @staticmethod
+    def get_scheduled_intervals_in_range(
+        db: Session,
+        doctor_id: int,
+        start_date: date,
+        end_date: date
+    ) -> List[tuple]:
+        """Get (appointment_date, start_time, end_time) of a doctor's scheduled appointments within a date range"""
+        return db.query(
+            Appointment.appointment_date,
+            Appointment.start_time,
+            Appointment.end_time
+        ).filter(
+            and_(
+                Appointment.doctor_id == doctor_id,
+                Appointment.appointment_date >= start_date,
+                Appointment.appointment_date <= end_date,
+                Appointment.status == AppointmentStatusEnum.scheduled
+            )
+        ).all()
+
+    @staticmethod
+    def get_scheduled_intervals_for_doctors_in_range(
+        db: Session,
+        doctor_ids: List[int],
+        start_date: date,
+        end_date: date
+    ) -> List[tuple]:
+        """Get (doctor_id, appointment_date, start_time, end_time) of several doctors' scheduled appointments within a date range"""
+        return db.query(
+            Appointment.doctor_id,
+            Appointment.appointment_date,
+            Appointment.start_time,
+            Appointment.end_time
+        ).filter(
+            and_(
+                Appointment.doctor_id.in_(doctor_ids),
+                Appointment.appointment_date >= start_date,
+                Appointment.appointment_date <= end_date,
+                Appointment.status == AppointmentStatusEnum.scheduled
+            )
+        ).all()
+
+    @staticmethod
+    def get_scheduled_intervals_for_days(db: Session, days: List[Tuple[int, date]]) -> List[tuple]:
+        """
+        Get (doctor_id, appointment_date, appointment_id, start_time, end_time) of scheduled
+        appointments on the given (doctor_id, appointment_date) pairs
+        """
+        return db.query(
+            Appointment.doctor_id,
+            Appointment.appointment_date,
+            Appointment.appointment_id,
+            Appointment.start_time,
+            Appointment.end_time
+        ).filter(
+            and_(
+                tuple_(Appointment.doctor_id, Appointment.appointment_date).in_(days),
+                Appointment.status == AppointmentStatusEnum.scheduled
+            )
+        ).all()
+
     @staticmethod
     def check_time_slot_availability(
         db: Session, 
@@ -55,55 +188,77 @@ class AppointmentRepository:
         end_time: time,
         exclude_appointment_id: Optional[int] = None
     ) -> bool:
-        """Check if a time slot is available for a doctor on a specific date"""
-        query = db.query(Appointment).filter(
-            and_(
-                Appointment.doctor_id == doctor_id,
-                Appointment.appointment_date == appointment_date,
-                Appointment.status.in_([
-                    AppointmentStatusEnum.scheduled  # Only check scheduled appointments
-                ]),
-                or_(
-                    and_(
-                        Appointment.start_time <= start_time,
-                        Appointment.end_time > start_time
-                    ),
-                    and_(
-                        Appointment.start_time < end_time,
-                        Appointment.end_time >= end_time
-                    ),
-                    and_(
-                        Appointment.start_time >= start_time,
-                        Appointment.end_time <= end_time
-                    )
-                )
-            )
+        """
+        Check if a time slot is available for a doctor on a specific date
+        Answered from the in-memory slot index; the doctor's day is reloaded from the DB when
+        it is missing or when any worker has changed it since it was loaded. A booking that
+        already bumped the day's version in this transaction (and so holds its counter row)
+        compares against the version it replaced; other checks read the version by primary key
+        """
+        versions = db.info.get(DAY_VERSIONS_KEY, {}).get((doctor_id, appointment_date))
+        if versions is not None:
+            version = versions[0]
+        else:
+            # Read before the intervals: a change committed in between only makes the next check reload
+            version = AppointmentRepository.get_day_version(db, doctor_id, appointment_date)
+        return appointment_slot_index.is_available(
+            doctor_id,
+            appointment_date,
+            start_time,
+            end_time,
+            loader=lambda: AppointmentRepository.get_scheduled_intervals(db, doctor_id, appointment_date),
+            exclude_appointment_id=exclude_appointment_id,
+            version=version
         )
-        
-        # Exclude current appointment when checking for updates
-        if exclude_appointment_id:
-            query = query.filter(Appointment.appointment_id != exclude_appointment_id)
-        
-        conflicting_appointments = query.all()
-        return len(conflicting_appointments) == 0
 
     @staticmethod
-    def get_upcoming_appointments(db: Session, patient_id: int) -> List[Appointment]:
-        """Get upcoming appointments for a patient"""
+    def sync_slot_index(appointment: Appointment, versions: Optional[Dict[Tuple[int, date], Tuple[int, int]]] = None) -> None:
+        """
+        Reflect a committed appointment in the in-memory slot index
+        versions are the doctor-day versions the commit moved (DAY_VERSIONS_KEY), so the
+        cached days stay current instead of being reloaded by the next check
+        """
+        if appointment.status == AppointmentStatusEnum.scheduled:
+            appointment_slot_index.add(
+                appointment.appointment_id,
+                appointment.doctor_id,
+                appointment.appointment_date,
+                appointment.start_time,
+                appointment.end_time
+            )
+        else:
+            appointment_slot_index.discard(appointment.appointment_id)
+        if versions:
+            appointment_slot_index.advance(versions)
+
+    @staticmethod
+    def get_upcoming_appointments(
+        db: Session,
+        patient_id: int,
+        cursor: Optional[str] = None,
+        limit: int = DEFAULT_PAGE_SIZE
+    ) -> Page:
+        """Get a page of a patient's upcoming appointments (soonest first)"""
         today = date.today()
-        return db.query(Appointment).filter(
+        query = db.query(Appointment).filter(
             and_(
                 Appointment.patient_id == patient_id,
                 Appointment.appointment_date >= today,
                 Appointment.status == AppointmentStatusEnum.scheduled  # Only scheduled
             )
-        ).order_by(Appointment.appointment_date, Appointment.start_time).all()
+        )
+        return paginate(query, APPOINTMENT_ORDER, cursor, limit)
 
     @staticmethod
-    def get_past_appointments(db: Session, patient_id: int) -> List[Appointment]:
-        """Get past appointments for a patient"""
+    def get_past_appointments(
+        db: Session,
+        patient_id: int,
+        cursor: Optional[str] = None,
+        limit: int = DEFAULT_PAGE_SIZE
+    ) -> Page:
+        """Get a page of a patient's past appointments (most recent first)"""
         today = date.today()
-        return db.query(Appointment).filter(
+        query = db.query(Appointment).filter(
             and_(
                 Appointment.patient_id == patient_id,
                 or_(
@@ -115,28 +270,242 @@ class AppointmentRepository:
                     ])
                 )
             )
-        ).order_by(Appointment.appointment_date.desc(), Appointment.start_time.desc()).all()
+        )
+        return paginate(query, APPOINTMENT_ORDER, cursor, limit, descending=True)
+
+    @staticmethod
+    def stream_for_export(
+        db: Session,
+        doctor_id: Optional[int] = None,
+        start_date: Optional[date] = None,
+        end_date: Optional[date] = None,
+        status: Optional[AppointmentStatusEnum] = None
+    ) -> Iterable[tuple]:
+        """
+        Stream APPOINTMENT_EXPORT_COLUMNS of the matching appointments (by date and time)
+        Plain column rows from a server-side cursor, so no ORM objects are kept; the query
+        runs when iteration starts
+        """
+        query = db.query(*APPOINTMENT_EXPORT_COLUMNS)
+        if doctor_id is not None:
+            query = query.filter(Appointment.doctor_id == doctor_id)
+        if start_date is not None:
+            query = query.filter(Appointment.appointment_date >= start_date)
+        if end_date is not None:
+            query = query.filter(Appointment.appointment_date <= end_date)
+        if status is not None:
+            query = query.filter(Appointment.status == status)
+        return stream_query(query.order_by(*APPOINTMENT_ORDER))
+
+    @staticmethod
+    def lock_doctor_day(db: Session, doctor_id: int, appointment_date: date) -> None:
+        """
+        Serialize bookings of one doctor-day until the current transaction ends
+        Uses a transaction-scoped advisory lock, so the appointment table itself is never locked
+        """
+        db.execute(
+            text("SELECT pg_advisory_xact_lock(:doctor_id, :day)"),
+            {"doctor_id": doctor_id, "day": appointment_date.toordinal()}
+        )
+
+    @staticmethod
+    def take_daily_capacity(db: Session, quantities: Dict[Tuple[int, date], int], limit: int) -> Set[Tuple[int, date]]:
+        """
+        Add {(doctor_id, date): quantity} bookings to the daily load counters with one
+        INSERT ... ON CONFLICT DO UPDATE ... WHERE booked + quantity <= limit RETURNING
+        Quantities must not exceed limit. Returns the (doctor_id, date) keys taken; a key
+        missing from it is a full doctor-day and the caller must roll back. The new versions
+        are recorded for the slot index (DAY_VERSIONS_KEY).
+        Does not commit.
+        """
+        if not quantities:
+            return set()
+
+        statement = pg_insert(DoctorDailyLoad).values([
+            {"doctor_id": doctor_id, "load_date": load_date, "booked": quantity, "version": 1}
+            for (doctor_id, load_date), quantity in quantities.items()
+        ])
+        statement = statement.on_conflict_do_update(
+            index_elements=[DoctorDailyLoad.doctor_id, DoctorDailyLoad.load_date],
+            set_={
+                "booked": DoctorDailyLoad.booked + statement.excluded.booked,
+                "version": DoctorDailyLoad.version + 1,
+                "updated_at": func.now()
+            },
+            where=DoctorDailyLoad.booked + statement.excluded.booked <= limit
+        ).returning(DoctorDailyLoad.doctor_id, DoctorDailyLoad.load_date, DoctorDailyLoad.version)
+        rows = db.execute(statement).all()
+        record_day_versions(db, rows)
+        return {(doctor_id, load_date) for doctor_id, load_date, _ in rows}
+
+    @staticmethod
+    def release_daily_capacity(db: Session, doctor_id: int, load_date: date) -> None:
+        """Remove one booking from a doctor's daily load counter. Does not commit."""
+        rows = db.execute(
+            update(DoctorDailyLoad)
+            .where(
+                and_(
+                    DoctorDailyLoad.doctor_id == doctor_id,
+                    DoctorDailyLoad.load_date == load_date,
+                    DoctorDailyLoad.booked > 0
+                )
+            )
+            .values(booked=DoctorDailyLoad.booked - 1, version=DoctorDailyLoad.version + 1, updated_at=func.now())
+            .returning(DoctorDailyLoad.doctor_id, DoctorDailyLoad.load_date, DoctorDailyLoad.version)
+        ).all()
+        record_day_versions(db, rows)
+
+    @staticmethod
+    def touch_day(db: Session, doctor_id: int, load_date: date) -> None:
+        """
+        Bump a doctor-day's version after a scheduled appointment moved within the day
+        (its count is unchanged). Does not commit.
+        """
+        rows = db.execute(
+            update(DoctorDailyLoad)
+            .where(
+                and_(
+                    DoctorDailyLoad.doctor_id == doctor_id,
+                    DoctorDailyLoad.load_date == load_date
+                )
+            )
+            .values(version=DoctorDailyLoad.version + 1, updated_at=func.now())
+            .returning(DoctorDailyLoad.doctor_id, DoctorDailyLoad.load_date, DoctorDailyLoad.version)
+        ).all()
+        record_day_versions(db, rows)
+
+    @staticmethod
+    def get_day_version(db: Session, doctor_id: int, load_date: date) -> int:
+        """Get the version of a doctor-day's scheduled appointments (0 before its first booking)"""
+        version = db.query(DoctorDailyLoad.version).filter(
+            and_(
+                DoctorDailyLoad.doctor_id == doctor_id,
+                DoctorDailyLoad.load_date == load_date
+            )
+        ).scalar()
+        return version or 0
+
+    @staticmethod
+    def get_daily_loads_for_days(db: Session, days: List[Tuple[int, date]]) -> List[tuple]:
+        """Get (doctor_id, load_date, booked) of the given (doctor_id, date) pairs that have bookings"""
+        return db.query(
+            DoctorDailyLoad.doctor_id,
+            DoctorDailyLoad.load_date,
+            DoctorDailyLoad.booked
+        ).filter(
+            tuple_(DoctorDailyLoad.doctor_id, DoctorDailyLoad.load_date).in_(days)
+        ).all()
+
+    @staticmethod
+    def get_daily_loads(
+        db: Session,
+        start_date: date,
+        end_date: date,
+        doctor_id: Optional[int] = None
+    ) -> List[DoctorDailyLoad]:
+        """Get daily load counters within a date range, optionally for one doctor"""
+        query = db.query(DoctorDailyLoad).filter(
+            and_(
+                DoctorDailyLoad.load_date >= start_date,
+                DoctorDailyLoad.load_date <= end_date
+            )
+        )
+        if doctor_id is not None:
+            query = query.filter(DoctorDailyLoad.doctor_id == doctor_id)
+        return query.order_by(DoctorDailyLoad.load_date, DoctorDailyLoad.doctor_id).all()
+
+    @staticmethod
+    def commit_booking(db: Session, appointment: Appointment) -> None:
+        """
+        Commit a booking change
+        Raises TimeSlotConflictException when the overlap constraint rejects it
+        """
+        try:
+            db.commit()
+        except IntegrityError as e:
+            db.rollback()
+            if not is_slot_conflict_error(e):
+                raise
+            # Another booking won the race; our cached view of the day is stale
+            appointment_slot_index.invalidate(appointment.doctor_id, appointment.appointment_date)
+            raise TimeSlotConflictException("Time slot is not available. Please choose a different time.")
 
     @staticmethod
     def create(db: Session, appointment: Appointment) -> Appointment:
         """Create a new appointment"""
         db.add(appointment)
-        db.commit()
+        versions = db.info.pop(DAY_VERSIONS_KEY, None)
+        AppointmentRepository.commit_booking(db, appointment)
         db.refresh(appointment)
+        AppointmentRepository.sync_slot_index(appointment, versions)
         return appointment
 
+    @staticmethod
+    def bulk_create(db: Session, appointments: List[Appointment]) -> List[int]:
+        """
+        Insert many appointments with multi-row INSERT ... RETURNING in one transaction
+        SQLAlchemy packs the rows into as few VALUES statements as the driver's bind
+        parameter limit allows. Returns the new ids in input order
+        """
+        if not appointments:
+            return []
+
+        columns = [column.key for column in Appointment.__table__.columns if column.key != "appointment_id"]
+        rows = [{key: getattr(appointment, key) for key in columns} for appointment in appointments]
+        statement = insert(Appointment).returning(Appointment.appointment_id, sort_by_parameter_order=True)
+        try:
+            appointment_ids = db.scalars(statement, rows).all()
+            # Core inserts bypass ORM change tracking, so stage their CREATED history here
+            for appointment, appointment_id in zip(appointments, appointment_ids):
+                appointment.appointment_id = appointment_id
+            stage_history(db, [
+                build_history_record(appointment, created=True, changed_by=db.info.get("changed_by"))
+                for appointment in appointments
+            ])
+            versions = db.info.pop(DAY_VERSIONS_KEY, None)
+            db.commit()
+        except IntegrityError as e:
+            db.rollback()
+            if not is_slot_conflict_error(e):
+                raise
+            for doctor_id, appointment_date in {(a.doctor_id, a.appointment_date) for a in appointments}:
+                appointment_slot_index.invalidate(doctor_id, appointment_date)
+            raise TimeSlotConflictException("Time slot is not available. Please choose a different time.")
+        except Exception:
+            db.rollback()
+            raise
+
+        for appointment, appointment_id in zip(appointments, appointment_ids):
+            appointment_slot_index.add(
+                appointment_id,
+                appointment.doctor_id,
+                appointment.appointment_date,
+                appointment.start_time,
+                appointment.end_time
+            )
+        if versions:
+            appointment_slot_index.advance(versions)
+        return appointment_ids
+
     @staticmethod
     def update(db: Session, appointment: Appointment) -> Appointment:
         """Update an existing appointment"""
-        db.commit()
+        versions = db.info.pop(DAY_VERSIONS_KEY, None)
+        AppointmentRepository.commit_booking(db, appointment)
         db.refresh(appointment)
+        AppointmentRepository.sync_slot_index(appointment, versions)
         return appointment
 
     @staticmethod
     def delete(db: Session, appointment: Appointment) -> None:
         """Delete an appointment"""
+        appointment_id = appointment.appointment_id
+        versions = db.info.pop(DAY_VERSIONS_KEY, None)
         db.delete(appointment)
         db.commit()
+        appointment_slot_index.discard(appointment_id)
+        if versions:
+            appointment_slot_index.advance(versions)
 
     @staticmethod
     def get_today_appointments_by_doctor(db: Session, doctor_id: int) -> List[Appointment]:
@@ -159,4 +528,13 @@ class AppointmentRepository:
                 Appointment.appointment_date == appointment_date,
                 Appointment.status == AppointmentStatusEnum.scheduled
             )
-        ).count()
\ No newline at end of file
+        ).count()
+
+
+# ============ SESSION EVENTS ============
+
+@event.listens_for(Session, "after_transaction_end")
+def _forget_day_versions(db: Session, transaction) -> None:
+    # Versions a rolled-back transaction bumped never reached the database
+    if transaction.parent is None:
+        db.info.pop(DAY_VERSIONS_KEY, None)
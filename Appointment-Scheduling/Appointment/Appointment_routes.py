@@ -1,4 +1,6 @@
 from fastapi import APIRouter
+from async_routes import build_async_router
+from Appointment.Appointment_config import get_db
 from Appointment.Appointment_controller import router as appointment_controller
 
 router = APIRouter(
@@ -7,3 +9,11 @@ router = APIRouter(
 )
 
 router.include_router(appointment_controller)
+
+# Same endpoints as async def handlers run in the threadpool (ASYNC_ROUTE_HANDLERS)
+async_router = APIRouter(
+    prefix="/appointments",
+    tags=["Appointments"]
+)
+
+async_router.include_router(build_async_router(appointment_controller, get_db, keep_sync=["export_appointments"]))
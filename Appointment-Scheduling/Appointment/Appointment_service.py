@@ -1,15 +1,32 @@
 from sqlalchemy.orm import Session
 from datetime import date, time, datetime, timedelta
-from typing import List, Optional, Dict
+from collections import Counter
+from itertools import islice
+from typing import Dict, Iterable, List, Optional, Tuple
 from Appointment.Appointment_model import Appointment, AppointmentStatusEnum, AppointmentTypeEnum
-from Appointment.Appointment_repository import AppointmentRepository
+from Appointment.Appointment_repository import AppointmentRepository, APPOINTMENT_EXPORT_COLUMNS
+from Appointment.Appointment_availability import iter_free_slots, iter_earliest_free_slots
+from Appointment.Appointment_index import DayIntervals
+from Appointment.Appointment_events import emit_slot_freed
+from Appointment.Appointment_config import (
+    get_appointment_settings,
+    TimeSlotConflictException,
+    DailyLimitExceededException
+)
+from Doctor_Schedule.Doctor_Schedule_repository import DoctorScheduleRepository
+from Blocked_Slots.Blocked_Slots_repository import BlockedSlotRepository
+from Doctor_Slot.Doctor_Slot_repository import DoctorSlotRepository
+from Doctor_Slot.Doctor_Slot_calendar import slots_taken_by
+from Appointment_Reminder.Appointment_Reminder_repository import AppointmentReminderRepository
+from Appointment_Reminder.Appointment_Reminder_service import AppointmentReminderService
+from pagination import DEFAULT_PAGE_SIZE, Page
 
 class AppointmentService:
 
     @staticmethod
-    def create_appointment(db: Session, data: dict) -> Appointment:
+    def _build_appointment(data: dict) -> Appointment:
         """
-        Create a new appointment with validation
+        Validate booking data and build an unsaved appointment (availability is not checked)
         """
         # Extract required fields
         doctor_id = data.get("doctor_id")
@@ -38,14 +55,6 @@ class AppointmentService:
         if start_time >= end_time:
             raise ValueError("Start time must be before end time")
 
-        # Check if the time slot is available
-        is_available = AppointmentRepository.check_time_slot_availability(
-            db, doctor_id, appointment_date, start_time, end_time
-        )
-        
-        if not is_available:
-            raise ValueError("Time slot is not available. Please choose a different time.")
-
         # Get appointment type - convert to match database enum
         appt_type_str = data.get("appointment_type", "opd").lower()
         # Map common names to database enum values
@@ -60,7 +69,7 @@ class AppointmentService:
         appointment_type = AppointmentTypeEnum[db_type]
 
         # Create appointment object
-        appointment = Appointment(
+        return Appointment(
             patient_id=patient_id,
             doctor_id=doctor_id,
             appointment_date=appointment_date,
@@ -72,10 +81,224 @@ class AppointmentService:
             symptoms=data.get("symptoms"),
             notes=data.get("notes"),
             consultation_fee=data.get("consultation_fee"),
-            booking_date=datetime.now()
+            booking_date=datetime.now(),
+            shares_slot=False
         )
 
-        return AppointmentRepository.create(db, appointment)
+    @staticmethod
+    def create_appointment(db: Session, data: dict) -> Appointment:
+        """
+        Create a new appointment with validation
+        """
+        appointment = AppointmentService._build_appointment(data)
+
+        try:
+            # Count the day, take the slot and insert the booking in one transaction
+            AppointmentService._take_day(db, appointment.doctor_id, appointment.appointment_date)
+            appointment.shares_slot = AppointmentService._reserve(
+                db, appointment.doctor_id, appointment.appointment_date, appointment.start_time, appointment.end_time
+            )
+            return AppointmentRepository.create(db, appointment)
+        except Exception:
+            db.rollback()
+            raise
+
+    @staticmethod
+    def _reserve(
+        db: Session,
+        doctor_id: int,
+        appointment_date: date,
+        start_time: time,
+        end_time: time,
+        exclude_appointment_id: Optional[int] = None
+    ) -> bool:
+        """
+        Take one unit of slot capacity for a booking (not committed)
+        Days in the slot calendar take a unit from every slot the booking overlaps, so group
+        slots accept up to max_patients_per_slot bookings and overlapping slots of schedules
+        with different slot durations are never both sold. Days outside the calendar fall
+        back to the overlap check under a doctor-day lock.
+        Returns whether the booking is in a group slot (Appointment.shares_slot)
+        """
+        capacity = DoctorSlotRepository.claim(db, doctor_id, appointment_date, start_time, end_time)
+        if capacity is not None:
+            return capacity > 1
+
+        if not DoctorSlotRepository.has_slots_on(db, doctor_id, appointment_date):
+            AppointmentRepository.lock_doctor_day(db, doctor_id, appointment_date)
+            if AppointmentRepository.check_time_slot_availability(
+                db, doctor_id, appointment_date, start_time, end_time,
+                exclude_appointment_id=exclude_appointment_id
+            ):
+                return False
+
+        raise TimeSlotConflictException("Time slot is not available. Please choose a different time.")
+
+    @staticmethod
+    def _take_day(db: Session, doctor_id: int, appointment_date: date) -> None:
+        """Count a booking against the doctor's daily limit with one atomic upsert (not committed)"""
+        limit = get_appointment_settings().MAX_APPOINTMENTS_PER_DAY_PER_DOCTOR
+        if not AppointmentRepository.take_daily_capacity(db, {(doctor_id, appointment_date): 1}, limit):
+            raise DailyLimitExceededException(
+                f"Doctor is fully booked on {appointment_date} ({limit} appointments per day)"
+            )
+
+    @staticmethod
+    def _release(db: Session, appointment: Appointment) -> None:
+        """Give a scheduled appointment's slot capacity and daily count back (not committed)"""
+        if appointment.status == AppointmentStatusEnum.scheduled:
+            DoctorSlotRepository.release(
+                db, appointment.doctor_id, appointment.appointment_date, appointment.start_time, appointment.end_time
+            )
+            AppointmentRepository.release_daily_capacity(db, appointment.doctor_id, appointment.appointment_date)
+
+    @staticmethod
+    def _set_status(db: Session, appointment: Appointment, status: AppointmentStatusEnum) -> None:
+        """
+        Move an appointment to a new status (not committed)
+        Every status change goes through here, so the same transition always has the same
+        effect on capacity: leaving scheduled gives the slot capacity and the daily count
+        back, and returning to scheduled takes them again. A cancellation or no-show also
+        announces the freed window so listeners (waiting-list backfill) act in the same
+        transaction, and a cancellation cancels the appointment's pending reminders with it
+        """
+        was_scheduled = appointment.status == AppointmentStatusEnum.scheduled
+        is_scheduled = status == AppointmentStatusEnum.scheduled
+        if was_scheduled and not is_scheduled:
+            AppointmentService._release(db, appointment)
+            if status in (AppointmentStatusEnum.cancelled, AppointmentStatusEnum.no_show):
+                emit_slot_freed(
+                    db, appointment.doctor_id, appointment.appointment_date, appointment.start_time, appointment.end_time
+                )
+        if status == AppointmentStatusEnum.cancelled and appointment.status != AppointmentStatusEnum.cancelled:
+            AppointmentReminderRepository.cancel_pending_for_appointments(db, [appointment.appointment_id])
+        elif is_scheduled and not was_scheduled:
+            AppointmentService._take_day(db, appointment.doctor_id, appointment.appointment_date)
+            appointment.shares_slot = AppointmentService._reserve(
+                db, appointment.doctor_id, appointment.appointment_date, appointment.start_time, appointment.end_time,
+                exclude_appointment_id=appointment.appointment_id
+            )
+        appointment.status = status
+
+    @staticmethod
+    def create_appointments_bulk(db: Session, items: List[dict]) -> Dict:
+        """
+        Book many appointments at once
+        Availability is decided in memory against the preloaded slot counters (or one
+        interval index per doctor-day outside the calendar), including earlier items of
+        the same batch. Capacity is claimed with one UPDATE and all accepted bookings are
+        written with a single multi-row INSERT ... RETURNING in the same transaction
+        """
+        settings = get_appointment_settings()
+        if not items:
+            raise ValueError("No appointments to create")
+        if len(items) > settings.BULK_BOOKING_MAX_ITEMS:
+            raise ValueError(f"Cannot book more than {settings.BULK_BOOKING_MAX_ITEMS} appointments at once")
+
+        results: List[Dict] = [None] * len(items)
+        candidates = []
+        for position, data in enumerate(items):
+            try:
+                candidates.append((position, AppointmentService._build_appointment(data)))
+            except (ValueError, KeyError) as e:
+                results[position] = {"index": position, "status": "failed", "error": str(e)}
+
+        # Daily loads and calendar days are checked against preloaded counters and claimed with
+        # one statement each. If a concurrent booking took a counted unit meanwhile, reload and
+        # try again; when the retry is beaten too, the items on the counters that could not be
+        # taken fail on their own and the rest of the batch is booked
+        daily_limit = settings.MAX_APPOINTMENTS_PER_DAY_PER_DOCTOR
+        unavailable = "Time slot is not available. Please choose a different time."
+        lost_days = set()
+        lost_slots = set()
+        attempt = 0
+        while True:
+            keys = sorted({(a.doctor_id, a.appointment_date) for _, a in candidates})
+            booked = {}
+            remaining = {}
+            capacities = {}
+            if keys:
+                for doctor_id, load_date, day_booked in AppointmentRepository.get_daily_loads_for_days(db, keys):
+                    booked[(doctor_id, load_date)] = day_booked
+                for doctor_id, slot_date, start_time, end_time, slot_remaining, capacity, is_blocked in (
+                    DoctorSlotRepository.get_for_days(db, keys)
+                ):
+                    remaining[(doctor_id, slot_date, start_time, end_time)] = 0 if is_blocked else slot_remaining
+                    capacities[(doctor_id, slot_date, start_time, end_time)] = capacity
+            day_slots = {}
+            for doctor_id, slot_date, start_time, end_time in remaining:
+                day_slots.setdefault((doctor_id, slot_date), []).append((start_time, end_time))
+            calendar_days = set(day_slots)
+
+            # Other days keep the overlap check, serialized per doctor-day (locks taken in sorted order)
+            days = {key: DayIntervals() for key in keys if key not in calendar_days}
+            for doctor_id, appointment_date in days:
+                AppointmentRepository.lock_doctor_day(db, doctor_id, appointment_date)
+            if days:
+                rows = AppointmentRepository.get_scheduled_intervals_for_days(db, list(days))
+                for doctor_id, appointment_date, appointment_id, start_time, end_time in rows:
+                    days[(doctor_id, appointment_date)].add(appointment_id, start_time, end_time)
+
+            accepted = []
+            day_counts = Counter()
+            claims = Counter()
+            for position, appointment in candidates:
+                day_key = (appointment.doctor_id, appointment.appointment_date)
+                slot_keys = []
+                if day_key in calendar_days:
+                    # Every slot the booking overlaps gives up a unit, as in _reserve
+                    taken = slots_taken_by(day_slots[day_key], appointment.start_time, appointment.end_time)
+                    slot_keys = [day_key + slot for slot in taken or []]
+                if day_key in lost_days or booked.get(day_key, 0) + day_counts[day_key] >= daily_limit:
+                    error = f"Doctor is fully booked on {appointment.appointment_date} ({daily_limit} appointments per day)"
+                elif day_key in calendar_days:
+                    available = bool(slot_keys) and all(
+                        key not in lost_slots and remaining[key] > claims[key] for key in slot_keys
+                    )
+                    error = None if available else unavailable
+                else:
+                    error = unavailable if days[day_key].conflicts(appointment.start_time, appointment.end_time) else None
+
+                if error:
+                    results[position] = {"index": position, "status": "failed", "error": error}
+                    continue
+
+                day_counts[day_key] += 1
+                if day_key in calendar_days:
+                    claims.update(slot_keys)
+                    appointment.shares_slot = max(capacities[key] for key in slot_keys) > 1
+                else:
+                    # Negative placeholder ids keep later items of the batch from taking this slot
+                    days[day_key].add(-(position + 1), appointment.start_time, appointment.end_time)
+                accepted.append((position, appointment))
+
+            try:
+                taken_days = AppointmentRepository.take_daily_capacity(db, day_counts, daily_limit)
+                taken_slots = DoctorSlotRepository.claim_many(db, claims)
+                if len(taken_days) == len(day_counts) and len(taken_slots) == len(claims):
+                    appointment_ids = AppointmentRepository.bulk_create(db, [a for _, a in accepted])
+                    break
+                db.rollback()
+            except Exception:
+                db.rollback()
+                raise
+
+            # Every failed retry loses at least one more counter, so this ends
+            if attempt:
+                lost_days.update(key for key in day_counts if key not in taken_days)
+                lost_slots.update(key for key in claims if key not in taken_slots)
+            attempt += 1
+
+        for (position, appointment), appointment_id in zip(accepted, appointment_ids):
+            results[position] = {"index": position, "status": "created", "appointment_id": appointment_id}
+
+        created = len(accepted)
+        return {
+            "total": len(items),
+            "created": created,
+            "failed": len(items) - created,
+            "results": results
+        }
 
     @staticmethod
     def get_appointment(db: Session, appointment_id: int) -> Appointment:
@@ -86,24 +309,39 @@ class AppointmentService:
         return appointment
 
     @staticmethod
-    def list_appointments(db: Session, skip: int = 0, limit: int = 100) -> List[Appointment]:
-        """List all appointments with pagination"""
-        return AppointmentRepository.get_all(db, skip, limit)
+    def list_appointments(db: Session, cursor: Optional[str] = None, limit: int = DEFAULT_PAGE_SIZE) -> Page:
+        """List all appointments, one page at a time"""
+        return AppointmentRepository.get_all(db, cursor, limit)
 
     @staticmethod
-    def get_patient_appointments(db: Session, patient_id: int) -> List[Appointment]:
-        """Get all appointments for a patient"""
-        return AppointmentRepository.get_by_patient_id(db, patient_id)
+    def get_patient_appointments(
+        db: Session,
+        patient_id: int,
+        cursor: Optional[str] = None,
+        limit: int = DEFAULT_PAGE_SIZE
+    ) -> Page:
+        """Get a page of a patient's appointments"""
+        return AppointmentRepository.get_by_patient_id(db, patient_id, cursor, limit)
 
     @staticmethod
-    def get_doctor_appointments(db: Session, doctor_id: int) -> List[Appointment]:
-        """Get all appointments for a doctor"""
-        return AppointmentRepository.get_by_doctor_id(db, doctor_id)
+    def get_doctor_appointments(
+        db: Session,
+        doctor_id: int,
+        cursor: Optional[str] = None,
+        limit: int = DEFAULT_PAGE_SIZE
+    ) -> Page:
+        """Get a page of a doctor's appointments"""
+        return AppointmentRepository.get_by_doctor_id(db, doctor_id, cursor, limit)
 
     @staticmethod
-    def get_appointments_by_date(db: Session, appointment_date: date) -> List[Appointment]:
-        """Get all appointments on a specific date"""
-        return AppointmentRepository.get_by_date(db, appointment_date)
+    def get_appointments_by_date(
+        db: Session,
+        appointment_date: date,
+        cursor: Optional[str] = None,
+        limit: int = DEFAULT_PAGE_SIZE
+    ) -> Page:
+        """Get a page of the appointments on a specific date"""
+        return AppointmentRepository.get_by_date(db, appointment_date, cursor, limit)
 
     @staticmethod
     def get_doctor_appointments_by_date(db: Session, doctor_id: int, appointment_date: date) -> List[Appointment]:
@@ -119,7 +357,10 @@ class AppointmentService:
         if not appointment:
             raise ValueError(f"Appointment with ID {appointment_id} not found")
 
-        # If updating date or time, check availability
+        old_slot = (appointment.doctor_id, appointment.appointment_date, appointment.start_time, appointment.end_time)
+        was_scheduled = appointment.status == AppointmentStatusEnum.scheduled
+
+        # If updating date or time, validate the new slot
         if any(key in data for key in ["appointment_date", "start_time", "end_time", "doctor_id"]):
             new_doctor_id = data.get("doctor_id", appointment.doctor_id)
             new_date = data.get("appointment_date", appointment.appointment_date)
@@ -138,36 +379,69 @@ class AppointmentService:
             if new_start_time >= new_end_time:
                 raise ValueError("Start time must be before end time")
 
-            # Check availability (excluding current appointment)
-            is_available = AppointmentRepository.check_time_slot_availability(
-                db, new_doctor_id, new_date, new_start_time, new_end_time, 
-                exclude_appointment_id=appointment_id
-            )
-            
-            if not is_available:
-                raise ValueError("Time slot is not available. Please choose a different time.")
-
-        # Update fields
-        for key, value in data.items():
-            if key == "appointment_type" and isinstance(value, str):
-                # Map type name to database enum
-                type_mapping = {
-                    "consultation": "opd",
-                    "followup": "follow_up",
-                    "follow-up": "follow_up",
-                    "emergency": "emergency",
-                    "opd": "opd"
-                }
-                db_type = type_mapping.get(value.lower(), "opd")
-                value = AppointmentTypeEnum[db_type]
-            elif key == "status" and isinstance(value, str):
-                # Map status to database enum
-                value = AppointmentStatusEnum[value.lower()]
-            
-            if hasattr(appointment, key):
-                setattr(appointment, key, value)
-
-        return AppointmentRepository.update(db, appointment)
+            data = {
+                **data,
+                "doctor_id": new_doctor_id,
+                "appointment_date": new_date,
+                "start_time": new_start_time,
+                "end_time": new_end_time
+            }
+
+        status = data.get("status", appointment.status)
+        if isinstance(status, str):
+            # Map status to database enum
+            status = AppointmentStatusEnum[status.lower()]
+
+        try:
+            # Leaving scheduled gives capacity back where the booking held it, before it moves
+            if status != AppointmentStatusEnum.scheduled:
+                AppointmentService._set_status(db, appointment, status)
+
+            # Update fields
+            for key, value in data.items():
+                if key == "appointment_type" and isinstance(value, str):
+                    # Map type name to database enum
+                    type_mapping = {
+                        "consultation": "opd",
+                        "followup": "follow_up",
+                        "follow-up": "follow_up",
+                        "emergency": "emergency",
+                        "opd": "opd"
+                    }
+                    db_type = type_mapping.get(value.lower(), "opd")
+                    value = AppointmentTypeEnum[db_type]
+                elif key == "status":
+                    continue
+
+                if hasattr(appointment, key):
+                    setattr(appointment, key, value)
+
+            new_slot = (appointment.doctor_id, appointment.appointment_date, appointment.start_time, appointment.end_time)
+
+            if appointment.status != AppointmentStatusEnum.scheduled:
+                # Returning to scheduled takes capacity at the new time
+                AppointmentService._set_status(db, appointment, status)
+            elif new_slot != old_slot:
+                # Still scheduled: move the daily count and the slot capacity with the booking
+                if new_slot[:2] != old_slot[:2]:
+                    AppointmentRepository.release_daily_capacity(db, *old_slot[:2])
+                    AppointmentService._take_day(db, *new_slot[:2])
+                else:
+                    AppointmentRepository.touch_day(db, *new_slot[:2])
+                DoctorSlotRepository.release(db, *old_slot)
+                appointment.shares_slot = AppointmentService._reserve(
+                    db, *new_slot, exclude_appointment_id=appointment_id
+                )
+
+            # Reminders follow a booking that moves or is scheduled again
+            if appointment.status == AppointmentStatusEnum.scheduled and (
+                not was_scheduled or new_slot[1:3] != old_slot[1:3]
+            ):
+                AppointmentReminderService.reschedule_reminders(db, appointment)
+            return AppointmentRepository.update(db, appointment)
+        except Exception:
+            db.rollback()
+            raise
 
     @staticmethod
     def cancel_appointment(db: Session, appointment_id: int, cancelled_by: int, reason: str) -> Appointment:
@@ -181,12 +455,19 @@ class AppointmentService:
         if appointment.status in [AppointmentStatusEnum.cancelled, AppointmentStatusEnum.completed]:
             raise ValueError(f"Cannot cancel appointment with status: {appointment.status.value}")
 
-        appointment.status = AppointmentStatusEnum.cancelled
+        db.info["changed_by"] = cancelled_by
+        db.info["change_reason"] = reason
         
         # Note: cancellation_reason, cancelled_at, cancelled_by fields don't exist in DB schema
         # If you need them, add them to database first
 
-        return AppointmentRepository.update(db, appointment)
+        try:
+            # The appointment, its capacity and its reminders are cancelled in one commit
+            AppointmentService._set_status(db, appointment, AppointmentStatusEnum.cancelled)
+            return AppointmentRepository.update(db, appointment)
+        except Exception:
+            db.rollback()
+            raise
 
     @staticmethod
     def complete_appointment(db: Session, appointment_id: int) -> Appointment:
@@ -200,9 +481,12 @@ class AppointmentService:
         if appointment.status != AppointmentStatusEnum.scheduled:
             raise ValueError(f"Can only complete scheduled appointments. Current status: {appointment.status.value}")
 
-        appointment.status = AppointmentStatusEnum.completed
-
-        return AppointmentRepository.update(db, appointment)
+        try:
+            AppointmentService._set_status(db, appointment, AppointmentStatusEnum.completed)
+            return AppointmentRepository.update(db, appointment)
+        except Exception:
+            db.rollback()
+            raise
 
     @staticmethod
     def mark_no_show(db: Session, appointment_id: int) -> Appointment:
@@ -213,9 +497,12 @@ class AppointmentService:
         if not appointment:
             raise ValueError(f"Appointment with ID {appointment_id} not found")
 
-        appointment.status = AppointmentStatusEnum.no_show
-
-        return AppointmentRepository.update(db, appointment)
+        try:
+            AppointmentService._set_status(db, appointment, AppointmentStatusEnum.no_show)
+            return AppointmentRepository.update(db, appointment)
+        except Exception:
+            db.rollback()
+            raise
 
     @staticmethod
     def delete_appointment(db: Session, appointment_id: int) -> None:
@@ -226,17 +513,59 @@ class AppointmentService:
         if not appointment:
             raise ValueError(f"Appointment with ID {appointment_id} not found")
 
+        AppointmentService._release(db, appointment)
         AppointmentRepository.delete(db, appointment)
 
     @staticmethod
-    def get_upcoming_appointments_for_patient(db: Session, patient_id: int) -> List[Appointment]:
-        """Get upcoming appointments for a patient"""
-        return AppointmentRepository.get_upcoming_appointments(db, patient_id)
+    def get_upcoming_appointments_for_patient(
+        db: Session,
+        patient_id: int,
+        cursor: Optional[str] = None,
+        limit: int = DEFAULT_PAGE_SIZE
+    ) -> Page:
+        """Get a page of a patient's upcoming appointments"""
+        return AppointmentRepository.get_upcoming_appointments(db, patient_id, cursor, limit)
 
     @staticmethod
-    def get_past_appointments_for_patient(db: Session, patient_id: int) -> List[Appointment]:
-        """Get past appointments for a patient"""
-        return AppointmentRepository.get_past_appointments(db, patient_id)
+    def get_past_appointments_for_patient(
+        db: Session,
+        patient_id: int,
+        cursor: Optional[str] = None,
+        limit: int = DEFAULT_PAGE_SIZE
+    ) -> Page:
+        """Get a page of a patient's past appointments"""
+        return AppointmentRepository.get_past_appointments(db, patient_id, cursor, limit)
+
+    @staticmethod
+    def export_appointments(
+        db: Session,
+        doctor_id: Optional[int] = None,
+        start_date: Optional[str] = None,
+        end_date: Optional[str] = None,
+        status: Optional[str] = None
+    ) -> Tuple[List[str], Iterable[tuple]]:
+        """
+        Field names and rows of an appointment export, optionally filtered by doctor,
+        date range and status
+        Filters are checked now; rows are read from a server-side cursor as they are consumed
+        """
+        if isinstance(start_date, str):
+            start_date = datetime.strptime(start_date, "%Y-%m-%d").date()
+        if isinstance(end_date, str):
+            end_date = datetime.strptime(end_date, "%Y-%m-%d").date()
+        if start_date and end_date and start_date > end_date:
+            raise ValueError("start_date must be before or equal to end_date")
+
+        status_enum = None
+        if status:
+            try:
+                status_enum = AppointmentStatusEnum[status.lower()]
+            except KeyError:
+                raise ValueError(f"Invalid status: {status}")
+
+        fields = [column.key for column in APPOINTMENT_EXPORT_COLUMNS]
+        rows = AppointmentRepository.stream_for_export(db, doctor_id, start_date, end_date, status_enum)
+        return fields, rows
 
     @staticmethod
     def get_today_appointments_for_doctor(db: Session, doctor_id: int) -> List[Appointment]:
@@ -253,10 +582,23 @@ class AppointmentService:
     ) -> Dict[str, bool]:
         """
         Check if a time slot is available
+        Calendar days are answered from the remaining capacity of every slot the time overlaps
         """
-        is_available = AppointmentRepository.check_time_slot_availability(
-            db, doctor_id, appointment_date, start_time, end_time
-        )
+        slots = {
+            (slot.start_time, slot.end_time): slot
+            for slot in DoctorSlotRepository.get_overlapping(db, doctor_id, appointment_date, start_time, end_time)
+        }
+        if slots:
+            taken = slots_taken_by(slots, start_time, end_time)
+            is_available = taken is not None and all(
+                slots[key].remaining > 0 and not slots[key].is_blocked for key in taken
+            )
+        elif DoctorSlotRepository.has_slots_on(db, doctor_id, appointment_date):
+            is_available = False
+        else:
+            is_available = AppointmentRepository.check_time_slot_availability(
+                db, doctor_id, appointment_date, start_time, end_time
+            )
         
         return {
             "available": is_available,
@@ -266,5 +608,165 @@ class AppointmentService:
             "end_time": str(end_time)
         }
 
+    @staticmethod
+    def get_daily_load(
+        db: Session,
+        start_date: date,
+        end_date: Optional[date] = None,
+        doctor_id: Optional[int] = None
+    ) -> Dict:
+        """
+        Get how full each doctor is per day, read straight from the daily load counters
+        Doctors without bookings on a day have no counter and are not listed
+        """
+        if isinstance(start_date, str):
+            start_date = datetime.strptime(start_date, "%Y-%m-%d").date()
+        if isinstance(end_date, str):
+            end_date = datetime.strptime(end_date, "%Y-%m-%d").date()
+        end_date = end_date or start_date
+
+        if start_date > end_date:
+            raise ValueError("start_date must be before or equal to end_date")
+
+        settings = get_appointment_settings()
+        if (end_date - start_date).days + 1 > settings.DAILY_LOAD_QUERY_MAX_DAYS:
+            raise ValueError(f"Date range cannot exceed {settings.DAILY_LOAD_QUERY_MAX_DAYS} days")
+
+        limit = settings.MAX_APPOINTMENTS_PER_DAY_PER_DOCTOR
+        loads = [
+            {
+                "doctor_id": load.doctor_id,
+                "date": str(load.load_date),
+                "booked": load.booked,
+                "remaining": max(limit - load.booked, 0),
+                "percent_full": round(100 * load.booked / limit, 1) if limit else 100.0
+            }
+            for load in AppointmentRepository.get_daily_loads(db, start_date, end_date, doctor_id)
+        ]
+
+        return {
+            "start_date": str(start_date),
+            "end_date": str(end_date),
+            "daily_limit": limit,
+            "count": len(loads),
+            "loads": loads
+        }
+
+    @staticmethod
+    def get_free_slots(
+        db: Session,
+        doctor_id: int,
+        start_date: date,
+        end_date: date
+    ) -> Dict:
+        """
+        Get all free slots for a doctor within a date range
+        Days in the slot calendar list the slots a booking could still take (group slots stay
+        free while they have places left); other days expand the doctor's schedules and
+        subtract blocked slots and scheduled appointments. One query per source for the whole range
+        """
+        if isinstance(start_date, str):
+            start_date = datetime.strptime(start_date, "%Y-%m-%d").date()
+        if isinstance(end_date, str):
+            end_date = datetime.strptime(end_date, "%Y-%m-%d").date()
+
+        if start_date > end_date:
+            raise ValueError("start_date must be before or equal to end_date")
+
+        settings = get_appointment_settings()
+        if (end_date - start_date).days + 1 > settings.FREE_SLOT_SEARCH_MAX_DAYS:
+            raise ValueError(f"Date range cannot exceed {settings.FREE_SLOT_SEARCH_MAX_DAYS} days")
+
+        # Nothing in the past can be booked
+        start_date = max(start_date, date.today())
+
+        schedules = DoctorScheduleRepository.get_effective_schedules_in_range(db, doctor_id, start_date, end_date)
+        blocked = BlockedSlotRepository.get_intervals_in_range(db, doctor_id, start_date, end_date)
+        booked = AppointmentRepository.get_scheduled_intervals_in_range(db, doctor_id, start_date, end_date)
+        calendar = DoctorSlotRepository.get_capacity_in_range(db, doctor_id, start_date, end_date)
+
+        free_slots = [
+            {
+                "date": str(slot_date),
+                "start_time": str(slot_start),
+                "end_time": str(slot_end)
+            }
+            for slot_date, slot_start, slot_end in iter_free_slots(
+                schedules, blocked, booked, start_date, end_date, not_before=datetime.now(), calendar_rows=calendar
+            )
+        ]
+
+        return {
+            "doctor_id": doctor_id,
+            "start_date": str(start_date),
+            "end_date": str(end_date),
+            "count": len(free_slots),
+            "free_slots": free_slots
+        }
+
+    @staticmethod
+    def find_earliest_slots_by_specialization(
+        db: Session,
+        specialization_id: int,
+        limit: int = 10,
+        from_date: Optional[date] = None
+    ) -> Dict:
+        """
+        Find the earliest free slots across every active doctor of a specialization
+        Stops loading further days as soon as `limit` slots have been found
+        """
+        # Doctor and Specialization resolve their tables through Patient_Registration_Management.database
+        from Doctor.repository import DoctorRepository
+        from Specialization.Specialization_repository import SpecializationRepository
+
+        if isinstance(from_date, str):
+            from_date = datetime.strptime(from_date, "%Y-%m-%d").date()
+
+        settings = get_appointment_settings()
+        if limit < 1 or limit > settings.EARLIEST_SLOT_MAX_RESULTS:
+            raise ValueError(f"limit must be between 1 and {settings.EARLIEST_SLOT_MAX_RESULTS}")
+
+        if not SpecializationRepository(db).get_by_id(specialization_id):
+            raise ValueError(f"Specialization with ID {specialization_id} not found")
+
+        doctor_ids = DoctorRepository(db).get_active_doctor_ids_by_specialization(specialization_id)
+
+        start_date = max(from_date or date.today(), date.today())
+        end_date = date.today() + timedelta(days=settings.BOOKING_ADVANCE_DAYS)
+
+        def load_window(window_start: date, window_end: date):
+            return (
+                DoctorScheduleRepository.get_effective_schedules_for_doctors_in_range(db, doctor_ids, window_start, window_end),
+                BlockedSlotRepository.get_intervals_for_doctors_in_range(db, doctor_ids, window_start, window_end),
+                AppointmentRepository.get_scheduled_intervals_for_doctors_in_range(db, doctor_ids, window_start, window_end),
+                DoctorSlotRepository.get_capacity_for_doctors_in_range(db, doctor_ids, window_start, window_end)
+            )
+
+        slots = []
+        if doctor_ids:
+            slots = list(islice(
+                iter_earliest_free_slots(
+                    load_window, doctor_ids, start_date, end_date,
+                    window_days=settings.EARLIEST_SLOT_SEARCH_WINDOW_DAYS,
+                    not_before=datetime.now()
+                ),
+                limit
+            ))
+
+        return {
+            "specialization_id": specialization_id,
+            "doctors_searched": len(doctor_ids),
+            "count": len(slots),
+            "slots": [
+                {
+                    "doctor_id": doctor_id,
+                    "date": str(slot_date),
+                    "start_time": str(slot_start),
+                    "end_time": str(slot_end)
+                }
+                for doctor_id, slot_date, slot_start, slot_end in slots
+            ]
+        }
+
     # Note: confirm_appointment and reschedule_appointment removed 
     # because database doesn't have 'confirmed' or 'rescheduled' enum values
\ No newline at end of file
@@ -0,0 +1,198 @@
+"""
+Appointment History Entity - Change Capture
+Records appointment history without callers having to ask for it. When a session
+flushes, ORM change tracking on Appointment (date, time, status) is turned into history
+records. They wait on the session until its transaction commits (and are dropped on
+rollback), then go to an in-memory buffer that a background thread writes with
+multi-row inserts, so the business transaction never waits on history writes.
+
+Who made a change and why is read from the session: set db.info["changed_by"] and
+db.info["change_reason"] before committing (both are cleared when the transaction ends).
+"""
+import atexit
+import threading
+from collections import deque
+from datetime import datetime
+from typing import Iterable, List, Optional
+
+from sqlalchemy import event, inspect
+from sqlalchemy.orm import Session
+
+from Appointment.Appointment_model import Appointment, AppointmentStatusEnum
+from Appointment_History.Appointment_History_config import SessionLocal, get_history_settings
+from Appointment_History.Appointment_History_model import ChangeTypeEnum
+from Appointment_History.Appointment_History_repository import AppointmentHistoryRepository
+
+
+PENDING_KEY = "appointment_history_pending"
+
+STATUS_CHANGE_TYPES = {
+    AppointmentStatusEnum.cancelled: ChangeTypeEnum.CANCELLED,
+    AppointmentStatusEnum.completed: ChangeTypeEnum.COMPLETED,
+    AppointmentStatusEnum.no_show: ChangeTypeEnum.NO_SHOW,
+}
+
+
+def _status_name(status: Optional[AppointmentStatusEnum]) -> Optional[str]:
+    return status.name.upper() if status is not None else None
+
+
+def _old_value(appointment: Appointment, key: str):
+    """Value an attribute had when loaded, or its current value when unchanged"""
+    history = inspect(appointment).attrs[key].history
+    if history.deleted:
+        return history.deleted[0]
+    return getattr(appointment, key)
+
+
+def build_history_record(
+    appointment: Appointment,
+    created: bool = False,
+    changed_by: Optional[int] = None,
+    change_reason: Optional[str] = None
+) -> Optional[dict]:
+    """
+    Turn an appointment's pending changes into a history record (as insert values)
+    A date or start time change is a reschedule; otherwise a status change is recorded.
+    Returns None when none of the tracked attributes changed.
+    """
+    state = inspect(appointment)
+    record = {
+        "appointment_id": appointment.appointment_id,
+        "changed_by": changed_by,
+        "new_date": appointment.appointment_date,
+        "new_time": appointment.start_time,
+        "new_status": _status_name(appointment.status),
+        "change_reason": change_reason,
+        "changed_at": datetime.now()
+    }
+
+    if created:
+        record.update(change_type=ChangeTypeEnum.CREATED.name, change_reason=change_reason or "Initial appointment booking")
+        return record
+
+    rescheduled = state.attrs.appointment_date.history.has_changes() or state.attrs.start_time.history.has_changes()
+    status_changed = state.attrs.status.history.has_changes()
+    if not (rescheduled or status_changed):
+        return None
+
+    old_status = _old_value(appointment, "status")
+    record.update(old_status=_status_name(old_status))
+    if rescheduled:
+        record.update(
+            change_type=ChangeTypeEnum.RESCHEDULED.name,
+            old_date=_old_value(appointment, "appointment_date"),
+            old_time=_old_value(appointment, "start_time")
+        )
+    else:
+        change_type = STATUS_CHANGE_TYPES.get(appointment.status, ChangeTypeEnum.STATUS_CHANGED)
+        record.update(change_type=change_type.name)
+    return record
+
+
+def stage_history(db: Session, records: Iterable[dict]) -> None:
+    """Attach records to the session's transaction; they are buffered once it commits"""
+    db.info.setdefault(PENDING_KEY, []).extend(record for record in records if record)
+
+
+class HistoryBuffer:
+    """
+    Committed history records waiting to be written
+    A daemon thread (started on first use) writes them every HISTORY_FLUSH_INTERVAL_SECONDS,
+    or sooner once a full HISTORY_FLUSH_BATCH_SIZE is waiting
+    """
+
+    def __init__(self):
+        self._records = deque()
+        self._lock = threading.Lock()
+        self._flush_lock = threading.Lock()
+        self._wakeup = threading.Event()
+        self._thread = None
+
+    def __len__(self) -> int:
+        return len(self._records)
+
+    def add(self, records: List[dict]) -> None:
+        """Queue records for writing"""
+        settings = get_history_settings()
+        with self._lock:
+            self._records.extend(records)
+            overflow = len(self._records) - settings.HISTORY_BUFFER_MAX_RECORDS
+            for _ in range(max(overflow, 0)):
+                self._records.popleft()
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name="appointment-history-writer", daemon=True)
+                self._thread.start()
+        if overflow > 0:
+            print(f"⚠️ Appointment history buffer full: dropped {overflow} oldest records")
+        if len(self._records) >= settings.HISTORY_FLUSH_BATCH_SIZE:
+            self._wakeup.set()
+
+    def flush(self) -> int:
+        """Write every queued record in HISTORY_FLUSH_BATCH_SIZE inserts. Returns count written."""
+        settings = get_history_settings()
+        written = 0
+        with self._flush_lock:
+            while self._records:
+                with self._lock:
+                    batch = [self._records.popleft() for _ in range(min(settings.HISTORY_FLUSH_BATCH_SIZE, len(self._records)))]
+                db = SessionLocal()
+                try:
+                    written += AppointmentHistoryRepository.insert_many(db, batch, settings.MAX_HISTORY_PER_APPOINTMENT)
+                except Exception as e:
+                    db.rollback()
+                    with self._lock:
+                        self._records.extendleft(reversed(batch))
+                    print(f"❌ Appointment history flush failed, will retry: {e}")
+                    break
+                finally:
+                    db.close()
+        return written
+
+    def _run(self) -> None:
+        while True:
+            self._wakeup.wait(get_history_settings().HISTORY_FLUSH_INTERVAL_SECONDS)
+            self._wakeup.clear()
+            self.flush()
+
+
+history_buffer = HistoryBuffer()
+atexit.register(history_buffer.flush)
+
+
+# ============ SESSION EVENTS ============
+
+@event.listens_for(Session, "after_flush")
+def _capture_appointment_changes(db: Session, flush_context) -> None:
+    """Build history for the appointments this flush inserted or changed"""
+    if not get_history_settings().HISTORY_CAPTURE_ENABLED:
+        return
+    changed_by = db.info.get("changed_by")
+    change_reason = db.info.get("change_reason")
+    stage_history(db, [
+        build_history_record(appointment, True, changed_by, change_reason)
+        for appointment in db.new if isinstance(appointment, Appointment)
+    ] + [
+        build_history_record(appointment, False, changed_by, change_reason)
+        for appointment in db.dirty if isinstance(appointment, Appointment)
+    ])
+
+
+@event.listens_for(Session, "after_commit")
+def _buffer_committed_history(db: Session) -> None:
+    records = db.info.pop(PENDING_KEY, None)
+    db.info.pop("changed_by", None)
+    db.info.pop("change_reason", None)
+    if records:
+        history_buffer.add(records)
+
+
+@event.listens_for(Session, "after_transaction_end")
+def _discard_rolled_back_history(db: Session, transaction) -> None:
+    # A savepoint ending (e.g. a slot-freed listener rolled back) leaves the outer
+    # transaction's history staged; only the outermost transaction settles it
+    if transaction.parent is not None:
+        return
+    db.info.pop(PENDING_KEY, None)
+    db.info.pop("changed_by", None)
+    db.info.pop("change_reason", None)
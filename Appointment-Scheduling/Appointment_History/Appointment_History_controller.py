@@ -2,8 +2,9 @@ from fastapi import APIRouter, Depends, HTTPException, Query
 from sqlalchemy.orm import Session
 from typing import List, Optional
 from datetime import datetime
-from Appointment_History_config import get_db
+from Appointment_History.Appointment_History_config import get_db
 from Appointment_History.Appointment_History_service import AppointmentHistoryService
+from pagination import DEFAULT_PAGE_SIZE, MAX_PAGE_SIZE
 from pydantic import BaseModel, Field
 
 router = APIRouter()
@@ -52,14 +53,16 @@ def get_history_record(history_id: int, db: Session = Depends(get_db)):
 
 @router.get("/")
 def list_history_records(
-    skip: int = Query(0, ge=0),
-    limit: int = Query(100, ge=1, le=1000),
+    cursor: Optional[str] = Query(None, description="next_cursor of the previous page"),
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
     db: Session = Depends(get_db)
 ):
-    """List all history records"""
+    """List all history records, newest first, one page at a time"""
     try:
-        records = AppointmentHistoryService.list_history_records(db, skip, limit)
-        return {"count": len(records), "records": records}
+        page = AppointmentHistoryService.list_history_records(db, cursor, limit)
+        return page.as_response("records")
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Internal server error: {str(e)}")
 
@@ -105,11 +108,16 @@ def get_reschedule_history(appointment_id: int, db: Session = Depends(get_db)):
 
 
 @router.get("/change-type/{change_type}")
-def get_by_change_type(change_type: str, db: Session = Depends(get_db)):
-    """Get history records by change type"""
+def get_by_change_type(
+    change_type: str,
+    cursor: Optional[str] = Query(None, description="next_cursor of the previous page"),
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+    db: Session = Depends(get_db)
+):
+    """Get history records by change type, one page at a time"""
     try:
-        records = AppointmentHistoryService.get_by_change_type(db, change_type)
-        return {"change_type": change_type, "count": len(records), "records": records}
+        page = AppointmentHistoryService.get_by_change_type(db, change_type, cursor, limit)
+        return {"change_type": change_type, **page.as_response("records")}
     except ValueError as e:
         raise HTTPException(status_code=400, detail=str(e))
     except Exception as e:
@@ -117,11 +125,18 @@ def get_by_change_type(change_type: str, db: Session = Depends(get_db)):
 
 
 @router.get("/user/{user_id}")
-def get_by_user(user_id: int, db: Session = Depends(get_db)):
-    """Get all changes made by a user"""
+def get_by_user(
+    user_id: int,
+    cursor: Optional[str] = Query(None, description="next_cursor of the previous page"),
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+    db: Session = Depends(get_db)
+):
+    """Get all changes made by a user, one page at a time"""
     try:
-        records = AppointmentHistoryService.get_by_user(db, user_id)
-        return {"user_id": user_id, "count": len(records), "records": records}
+        page = AppointmentHistoryService.get_by_user(db, user_id, cursor, limit)
+        return {"user_id": user_id, **page.as_response("records")}
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Internal server error: {str(e)}")
 
@@ -166,9 +181,13 @@ def cleanup_old_records(
     days_to_keep: int = Query(1825, ge=1, description="Days to keep"),
     db: Session = Depends(get_db)
 ):
-    """Cleanup old history records"""
+    """Drop monthly history partitions older than days_to_keep"""
     try:
-        count = AppointmentHistoryService.cleanup_old_records(db, days_to_keep)
-        return {"message": f"Cleaned up {count} old records", "count": count}
+        result = AppointmentHistoryService.cleanup_old_records(db, days_to_keep)
+        return {
+            "message": f"Dropped {len(result['dropped_partitions'])} history partitions",
+            "count": result["estimated_rows"],
+            **result
+        }
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Internal server error: {str(e)}")
\ No newline at end of file
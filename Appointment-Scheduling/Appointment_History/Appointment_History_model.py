@@ -1,6 +1,6 @@
-from sqlalchemy import Column, Integer, String, Date, Time, DateTime, Text, Enum, ForeignKey
+from sqlalchemy import Column, Integer, String, Date, Time, DateTime, Text, Enum, ForeignKey, Index
 from sqlalchemy.sql import func
-from Appointment_History_config import Base
+from Appointment_History.Appointment_History_config import Base
 import enum
 
 class ChangeTypeEnum(enum.Enum):
@@ -19,8 +19,8 @@ class AppointmentHistory(Base):
     history_id = Column(Integer, primary_key=True, index=True, autoincrement=True)
     
     # Foreign Keys
-    appointment_id = Column(Integer, ForeignKey("appointment.appointment_id"), nullable=False, index=True)
-    changed_by = Column(Integer, ForeignKey("user.user_id"), nullable=False)
+    appointment_id = Column(Integer, ForeignKey("hms.appointment.appointment_id"), nullable=False)
+    changed_by = Column(Integer, ForeignKey("hms.users.user_id"), nullable=True)
     
     # Change Information
     change_type = Column(
@@ -41,7 +41,17 @@ class AppointmentHistory(Base):
     
     # Change Details
     change_reason = Column(Text, nullable=True)
-    changed_at = Column(DateTime, nullable=False, default=func.now(), index=True)
+    # Partition key: part of the primary key, as PostgreSQL requires for partitioned tables
+    changed_at = Column(DateTime, primary_key=True, nullable=False, default=func.now())
+
+    __table_args__ = (
+        Index("ix_hms_appointment_history_appointment_id", "appointment_id", "changed_at"),
+        Index("ix_hms_appointment_history_changed_at", "changed_at"),
+        # Keyset pagination of the per-change-type and per-user listings
+        Index("ix_hms_appointment_history_change_type_changed_at", "change_type", "changed_at", "history_id"),
+        Index("ix_hms_appointment_history_changed_by_changed_at", "changed_by", "changed_at", "history_id"),
+        {"schema": "hms", "postgresql_partition_by": "RANGE (changed_at)"}
+    )
     
     def __repr__(self):
         return f"<AppointmentHistory(id={self.history_id}, appointment_id={self.appointment_id}, type={self.change_type})>"
\ No newline at end of file
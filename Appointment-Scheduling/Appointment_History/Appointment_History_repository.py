@@ -1,8 +1,18 @@
 from sqlalchemy.orm import Session
-from sqlalchemy import and_, or_, desc
+from sqlalchemy import and_, or_, desc, func, select, insert, values, column, cast, text
+from sqlalchemy import Integer, String, Date, Time, DateTime, Text
 from datetime import date, time, datetime, timedelta
 from typing import List, Optional
 from Appointment_History.Appointment_History_model import AppointmentHistory, ChangeTypeEnum
+from statistics_cache import count_by
+from pagination import DEFAULT_PAGE_SIZE, Page, paginate
+from Appointment_History.Appointment_History_config import (
+    HISTORY_DEFAULT_PARTITION, get_partition_name, parse_partition_month, add_months
+)
+
+# Sort key of history listings, newest first (see migrations/015)
+HISTORY_ORDER = (AppointmentHistory.changed_at, AppointmentHistory.history_id)
+
 
 class AppointmentHistoryRepository:
 
@@ -12,9 +22,9 @@ class AppointmentHistoryRepository:
         return db.query(AppointmentHistory).filter(AppointmentHistory.history_id == history_id).first()
 
     @staticmethod
-    def get_all(db: Session, skip: int = 0, limit: int = 100) -> List[AppointmentHistory]:
-        """Get all history records with pagination"""
-        return db.query(AppointmentHistory).offset(skip).limit(limit).all()
+    def get_all(db: Session, cursor: Optional[str] = None, limit: int = DEFAULT_PAGE_SIZE) -> Page:
+        """Get a page of all history records (newest first)"""
+        return paginate(db.query(AppointmentHistory), HISTORY_ORDER, cursor, limit, descending=True)
 
     @staticmethod
     def get_by_appointment_id(db: Session, appointment_id: int) -> List[AppointmentHistory]:
@@ -24,32 +34,43 @@ class AppointmentHistoryRepository:
         ).order_by(desc(AppointmentHistory.changed_at)).all()
 
     @staticmethod
-    def get_by_change_type(db: Session, change_type: ChangeTypeEnum) -> List[AppointmentHistory]:
-        """Get all history records of a specific change type"""
-        return db.query(AppointmentHistory).filter(
-            AppointmentHistory.change_type == change_type
-        ).order_by(desc(AppointmentHistory.changed_at)).all()
+    def get_by_change_type(
+        db: Session,
+        change_type: ChangeTypeEnum,
+        cursor: Optional[str] = None,
+        limit: int = DEFAULT_PAGE_SIZE
+    ) -> Page:
+        """Get a page of the history records of a specific change type (newest first)"""
+        query = db.query(AppointmentHistory).filter(AppointmentHistory.change_type == change_type)
+        return paginate(query, HISTORY_ORDER, cursor, limit, descending=True)
 
     @staticmethod
-    def get_by_changed_by(db: Session, changed_by: int) -> List[AppointmentHistory]:
-        """Get all history records changed by a specific user"""
-        return db.query(AppointmentHistory).filter(
-            AppointmentHistory.changed_by == changed_by
-        ).order_by(desc(AppointmentHistory.changed_at)).all()
+    def get_by_changed_by(
+        db: Session,
+        changed_by: int,
+        cursor: Optional[str] = None,
+        limit: int = DEFAULT_PAGE_SIZE
+    ) -> Page:
+        """Get a page of the history records changed by a specific user (newest first)"""
+        query = db.query(AppointmentHistory).filter(AppointmentHistory.changed_by == changed_by)
+        return paginate(query, HISTORY_ORDER, cursor, limit, descending=True)
 
     @staticmethod
     def get_by_date_range(
         db: Session,
         start_date: datetime,
-        end_date: datetime
-    ) -> List[AppointmentHistory]:
-        """Get history records within a date range"""
-        return db.query(AppointmentHistory).filter(
+        end_date: datetime,
+        cursor: Optional[str] = None,
+        limit: int = DEFAULT_PAGE_SIZE
+    ) -> Page:
+        """Get a page of the history records within a date range (newest first)"""
+        query = db.query(AppointmentHistory).filter(
             and_(
                 AppointmentHistory.changed_at >= start_date,
                 AppointmentHistory.changed_at <= end_date
             )
-        ).order_by(desc(AppointmentHistory.changed_at)).all()
+        )
+        return paginate(query, HISTORY_ORDER, cursor, limit, descending=True)
 
     @staticmethod
     def get_recent_changes(db: Session, limit: int = 50) -> List[AppointmentHistory]:
@@ -113,6 +134,41 @@ class AppointmentHistoryRepository:
         db.refresh(history)
         return history
 
+    @staticmethod
+    def insert_many(db: Session, rows: List[dict], max_per_appointment: int) -> int:
+        """
+        Insert many history records with one INSERT ... SELECT FROM (VALUES ...) and commit
+        A record is skipped when its appointment already has max_per_appointment records
+        (records of the same batch do not count against each other). Returns count inserted.
+        """
+        if not rows:
+            return 0
+
+        fields = [
+            ("appointment_id", Integer), ("changed_by", Integer), ("change_type", String),
+            ("old_date", Date), ("new_date", Date), ("old_time", Time), ("new_time", Time),
+            ("old_status", String), ("new_status", String), ("change_reason", Text),
+            ("changed_at", DateTime)
+        ]
+        captured = values(
+            *[column(name, type_) for name, type_ in fields], name="captured"
+        ).data([tuple(row.get(name) for name, _ in fields) for row in rows])
+
+        existing = select(func.count(AppointmentHistory.history_id)).where(
+            AppointmentHistory.appointment_id == captured.c.appointment_id
+        ).scalar_subquery()
+
+        # Columns that are NULL in every row come back as text from VALUES, so cast them all
+        statement = insert(AppointmentHistory).from_select(
+            [name for name, _ in fields],
+            select(*[cast(captured.c[name], type_) for name, type_ in fields]).where(
+                existing < max_per_appointment
+            )
+        )
+        count = db.execute(statement).rowcount
+        db.commit()
+        return count
+
     @staticmethod
     def delete(db: Session, history: AppointmentHistory) -> None:
         """Delete a history record"""
@@ -120,31 +176,84 @@ class AppointmentHistoryRepository:
         db.commit()
 
     @staticmethod
-    def delete_old_records(db: Session, before_date: datetime) -> int:
-        """Delete history records older than specified date"""
-        count = db.query(AppointmentHistory).filter(
-            AppointmentHistory.changed_at < before_date
-        ).count()
-        db.query(AppointmentHistory).filter(
-            AppointmentHistory.changed_at < before_date
-        ).delete()
+    def get_partition_months(db: Session) -> List[date]:
+        """Get the months that have their own appointment_history partition, oldest first"""
+        names = db.execute(text("""
+            SELECT child.relname
+            FROM pg_inherits
+            JOIN pg_class parent ON parent.oid = pg_inherits.inhparent
+            JOIN pg_class child ON child.oid = pg_inherits.inhrelid
+            JOIN pg_namespace ns ON ns.oid = parent.relnamespace
+            WHERE ns.nspname = 'hms' AND parent.relname = 'appointment_history'
+        """)).scalars().all()
+        return sorted(month for month in map(parse_partition_month, names) if month)
+
+    @staticmethod
+    def create_month_partition(db: Session, month_start: date) -> int:
+        """
+        Create the partition holding one month of history, if it does not exist, and commit
+        Rows of that month already caught by the default partition are moved into the new
+        table before it is attached (PostgreSQL refuses to add a partition whose range the
+        default partition holds rows for). Concurrent callers are serialized with an
+        advisory lock. Returns the number of rows moved.
+        """
+        name = get_partition_name(month_start)
+        bounds = {"start": month_start, "end": add_months(month_start, 1)}
+        db.execute(text("SELECT pg_advisory_xact_lock(hashtext('hms.appointment_history'))"))
+        if db.execute(text("SELECT to_regclass(:name)"), {"name": f"hms.{name}"}).scalar() is not None:
+            db.commit()
+            return 0
+
+        db.execute(text(
+            f"CREATE TABLE hms.{name} "
+            f"(LIKE hms.appointment_history INCLUDING DEFAULTS INCLUDING CONSTRAINTS)"
+        ))
+        moved = db.execute(text(
+            f"WITH moved AS ("
+            f"DELETE FROM hms.{HISTORY_DEFAULT_PARTITION} "
+            f"WHERE changed_at >= :start AND changed_at < :end RETURNING *"
+            f") INSERT INTO hms.{name} SELECT * FROM moved"
+        ), bounds).rowcount
+        db.execute(text(
+            f"ALTER TABLE hms.appointment_history ATTACH PARTITION hms.{name} "
+            f"FOR VALUES FROM ('{bounds['start'].isoformat()}') TO ('{bounds['end'].isoformat()}')"
+        ))
+        db.commit()
+        return moved
+
+    @staticmethod
+    def delete_default_partition_rows(db: Session, before: date) -> int:
+        """
+        Delete the rows older than `before` that sit in the default partition (months
+        without a partition of their own) and commit. Returns the number deleted.
+        """
+        count = db.execute(text(
+            f"DELETE FROM hms.{HISTORY_DEFAULT_PARTITION} WHERE changed_at < :before"
+        ), {"before": before}).rowcount
         db.commit()
         return count
 
+    @staticmethod
+    def drop_month_partition(db: Session, month_start: date) -> int:
+        """
+        Detach and drop the partition holding one month of history
+        Only the catalog changes: no rows are deleted, so nothing bloats and the parent
+        is locked just for the detach. Returns the planner's row estimate of the partition.
+        """
+        name = get_partition_name(month_start)
+        rows = db.execute(text(
+            "SELECT reltuples::bigint FROM pg_class WHERE oid = CAST(:name AS regclass)"
+        ), {"name": f"hms.{name}"}).scalar()
+        db.execute(text(f"ALTER TABLE hms.appointment_history DETACH PARTITION hms.{name}"))
+        db.execute(text(f"DROP TABLE hms.{name}"))
+        db.commit()
+        return max(rows or 0, 0)
+
     @staticmethod
     def get_statistics(db: Session) -> dict:
-        """Get overall statistics"""
-        total = db.query(AppointmentHistory).count()
-        
-        stats = {
-            "total_records": total,
-            "by_change_type": {}
+        """Get overall statistics (one grouped query)"""
+        counts = count_by(db, AppointmentHistory.change_type)
+        return {
+            "total_records": sum(counts.values()),
+            "by_change_type": {change_type.name: counts.get(change_type, 0) for change_type in ChangeTypeEnum}
         }
-        
-        for change_type in ChangeTypeEnum:
-            count = db.query(AppointmentHistory).filter(
-                AppointmentHistory.change_type == change_type
-            ).count()
-            stats["by_change_type"][change_type.name] = count
-        
-        return stats
\ No newline at end of file
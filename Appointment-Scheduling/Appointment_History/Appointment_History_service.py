@@ -2,8 +2,16 @@ from sqlalchemy.orm import Session
 from datetime import date, time, datetime, timedelta
 from typing import List, Optional, Dict
 from Appointment_History.Appointment_History_model import AppointmentHistory, ChangeTypeEnum
-from Repository.Appointment_History_repository import AppointmentHistoryRepository
-from Appointment_History_config import get_history_settings
+from Appointment_History.Appointment_History_repository import AppointmentHistoryRepository
+from statistics_cache import statistics_cache, table_key
+from pagination import DEFAULT_PAGE_SIZE, Page
+from Appointment_History.Appointment_History_config import (
+    SessionLocal,
+    get_history_settings,
+    get_month_start,
+    add_months,
+    get_partition_name
+)
 
 class AppointmentHistoryService:
 
@@ -73,9 +81,9 @@ class AppointmentHistoryService:
         return history
 
     @staticmethod
-    def list_history_records(db: Session, skip: int = 0, limit: int = 100) -> List[AppointmentHistory]:
-        """List all history records with pagination"""
-        return AppointmentHistoryRepository.get_all(db, skip, limit)
+    def list_history_records(db: Session, cursor: Optional[str] = None, limit: int = DEFAULT_PAGE_SIZE) -> Page:
+        """List all history records, one page at a time"""
+        return AppointmentHistoryRepository.get_all(db, cursor, limit)
 
     @staticmethod
     def get_appointment_history(db: Session, appointment_id: int) -> List[AppointmentHistory]:
@@ -88,18 +96,28 @@ class AppointmentHistoryService:
         return AppointmentHistoryRepository.get_appointment_timeline(db, appointment_id)
 
     @staticmethod
-    def get_by_change_type(db: Session, change_type: str) -> List[AppointmentHistory]:
-        """Get history records by change type"""
+    def get_by_change_type(
+        db: Session,
+        change_type: str,
+        cursor: Optional[str] = None,
+        limit: int = DEFAULT_PAGE_SIZE
+    ) -> Page:
+        """Get a page of history records by change type"""
         try:
             change_type_enum = ChangeTypeEnum[change_type]
         except KeyError:
             raise ValueError(f"Invalid change_type: {change_type}")
-        return AppointmentHistoryRepository.get_by_change_type(db, change_type_enum)
+        return AppointmentHistoryRepository.get_by_change_type(db, change_type_enum, cursor, limit)
 
     @staticmethod
-    def get_by_user(db: Session, user_id: int) -> List[AppointmentHistory]:
-        """Get all changes made by a specific user"""
-        return AppointmentHistoryRepository.get_by_changed_by(db, user_id)
+    def get_by_user(
+        db: Session,
+        user_id: int,
+        cursor: Optional[str] = None,
+        limit: int = DEFAULT_PAGE_SIZE
+    ) -> Page:
+        """Get a page of the changes made by a specific user"""
+        return AppointmentHistoryRepository.get_by_changed_by(db, user_id, cursor, limit)
 
     @staticmethod
     def get_recent_changes(db: Session, limit: int = 50) -> List[AppointmentHistory]:
@@ -120,9 +138,11 @@ class AppointmentHistoryService:
     def get_history_by_date_range(
         db: Session,
         start_date: datetime,
-        end_date: datetime
-    ) -> List[AppointmentHistory]:
-        """Get history records within a date range"""
+        end_date: datetime,
+        cursor: Optional[str] = None,
+        limit: int = DEFAULT_PAGE_SIZE
+    ) -> Page:
+        """Get a page of history records within a date range"""
         if isinstance(start_date, str):
             start_date = datetime.strptime(start_date, "%Y-%m-%d %H:%M:%S")
         if isinstance(end_date, str):
@@ -131,7 +151,7 @@ class AppointmentHistoryService:
         if start_date > end_date:
             raise ValueError("start_date must be before end_date")
 
-        return AppointmentHistoryRepository.get_by_date_range(db, start_date, end_date)
+        return AppointmentHistoryRepository.get_by_date_range(db, start_date, end_date, cursor, limit)
 
     @staticmethod
     def delete_history_record(db: Session, history_id: int) -> None:
@@ -142,17 +162,66 @@ class AppointmentHistoryService:
         AppointmentHistoryRepository.delete(db, history)
 
     @staticmethod
-    def cleanup_old_records(db: Session, days_to_keep: int = None) -> int:
-        """Cleanup old history records"""
+    def cleanup_old_records(db: Session, days_to_keep: int = None) -> Dict:
+        """
+        Drop whole monthly partitions older than the retention period
+        A month goes once all of it is past the cutoff, so up to a month more than
+        days_to_keep may be kept; rows of those months held by the default partition are
+        deleted. Upcoming partitions are created on the same run.
+        """
         settings = get_history_settings()
         days = days_to_keep if days_to_keep else settings.RETENTION_DAYS
         cutoff_date = datetime.now() - timedelta(days=days)
-        return AppointmentHistoryRepository.delete_old_records(db, cutoff_date)
+
+        dropped = []
+        rows = 0
+        for month_start in AppointmentHistoryRepository.get_partition_months(db):
+            if add_months(month_start, 1) > cutoff_date.date():
+                break
+            rows += AppointmentHistoryRepository.drop_month_partition(db, month_start)
+            dropped.append(get_partition_name(month_start))
+        rows += AppointmentHistoryRepository.delete_default_partition_rows(db, get_month_start(cutoff_date))
+
+        created = AppointmentHistoryService.ensure_partitions(db)
+        return {
+            "cutoff": cutoff_date.isoformat(),
+            "dropped_partitions": dropped,
+            "estimated_rows": rows,
+            "created_partitions": created
+        }
+
+    @staticmethod
+    def ensure_partitions(db: Session, months_ahead: int = None) -> List[str]:
+        """Create the partitions for this month and the next HISTORY_PARTITION_MONTHS_AHEAD months"""
+        settings = get_history_settings()
+        months_ahead = settings.HISTORY_PARTITION_MONTHS_AHEAD if months_ahead is None else months_ahead
+
+        existing = set(AppointmentHistoryRepository.get_partition_months(db))
+        current = get_month_start(date.today())
+        created = []
+        for offset in range(months_ahead + 1):
+            month_start = add_months(current, offset)
+            if month_start not in existing:
+                AppointmentHistoryRepository.create_month_partition(db, month_start)
+                created.append(get_partition_name(month_start))
+        return created
+
+    @staticmethod
+    def maintain_partitions() -> List[str]:
+        """Create the upcoming partitions in a session of their own (run by the app at startup and daily)"""
+        db = SessionLocal()
+        try:
+            return AppointmentHistoryService.ensure_partitions(db)
+        finally:
+            db.close()
 
     @staticmethod
     def get_statistics(db: Session) -> Dict:
-        """Get overall history statistics"""
-        return AppointmentHistoryRepository.get_statistics(db)
+        """Get overall history statistics (cached briefly, dropped when history is written)"""
+        return statistics_cache.get_or_compute(
+            table_key(AppointmentHistory), "overall",
+            lambda: AppointmentHistoryRepository.get_statistics(db)
+        )
 
     @staticmethod
     def get_appointment_summary(db: Session, appointment_id: int) -> Dict:
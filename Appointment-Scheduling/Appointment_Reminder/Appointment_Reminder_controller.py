@@ -1,8 +1,9 @@
 from fastapi import APIRouter, Depends, HTTPException, Query
 from sqlalchemy.orm import Session
 from typing import List, Optional
-from Appointment_Reminder_config import get_db
+from Appointment_Reminder.Appointment_Reminder_config import get_db
 from Appointment_Reminder.Appointment_Reminder_service import AppointmentReminderService
+from pagination import DEFAULT_PAGE_SIZE, MAX_PAGE_SIZE
 from pydantic import BaseModel, Field
 
 router = APIRouter()
@@ -13,6 +14,9 @@ class ReminderCreate(BaseModel):
     reminder_time: str = Field(..., description="Reminder time (YYYY-MM-DD HH:MM:SS)")
     message_content: Optional[str] = Field(None, description="Custom message content")
 
+class ReminderBulkCancel(BaseModel):
+    appointment_ids: List[int] = Field(..., description="Appointments whose pending reminders are cancelled")
+
 class ReminderUpdate(BaseModel):
     reminder_type: Optional[str] = None
     reminder_time: Optional[str] = None
@@ -47,13 +51,15 @@ def get_reminder(reminder_id: int, db: Session = Depends(get_db)):
 
 @router.get("/")
 def list_reminders(
-    skip: int = Query(0, ge=0),
-    limit: int = Query(100, ge=1, le=1000),
+    cursor: Optional[str] = Query(None, description="next_cursor of the previous page"),
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
     db: Session = Depends(get_db)
 ):
     try:
-        reminders = AppointmentReminderService.list_reminders(db, skip, limit)
-        return {"count": len(reminders), "reminders": reminders}
+        page = AppointmentReminderService.list_reminders(db, cursor, limit)
+        return page.as_response("reminders")
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Internal server error: {str(e)}")
 
@@ -68,28 +74,46 @@ def get_appointment_reminders(appointment_id: int, db: Session = Depends(get_db)
 
 
 @router.get("/pending")
-def get_pending_reminders(db: Session = Depends(get_db)):
+def get_pending_reminders(
+    cursor: Optional[str] = Query(None, description="next_cursor of the previous page"),
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+    db: Session = Depends(get_db)
+):
     try:
-        reminders = AppointmentReminderService.get_pending_reminders(db)
-        return {"count": len(reminders), "reminders": reminders}
+        page = AppointmentReminderService.get_pending_reminders(db, cursor, limit)
+        return page.as_response("reminders")
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Internal server error: {str(e)}")
 
 
 @router.get("/due")
-def get_due_reminders(db: Session = Depends(get_db)):
+def get_due_reminders(
+    cursor: Optional[str] = Query(None, description="next_cursor of the previous page"),
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+    db: Session = Depends(get_db)
+):
     try:
-        reminders = AppointmentReminderService.get_due_reminders(db)
-        return {"count": len(reminders), "reminders": reminders}
+        page = AppointmentReminderService.get_due_reminders(db, cursor, limit)
+        return page.as_response("reminders")
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Internal server error: {str(e)}")
 
 
 @router.get("/failed")
-def get_failed_reminders(db: Session = Depends(get_db)):
+def get_failed_reminders(
+    cursor: Optional[str] = Query(None, description="next_cursor of the previous page"),
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+    db: Session = Depends(get_db)
+):
     try:
-        reminders = AppointmentReminderService.get_failed_reminders(db)
-        return {"count": len(reminders), "reminders": reminders}
+        page = AppointmentReminderService.get_failed_reminders(db, cursor, limit)
+        return page.as_response("reminders")
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Internal server error: {str(e)}")
 
@@ -175,6 +199,28 @@ def cancel_appointment_reminders(appointment_id: int, db: Session = Depends(get_
         raise HTTPException(status_code=500, detail=f"Internal server error: {str(e)}")
 
 
+@router.post("/appointments/cancel-all")
+def cancel_reminders_for_appointments(payload: ReminderBulkCancel, db: Session = Depends(get_db)):
+    try:
+        count = AppointmentReminderService.cancel_reminders_for_appointments(db, payload.appointment_ids)
+        return {"message": f"Cancelled {count} reminder(s)", "count": count}
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Internal server error: {str(e)}")
+
+
+@router.post("/doctor/{doctor_id}/date/{appointment_date}/cancel-all")
+def cancel_doctor_day_reminders(doctor_id: int, appointment_date: str, db: Session = Depends(get_db)):
+    try:
+        count = AppointmentReminderService.cancel_doctor_day_reminders(db, doctor_id, appointment_date)
+        return {"message": f"Cancelled {count} reminder(s)", "count": count}
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Internal server error: {str(e)}")
+
+
 @router.post("/process-due")
 def process_due_reminders(db: Session = Depends(get_db)):
     try:
@@ -182,3 +228,17 @@ def process_due_reminders(db: Session = Depends(get_db)):
         return result
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Internal server error: {str(e)}")
+
+
+@router.post("/generate")
+def generate_reminders(
+    full: bool = Query(False, description="Scan every upcoming appointment instead of those booked since the last run"),
+    db: Session = Depends(get_db)
+):
+    try:
+        result = AppointmentReminderService.generate_reminders(db, full)
+        return {"message": f"Created {result['created']} reminder(s)", **result}
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Internal server error: {str(e)}")
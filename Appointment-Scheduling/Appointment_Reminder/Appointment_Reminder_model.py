@@ -1,6 +1,6 @@
-from sqlalchemy import Column, Integer, DateTime, Text, Enum, ForeignKey
+from sqlalchemy import Column, Integer, DateTime, Text, Enum, ForeignKey, Index, UniqueConstraint, text
 from sqlalchemy.sql import func
-from Appointment_Reminder_config import Base
+from Appointment_Reminder.Appointment_Reminder_config import Base
 import enum
 
 class ReminderTypeEnum(enum.Enum):
@@ -21,7 +21,7 @@ class AppointmentReminder(Base):
     reminder_id = Column(Integer, primary_key=True, index=True, autoincrement=True)
     
     # Foreign Key
-    appointment_id = Column(Integer, ForeignKey("appointment.appointment_id"), nullable=False, index=True)
+    appointment_id = Column(Integer, ForeignKey("hms.appointment.appointment_id"), nullable=False, index=True)
     
     # Reminder Details
     reminder_type = Column(
@@ -41,6 +41,46 @@ class AppointmentReminder(Base):
     
     # Message Content
     message_content = Column(Text, nullable=True)
+
+    # Delivery attempts; a failed reminder is retried at next_attempt_at (None = no more retries)
+    attempt_count = Column(Integer, nullable=False, default=0)
+    next_attempt_at = Column(DateTime, nullable=True)
+    failure_reason = Column(Text, nullable=True)
     
+    __table_args__ = (
+        # Lets the reminder generator rerun without creating duplicates
+        UniqueConstraint("appointment_id", "reminder_type", "reminder_time", name="uq_appointment_reminder_time"),
+        # Dispatch queue: workers scan only pending rows in reminder_time order
+        Index(
+            "ix_appointment_reminder_pending_due",
+            "reminder_time",
+            postgresql_where=text("status = 'PENDING'")
+        ),
+        # Retry queue: failed rows still waiting for another attempt
+        Index(
+            "ix_appointment_reminder_retry_due",
+            "next_attempt_at",
+            postgresql_where=text("status = 'FAILED' AND next_attempt_at IS NOT NULL")
+        ),
+        # Keyset pagination of the per-status and per-type listings
+        Index("ix_appointment_reminder_status_time_id", "status", "reminder_time", "reminder_id"),
+        Index("ix_appointment_reminder_type_time_id", "reminder_type", "reminder_time", "reminder_id"),
+        {"schema": "hms"}
+    )
+
+    def __repr__(self):
+        return f"<AppointmentReminder(id={self.reminder_id}, appointment_id={self.appointment_id}, type={self.reminder_type}, status={self.status})>"
+
+
+class ReminderGenerationRun(Base):
+    """One run of the automatic reminder generator; the next run starts from the last one"""
+    __tablename__ = "reminder_generation_run"
+    __table_args__ = {"schema": "hms"}
+
+    run_id = Column(Integer, primary_key=True, autoincrement=True)
+    started_at = Column(DateTime, nullable=False)
+    booked_since = Column(DateTime, nullable=True)  # None for a full run
+    created_count = Column(Integer, nullable=False, default=0)
+
     def __repr__(self):
-        return f"<AppointmentReminder(id={self.reminder_id}, appointment_id={self.appointment_id}, type={self.reminder_type}, status={self.status})>"
\ No newline at end of file
+        return f"<ReminderGenerationRun(id={self.run_id}, started_at={self.started_at}, created={self.created_count})>"
@@ -1,8 +1,22 @@
+import heapq
+from itertools import islice
 from sqlalchemy.orm import Session
-from sqlalchemy import and_, or_
-from datetime import datetime
-from typing import List, Optional
-from Appointment_Reminder.Appointment_Reminder_model import AppointmentReminder, ReminderTypeEnum, ReminderStatusEnum
+from sqlalchemy import and_, or_, case, update, values, column, cast, select, exists, literal, func, Integer, DateTime, Text
+from sqlalchemy.dialects.postgresql import insert
+from datetime import date, datetime, timedelta
+from typing import Dict, List, Optional, Tuple
+from Appointment_Reminder.Appointment_Reminder_model import (
+    AppointmentReminder,
+    ReminderTypeEnum,
+    ReminderStatusEnum,
+    ReminderGenerationRun
+)
+from Appointment.Appointment_model import Appointment, AppointmentStatusEnum
+from statistics_cache import count_by
+from pagination import DEFAULT_PAGE_SIZE, Page, paginate
+
+# Sort key of reminder listings (see migrations/015)
+REMINDER_ORDER = (AppointmentReminder.reminder_time, AppointmentReminder.reminder_id)
 
 class AppointmentReminderRepository:
 
@@ -11,8 +25,8 @@ class AppointmentReminderRepository:
         return db.query(AppointmentReminder).filter(AppointmentReminder.reminder_id == reminder_id).first()
 
     @staticmethod
-    def get_all(db: Session, skip: int = 0, limit: int = 100) -> List[AppointmentReminder]:
-        return db.query(AppointmentReminder).offset(skip).limit(limit).all()
+    def get_all(db: Session, cursor: Optional[str] = None, limit: int = DEFAULT_PAGE_SIZE) -> Page:
+        return paginate(db.query(AppointmentReminder), [AppointmentReminder.reminder_id], cursor, limit)
 
     @staticmethod
     def get_by_appointment_id(db: Session, appointment_id: int) -> List[AppointmentReminder]:
@@ -21,37 +35,55 @@ class AppointmentReminderRepository:
         ).order_by(AppointmentReminder.reminder_time).all()
 
     @staticmethod
-    def get_by_status(db: Session, status: ReminderStatusEnum) -> List[AppointmentReminder]:
-        return db.query(AppointmentReminder).filter(
-            AppointmentReminder.status == status
-        ).order_by(AppointmentReminder.reminder_time).all()
+    def get_by_status(
+        db: Session,
+        status: ReminderStatusEnum,
+        cursor: Optional[str] = None,
+        limit: int = DEFAULT_PAGE_SIZE
+    ) -> Page:
+        query = db.query(AppointmentReminder).filter(AppointmentReminder.status == status)
+        return paginate(query, REMINDER_ORDER, cursor, limit)
 
     @staticmethod
-    def get_pending_reminders(db: Session) -> List[AppointmentReminder]:
-        return db.query(AppointmentReminder).filter(
+    def get_pending_reminders(db: Session, cursor: Optional[str] = None, limit: int = DEFAULT_PAGE_SIZE) -> Page:
+        query = db.query(AppointmentReminder).filter(
             AppointmentReminder.status == ReminderStatusEnum.PENDING
-        ).order_by(AppointmentReminder.reminder_time).all()
+        )
+        return paginate(query, REMINDER_ORDER, cursor, limit)
 
     @staticmethod
-    def get_due_reminders(db: Session, current_time: datetime) -> List[AppointmentReminder]:
-        return db.query(AppointmentReminder).filter(
+    def get_due_reminders(
+        db: Session,
+        current_time: datetime,
+        cursor: Optional[str] = None,
+        limit: int = DEFAULT_PAGE_SIZE
+    ) -> Page:
+        query = db.query(AppointmentReminder).filter(
             and_(
                 AppointmentReminder.status == ReminderStatusEnum.PENDING,
                 AppointmentReminder.reminder_time <= current_time
             )
-        ).order_by(AppointmentReminder.reminder_time).all()
+        )
+        return paginate(query, REMINDER_ORDER, cursor, limit)
 
     @staticmethod
-    def get_failed_reminders(db: Session) -> List[AppointmentReminder]:
-        return db.query(AppointmentReminder).filter(
+    def get_failed_reminders(db: Session, cursor: Optional[str] = None, limit: int = DEFAULT_PAGE_SIZE) -> Page:
+        query = db.query(AppointmentReminder).filter(
             AppointmentReminder.status == ReminderStatusEnum.FAILED
-        ).order_by(AppointmentReminder.reminder_time.desc()).all()
+        )
+        return paginate(query, REMINDER_ORDER, cursor, limit, descending=True)
 
     @staticmethod
-    def get_by_reminder_type(db: Session, reminder_type: ReminderTypeEnum) -> List[AppointmentReminder]:
-        return db.query(AppointmentReminder).filter(
+    def get_by_reminder_type(
+        db: Session,
+        reminder_type: ReminderTypeEnum,
+        cursor: Optional[str] = None,
+        limit: int = DEFAULT_PAGE_SIZE
+    ) -> Page:
+        query = db.query(AppointmentReminder).filter(
             AppointmentReminder.reminder_type == reminder_type
-        ).all()
+        )
+        return paginate(query, REMINDER_ORDER, cursor, limit)
 
     @staticmethod
     def count_by_appointment(db: Session, appointment_id: int) -> int:
@@ -59,6 +91,11 @@ class AppointmentReminderRepository:
             AppointmentReminder.appointment_id == appointment_id
         ).count()
 
+    @staticmethod
+    def count_grouped_by_status(db: Session) -> Dict[ReminderStatusEnum, int]:
+        """Count reminders per status with one grouped query"""
+        return count_by(db, AppointmentReminder.status)
+
     @staticmethod
     def count_by_status(db: Session, status: ReminderStatusEnum) -> int:
         return db.query(AppointmentReminder).filter(
@@ -69,14 +106,17 @@ class AppointmentReminderRepository:
     def get_reminders_by_time_range(
         db: Session,
         start_time: datetime,
-        end_time: datetime
-    ) -> List[AppointmentReminder]:
-        return db.query(AppointmentReminder).filter(
+        end_time: datetime,
+        cursor: Optional[str] = None,
+        limit: int = DEFAULT_PAGE_SIZE
+    ) -> Page:
+        query = db.query(AppointmentReminder).filter(
             and_(
                 AppointmentReminder.reminder_time >= start_time,
                 AppointmentReminder.reminder_time <= end_time
             )
-        ).order_by(AppointmentReminder.reminder_time).all()
+        )
+        return paginate(query, REMINDER_ORDER, cursor, limit)
 
     @staticmethod
     def create(db: Session, reminder: AppointmentReminder) -> AppointmentReminder:
@@ -109,4 +149,239 @@ class AppointmentReminderRepository:
             synchronize_session=False
         )
         db.commit()
-        return count
\ No newline at end of file
+        return count
+
+    @staticmethod
+    def cancel_pending_for_appointments(db: Session, appointment_ids: List[int]) -> int:
+        """
+        Cancel every pending (or failed and still retrying) reminder of the given appointments
+        with one UPDATE. Returns count of cancelled reminders. Does not commit: the caller
+        commits it with the change that made the reminders obsolete.
+        """
+        if not appointment_ids:
+            return 0
+        return AppointmentReminderRepository._cancel_pending(
+            db, AppointmentReminder.appointment_id.in_(appointment_ids)
+        )
+
+    @staticmethod
+    def cancel_pending_for_doctor_on_date(db: Session, doctor_id: int, appointment_date: date) -> int:
+        """
+        Cancel every pending (or failed and still retrying) reminder of a doctor's appointments
+        on a date with one UPDATE ... WHERE appointment_id IN (SELECT ...). Returns count.
+        Does not commit.
+        """
+        return AppointmentReminderRepository._cancel_pending(
+            db,
+            AppointmentReminder.appointment_id.in_(
+                select(Appointment.appointment_id).where(
+                    and_(
+                        Appointment.doctor_id == doctor_id,
+                        Appointment.appointment_date == appointment_date
+                    )
+                )
+            )
+        )
+
+    @staticmethod
+    def _cancel_pending(db: Session, condition) -> int:
+        return db.execute(
+            update(AppointmentReminder)
+            .where(
+                and_(
+                    condition,
+                    or_(
+                        AppointmentReminder.status == ReminderStatusEnum.PENDING,
+                        and_(
+                            AppointmentReminder.status == ReminderStatusEnum.FAILED,
+                            AppointmentReminder.next_attempt_at != None
+                        )
+                    )
+                )
+            )
+            .values(status=ReminderStatusEnum.CANCELLED, next_attempt_at=None)
+            .execution_options(synchronize_session=False)
+        ).rowcount
+
+    @staticmethod
+    def schedule_pending(
+        db: Session,
+        appointment_id: int,
+        reminder_type: ReminderTypeEnum,
+        reminder_time: datetime,
+        message_content: str
+    ) -> None:
+        """
+        Add a pending reminder of an appointment, or bring back the cancelled one with the same
+        (appointment_id, reminder_type, reminder_time) when it is moved back to a former time.
+        Does not commit.
+        """
+        statement = insert(AppointmentReminder).values(
+            appointment_id=appointment_id,
+            reminder_type=reminder_type,
+            reminder_time=reminder_time,
+            status=ReminderStatusEnum.PENDING,
+            message_content=message_content
+        )
+        db.execute(
+            statement.on_conflict_do_update(
+                constraint="uq_appointment_reminder_time",
+                set_={
+                    "status": ReminderStatusEnum.PENDING,
+                    "message_content": statement.excluded.message_content,
+                    "attempt_count": 0,
+                    "next_attempt_at": None,
+                    "failure_reason": None
+                },
+                where=AppointmentReminder.status == ReminderStatusEnum.CANCELLED
+            )
+        )
+
+    @staticmethod
+    def claim_due_batch(db: Session, current_time: datetime, batch_size: int) -> List[AppointmentReminder]:
+        """
+        Lock up to batch_size due reminders with SELECT ... FOR UPDATE SKIP LOCKED
+        Due means pending with reminder_time reached, or failed with next_attempt_at reached.
+        Each queue is read and locked by its own query on its partial index in due order with a
+        LIMIT (PostgreSQL does not allow FOR UPDATE with UNION), and the two are merged here, so a
+        batch never sorts the whole backlog. Rows locked by another worker are skipped, so several
+        workers drain the queue without sending anything twice. The locks are held until the
+        caller commits; a row locked by one queue's LIMIT but not in the merged batch stays locked
+        (and skipped by other workers) until then.
+        """
+        pending = db.query(AppointmentReminder).filter(
+            and_(
+                AppointmentReminder.status == ReminderStatusEnum.PENDING,
+                AppointmentReminder.reminder_time <= current_time
+            )
+        ).order_by(AppointmentReminder.reminder_time).limit(batch_size).with_for_update(skip_locked=True).all()
+        retries = db.query(AppointmentReminder).filter(
+            and_(
+                AppointmentReminder.status == ReminderStatusEnum.FAILED,
+                AppointmentReminder.next_attempt_at != None,
+                AppointmentReminder.next_attempt_at <= current_time
+            )
+        ).order_by(AppointmentReminder.next_attempt_at).limit(batch_size).with_for_update(skip_locked=True).all()
+
+        due = heapq.merge(pending, retries, key=lambda reminder: reminder.next_attempt_at
+                          if reminder.status == ReminderStatusEnum.FAILED else reminder.reminder_time)
+        return list(islice(due, batch_size))
+
+    @staticmethod
+    def apply_dispatch_results(
+        db: Session,
+        results: List[Tuple[int, ReminderStatusEnum, Optional[datetime], int, Optional[datetime], Optional[str]]]
+    ) -> int:
+        """
+        Write (reminder_id, status, sent_at, attempt_count, next_attempt_at, failure_reason) of a
+        dispatched batch with one UPDATE ... FROM (VALUES ...) and commit, releasing the batch's
+        row locks. A retry that would fall at or after the appointment's start is dropped
+        (next_attempt_at stays NULL), so no reminder goes out once the appointment has begun.
+        Returns count of updated reminders.
+        """
+        if not results:
+            db.commit()
+            return 0
+
+        outcome = values(
+            column("reminder_id", Integer),
+            column("status", AppointmentReminder.status.type),
+            column("sent_at", DateTime),
+            column("attempt_count", Integer),
+            column("next_attempt_at", DateTime),
+            column("failure_reason", Text),
+            name="outcome"
+        ).data(results)
+
+        # Columns that are NULL in every row of a batch come back as text in PostgreSQL
+        next_attempt_at = cast(outcome.c.next_attempt_at, DateTime)
+        count = db.execute(
+            update(AppointmentReminder)
+            .where(
+                and_(
+                    AppointmentReminder.reminder_id == outcome.c.reminder_id,
+                    Appointment.appointment_id == AppointmentReminder.appointment_id
+                )
+            )
+            .values(
+                status=outcome.c.status,
+                sent_at=cast(outcome.c.sent_at, DateTime),
+                attempt_count=outcome.c.attempt_count,
+                next_attempt_at=case(
+                    (next_attempt_at < Appointment.appointment_date + Appointment.start_time, next_attempt_at),
+                    else_=None
+                ),
+                failure_reason=cast(outcome.c.failure_reason, Text)
+            )
+            .execution_options(synchronize_session=False)
+        ).rowcount
+        db.commit()
+        return count
+
+    @staticmethod
+    def generate_for_upcoming_appointments(
+        db: Session,
+        current_time: datetime,
+        hours_before: int,
+        reminder_type: ReminderTypeEnum,
+        max_per_appointment: int,
+        booked_since: Optional[datetime] = None
+    ) -> int:
+        """
+        Create a pending reminder for every upcoming scheduled appointment with one INSERT ... SELECT
+        Skips appointments whose reminder time has passed, that already have this reminder or
+        that reached max_per_appointment; ON CONFLICT DO NOTHING keeps concurrent runs safe.
+        booked_since limits the scan to appointments booked after that time. Returns count created.
+        """
+        reminder_time = (Appointment.appointment_date + Appointment.start_time) - timedelta(hours=hours_before)
+        message = func.concat(
+            "Reminder: you have an appointment on ",
+            func.to_char(Appointment.appointment_date, "FMMonth DD, YYYY"),
+            " at ",
+            func.to_char(Appointment.start_time, "HH12:MI AM"),
+            "."
+        )
+        existing = select(func.count()).where(
+            AppointmentReminder.appointment_id == Appointment.appointment_id
+        ).scalar_subquery()
+
+        conditions = [
+            Appointment.status == AppointmentStatusEnum.scheduled,
+            reminder_time > current_time,
+            existing < max_per_appointment,
+            ~exists().where(
+                and_(
+                    AppointmentReminder.appointment_id == Appointment.appointment_id,
+                    AppointmentReminder.reminder_type == reminder_type,
+                    AppointmentReminder.reminder_time == reminder_time
+                )
+            )
+        ]
+        if booked_since is not None:
+            conditions.append(Appointment.booking_date >= booked_since)
+
+        statement = insert(AppointmentReminder).from_select(
+            ["appointment_id", "reminder_type", "reminder_time", "status", "message_content"],
+            select(
+                Appointment.appointment_id,
+                literal(reminder_type, AppointmentReminder.reminder_type.type),
+                reminder_time,
+                literal(ReminderStatusEnum.PENDING, AppointmentReminder.status.type),
+                message
+            ).where(and_(*conditions))
+        ).on_conflict_do_nothing()
+
+        count = db.execute(statement).rowcount
+        db.commit()
+        return count
+
+    @staticmethod
+    def get_last_generation_run(db: Session) -> Optional[ReminderGenerationRun]:
+        return db.query(ReminderGenerationRun).order_by(ReminderGenerationRun.started_at.desc()).first()
+
+    @staticmethod
+    def create_generation_run(db: Session, run: ReminderGenerationRun) -> ReminderGenerationRun:
+        db.add(run)
+        db.commit()
+        db.refresh(run)
+        return run
@@ -1,9 +1,23 @@
 from sqlalchemy.orm import Session
-from datetime import datetime, timedelta
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date, datetime, timedelta
 from typing import List, Optional, Dict
-from Appointment_Reminder.Appointment_Reminder_model import AppointmentReminder, ReminderTypeEnum, ReminderStatusEnum
-from Appointment_Reminder_repository import AppointmentReminderRepository
-from Appointment_Reminder_config import get_reminder_settings
+from Appointment_Reminder.Appointment_Reminder_model import (
+    AppointmentReminder,
+    ReminderTypeEnum,
+    ReminderStatusEnum,
+    ReminderGenerationRun
+)
+from Appointment_Reminder.Appointment_Reminder_repository import AppointmentReminderRepository
+from Appointment_Reminder.Appointment_Reminder_config import (
+    get_reminder_settings,
+    get_next_attempt_at,
+    calculate_reminder_time,
+    format_automatic_reminder_message
+)
+from Appointment_Reminder.Appointment_Reminder_transport import ReminderTransport, get_reminder_transport
+from statistics_cache import statistics_cache, table_key
+from pagination import DEFAULT_PAGE_SIZE, Page
 
 class AppointmentReminderService:
 
@@ -51,25 +65,25 @@ class AppointmentReminderService:
         return reminder
 
     @staticmethod
-    def list_reminders(db: Session, skip: int = 0, limit: int = 100) -> List[AppointmentReminder]:
-        return AppointmentReminderRepository.get_all(db, skip, limit)
+    def list_reminders(db: Session, cursor: Optional[str] = None, limit: int = DEFAULT_PAGE_SIZE) -> Page:
+        return AppointmentReminderRepository.get_all(db, cursor, limit)
 
     @staticmethod
     def get_appointment_reminders(db: Session, appointment_id: int) -> List[AppointmentReminder]:
         return AppointmentReminderRepository.get_by_appointment_id(db, appointment_id)
 
     @staticmethod
-    def get_pending_reminders(db: Session) -> List[AppointmentReminder]:
-        return AppointmentReminderRepository.get_pending_reminders(db)
+    def get_pending_reminders(db: Session, cursor: Optional[str] = None, limit: int = DEFAULT_PAGE_SIZE) -> Page:
+        return AppointmentReminderRepository.get_pending_reminders(db, cursor, limit)
 
     @staticmethod
-    def get_due_reminders(db: Session) -> List[AppointmentReminder]:
+    def get_due_reminders(db: Session, cursor: Optional[str] = None, limit: int = DEFAULT_PAGE_SIZE) -> Page:
         current_time = datetime.now()
-        return AppointmentReminderRepository.get_due_reminders(db, current_time)
+        return AppointmentReminderRepository.get_due_reminders(db, current_time, cursor, limit)
 
     @staticmethod
-    def get_failed_reminders(db: Session) -> List[AppointmentReminder]:
-        return AppointmentReminderRepository.get_failed_reminders(db)
+    def get_failed_reminders(db: Session, cursor: Optional[str] = None, limit: int = DEFAULT_PAGE_SIZE) -> Page:
+        return AppointmentReminderRepository.get_failed_reminders(db, cursor, limit)
 
     @staticmethod
     def mark_as_sent(db: Session, reminder_id: int) -> AppointmentReminder:
@@ -77,11 +91,13 @@ class AppointmentReminderService:
         if not reminder:
             raise ValueError(f"Reminder with ID {reminder_id} not found")
 
-        if reminder.status != ReminderStatusEnum.PENDING:
-            raise ValueError(f"Can only mark pending reminders as sent. Current status: {reminder.status.value}")
+        if reminder.status not in [ReminderStatusEnum.PENDING, ReminderStatusEnum.FAILED]:
+            raise ValueError(f"Can only mark pending or failed reminders as sent. Current status: {reminder.status.value}")
 
         reminder.status = ReminderStatusEnum.SENT
         reminder.sent_at = datetime.now()
+        reminder.attempt_count = (reminder.attempt_count or 0) + 1
+        reminder.next_attempt_at = None
 
         return AppointmentReminderRepository.update(db, reminder)
 
@@ -91,9 +107,11 @@ class AppointmentReminderService:
         if not reminder:
             raise ValueError(f"Reminder with ID {reminder_id} not found")
 
+        failed_at = datetime.now()
         reminder.status = ReminderStatusEnum.FAILED
-        if reason:
-            reminder.message_content = f"{reminder.message_content}\nFailed: {reason}"
+        reminder.attempt_count = (reminder.attempt_count or 0) + 1
+        reminder.next_attempt_at = get_next_attempt_at(failed_at, reminder.attempt_count)
+        reminder.failure_reason = reason
 
         return AppointmentReminderRepository.update(db, reminder)
 
@@ -142,51 +160,192 @@ class AppointmentReminderService:
 
     @staticmethod
     def cancel_appointment_reminders(db: Session, appointment_id: int) -> int:
-        reminders = AppointmentReminderRepository.get_by_appointment_id(db, appointment_id)
-        
-        cancelled_count = 0
-        for reminder in reminders:
-            if reminder.status == ReminderStatusEnum.PENDING:
-                reminder.status = ReminderStatusEnum.CANCELLED
-                AppointmentReminderRepository.update(db, reminder)
-                cancelled_count += 1
-        
-        return cancelled_count
+        count = AppointmentReminderRepository.cancel_pending_for_appointments(db, [appointment_id])
+        db.commit()
+        return count
+
+    @staticmethod
+    def cancel_reminders_for_appointments(db: Session, appointment_ids: List[int]) -> int:
+        """Cancel the pending reminders of many appointments in one statement"""
+        if not appointment_ids:
+            raise ValueError("No appointment IDs provided")
+        count = AppointmentReminderRepository.cancel_pending_for_appointments(db, list(set(appointment_ids)))
+        db.commit()
+        return count
+
+    @staticmethod
+    def cancel_doctor_day_reminders(db: Session, doctor_id: int, appointment_date: date) -> int:
+        """Cancel the pending reminders of all of a doctor's appointments on a date in one statement"""
+        if isinstance(appointment_date, str):
+            appointment_date = datetime.strptime(appointment_date, "%Y-%m-%d").date()
+        count = AppointmentReminderRepository.cancel_pending_for_doctor_on_date(db, doctor_id, appointment_date)
+        db.commit()
+        return count
 
     @staticmethod
     def process_due_reminders(db: Session) -> Dict:
-        due_reminders = AppointmentReminderService.get_due_reminders(db)
-        
-        sent = 0
-        failed = 0
-        
-        for reminder in due_reminders:
+        result = AppointmentReminderService.dispatch_due_reminders(db)
+        return {
+            "total_processed": result["sent"] + result["failed"],
+            "sent": result["sent"],
+            "failed": result["failed"]
+        }
+
+    @staticmethod
+    def dispatch_due_reminders(
+        db: Session,
+        transport: Optional[ReminderTransport] = None,
+        batch_size: Optional[int] = None,
+        max_batches: Optional[int] = None
+    ) -> Dict:
+        """
+        Send due reminders batch by batch until none are left (or max_batches is reached)
+        Each batch is claimed with FOR UPDATE SKIP LOCKED, sent through a bounded thread pool
+        and written back with one UPDATE, so any number of workers can run side by side.
+        """
+        settings = get_reminder_settings()
+        transport = transport or get_reminder_transport()
+        batch_size = batch_size or settings.REMINDER_DISPATCH_BATCH_SIZE
+
+        def send(message: Dict) -> Optional[str]:
             try:
-                # Simulate sending reminder (replace with actual sending logic)
-                AppointmentReminderService.mark_as_sent(db, reminder.reminder_id)
-                sent += 1
+                transport.send(message)
+                return None
             except Exception as e:
-                AppointmentReminderService.mark_as_failed(db, reminder.reminder_id, str(e))
-                failed += 1
-        
+                return str(e) or e.__class__.__name__
+
+        batches = sent = failed = 0
+        with ThreadPoolExecutor(max_workers=settings.REMINDER_SEND_CONCURRENCY) as pool:
+            while max_batches is None or batches < max_batches:
+                batch = AppointmentReminderRepository.claim_due_batch(db, datetime.now(), batch_size)
+                if not batch:
+                    db.commit()
+                    break
+
+                messages = [AppointmentReminderService.to_message(reminder) for reminder in batch]
+                results = []
+                for message, error in zip(messages, pool.map(send, messages)):
+                    finished_at = datetime.now()
+                    attempt_count = message["attempt"]
+                    if error is None:
+                        results.append((
+                            message["reminder_id"], ReminderStatusEnum.SENT, finished_at, attempt_count, None, None
+                        ))
+                    else:
+                        results.append((
+                            message["reminder_id"],
+                            ReminderStatusEnum.FAILED,
+                            None,
+                            attempt_count,
+                            get_next_attempt_at(finished_at, attempt_count),
+                            error
+                        ))
+
+                AppointmentReminderRepository.apply_dispatch_results(db, results)
+                batches += 1
+                batch_sent = sum(1 for result in results if result[1] == ReminderStatusEnum.SENT)
+                sent += batch_sent
+                failed += len(results) - batch_sent
+
+        return {"batches": batches, "sent": sent, "failed": failed}
+
+    @staticmethod
+    def to_message(reminder: AppointmentReminder) -> Dict:
+        """Plain copy of a reminder handed to the transport"""
         return {
-            "total_processed": len(due_reminders),
-            "sent": sent,
-            "failed": failed
+            "reminder_id": reminder.reminder_id,
+            "appointment_id": reminder.appointment_id,
+            "reminder_type": reminder.reminder_type.value,
+            "reminder_time": reminder.reminder_time,
+            "message_content": reminder.message_content,
+            "attempt": (reminder.attempt_count or 0) + 1
         }
 
     @staticmethod
-    def get_reminder_statistics(db: Session) -> Dict:
-        total = AppointmentReminderRepository.count_by_status(db, None) if hasattr(AppointmentReminderRepository, 'count_all') else 0
-        pending = AppointmentReminderRepository.count_by_status(db, ReminderStatusEnum.PENDING)
-        sent = AppointmentReminderRepository.count_by_status(db, ReminderStatusEnum.SENT)
-        failed = AppointmentReminderRepository.count_by_status(db, ReminderStatusEnum.FAILED)
-        cancelled = AppointmentReminderRepository.count_by_status(db, ReminderStatusEnum.CANCELLED)
+    def generate_reminders(db: Session, full: bool = False) -> Dict:
+        """
+        Nightly job: create the automatic reminder of every upcoming scheduled appointment
+        Incremental runs only scan appointments booked since the previous run (minus
+        AUTO_REMINDER_OVERLAP_MINUTES for bookings committed late); rerunning is harmless.
+        Appointments moved to another date or time get their reminder from reschedule_reminders.
+        """
+        settings = get_reminder_settings()
+        if not settings.ENABLE_AUTO_REMINDERS:
+            raise ValueError("Automatic reminders are disabled")
+
+        try:
+            reminder_type = ReminderTypeEnum[settings.AUTO_REMINDER_TYPE]
+        except KeyError:
+            raise ValueError(f"Invalid AUTO_REMINDER_TYPE: {settings.AUTO_REMINDER_TYPE}")
+
+        started_at = datetime.now()
+        booked_since = None
+        if not full:
+            last_run = AppointmentReminderRepository.get_last_generation_run(db)
+            if last_run:
+                booked_since = last_run.started_at - timedelta(minutes=settings.AUTO_REMINDER_OVERLAP_MINUTES)
+
+        created = AppointmentReminderRepository.generate_for_upcoming_appointments(
+            db,
+            started_at,
+            settings.DEFAULT_REMINDER_HOURS_BEFORE,
+            reminder_type,
+            settings.MAX_REMINDERS_PER_APPOINTMENT,
+            booked_since
+        )
+        AppointmentReminderRepository.create_generation_run(
+            db,
+            ReminderGenerationRun(started_at=started_at, booked_since=booked_since, created_count=created)
+        )
 
         return {
-            "total_reminders": total,
-            "pending": pending,
-            "sent": sent,
-            "failed": failed,
-            "cancelled": cancelled
+            "started_at": started_at,
+            "booked_since": booked_since,
+            "created": created
         }
+
+    @staticmethod
+    def reschedule_reminders(db: Session, appointment) -> None:
+        """
+        Follow an appointment to its new date or time (not committed)
+        Its pending reminders, which point at the old time, are cancelled and the automatic
+        reminder is created for the new time, in the transaction that moves the appointment.
+        The nightly generate_reminders only scans new bookings, so it would miss the move.
+        """
+        AppointmentReminderRepository.cancel_pending_for_appointments(db, [appointment.appointment_id])
+
+        settings = get_reminder_settings()
+        if not settings.ENABLE_AUTO_REMINDERS:
+            return
+        try:
+            reminder_type = ReminderTypeEnum[settings.AUTO_REMINDER_TYPE]
+        except KeyError:
+            raise ValueError(f"Invalid AUTO_REMINDER_TYPE: {settings.AUTO_REMINDER_TYPE}")
+
+        reminder_time = calculate_reminder_time(
+            datetime.combine(appointment.appointment_date, appointment.start_time),
+            settings.DEFAULT_REMINDER_HOURS_BEFORE
+        )
+        if reminder_time > datetime.now():
+            AppointmentReminderRepository.schedule_pending(
+                db,
+                appointment.appointment_id,
+                reminder_type,
+                reminder_time,
+                format_automatic_reminder_message(appointment.appointment_date, appointment.start_time)
+            )
+
+    @staticmethod
+    def get_reminder_statistics(db: Session) -> Dict:
+        """Reminder counts per status (cached briefly, dropped when reminders are written)"""
+        def compute() -> Dict:
+            counts = AppointmentReminderRepository.count_grouped_by_status(db)
+            return {
+                "total_reminders": sum(counts.values()),
+                "pending": counts.get(ReminderStatusEnum.PENDING, 0),
+                "sent": counts.get(ReminderStatusEnum.SENT, 0),
+                "failed": counts.get(ReminderStatusEnum.FAILED, 0),
+                "cancelled": counts.get(ReminderStatusEnum.CANCELLED, 0)
+            }
+
+        return statistics_cache.get_or_compute(table_key(AppointmentReminder), "overall", compute)
@@ -0,0 +1,60 @@
+"""
+Appointment Reminder Entity - Transports
+A transport delivers one reminder (SMS, email, ...). The dispatcher picks the one named by
+REMINDER_TRANSPORT; register real gateways with register_transport.
+"""
+from abc import ABC, abstractmethod
+from threading import Lock
+from typing import Callable, Dict, Iterable, List
+
+from Appointment_Reminder.Appointment_Reminder_config import get_reminder_settings, ReminderException
+
+
+class ReminderTransportException(ReminderException):
+    """Raised by a transport when a reminder could not be delivered"""
+    pass
+
+
+class ReminderTransport(ABC):
+    """
+    Base class for reminder transports
+    send() receives a plain dict (reminder_id, appointment_id, reminder_type, reminder_time,
+    message_content) and raises on failure. It is called from several threads at once.
+    """
+
+    @abstractmethod
+    def send(self, reminder: Dict) -> None:
+        """Deliver one reminder; raise ReminderTransportException when it cannot be delivered"""
+
+
+class FakeReminderTransport(ReminderTransport):
+    """Local transport that records what it was asked to send; used in tests and development"""
+
+    def __init__(self, fail_ids: Iterable[int] = ()):
+        self.fail_ids = set(fail_ids)
+        self.sent: List[Dict] = []
+        self._lock = Lock()
+
+    def send(self, reminder: Dict) -> None:
+        if reminder["reminder_id"] in self.fail_ids:
+            raise ReminderTransportException(f"Delivery refused for reminder {reminder['reminder_id']}")
+        with self._lock:
+            self.sent.append(reminder)
+
+
+_transports: Dict[str, Callable[[], ReminderTransport]] = {
+    "fake": FakeReminderTransport
+}
+
+
+def register_transport(name: str, factory: Callable[[], ReminderTransport]) -> None:
+    """Make a transport selectable through REMINDER_TRANSPORT"""
+    _transports[name] = factory
+
+
+def get_reminder_transport() -> ReminderTransport:
+    """Build the transport named by REMINDER_TRANSPORT"""
+    name = get_reminder_settings().REMINDER_TRANSPORT
+    if name not in _transports:
+        raise ReminderException(f"Unknown reminder transport: {name}")
+    return _transports[name]()
@@ -0,0 +1,36 @@
+"""
+Appointment Reminder Entity - Dispatch Worker
+Long-running process that sends due reminders. Start as many as needed:
+    python -m Appointment_Reminder.Appointment_Reminder_worker
+"""
+import time
+
+from Appointment_Reminder.Appointment_Reminder_config import SessionLocal, get_reminder_settings
+from Appointment_Reminder.Appointment_Reminder_service import AppointmentReminderService
+from Appointment_Reminder.Appointment_Reminder_transport import get_reminder_transport
+
+
+def run_worker() -> None:
+    """Drain due reminders, then sleep REMINDER_POLL_INTERVAL_SECONDS while nothing is due"""
+    settings = get_reminder_settings()
+    transport = get_reminder_transport()
+
+    while True:
+        db = SessionLocal()
+        try:
+            result = AppointmentReminderService.dispatch_due_reminders(db, transport)
+        except Exception as e:
+            print(f"❌ Reminder dispatch failed: {e}")
+            db.rollback()
+            result = {"batches": 0}
+        finally:
+            db.close()
+
+        if result["batches"]:
+            print(f"Reminders dispatched: {result['sent']} sent, {result['failed']} failed")
+        else:
+            time.sleep(settings.REMINDER_POLL_INTERVAL_SECONDS)
+
+
+if __name__ == "__main__":
+    run_worker()
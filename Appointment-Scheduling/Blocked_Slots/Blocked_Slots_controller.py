@@ -2,8 +2,10 @@ from fastapi import APIRouter, Depends, HTTPException, Query
 from sqlalchemy.orm import Session
 from typing import List, Optional
 from datetime import date
+from functools import partial
 from Blocked_Slots.Blocked_Slots_config import get_db
 from Blocked_Slots.Blocked_Slots_service import BlockedSlotService
+from pagination import DEFAULT_PAGE_SIZE, MAX_PAGE_SIZE
 from pydantic import BaseModel, Field
 
 router = APIRouter()
@@ -50,7 +52,7 @@ def create_blocked_slot(payload: BlockedSlotCreate, db: Session = Depends(get_db
         return {
             "message": "Blocked slot created successfully",
             "blocked_slot_id": blocked_slot.blocked_slot_id,
-            "blocked_slot": blocked_slot
+            "blocked_slot": BlockedSlotService.to_dict(blocked_slot)
         }
     except ValueError as e:
         raise HTTPException(status_code=400, detail=str(e))
@@ -69,7 +71,7 @@ def block_full_day(payload: FullDayBlock, db: Session = Depends(get_db)):
         return {
             "message": "Full day blocked successfully",
             "blocked_slot_id": blocked_slot.blocked_slot_id,
-            "blocked_slot": blocked_slot
+            "blocked_slot": BlockedSlotService.to_dict(blocked_slot)
         }
     except ValueError as e:
         raise HTTPException(status_code=400, detail=str(e))
@@ -83,13 +85,13 @@ def block_multiple_days(payload: MultipleDaysBlock, db: Session = Depends(get_db
         from datetime import datetime
         start_date = datetime.strptime(payload.start_date, "%Y-%m-%d").date()
         end_date = datetime.strptime(payload.end_date, "%Y-%m-%d").date()
-        blocked_slots = BlockedSlotService.block_multiple_days(
+        result = BlockedSlotService.block_multiple_days(
             db, payload.doctor_id, start_date, end_date, payload.reason, payload.created_by
         )
         return {
-            "message": f"Blocked {len(blocked_slots)} days successfully",
-            "count": len(blocked_slots),
-            "blocked_slots": blocked_slots
+            "message": f"Blocked {result['blocked_count']} days successfully",
+            "count": result["blocked_count"],
+            **result
         }
     except ValueError as e:
         raise HTTPException(status_code=400, detail=str(e))
@@ -100,7 +102,7 @@ def block_multiple_days(payload: MultipleDaysBlock, db: Session = Depends(get_db
 @router.get("/{blocked_slot_id}")
 def get_blocked_slot(blocked_slot_id: int, db: Session = Depends(get_db)):
     try:
-        return BlockedSlotService.get_blocked_slot(db, blocked_slot_id)
+        return BlockedSlotService.to_dict(BlockedSlotService.get_blocked_slot(db, blocked_slot_id))
     except ValueError as e:
         raise HTTPException(status_code=404, detail=str(e))
     except Exception as e:
@@ -109,31 +111,51 @@ def get_blocked_slot(blocked_slot_id: int, db: Session = Depends(get_db)):
 
 @router.get("/")
 def list_blocked_slots(
-    skip: int = Query(0, ge=0),
-    limit: int = Query(100, ge=1, le=1000),
+    cursor: Optional[str] = Query(None, description="next_cursor of the previous page"),
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
     db: Session = Depends(get_db)
 ):
     try:
-        blocked_slots = BlockedSlotService.list_blocked_slots(db, skip, limit)
-        return {"count": len(blocked_slots), "blocked_slots": blocked_slots}
+        page = BlockedSlotService.to_day_page(partial(BlockedSlotService.list_blocked_slots, db), cursor, limit)
+        return page.as_response("blocked_slots")
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Internal server error: {str(e)}")
 
 
 @router.get("/doctor/{doctor_id}")
-def get_doctor_blocked_slots(doctor_id: int, db: Session = Depends(get_db)):
+def get_doctor_blocked_slots(
+    doctor_id: int,
+    cursor: Optional[str] = Query(None, description="next_cursor of the previous page"),
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+    db: Session = Depends(get_db)
+):
     try:
-        blocked_slots = BlockedSlotService.get_doctor_blocked_slots(db, doctor_id)
-        return {"doctor_id": doctor_id, "count": len(blocked_slots), "blocked_slots": blocked_slots}
+        page = BlockedSlotService.to_day_page(
+            partial(BlockedSlotService.get_doctor_blocked_slots, db, doctor_id), cursor, limit
+        )
+        return {"doctor_id": doctor_id, **page.as_response("blocked_slots")}
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Internal server error: {str(e)}")
 
 
 @router.get("/doctor/{doctor_id}/upcoming")
-def get_upcoming_blocked_slots(doctor_id: int, db: Session = Depends(get_db)):
+def get_upcoming_blocked_slots(
+    doctor_id: int,
+    cursor: Optional[str] = Query(None, description="next_cursor of the previous page"),
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+    db: Session = Depends(get_db)
+):
     try:
-        blocked_slots = BlockedSlotService.get_upcoming_blocked_slots(db, doctor_id)
-        return {"doctor_id": doctor_id, "count": len(blocked_slots), "blocked_slots": blocked_slots}
+        page = BlockedSlotService.to_day_page(
+            partial(BlockedSlotService.get_upcoming_blocked_slots, db, doctor_id), cursor, limit, start_date=date.today()
+        )
+        return {"doctor_id": doctor_id, **page.as_response("blocked_slots")}
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Internal server error: {str(e)}")
 
@@ -151,7 +173,11 @@ def get_doctor_blocked_slots_by_date(doctor_id: int, blocked_date: str, db: Sess
     try:
         from datetime import datetime
         date_obj = datetime.strptime(blocked_date, "%Y-%m-%d").date()
-        blocked_slots = BlockedSlotService.get_doctor_blocked_slots_by_date(db, doctor_id, date_obj)
+        blocked_slots = [
+            entry
+            for blocked_slot in BlockedSlotService.get_blocked_slots_by_date(db, doctor_id, date_obj)
+            for entry in BlockedSlotService.to_day_dicts(blocked_slot, date_obj, date_obj)
+        ]
         return {"doctor_id": doctor_id, "date": blocked_date, "count": len(blocked_slots), "blocked_slots": blocked_slots}
     except ValueError as e:
         raise HTTPException(status_code=400, detail=str(e))
@@ -160,12 +186,19 @@ def get_doctor_blocked_slots_by_date(doctor_id: int, blocked_date: str, db: Sess
 
 
 @router.get("/date/{blocked_date}")
-def get_blocked_slots_by_date(blocked_date: str, db: Session = Depends(get_db)):
+def get_blocked_slots_by_date(
+    blocked_date: str,
+    cursor: Optional[str] = Query(None, description="next_cursor of the previous page"),
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+    db: Session = Depends(get_db)
+):
     try:
         from datetime import datetime
         date_obj = datetime.strptime(blocked_date, "%Y-%m-%d").date()
-        blocked_slots = BlockedSlotService.get_blocked_slots_by_date(db, date_obj)
-        return {"date": blocked_date, "count": len(blocked_slots), "blocked_slots": blocked_slots}
+        page = BlockedSlotService.to_day_page(
+            partial(BlockedSlotService.get_all_blocked_slots_by_date, db, date_obj), cursor, limit, date_obj, date_obj
+        )
+        return {"date": blocked_date, **page.as_response("blocked_slots")}
     except ValueError as e:
         raise HTTPException(status_code=400, detail=str(e))
     except Exception as e:
@@ -177,15 +210,19 @@ def get_blocked_slots_by_date_range(
     doctor_id: int,
     start_date: str = Query(..., description="Start date (YYYY-MM-DD)"),
     end_date: str = Query(..., description="End date (YYYY-MM-DD)"),
+    cursor: Optional[str] = Query(None, description="next_cursor of the previous page"),
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
     db: Session = Depends(get_db)
 ):
     try:
         from datetime import datetime
         start = datetime.strptime(start_date, "%Y-%m-%d").date()
         end = datetime.strptime(end_date, "%Y-%m-%d").date()
-        blocked_slots = BlockedSlotService.get_blocked_slots_by_date_range(db, doctor_id, start, end)
+        page = BlockedSlotService.to_day_page(
+            partial(BlockedSlotService.get_blocked_slots_in_range, db, doctor_id, start, end), cursor, limit, start, end
+        )
         return {"doctor_id": doctor_id, "start_date": start_date, "end_date": end_date,
-                "count": len(blocked_slots), "blocked_slots": blocked_slots}
+                **page.as_response("blocked_slots")}
     except ValueError as e:
         raise HTTPException(status_code=400, detail=str(e))
     except Exception as e:
@@ -252,7 +289,7 @@ def update_blocked_slot(blocked_slot_id: int, payload: BlockedSlotUpdate, db: Se
         if not update_data:
             raise HTTPException(status_code=400, detail="No fields to update")
         blocked_slot = BlockedSlotService.update_blocked_slot(db, blocked_slot_id, update_data)
-        return {"message": "Blocked slot updated successfully", "blocked_slot": blocked_slot}
+        return {"message": "Blocked slot updated successfully", "blocked_slot": BlockedSlotService.to_dict(blocked_slot)}
     except ValueError as e:
         raise HTTPException(status_code=404, detail=str(e))
     except Exception as e:
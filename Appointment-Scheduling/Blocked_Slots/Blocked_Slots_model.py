@@ -1,29 +1,56 @@
-from sqlalchemy import Column, Integer, Date, Time, DateTime, Text
+from sqlalchemy import Column, Integer, DateTime, Text, Index, CheckConstraint
 from sqlalchemy.sql import func
-from Blocked_Slots.Blocked_Slots_config import Base
+from Blocked_Slots.Blocked_Slots_config import Base, split_period_by_day
+from datetime import date, time
 
 
 class BlockedSlot(Base):
     """Blocked Slots model matching hms.blocked_slots table"""
     __tablename__ = "blocked_slots"
-    __table_args__ = {"schema": "hms"}
 
     blocked_slot_id = Column(Integer, primary_key=True, autoincrement=True)
-    
+
     # Foreign Key - just integer, DB has the constraint
     doctor_id = Column(Integer, nullable=False, index=True)
-    
-    # Date and Time
-    blocked_date = Column(Date, nullable=False, index=True)
-    start_time = Column(Time, nullable=False)
-    end_time = Column(Time, nullable=False)
-    
+
+    # Blocked period [blocked_from, blocked_until) - one row per block, however many days it spans
+    blocked_from = Column(DateTime, nullable=False)
+    blocked_until = Column(DateTime, nullable=False)
+
     # Reason for blocking
     reason = Column(Text, nullable=False)
-    
+
     # Audit fields
     created_at = Column(DateTime, nullable=False, server_default=func.now())
     created_by = Column(Integer, nullable=False)
-    
+
+    __table_args__ = (
+        CheckConstraint("blocked_from < blocked_until", name="blocked_slots_period_check"),
+        # Overlap tests (tsrange && tsrange) per doctor are answered from this index
+        Index(
+            "ix_blocked_slots_doctor_period",
+            doctor_id,
+            func.tsrange(blocked_from, blocked_until),
+            postgresql_using="gist"
+        ),
+        # Keyset pagination of a doctor's blocked periods
+        Index("ix_blocked_slots_doctor_from_id", doctor_id, blocked_from, blocked_slot_id),
+        {"schema": "hms"}
+    )
+
+    # The API's per-day shape: the first day the block covers, and its times on that day
+    @property
+    def blocked_date(self) -> date:
+        return self.blocked_from.date()
+
+    @property
+    def start_time(self) -> time:
+        return self.blocked_from.time()
+
+    @property
+    def end_time(self) -> time:
+        """End time on the first day (23:59:59 when the block runs past midnight)"""
+        return next(split_period_by_day(self.blocked_from, self.blocked_until))[2]
+
     def __repr__(self):
-        return f"<BlockedSlot {self.blocked_slot_id}: Dr.{self.doctor_id} on {self.blocked_date} {self.start_time}-{self.end_time}>"
\ No newline at end of file
+        return f"<BlockedSlot {self.blocked_slot_id}: Dr.{self.doctor_id} {self.blocked_from} to {self.blocked_until}>"
@@ -1,8 +1,32 @@
 from sqlalchemy.orm import Session
-from sqlalchemy import and_, or_
-from datetime import date, time, datetime
-from typing import List, Optional
+from sqlalchemy import and_, insert, func
+from datetime import date, time, datetime, timedelta
+from typing import List, Optional, Set
 from Blocked_Slots.Blocked_Slots_model import BlockedSlot
+from Blocked_Slots.Blocked_Slots_config import to_blocked_period, split_period_by_day, is_time_overlap
+from pagination import DEFAULT_PAGE_SIZE, Page, paginate
+
+
+def day_start(check_date: date) -> datetime:
+    """Midnight at the start of a date"""
+    return datetime.combine(check_date, time(0, 0, 0))
+
+
+def overlaps_period(blocked_from: datetime, blocked_until: datetime):
+    """Filter for blocked slots overlapping [blocked_from, blocked_until); matches the GiST index expression"""
+    return func.tsrange(BlockedSlot.blocked_from, BlockedSlot.blocked_until).op("&&")(
+        func.tsrange(blocked_from, blocked_until)
+    )
+
+
+def overlaps_dates(start_date: date, end_date: date):
+    """Filter for blocked slots touching any day from start_date to end_date (inclusive)"""
+    return overlaps_period(day_start(start_date), day_start(end_date + timedelta(days=1)))
+
+
+# Sort key of blocked slot listings (see migrations/015)
+BLOCKED_SLOT_ORDER = (BlockedSlot.blocked_from, BlockedSlot.blocked_slot_id)
+
 
 class BlockedSlotRepository:
 
@@ -12,152 +36,341 @@ class BlockedSlotRepository:
         return db.query(BlockedSlot).filter(BlockedSlot.blocked_slot_id == blocked_slot_id).first()
 
     @staticmethod
-    def get_all(db: Session, skip: int = 0, limit: int = 100) -> List[BlockedSlot]:
-        """Get all blocked slots with pagination"""
-        return db.query(BlockedSlot).offset(skip).limit(limit).all()
+    def get_all(db: Session, cursor: Optional[str] = None, limit: int = DEFAULT_PAGE_SIZE) -> Page:
+        """Get a page of all blocked slots (by ID)"""
+        return paginate(db.query(BlockedSlot), [BlockedSlot.blocked_slot_id], cursor, limit)
 
     @staticmethod
-    def get_by_doctor_id(db: Session, doctor_id: int) -> List[BlockedSlot]:
-        """Get all blocked slots for a specific doctor"""
-        return db.query(BlockedSlot).filter(BlockedSlot.doctor_id == doctor_id).all()
+    def get_by_doctor_id(
+        db: Session,
+        doctor_id: int,
+        cursor: Optional[str] = None,
+        limit: int = DEFAULT_PAGE_SIZE
+    ) -> Page:
+        """Get a page of a doctor's blocked slots (by start)"""
+        query = db.query(BlockedSlot).filter(BlockedSlot.doctor_id == doctor_id)
+        return paginate(query, BLOCKED_SLOT_ORDER, cursor, limit)
 
     @staticmethod
-    def get_by_date(db: Session, blocked_date: date) -> List[BlockedSlot]:
-        """Get all blocked slots on a specific date"""
-        return db.query(BlockedSlot).filter(BlockedSlot.blocked_date == blocked_date).all()
+    def get_by_date(
+        db: Session,
+        blocked_date: date,
+        cursor: Optional[str] = None,
+        limit: int = DEFAULT_PAGE_SIZE
+    ) -> Page:
+        """Get a page of the blocked slots touching a specific date (by start)"""
+        query = db.query(BlockedSlot).filter(overlaps_dates(blocked_date, blocked_date))
+        return paginate(query, BLOCKED_SLOT_ORDER, cursor, limit)
 
     @staticmethod
     def get_by_doctor_and_date(db: Session, doctor_id: int, blocked_date: date) -> List[BlockedSlot]:
-        """Get blocked slots for a doctor on a specific date"""
+        """Get blocked slots for a doctor touching a specific date"""
         return db.query(BlockedSlot).filter(
             and_(
                 BlockedSlot.doctor_id == doctor_id,
-                BlockedSlot.blocked_date == blocked_date
+                overlaps_dates(blocked_date, blocked_date)
             )
         ).all()
 
     @staticmethod
-    def get_upcoming_blocked_slots(db: Session, doctor_id: int, from_date: date) -> List[BlockedSlot]:
-        """Get upcoming blocked slots for a doctor"""
-        return db.query(BlockedSlot).filter(
+    def get_upcoming_blocked_slots(
+        db: Session,
+        doctor_id: int,
+        from_date: date,
+        cursor: Optional[str] = None,
+        limit: int = DEFAULT_PAGE_SIZE
+    ) -> Page:
+        """Get a page of a doctor's blocked slots that have not ended before from_date"""
+        query = db.query(BlockedSlot).filter(
             and_(
                 BlockedSlot.doctor_id == doctor_id,
-                BlockedSlot.blocked_date >= from_date
+                BlockedSlot.blocked_until > day_start(from_date)
             )
-        ).order_by(BlockedSlot.blocked_date, BlockedSlot.start_time).all()
+        )
+        return paginate(query, BLOCKED_SLOT_ORDER, cursor, limit)
 
     @staticmethod
-    def get_past_blocked_slots(db: Session, doctor_id: int, before_date: date) -> List[BlockedSlot]:
-        """Get past blocked slots for a doctor"""
-        return db.query(BlockedSlot).filter(
+    def get_past_blocked_slots(
+        db: Session,
+        doctor_id: int,
+        before_date: date,
+        cursor: Optional[str] = None,
+        limit: int = DEFAULT_PAGE_SIZE
+    ) -> Page:
+        """Get a page of a doctor's blocked slots that started before before_date (latest first)"""
+        query = db.query(BlockedSlot).filter(
             and_(
                 BlockedSlot.doctor_id == doctor_id,
-                BlockedSlot.blocked_date < before_date
+                BlockedSlot.blocked_from < day_start(before_date)
             )
-        ).order_by(BlockedSlot.blocked_date.desc(), BlockedSlot.start_time.desc()).all()
+        )
+        return paginate(query, BLOCKED_SLOT_ORDER, cursor, limit, descending=True)
 
     @staticmethod
     def get_by_date_range(
-        db: Session, 
-        doctor_id: int, 
-        start_date: date, 
+        db: Session,
+        doctor_id: int,
+        start_date: date,
         end_date: date
     ) -> List[BlockedSlot]:
-        """Get blocked slots within a date range"""
+        """Get blocked slots overlapping a date range"""
         return db.query(BlockedSlot).filter(
             and_(
                 BlockedSlot.doctor_id == doctor_id,
-                BlockedSlot.blocked_date >= start_date,
-                BlockedSlot.blocked_date <= end_date
+                overlaps_dates(start_date, end_date)
             )
-        ).order_by(BlockedSlot.blocked_date, BlockedSlot.start_time).all()
+        ).order_by(BlockedSlot.blocked_from).all()
 
     @staticmethod
-    def check_time_conflict(
+    def list_by_date_range(
         db: Session,
         doctor_id: int,
-        blocked_date: date,
-        start_time: time,
-        end_time: time,
+        start_date: date,
+        end_date: date,
+        cursor: Optional[str] = None,
+        limit: int = DEFAULT_PAGE_SIZE
+    ) -> Page:
+        """Get a page of the blocked slots overlapping a date range (by start)"""
+        query = db.query(BlockedSlot).filter(
+            and_(
+                BlockedSlot.doctor_id == doctor_id,
+                overlaps_dates(start_date, end_date)
+            )
+        )
+        return paginate(query, BLOCKED_SLOT_ORDER, cursor, limit)
+
+    @staticmethod
+    def get_intervals_in_range(
+        db: Session,
+        doctor_id: int,
+        start_date: date,
+        end_date: date
+    ) -> List[tuple]:
+        """Get (date, start_time, end_time) per blocked day of a doctor within a date range"""
+        rows = db.query(
+            BlockedSlot.blocked_from,
+            BlockedSlot.blocked_until
+        ).filter(
+            and_(
+                BlockedSlot.doctor_id == doctor_id,
+                overlaps_dates(start_date, end_date)
+            )
+        ).all()
+
+        return [
+            interval
+            for blocked_from, blocked_until in rows
+            for interval in split_period_by_day(blocked_from, blocked_until, start_date, end_date)
+        ]
+
+    @staticmethod
+    def get_intervals_for_doctors_in_range(
+        db: Session,
+        doctor_ids: List[int],
+        start_date: date,
+        end_date: date
+    ) -> List[tuple]:
+        """Get (doctor_id, date, start_time, end_time) per blocked day of several doctors within a date range"""
+        rows = db.query(
+            BlockedSlot.doctor_id,
+            BlockedSlot.blocked_from,
+            BlockedSlot.blocked_until
+        ).filter(
+            and_(
+                BlockedSlot.doctor_id.in_(doctor_ids),
+                overlaps_dates(start_date, end_date)
+            )
+        ).all()
+
+        return [
+            (doctor_id, *interval)
+            for doctor_id, blocked_from, blocked_until in rows
+            for interval in split_period_by_day(blocked_from, blocked_until, start_date, end_date)
+        ]
+
+    @staticmethod
+    def check_period_conflict(
+        db: Session,
+        doctor_id: int,
+        blocked_from: datetime,
+        blocked_until: datetime,
         exclude_blocked_slot_id: Optional[int] = None
     ) -> List[BlockedSlot]:
         """
-        Check if there's a time conflict for a doctor on a specific date
+        Check if a doctor's blocked slots overlap [blocked_from, blocked_until)
         Returns list of conflicting blocked slots
         """
         query = db.query(BlockedSlot).filter(
             and_(
                 BlockedSlot.doctor_id == doctor_id,
-                BlockedSlot.blocked_date == blocked_date,
-                # Time overlap check
-                or_(
-                    and_(
-                        BlockedSlot.start_time <= start_time,
-                        BlockedSlot.end_time > start_time
-                    ),
-                    and_(
-                        BlockedSlot.start_time < end_time,
-                        BlockedSlot.end_time >= end_time
-                    ),
-                    and_(
-                        BlockedSlot.start_time >= start_time,
-                        BlockedSlot.end_time <= end_time
-                    )
-                )
+                overlaps_period(blocked_from, blocked_until)
             )
         )
-        
+
         # Exclude current blocked slot when checking for updates
         if exclude_blocked_slot_id:
             query = query.filter(BlockedSlot.blocked_slot_id != exclude_blocked_slot_id)
-        
+
         return query.all()
 
     @staticmethod
-    def get_blocked_dates(db: Session, doctor_id: int) -> List[date]:
-        """Get list of dates that have blocked slots for a doctor"""
-        results = db.query(BlockedSlot.blocked_date).filter(
+    def check_time_conflict(
+        db: Session,
+        doctor_id: int,
+        blocked_date: date,
+        start_time: time,
+        end_time: time,
+        exclude_blocked_slot_id: Optional[int] = None
+    ) -> List[BlockedSlot]:
+        """
+        Check if there's a time conflict for a doctor on a specific date
+        Returns list of conflicting blocked slots
+        """
+        blocked_from, blocked_until = to_blocked_period(blocked_date, start_time, end_time)
+        return BlockedSlotRepository.check_period_conflict(
+            db, doctor_id, blocked_from, blocked_until, exclude_blocked_slot_id
+        )
+
+    @staticmethod
+    def get_conflicting_dates(
+        db: Session,
+        doctor_id: int,
+        start_date: date,
+        end_date: date,
+        start_time: time,
+        end_time: time
+    ) -> Set[date]:
+        """Get the dates in a range on which a doctor's blocked slots overlap start_time-end_time"""
+        return {
+            blocked_date
+            for blocked_date, blocked_start, blocked_end in BlockedSlotRepository.get_intervals_in_range(
+                db, doctor_id, start_date, end_date
+            )
+            if is_time_overlap(blocked_start, blocked_end, start_time, end_time)
+        }
+
+    @staticmethod
+    def get_blocked_dates(
+        db: Session,
+        doctor_id: int,
+        start_date: Optional[date] = None,
+        end_date: Optional[date] = None
+    ) -> List[date]:
+        """Get list of dates that have blocked slots for a doctor, optionally within a date range"""
+        query = db.query(BlockedSlot.blocked_from, BlockedSlot.blocked_until).filter(
             BlockedSlot.doctor_id == doctor_id
-        ).distinct().order_by(BlockedSlot.blocked_date).all()
-        
-        return [result[0] for result in results]
+        )
+        if start_date and end_date:
+            query = query.filter(overlaps_dates(start_date, end_date))
+
+        blocked_dates = {
+            blocked_date
+            for blocked_from, blocked_until in query.all()
+            for blocked_date, _, _ in split_period_by_day(blocked_from, blocked_until, start_date, end_date)
+        }
+        return sorted(blocked_dates)
 
     @staticmethod
-    def create(db: Session, blocked_slot: BlockedSlot) -> BlockedSlot:
-        """Create a new blocked slot"""
+    def create(db: Session, blocked_slot: BlockedSlot, commit: bool = True) -> BlockedSlot:
+        """Create a new blocked slot (with commit=False: only flushed, for the caller to commit)"""
         db.add(blocked_slot)
+        if not commit:
+            db.flush()
+            return blocked_slot
         db.commit()
         db.refresh(blocked_slot)
         return blocked_slot
 
     @staticmethod
-    def update(db: Session, blocked_slot: BlockedSlot) -> BlockedSlot:
-        """Update an existing blocked slot"""
+    def bulk_create(db: Session, blocked_slots: List[BlockedSlot], commit: bool = True) -> List[int]:
+        """
+        Insert many blocked slots with multi-row INSERT ... RETURNING in one transaction
+        Returns the new ids in input order. With commit=False the caller commits.
+        """
+        if not blocked_slots:
+            return []
+
+        columns = [column.key for column in BlockedSlot.__table__.columns if column.key != "blocked_slot_id"]
+        rows = [{key: getattr(blocked_slot, key) for key in columns} for blocked_slot in blocked_slots]
+        statement = insert(BlockedSlot).returning(BlockedSlot.blocked_slot_id, sort_by_parameter_order=True)
+        try:
+            blocked_slot_ids = db.scalars(statement, rows).all()
+            if commit:
+                db.commit()
+        except Exception:
+            db.rollback()
+            raise
+        return blocked_slot_ids
+
+    @staticmethod
+    def update(db: Session, blocked_slot: BlockedSlot, commit: bool = True) -> BlockedSlot:
+        """Update an existing blocked slot (with commit=False: only flushed, for the caller to commit)"""
+        if not commit:
+            db.flush()
+            return blocked_slot
         db.commit()
         db.refresh(blocked_slot)
         return blocked_slot
 
     @staticmethod
-    def delete(db: Session, blocked_slot: BlockedSlot) -> None:
-        """Delete a blocked slot"""
+    def delete(db: Session, blocked_slot: BlockedSlot, commit: bool = True) -> None:
+        """Delete a blocked slot (with commit=False: only flushed, for the caller to commit)"""
         db.delete(blocked_slot)
-        db.commit()
+        if commit:
+            db.commit()
+        else:
+            db.flush()
 
     @staticmethod
     def delete_by_date_range(
-        db: Session, 
-        doctor_id: int, 
-        start_date: date, 
-        end_date: date
+        db: Session,
+        doctor_id: int,
+        start_date: date,
+        end_date: date,
+        commit: bool = True
     ) -> int:
-        """Delete blocked slots within a date range. Returns count of deleted slots."""
+        """
+        Unblock the days from start_date to end_date. Blocks lying inside the range are
+        deleted; blocks reaching outside it are trimmed (or split) to the remaining days.
+        Returns count of affected blocked slots. With commit=False the caller commits.
+        """
+        range_start = day_start(start_date)
+        range_end = day_start(end_date + timedelta(days=1))
+
+        blocked_slots = BlockedSlotRepository.get_by_date_range(db, doctor_id, start_date, end_date)
+        for blocked_slot in blocked_slots:
+            keeps_before = blocked_slot.blocked_from < range_start
+            keeps_after = blocked_slot.blocked_until > range_end
+
+            if keeps_before and keeps_after:
+                db.add(BlockedSlot(
+                    doctor_id=blocked_slot.doctor_id,
+                    blocked_from=range_end,
+                    blocked_until=blocked_slot.blocked_until,
+                    reason=blocked_slot.reason,
+                    created_by=blocked_slot.created_by,
+                    created_at=blocked_slot.created_at
+                ))
+                blocked_slot.blocked_until = range_start
+            elif keeps_before:
+                blocked_slot.blocked_until = range_start
+            elif keeps_after:
+                blocked_slot.blocked_from = range_end
+            else:
+                db.delete(blocked_slot)
+
+        if commit:
+            db.commit()
+        else:
+            db.flush()
+        return len(blocked_slots)
+
+    @staticmethod
+    def delete_ended_before(db: Session, cutoff_date: date) -> int:
+        """Delete blocked slots that ended before cutoff_date. Returns count of deleted slots."""
         count = db.query(BlockedSlot).filter(
-            and_(
-                BlockedSlot.doctor_id == doctor_id,
-                BlockedSlot.blocked_date >= start_date,
-                BlockedSlot.blocked_date <= end_date
-            )
-        ).delete()
+            BlockedSlot.blocked_until <= day_start(cutoff_date)
+        ).delete(synchronize_session=False)
         db.commit()
         return count
 
@@ -170,10 +383,10 @@ class BlockedSlotRepository:
 
     @staticmethod
     def count_upcoming(db: Session, doctor_id: int, from_date: date) -> int:
-        """Count upcoming blocked slots for a doctor"""
+        """Count blocked slots for a doctor that have not ended before from_date"""
         return db.query(BlockedSlot).filter(
             and_(
                 BlockedSlot.doctor_id == doctor_id,
-                BlockedSlot.blocked_date >= from_date
+                BlockedSlot.blocked_until > day_start(from_date)
             )
-        ).count()
\ No newline at end of file
+        ).count()
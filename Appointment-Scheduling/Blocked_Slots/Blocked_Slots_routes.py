@@ -1,4 +1,6 @@
 from fastapi import APIRouter
+from async_routes import build_async_router
+from Blocked_Slots.Blocked_Slots_config import get_db
 from Blocked_Slots.Blocked_Slots_controller import router as blocked_slots_controller
 
 router = APIRouter(
@@ -7,3 +9,11 @@ router = APIRouter(
 )
 
 router.include_router(blocked_slots_controller)
+
+# Same endpoints as async def handlers run in the threadpool (ASYNC_ROUTE_HANDLERS)
+async_router = APIRouter(
+    prefix="/blocked-slots",
+    tags=["Blocked Slots"]
+)
+
+async_router.include_router(build_async_router(blocked_slots_controller, get_db))
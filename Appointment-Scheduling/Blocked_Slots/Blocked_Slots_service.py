@@ -1,8 +1,22 @@
 from sqlalchemy.orm import Session
 from datetime import date, time, datetime, timedelta
-from typing import List, Optional, Dict
+from itertools import islice
+from typing import Callable, List, Optional, Dict
 from Blocked_Slots.Blocked_Slots_model import BlockedSlot
 from Blocked_Slots.Blocked_Slots_repository import BlockedSlotRepository
+from Doctor_Slot.Doctor_Slot_service import DoctorSlotService
+from Blocked_Slots.Blocked_Slots_config import (
+    get_blocked_slots_settings,
+    validate_block_duration,
+    generate_date_range,
+    to_blocked_period,
+    split_period_by_day,
+    encode_day_cursor,
+    decode_day_cursor,
+    FULL_DAY_START,
+    FULL_DAY_END
+)
+from pagination import DEFAULT_PAGE_SIZE, MAX_PAGE_SIZE, Page
 
 class BlockedSlotService:
 
@@ -39,27 +53,44 @@ class BlockedSlotService:
         if start_time >= end_time:
             raise ValueError("Start time must be before end time")
 
+        blocked_from, blocked_until = to_blocked_period(blocked_date, start_time, end_time)
+
         # Check for time conflicts
-        conflicts = BlockedSlotRepository.check_time_conflict(
-            db, doctor_id, blocked_date, start_time, end_time
+        conflicts = BlockedSlotRepository.check_period_conflict(
+            db, doctor_id, blocked_from, blocked_until
         )
         
         if conflicts:
-            conflict_times = [f"{c.start_time}-{c.end_time}" for c in conflicts]
+            conflict_times = [f"{c.blocked_from}-{c.blocked_until}" for c in conflicts]
             raise ValueError(f"Time slot conflicts with existing blocked slots: {', '.join(conflict_times)}")
 
         # Create blocked slot object
         blocked_slot = BlockedSlot(
             doctor_id=doctor_id,
-            blocked_date=blocked_date,
-            start_time=start_time,
-            end_time=end_time,
+            blocked_from=blocked_from,
+            blocked_until=blocked_until,
             reason=reason,
             created_by=created_by,
             created_at=datetime.now()
         )
 
-        return BlockedSlotRepository.create(db, blocked_slot)
+        try:
+            blocked_slot = BlockedSlotRepository.create(db, blocked_slot, commit=False)
+            BlockedSlotService._refresh_slot_calendar(db, blocked_slot.doctor_id, blocked_slot.blocked_from, blocked_slot.blocked_until)
+            db.commit()
+        except Exception:
+            db.rollback()
+            raise
+        return blocked_slot
+
+    @staticmethod
+    def _refresh_slot_calendar(db: Session, doctor_id: int, blocked_from: datetime, blocked_until: datetime) -> None:
+        """
+        Regenerate the doctor's slot calendar for the days a blocked period touches
+        Runs in the block change's transaction, so the block and the calendar commit together
+        """
+        last_day = (blocked_until - timedelta(microseconds=1)).date()
+        DoctorSlotService.refresh_doctor(db, doctor_id, blocked_from.date(), last_day)
 
     @staticmethod
     def block_full_day(db: Session, doctor_id: int, blocked_date: date, reason: str, created_by: int) -> BlockedSlot:
@@ -69,8 +100,8 @@ class BlockedSlotService:
         data = {
             "doctor_id": doctor_id,
             "blocked_date": blocked_date,
-            "start_time": time(0, 0, 0),
-            "end_time": time(23, 59, 59),
+            "start_time": FULL_DAY_START,
+            "end_time": FULL_DAY_END,
             "reason": reason,
             "created_by": created_by
         }
@@ -84,33 +115,76 @@ class BlockedSlotService:
         end_date: date, 
         reason: str, 
         created_by: int
-    ) -> List[BlockedSlot]:
+    ) -> Dict:
         """
         Block multiple consecutive days for a doctor (e.g., vacation)
+        Conflicts for the whole range are found with one query; each run of consecutive
+        free days becomes one blocked period and all periods are inserted in a single
+        transaction. Returns the outcome of each day.
         """
         if start_date > end_date:
             raise ValueError("Start date must be before or equal to end date")
-        
-        days_to_block = (end_date - start_date).days + 1
-        if days_to_block > 365:
-            raise ValueError("Cannot block more than 365 days at once")
 
-        blocked_slots = []
-        current_date = start_date
-        
-        while current_date <= end_date:
-            try:
-                blocked_slot = BlockedSlotService.block_full_day(
-                    db, doctor_id, current_date, reason, created_by
-                )
-                blocked_slots.append(blocked_slot)
-            except ValueError as e:
-                # Skip if already blocked or other validation error
-                print(f"Skipping {current_date}: {str(e)}")
-            
-            current_date += timedelta(days=1)
-        
-        return blocked_slots
+        if not validate_block_duration(start_date, end_date):
+            settings = get_blocked_slots_settings()
+            raise ValueError(f"Cannot block more than {settings.MAX_DAYS_BLOCK_AT_ONCE} days at once")
+
+        if not all([doctor_id, reason, created_by]):
+            raise ValueError("Missing required fields: doctor_id, reason, created_by")
+
+        start_time, end_time = FULL_DAY_START, FULL_DAY_END
+        conflicting_dates = BlockedSlotRepository.get_conflicting_dates(
+            db, doctor_id, start_date, end_date, start_time, end_time
+        )
+
+        outcomes = []
+        runs = []  # [outcomes of consecutive free days]
+        for current_date in generate_date_range(start_date, end_date):
+            if current_date < date.today():
+                outcomes.append({"date": current_date, "status": "skipped", "reason": "Cannot block dates in the past"})
+            elif current_date in conflicting_dates:
+                outcomes.append({"date": current_date, "status": "skipped", "reason": "Conflicts with existing blocked slots"})
+            else:
+                outcome = {"date": current_date, "status": "blocked", "blocked_slot_id": None}
+                if not outcomes or outcomes[-1]["status"] != "blocked":
+                    runs.append([])
+                runs[-1].append(outcome)
+                outcomes.append(outcome)
+
+        created_at = datetime.now()
+        blocked_slots = [
+            BlockedSlot(
+                doctor_id=doctor_id,
+                blocked_from=to_blocked_period(run[0]["date"], start_time, end_time)[0],
+                blocked_until=to_blocked_period(run[-1]["date"], start_time, end_time)[1],
+                reason=reason,
+                created_by=created_by,
+                created_at=created_at
+            )
+            for run in runs
+        ]
+
+        try:
+            blocked_slot_ids = BlockedSlotRepository.bulk_create(db, blocked_slots, commit=False)
+            if runs:
+                DoctorSlotService.refresh_doctor(db, doctor_id, runs[0][0]["date"], runs[-1][-1]["date"])
+            db.commit()
+        except Exception:
+            db.rollback()
+            raise
+        for run, blocked_slot_id in zip(runs, blocked_slot_ids):
+            for outcome in run:
+                outcome["blocked_slot_id"] = blocked_slot_id
+
+        blocked_count = sum(len(run) for run in runs)
+        return {
+            "doctor_id": doctor_id,
+            "start_date": start_date,
+            "end_date": end_date,
+            "blocked_count": blocked_count,
+            "skipped_count": len(outcomes) - blocked_count,
+            "days": outcomes
+        }
 
     @staticmethod
     def get_blocked_slot(db: Session, blocked_slot_id: int) -> BlockedSlot:
@@ -121,34 +195,68 @@ class BlockedSlotService:
         return blocked_slot
 
     @staticmethod
-    def list_blocked_slots(db: Session, skip: int = 0, limit: int = 100) -> List[BlockedSlot]:
-        """List all blocked slots with pagination"""
-        return BlockedSlotRepository.get_all(db, skip, limit)
+    def list_blocked_slots(db: Session, cursor: Optional[str] = None, limit: int = DEFAULT_PAGE_SIZE) -> Page:
+        """List all blocked slots, one page at a time"""
+        return BlockedSlotRepository.get_all(db, cursor, limit)
 
     @staticmethod
-    def get_doctor_blocked_slots(db: Session, doctor_id: int) -> List[BlockedSlot]:
-        """Get all blocked slots for a doctor"""
-        return BlockedSlotRepository.get_by_doctor_id(db, doctor_id)
+    def get_doctor_blocked_slots(
+        db: Session,
+        doctor_id: int,
+        cursor: Optional[str] = None,
+        limit: int = DEFAULT_PAGE_SIZE
+    ) -> Page:
+        """Get a page of a doctor's blocked slots"""
+        return BlockedSlotRepository.get_by_doctor_id(db, doctor_id, cursor, limit)
 
     @staticmethod
-    def get_upcoming_blocked_slots(db: Session, doctor_id: int) -> List[BlockedSlot]:
-        """Get upcoming blocked slots for a doctor"""
-        return BlockedSlotRepository.get_upcoming_blocked_slots(db, doctor_id, date.today())
+    def get_upcoming_blocked_slots(
+        db: Session,
+        doctor_id: int,
+        cursor: Optional[str] = None,
+        limit: int = DEFAULT_PAGE_SIZE
+    ) -> Page:
+        """Get a page of a doctor's upcoming blocked slots"""
+        return BlockedSlotRepository.get_upcoming_blocked_slots(db, doctor_id, date.today(), cursor, limit)
 
     @staticmethod
     def get_blocked_slots_by_date(db: Session, doctor_id: int, blocked_date: date) -> List[BlockedSlot]:
         """Get blocked slots for a doctor on a specific date"""
         return BlockedSlotRepository.get_by_doctor_and_date(db, doctor_id, blocked_date)
 
+    @staticmethod
+    def get_all_blocked_slots_by_date(
+        db: Session,
+        blocked_date: date,
+        cursor: Optional[str] = None,
+        limit: int = DEFAULT_PAGE_SIZE
+    ) -> Page:
+        """Get a page of the blocked slots of every doctor touching a specific date"""
+        return BlockedSlotRepository.get_by_date(db, blocked_date, cursor, limit)
+
+    @staticmethod
+    def get_blocked_dates_in_range(
+        db: Session,
+        doctor_id: int,
+        start_date: date,
+        end_date: date
+    ) -> List[date]:
+        """Get the dates within a range on which a doctor has blocked slots"""
+        if start_date > end_date:
+            raise ValueError("Start date must be before or equal to end date")
+        return BlockedSlotRepository.get_blocked_dates(db, doctor_id, start_date, end_date)
+
     @staticmethod
     def get_blocked_slots_in_range(
         db: Session, 
         doctor_id: int, 
         start_date: date, 
-        end_date: date
-    ) -> List[BlockedSlot]:
-        """Get blocked slots within a date range"""
-        return BlockedSlotRepository.get_by_date_range(db, doctor_id, start_date, end_date)
+        end_date: date,
+        cursor: Optional[str] = None,
+        limit: int = DEFAULT_PAGE_SIZE
+    ) -> Page:
+        """Get a page of the blocked slots within a date range"""
+        return BlockedSlotRepository.list_by_date_range(db, doctor_id, start_date, end_date, cursor, limit)
 
     @staticmethod
     def is_time_slot_blocked(
@@ -168,7 +276,9 @@ class BlockedSlotService:
         
         return {
             "is_blocked": len(conflicts) > 0,
-            "conflicting_slots": conflicts,
+            "conflicting_slots": [
+                entry for c in conflicts for entry in BlockedSlotService.to_day_dicts(c, check_date, check_date)
+            ],
             "reasons": [c.reason for c in conflicts] if conflicts else []
         }
 
@@ -181,11 +291,17 @@ class BlockedSlotService:
         if not blocked_slot:
             raise ValueError(f"Blocked slot with ID {blocked_slot_id} not found")
 
+        old_period = (blocked_slot.blocked_from, blocked_slot.blocked_until)
+
         # If updating date or time, check for conflicts
         if any(key in data for key in ["blocked_date", "start_time", "end_time"]):
-            new_date = data.get("blocked_date", blocked_slot.blocked_date)
-            new_start = data.get("start_time", blocked_slot.start_time)
-            new_end = data.get("end_time", blocked_slot.end_time)
+            days = list(split_period_by_day(blocked_slot.blocked_from, blocked_slot.blocked_until))
+            first_date, current_start, _ = days[0]
+            current_end = days[-1][2]
+
+            new_date = data.get("blocked_date", first_date)
+            new_start = data.get("start_time", current_start)
+            new_end = data.get("end_time", current_end)
 
             # Convert if needed
             if isinstance(new_date, str):
@@ -195,25 +311,40 @@ class BlockedSlotService:
             if isinstance(new_end, str):
                 new_end = datetime.strptime(new_end, "%H:%M:%S").time()
 
-            # Validate time logic
-            if new_start >= new_end:
+            # Validate time logic (a multi-day block may end earlier in the day than it starts)
+            if len(days) == 1 and new_start >= new_end:
                 raise ValueError("Start time must be before end time")
 
+            # A multi-day block keeps its length when it is moved
+            new_from = to_blocked_period(new_date, new_start, new_end)[0]
+            new_until = to_blocked_period(new_date + timedelta(days=len(days) - 1), new_start, new_end)[1]
+
             # Check for conflicts (excluding current slot)
-            conflicts = BlockedSlotRepository.check_time_conflict(
-                db, blocked_slot.doctor_id, new_date, new_start, new_end,
+            conflicts = BlockedSlotRepository.check_period_conflict(
+                db, blocked_slot.doctor_id, new_from, new_until,
                 exclude_blocked_slot_id=blocked_slot_id
             )
             
             if conflicts:
                 raise ValueError("Updated time slot conflicts with existing blocked slots")
 
-        # Update fields
-        for key, value in data.items():
-            if hasattr(blocked_slot, key):
-                setattr(blocked_slot, key, value)
+            blocked_slot.blocked_from = new_from
+            blocked_slot.blocked_until = new_until
 
-        return BlockedSlotRepository.update(db, blocked_slot)
+        # Update remaining fields
+        if "reason" in data:
+            blocked_slot.reason = data["reason"]
+
+        try:
+            blocked_slot = BlockedSlotRepository.update(db, blocked_slot, commit=False)
+            if old_period != (blocked_slot.blocked_from, blocked_slot.blocked_until):
+                BlockedSlotService._refresh_slot_calendar(db, blocked_slot.doctor_id, *old_period)
+                BlockedSlotService._refresh_slot_calendar(db, blocked_slot.doctor_id, blocked_slot.blocked_from, blocked_slot.blocked_until)
+            db.commit()
+        except Exception:
+            db.rollback()
+            raise
+        return blocked_slot
 
     @staticmethod
     def delete_blocked_slot(db: Session, blocked_slot_id: int) -> None:
@@ -222,7 +353,14 @@ class BlockedSlotService:
         if not blocked_slot:
             raise ValueError(f"Blocked slot with ID {blocked_slot_id} not found")
         
-        BlockedSlotRepository.delete(db, blocked_slot)
+        doctor_id, blocked_from, blocked_until = blocked_slot.doctor_id, blocked_slot.blocked_from, blocked_slot.blocked_until
+        try:
+            BlockedSlotRepository.delete(db, blocked_slot, commit=False)
+            BlockedSlotService._refresh_slot_calendar(db, doctor_id, blocked_from, blocked_until)
+            db.commit()
+        except Exception:
+            db.rollback()
+            raise
 
     @staticmethod
     def cancel_blocked_slots_in_range(
@@ -232,7 +370,22 @@ class BlockedSlotService:
         end_date: date
     ) -> int:
         """Cancel (delete) all blocked slots in a date range. Returns count of deleted slots."""
-        return BlockedSlotRepository.delete_by_date_range(db, doctor_id, start_date, end_date)
+        if start_date > end_date:
+            raise ValueError("Start date must be before or equal to end date")
+        try:
+            count = BlockedSlotRepository.delete_by_date_range(db, doctor_id, start_date, end_date, commit=False)
+            DoctorSlotService.refresh_doctor(db, doctor_id, start_date, end_date)
+            db.commit()
+        except Exception:
+            db.rollback()
+            raise
+        return count
+
+    @staticmethod
+    def delete_past_blocked_slots(db: Session, days_to_keep: int) -> int:
+        """Delete blocked slots that ended more than days_to_keep days ago. Returns count of deleted slots."""
+        cutoff_date = date.today() - timedelta(days=days_to_keep)
+        return BlockedSlotRepository.delete_ended_before(db, cutoff_date)
 
     @staticmethod
     def get_blocked_slots_summary(db: Session, doctor_id: int) -> Dict:
@@ -277,16 +430,19 @@ class BlockedSlotService:
             db, doctor_id, first_day, last_day
         )
         
-        # Group by date
+        # Expand each blocked period into the days of this month and group by date
         blocked_by_date = {}
         for slot in blocked_slots:
-            if slot.blocked_date not in blocked_by_date:
-                blocked_by_date[slot.blocked_date] = []
-            blocked_by_date[slot.blocked_date].append({
-                "start_time": str(slot.start_time),
-                "end_time": str(slot.end_time),
-                "reason": slot.reason
-            })
+            for blocked_date, start_time, end_time in split_period_by_day(
+                slot.blocked_from, slot.blocked_until, first_day, last_day
+            ):
+                if blocked_date not in blocked_by_date:
+                    blocked_by_date[blocked_date] = []
+                blocked_by_date[blocked_date].append({
+                    "start_time": str(start_time),
+                    "end_time": str(end_time),
+                    "reason": slot.reason
+                })
         
         return {
             "doctor_id": doctor_id,
@@ -295,4 +451,71 @@ class BlockedSlotService:
             "blocked_dates": sorted(blocked_by_date.keys()),
             "blocked_slots_by_date": blocked_by_date,
             "total_blocked_slots": len(blocked_slots)
-        }
\ No newline at end of file
+        }
+
+    @staticmethod
+    def to_day_dicts(
+        blocked_slot: BlockedSlot,
+        start_date: Optional[date] = None,
+        end_date: Optional[date] = None
+    ) -> List[Dict]:
+        """
+        Serialize a blocked period for API responses, one entry per day it covers
+        (optionally clipped to [start_date, end_date]) in the per-day shape clients
+        know: blocked_date, start_time and end_time
+        """
+        return [
+            {
+                "blocked_slot_id": blocked_slot.blocked_slot_id,
+                "doctor_id": blocked_slot.doctor_id,
+                "blocked_date": blocked_date,
+                "start_time": start_time,
+                "end_time": end_time,
+                "reason": blocked_slot.reason,
+                "created_at": blocked_slot.created_at,
+                "created_by": blocked_slot.created_by
+            }
+            for blocked_date, start_time, end_time in split_period_by_day(
+                blocked_slot.blocked_from, blocked_slot.blocked_until, start_date, end_date
+            )
+        ]
+
+    @staticmethod
+    def to_dict(blocked_slot: BlockedSlot) -> Dict:
+        """Serialize a single blocked slot for API responses (its first day)"""
+        return BlockedSlotService.to_day_dicts(blocked_slot)[0]
+
+    @staticmethod
+    def to_day_page(
+        fetch_periods: Callable[[Optional[str], int], Page],
+        cursor: Optional[str] = None,
+        limit: int = DEFAULT_PAGE_SIZE,
+        start_date: Optional[date] = None,
+        end_date: Optional[date] = None
+    ) -> Page:
+        """
+        A page of at most `limit` per-day entries (see to_day_dicts) of the blocked periods
+        listed by fetch_periods(period_cursor, limit)
+        The cursor holds the period cursor and how many day entries of that page of periods
+        were already served, so a long period is split across pages instead of returning
+        one entry per day it covers at once
+        """
+        limit = max(1, min(limit, MAX_PAGE_SIZE))
+        period_cursor, days_served = decode_day_cursor(cursor)
+        entries = []
+        while True:
+            page = fetch_periods(period_cursor, limit)
+            days = (
+                entry
+                for blocked_slot in page.items
+                for entry in BlockedSlotService.to_day_dicts(blocked_slot, start_date, end_date)
+            )
+            room = limit - len(entries)
+            entries.extend(islice(days, days_served, days_served + room))
+            if len(entries) == limit and next(days, None) is not None:
+                return Page(entries, encode_day_cursor(period_cursor, days_served + room))
+            if page.next_cursor is None:
+                return Page(entries, None)
+            period_cursor, days_served = page.next_cursor, 0
+            if len(entries) == limit:
+                return Page(entries, encode_day_cursor(period_cursor, 0))
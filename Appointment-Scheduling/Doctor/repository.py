@@ -19,6 +19,18 @@ class DoctorRepository:
     def get_all_doctors(self):
         return self.db.query(Doctor).all()
 
+    def get_active_doctor_ids_by_specialization(self, specialization_id: int):
+        rows = (
+            self.db.query(Doctor.doctor_id)
+            .filter(
+                Doctor.specialization_id == specialization_id,
+                Doctor.is_active == True
+            )
+            .order_by(Doctor.doctor_id)
+            .all()
+        )
+        return [row[0] for row in rows]
+
     def update_doctor(self, doctor_id: int, data: dict):
         doctor = self.get_doctor_by_id(doctor_id)
         if not doctor:
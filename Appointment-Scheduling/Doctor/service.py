@@ -17,6 +17,9 @@ class DoctorService:
     def get_all_doctors(self):
         return self.repository.get_all_doctors()
 
+    def get_active_doctor_ids_by_specialization(self, specialization_id: int):
+        return self.repository.get_active_doctor_ids_by_specialization(specialization_id)
+
     def update_doctor(self, doctor_id: int, data: dict):
         return self.repository.update_doctor(doctor_id, data)
 
@@ -4,6 +4,8 @@ from typing import List, Optional, Dict
 from datetime import date
 from Doctor_Schedule.Doctor_Schedule_config import get_db
 from Doctor_Schedule.Doctor_Schedule_service import DoctorScheduleService
+from pagination import DEFAULT_PAGE_SIZE, MAX_PAGE_SIZE
+from export import export_response
 from pydantic import BaseModel, Field
 
 router = APIRouter()
@@ -101,6 +103,28 @@ def create_bulk_weekly_schedule(payload: BulkWeeklyScheduleCreate, db: Session =
         raise HTTPException(status_code=500, detail=f"Internal server error: {str(e)}")
 
 
+@router.get("/export")
+def export_schedules(
+    export_format: str = Query("ndjson", alias="format", description="ndjson or csv"),
+    doctor_id: Optional[int] = Query(None, description="Only this doctor's schedules"),
+    start_date: Optional[str] = Query(None, description="Effective on or after (YYYY-MM-DD)"),
+    end_date: Optional[str] = Query(None, description="Effective on or before (YYYY-MM-DD)"),
+    is_active: Optional[bool] = Query(None, description="Only active (true) or inactive (false) schedules"),
+    db: Session = Depends(get_db)
+):
+    """
+    Download every matching schedule as NDJSON or CSV
+    Rows are streamed as they are read
+    """
+    try:
+        fields, rows = DoctorScheduleService.export_schedules(db, doctor_id, start_date, end_date, is_active)
+        return export_response(rows, fields, export_format, "doctor_schedules")
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Internal server error: {str(e)}")
+
+
 @router.get("/{schedule_id}")
 def get_schedule(schedule_id: int, db: Session = Depends(get_db)):
     """
@@ -117,19 +141,18 @@ def get_schedule(schedule_id: int, db: Session = Depends(get_db)):
 
 @router.get("/")
 def list_schedules(
-    skip: int = Query(0, ge=0),
-    limit: int = Query(100, ge=1, le=1000),
+    cursor: Optional[str] = Query(None, description="next_cursor of the previous page"),
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
     db: Session = Depends(get_db)
 ):
     """
-    List all schedules with pagination
+    List all schedules, one page at a time (pass next_cursor to get the next page)
     """
     try:
-        schedules = DoctorScheduleService.list_schedules(db, skip, limit)
-        return {
-            "count": len(schedules),
-            "schedules": schedules
-        }
+        page = DoctorScheduleService.list_schedules(db, cursor, limit)
+        return page.as_response("schedules")
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Internal server error: {str(e)}")
 
@@ -138,18 +161,18 @@ def list_schedules(
 def get_doctor_schedules(
     doctor_id: int,
     active_only: bool = Query(False, description="Show only active schedules"),
+    cursor: Optional[str] = Query(None, description="next_cursor of the previous page"),
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
     db: Session = Depends(get_db)
 ):
     """
-    Get all schedules for a specific doctor
+    Get all schedules for a specific doctor, one page at a time
     """
     try:
-        schedules = DoctorScheduleService.get_doctor_schedules(db, doctor_id, active_only)
-        return {
-            "doctor_id": doctor_id,
-            "count": len(schedules),
-            "schedules": schedules
-        }
+        page = DoctorScheduleService.get_doctor_schedules(db, doctor_id, active_only, cursor, limit)
+        return {"doctor_id": doctor_id, **page.as_response("schedules")}
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Internal server error: {str(e)}")
 
@@ -193,17 +216,18 @@ def get_doctor_schedule_by_day(
 
 
 @router.get("/day/{day_of_week}")
-def get_schedules_by_day(day_of_week: str, db: Session = Depends(get_db)):
+def get_schedules_by_day(
+    day_of_week: str,
+    cursor: Optional[str] = Query(None, description="next_cursor of the previous page"),
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+    db: Session = Depends(get_db)
+):
     """
-    Get all schedules for a specific day of week
+    Get all schedules for a specific day of week, one page at a time
     """
     try:
-        schedules = DoctorScheduleService.get_schedules_by_day(db, day_of_week)
-        return {
-            "day_of_week": day_of_week.upper(),
-            "count": len(schedules),
-            "schedules": schedules
-        }
+        page = DoctorScheduleService.get_all_schedules_by_day(db, day_of_week, cursor, limit)
+        return {"day_of_week": day_of_week.upper(), **page.as_response("schedules")}
     except ValueError as e:
         raise HTTPException(status_code=400, detail=str(e))
     except Exception as e:
@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, Time, Date, Enum, Boolean
+from sqlalchemy import Column, Integer, Time, Date, Enum, Boolean, Index
 from Doctor_Schedule.Doctor_Schedule_config import Base
 import enum
 
@@ -22,7 +22,12 @@ class DayOfWeekEnum(enum.Enum):
 class DoctorSchedule(Base):
     """Doctor Schedule model matching hms.doctor_schedule table"""
     __tablename__ = "doctor_schedule"
-    __table_args__ = {"schema": "hms"}
+    __table_args__ = (
+        # Keyset pagination of the per-doctor and per-weekday listings
+        Index("ix_doctor_schedule_doctor_id_schedule_id", "doctor_id", "schedule_id"),
+        Index("ix_doctor_schedule_day_schedule_id", "day_of_week", "schedule_id"),
+        {"schema": "hms"}
+    )
 
     schedule_id = Column(Integer, primary_key=True, autoincrement=True)
     
@@ -1,8 +1,24 @@
 from sqlalchemy.orm import Session
 from sqlalchemy import and_, or_
 from datetime import date, time
-from typing import List, Optional
+from typing import Iterable, List, Optional
 from Doctor_Schedule.Doctor_Schedule_model import DoctorSchedule, DayOfWeekEnum
+from pagination import DEFAULT_PAGE_SIZE, Page, paginate
+from export import stream_query
+
+# Columns of a schedule export, in output order
+SCHEDULE_EXPORT_COLUMNS = (
+    DoctorSchedule.schedule_id,
+    DoctorSchedule.doctor_id,
+    DoctorSchedule.day_of_week,
+    DoctorSchedule.start_time,
+    DoctorSchedule.end_time,
+    DoctorSchedule.slot_duration,
+    DoctorSchedule.max_patients_per_slot,
+    DoctorSchedule.is_active,
+    DoctorSchedule.effective_from,
+    DoctorSchedule.effective_to
+)
 
 class DoctorScheduleRepository:
 
@@ -12,14 +28,23 @@ class DoctorScheduleRepository:
         return db.query(DoctorSchedule).filter(DoctorSchedule.schedule_id == schedule_id).first()
 
     @staticmethod
-    def get_all(db: Session, skip: int = 0, limit: int = 100) -> List[DoctorSchedule]:
-        """Get all doctor schedules with pagination"""
-        return db.query(DoctorSchedule).offset(skip).limit(limit).all()
+    def get_all(db: Session, cursor: Optional[str] = None, limit: int = DEFAULT_PAGE_SIZE) -> Page:
+        """Get a page of all doctor schedules (by ID)"""
+        return paginate(db.query(DoctorSchedule), [DoctorSchedule.schedule_id], cursor, limit)
 
     @staticmethod
-    def get_by_doctor_id(db: Session, doctor_id: int) -> List[DoctorSchedule]:
-        """Get all schedules for a specific doctor"""
-        return db.query(DoctorSchedule).filter(DoctorSchedule.doctor_id == doctor_id).all()
+    def get_by_doctor_id(
+        db: Session,
+        doctor_id: int,
+        active_only: bool = False,
+        cursor: Optional[str] = None,
+        limit: int = DEFAULT_PAGE_SIZE
+    ) -> Page:
+        """Get a page of a doctor's schedules (by ID), optionally only the active ones"""
+        query = db.query(DoctorSchedule).filter(DoctorSchedule.doctor_id == doctor_id)
+        if active_only:
+            query = query.filter(DoctorSchedule.is_active == True)
+        return paginate(query, [DoctorSchedule.schedule_id], cursor, limit)
 
     @staticmethod
     def get_active_by_doctor_id(db: Session, doctor_id: int) -> List[DoctorSchedule]:
@@ -43,14 +68,20 @@ class DoctorScheduleRepository:
         ).all()
 
     @staticmethod
-    def get_by_day_of_week(db: Session, day_of_week: DayOfWeekEnum) -> List[DoctorSchedule]:
-        """Get all schedules for a specific day of week"""
-        return db.query(DoctorSchedule).filter(
+    def get_by_day_of_week(
+        db: Session,
+        day_of_week: DayOfWeekEnum,
+        cursor: Optional[str] = None,
+        limit: int = DEFAULT_PAGE_SIZE
+    ) -> Page:
+        """Get a page of the active schedules of every doctor on a specific day of week (by ID)"""
+        query = db.query(DoctorSchedule).filter(
             and_(
                 DoctorSchedule.day_of_week == day_of_week,
                 DoctorSchedule.is_active == True
             )
-        ).all()
+        )
+        return paginate(query, [DoctorSchedule.schedule_id], cursor, limit)
 
     @staticmethod
     def get_effective_schedule(
@@ -75,6 +106,86 @@ class DoctorScheduleRepository:
             )
         ).all()
 
+    @staticmethod
+    def get_effective_schedules_in_range(
+        db: Session,
+        doctor_id: int,
+        start_date: date,
+        end_date: date
+    ) -> List[DoctorSchedule]:
+        """Get active schedules for a doctor that are effective on any day of a date range"""
+        return db.query(DoctorSchedule).filter(
+            and_(
+                DoctorSchedule.doctor_id == doctor_id,
+                DoctorSchedule.is_active == True,
+                DoctorSchedule.effective_from <= end_date,
+                or_(
+                    DoctorSchedule.effective_to == None,
+                    DoctorSchedule.effective_to >= start_date
+                )
+            )
+        ).all()
+
+    @staticmethod
+    def get_effective_schedules_for_doctors_in_range(
+        db: Session,
+        doctor_ids: List[int],
+        start_date: date,
+        end_date: date
+    ) -> List[DoctorSchedule]:
+        """Get active schedules of several doctors that are effective on any day of a date range"""
+        return db.query(DoctorSchedule).filter(
+            and_(
+                DoctorSchedule.doctor_id.in_(doctor_ids),
+                DoctorSchedule.is_active == True,
+                DoctorSchedule.effective_from <= end_date,
+                or_(
+                    DoctorSchedule.effective_to == None,
+                    DoctorSchedule.effective_to >= start_date
+                )
+            )
+        ).all()
+
+    @staticmethod
+    def stream_for_export(
+        db: Session,
+        doctor_id: Optional[int] = None,
+        start_date: Optional[date] = None,
+        end_date: Optional[date] = None,
+        is_active: Optional[bool] = None
+    ) -> Iterable[tuple]:
+        """
+        Stream SCHEDULE_EXPORT_COLUMNS of the matching schedules (by doctor, then ID)
+        A date range keeps the schedules effective on any of its days; the query runs
+        when iteration starts
+        """
+        query = db.query(*SCHEDULE_EXPORT_COLUMNS)
+        if doctor_id is not None:
+            query = query.filter(DoctorSchedule.doctor_id == doctor_id)
+        if end_date is not None:
+            query = query.filter(DoctorSchedule.effective_from <= end_date)
+        if start_date is not None:
+            query = query.filter(or_(DoctorSchedule.effective_to == None, DoctorSchedule.effective_to >= start_date))
+        if is_active is not None:
+            query = query.filter(DoctorSchedule.is_active == is_active)
+        return stream_query(query.order_by(DoctorSchedule.doctor_id, DoctorSchedule.schedule_id))
+
+    @staticmethod
+    def get_scheduled_doctor_ids(db: Session, start_date: date, end_date: date) -> List[int]:
+        """Get ids of doctors with an active schedule effective on any day of a date range"""
+        results = db.query(DoctorSchedule.doctor_id).filter(
+            and_(
+                DoctorSchedule.is_active == True,
+                DoctorSchedule.effective_from <= end_date,
+                or_(
+                    DoctorSchedule.effective_to == None,
+                    DoctorSchedule.effective_to >= start_date
+                )
+            )
+        ).distinct().all()
+
+        return [result[0] for result in results]
+
     @staticmethod
     def check_time_overlap(
         db: Session,
@@ -135,30 +246,42 @@ class DoctorScheduleRepository:
         return len(overlapping_schedules) > 0
 
     @staticmethod
-    def create(db: Session, schedule: DoctorSchedule) -> DoctorSchedule:
-        """Create a new doctor schedule"""
+    def create(db: Session, schedule: DoctorSchedule, commit: bool = True) -> DoctorSchedule:
+        """Create a new doctor schedule (with commit=False: only flushed, for the caller to commit)"""
         db.add(schedule)
+        if not commit:
+            db.flush()
+            return schedule
         db.commit()
         db.refresh(schedule)
         return schedule
 
     @staticmethod
-    def update(db: Session, schedule: DoctorSchedule) -> DoctorSchedule:
-        """Update an existing doctor schedule"""
+    def update(db: Session, schedule: DoctorSchedule, commit: bool = True) -> DoctorSchedule:
+        """Update an existing doctor schedule (with commit=False: only flushed, for the caller to commit)"""
+        if not commit:
+            db.flush()
+            return schedule
         db.commit()
         db.refresh(schedule)
         return schedule
 
     @staticmethod
-    def delete(db: Session, schedule: DoctorSchedule) -> None:
-        """Delete a doctor schedule (hard delete)"""
+    def delete(db: Session, schedule: DoctorSchedule, commit: bool = True) -> None:
+        """Delete a doctor schedule (hard delete; with commit=False: only flushed)"""
         db.delete(schedule)
-        db.commit()
+        if commit:
+            db.commit()
+        else:
+            db.flush()
 
     @staticmethod
-    def deactivate(db: Session, schedule: DoctorSchedule) -> DoctorSchedule:
-        """Soft delete by deactivating the schedule"""
+    def deactivate(db: Session, schedule: DoctorSchedule, commit: bool = True) -> DoctorSchedule:
+        """Soft delete by deactivating the schedule (with commit=False: only flushed)"""
         schedule.is_active = False
+        if not commit:
+            db.flush()
+            return schedule
         db.commit()
         db.refresh(schedule)
         return schedule
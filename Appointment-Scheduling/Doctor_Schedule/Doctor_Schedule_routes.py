@@ -1,4 +1,6 @@
 from fastapi import APIRouter
+from async_routes import build_async_router
+from Doctor_Schedule.Doctor_Schedule_config import get_db
 from Doctor_Schedule.Doctor_Schedule_controller import router as doctor_schedule_controller
 
 router = APIRouter(
@@ -7,3 +9,11 @@ router = APIRouter(
 )
 
 router.include_router(doctor_schedule_controller)
+
+# Same endpoints as async def handlers run in the threadpool (ASYNC_ROUTE_HANDLERS)
+async_router = APIRouter(
+    prefix="/doctor-schedules",
+    tags=["Doctor Schedules"]
+)
+
+async_router.include_router(build_async_router(doctor_schedule_controller, get_db, keep_sync=["export_schedules"]))
@@ -1,8 +1,10 @@
 from sqlalchemy.orm import Session
 from datetime import date, time, datetime
-from typing import List, Optional, Dict
+from typing import Dict, Iterable, List, Optional, Tuple
 from Doctor_Schedule.Doctor_Schedule_model import DoctorSchedule, DayOfWeekEnum
-from Doctor_Schedule.Doctor_Schedule_repository import DoctorScheduleRepository
+from Doctor_Schedule.Doctor_Schedule_repository import DoctorScheduleRepository, SCHEDULE_EXPORT_COLUMNS
+from Doctor_Slot.Doctor_Slot_service import DoctorSlotService
+from pagination import DEFAULT_PAGE_SIZE, Page
 
 class DoctorScheduleService:
 
@@ -66,7 +68,15 @@ class DoctorScheduleService:
             effective_to=effective_to
         )
 
-        return DoctorScheduleRepository.create(db, schedule)
+        # The schedule and its slot calendar commit together or not at all
+        try:
+            schedule = DoctorScheduleRepository.create(db, schedule, commit=False)
+            DoctorSlotService.refresh_doctor(db, schedule.doctor_id, schedule.effective_from, schedule.effective_to)
+            db.commit()
+        except Exception:
+            db.rollback()
+            raise
+        return schedule
 
     @staticmethod
     def get_schedule(db: Session, schedule_id: int) -> DoctorSchedule:
@@ -77,14 +87,20 @@ class DoctorScheduleService:
         return schedule
 
     @staticmethod
-    def list_schedules(db: Session, skip: int = 0, limit: int = 100) -> List[DoctorSchedule]:
-        """List all schedules with pagination"""
-        return DoctorScheduleRepository.get_all(db, skip, limit)
+    def list_schedules(db: Session, cursor: Optional[str] = None, limit: int = DEFAULT_PAGE_SIZE) -> Page:
+        """List all schedules, one page at a time"""
+        return DoctorScheduleRepository.get_all(db, cursor, limit)
 
     @staticmethod
-    def get_doctor_schedules(db: Session, doctor_id: int) -> List[DoctorSchedule]:
-        """Get all schedules for a doctor"""
-        return DoctorScheduleRepository.get_by_doctor_id(db, doctor_id)
+    def get_doctor_schedules(
+        db: Session,
+        doctor_id: int,
+        active_only: bool = False,
+        cursor: Optional[str] = None,
+        limit: int = DEFAULT_PAGE_SIZE
+    ) -> Page:
+        """Get a page of a doctor's schedules"""
+        return DoctorScheduleRepository.get_by_doctor_id(db, doctor_id, active_only, cursor, limit)
 
     @staticmethod
     def get_active_doctor_schedules(db: Session, doctor_id: int) -> List[DoctorSchedule]:
@@ -97,6 +113,44 @@ class DoctorScheduleService:
         day_enum = DayOfWeekEnum[day_of_week.lower()]
         return DoctorScheduleRepository.get_by_doctor_and_day(db, doctor_id, day_enum)
 
+    @staticmethod
+    def get_all_schedules_by_day(
+        db: Session,
+        day_of_week: str,
+        cursor: Optional[str] = None,
+        limit: int = DEFAULT_PAGE_SIZE
+    ) -> Page:
+        """Get a page of the active schedules of every doctor on a specific day"""
+        try:
+            day_enum = DayOfWeekEnum[day_of_week.lower()]
+        except KeyError:
+            raise ValueError(f"Invalid day_of_week: {day_of_week}")
+        return DoctorScheduleRepository.get_by_day_of_week(db, day_enum, cursor, limit)
+
+    @staticmethod
+    def export_schedules(
+        db: Session,
+        doctor_id: Optional[int] = None,
+        start_date: Optional[str] = None,
+        end_date: Optional[str] = None,
+        is_active: Optional[bool] = None
+    ) -> Tuple[List[str], Iterable[tuple]]:
+        """
+        Field names and rows of a schedule export, optionally filtered by doctor, the date
+        range the schedules are effective in, and active status
+        Filters are checked now; rows are read from a server-side cursor as they are consumed
+        """
+        if isinstance(start_date, str):
+            start_date = datetime.strptime(start_date, "%Y-%m-%d").date()
+        if isinstance(end_date, str):
+            end_date = datetime.strptime(end_date, "%Y-%m-%d").date()
+        if start_date and end_date and start_date > end_date:
+            raise ValueError("start_date must be before or equal to end_date")
+
+        fields = [column.key for column in SCHEDULE_EXPORT_COLUMNS]
+        rows = DoctorScheduleRepository.stream_for_export(db, doctor_id, start_date, end_date, is_active)
+        return fields, rows
+
     @staticmethod
     def update_schedule(db: Session, schedule_id: int, data: dict) -> DoctorSchedule:
         """
@@ -106,6 +160,8 @@ class DoctorScheduleService:
         if not schedule:
             raise ValueError(f"Schedule with ID {schedule_id} not found")
 
+        old_effective_from, old_effective_to = schedule.effective_from, schedule.effective_to
+
         # If updating time or day, check for overlaps
         if any(key in data for key in ["day_of_week", "start_time", "end_time", "effective_from", "effective_to"]):
             new_day = data.get("day_of_week", schedule.day_of_week)
@@ -146,7 +202,21 @@ class DoctorScheduleService:
             if hasattr(schedule, key):
                 setattr(schedule, key, value)
 
-        return DoctorScheduleRepository.update(db, schedule)
+        try:
+            schedule = DoctorScheduleRepository.update(db, schedule, commit=False)
+
+            # Regenerate every day the old or the new version of the schedule covered
+            refresh_to = None
+            if old_effective_to and schedule.effective_to:
+                refresh_to = max(old_effective_to, schedule.effective_to)
+            DoctorSlotService.refresh_doctor(
+                db, schedule.doctor_id, min(old_effective_from, schedule.effective_from), refresh_to
+            )
+            db.commit()
+        except Exception:
+            db.rollback()
+            raise
+        return schedule
 
     @staticmethod
     def deactivate_schedule(db: Session, schedule_id: int) -> DoctorSchedule:
@@ -155,7 +225,14 @@ class DoctorScheduleService:
         if not schedule:
             raise ValueError(f"Schedule with ID {schedule_id} not found")
         
-        return DoctorScheduleRepository.deactivate(db, schedule)
+        try:
+            schedule = DoctorScheduleRepository.deactivate(db, schedule, commit=False)
+            DoctorSlotService.refresh_doctor(db, schedule.doctor_id, schedule.effective_from, schedule.effective_to)
+            db.commit()
+        except Exception:
+            db.rollback()
+            raise
+        return schedule
 
     @staticmethod
     def delete_schedule(db: Session, schedule_id: int) -> None:
@@ -164,7 +241,14 @@ class DoctorScheduleService:
         if not schedule:
             raise ValueError(f"Schedule with ID {schedule_id} not found")
         
-        DoctorScheduleRepository.delete(db, schedule)
+        doctor_id, effective_from, effective_to = schedule.doctor_id, schedule.effective_from, schedule.effective_to
+        try:
+            DoctorScheduleRepository.delete(db, schedule, commit=False)
+            DoctorSlotService.refresh_doctor(db, doctor_id, effective_from, effective_to)
+            db.commit()
+        except Exception:
+            db.rollback()
+            raise
 
     @staticmethod
     def get_doctor_schedule_summary(db: Session, doctor_id: int) -> Dict:
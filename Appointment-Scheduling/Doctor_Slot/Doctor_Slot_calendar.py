@@ -0,0 +1,129 @@
+"""
+Doctor_Slot Entity - Calendar
+Pure functions that turn schedules, blocked periods and booked appointments into
+doctor_slot rows. Callers load the inputs for a doctor/date window once and write
+the rows back; nothing here touches the database.
+"""
+from collections import defaultdict
+from datetime import date, time, timedelta
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from Appointment.Appointment_availability import (
+    WEEKDAY_TO_ENUM,
+    group_schedules_by_weekday,
+    group_busy_by_date,
+    is_schedule_effective,
+    subtract_busy,
+)
+from Appointment.Appointment_index import DayIntervals
+from Doctor_Schedule.Doctor_Schedule_config import generate_time_slots
+
+
+def expand_day_capacity(schedules_by_weekday: Dict, check_date: date) -> Dict[Tuple[time, time], Tuple[int, int]]:
+    """
+    Expand the schedules effective on a date into {(start, end): (capacity, schedule_id)}
+    When schedules produce the same slot the larger capacity wins
+    """
+    slots = {}
+    for schedule in schedules_by_weekday.get(WEEKDAY_TO_ENUM[check_date.weekday()], []):
+        if not is_schedule_effective(schedule, check_date):
+            continue
+        for slot in generate_time_slots(schedule.start_time, schedule.end_time, schedule.slot_duration):
+            if slot not in slots or schedule.max_patients_per_slot > slots[slot][0]:
+                slots[slot] = (schedule.max_patients_per_slot, schedule.schedule_id)
+    return slots
+
+
+def slots_taken_by(slots: Iterable[Tuple[time, time]], start_time: time, end_time: time) -> Optional[List[Tuple[time, time]]]:
+    """
+    The (start, end) slots a booking of [start_time, end_time) takes one unit from: every
+    slot it overlaps, so slots of schedules with different slot durations never sell the
+    same time twice. None when those slots leave part of the booking uncovered (it reaches
+    outside the doctor's hours)
+    """
+    taken = sorted(slot for slot in slots if slot[0] < end_time and slot[1] > start_time)
+    reached = start_time
+    for slot_start, slot_end in taken:
+        if slot_start > reached:
+            return None
+        reached = max(reached, slot_end)
+    return taken if taken and reached >= end_time else None
+
+
+def build_slot_rows(
+    doctor_id: int,
+    schedules: Iterable,
+    blocked_rows: Iterable[Tuple[date, time, time]],
+    booked_rows: Iterable[Tuple[date, time, time]],
+    start_date: date,
+    end_date: date
+) -> List[dict]:
+    """
+    Build the doctor_slot rows of one doctor from start_date to end_date
+    Every scheduled appointment overlapping a slot uses up one unit of its capacity
+    """
+    schedules_by_weekday = group_schedules_by_weekday(schedules)
+    blocked_by_date = group_busy_by_date(blocked_rows)
+
+    booked_by_date = defaultdict(list)
+    for position, (booked_date, start, end) in enumerate(booked_rows):
+        booked_by_date[booked_date].append((position, start, end))
+
+    rows = []
+    current_date = start_date
+    while current_date <= end_date:
+        blocked = blocked_by_date.get(current_date, [])
+        booked = DayIntervals(booked_by_date.get(current_date, []))
+
+        for (slot_start, slot_end), (capacity, schedule_id) in sorted(
+            expand_day_capacity(schedules_by_weekday, current_date).items()
+        ):
+            booked_count = len(booked.conflicts(slot_start, slot_end))
+            rows.append({
+                "doctor_id": doctor_id,
+                "schedule_id": schedule_id,
+                "slot_date": current_date,
+                "start_time": slot_start,
+                "end_time": slot_end,
+                "capacity": capacity,
+                "remaining": max(capacity - booked_count, 0),
+                "is_blocked": not subtract_busy([(slot_start, slot_end)], blocked)
+            })
+        current_date += timedelta(days=1)
+    return rows
+
+
+def build_calendar_rows(
+    doctor_ids: Iterable[int],
+    schedules: Iterable,
+    blocked_rows: Iterable[Tuple[int, date, time, time]],
+    booked_rows: Iterable[Tuple[int, date, time, time]],
+    start_date: date,
+    end_date: date
+) -> List[dict]:
+    """
+    Build the doctor_slot rows of several doctors from start_date to end_date
+    blocked_rows and booked_rows are (doctor_id, date, start_time, end_time)
+    """
+    schedules_by_doctor = defaultdict(list)
+    for schedule in schedules:
+        schedules_by_doctor[schedule.doctor_id].append(schedule)
+    blocked_by_doctor = defaultdict(list)
+    for doctor_id, blocked_date, start, end in blocked_rows:
+        blocked_by_doctor[doctor_id].append((blocked_date, start, end))
+    booked_by_doctor = defaultdict(list)
+    for doctor_id, booked_date, start, end in booked_rows:
+        booked_by_doctor[doctor_id].append((booked_date, start, end))
+
+    rows = []
+    for doctor_id in doctor_ids:
+        if doctor_id in schedules_by_doctor:
+            rows.extend(build_slot_rows(
+                doctor_id,
+                schedules_by_doctor[doctor_id],
+                blocked_by_doctor[doctor_id],
+                booked_by_doctor[doctor_id],
+                start_date,
+                end_date
+            ))
+    return rows
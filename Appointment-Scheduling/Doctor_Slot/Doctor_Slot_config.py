@@ -0,0 +1,88 @@
+"""
+Doctor_Slot Entity - Configuration
+Contains settings, database setup, exceptions, and utilities specific to the materialized slot calendar
+"""
+from pydantic_settings import BaseSettings
+from functools import lru_cache
+from sqlalchemy.ext.declarative import declarative_base
+from database import LazySessionLocal, lazy_engine_getattr
+from datetime import date, timedelta
+from typing import Optional, Tuple
+from Appointment.Appointment_config import get_appointment_settings
+
+
+# ============ CONFIGURATION ============
+
+class DoctorSlotSettings(BaseSettings):
+    """Doctor Slot entity settings"""
+
+    # Database
+    DATABASE_URL: Optional[str] = None  # None: the shared DATABASE_URL (database.py), one pool for all
+
+    # Calendar Settings
+    MAX_OPEN_SLOT_QUERY_DAYS: int = 31  # Max days returned by one open-slot query
+
+    class Config:
+        env_file = ".env"
+        case_sensitive = True
+        extra = "ignore"  # Shared keys (pool sizing) are read by database.py
+
+
+@lru_cache()
+def get_doctor_slot_settings() -> DoctorSlotSettings:
+    """Get cached doctor slot settings instance"""
+    return DoctorSlotSettings()
+
+
+# ============ DATABASE SETUP ============
+
+Base = declarative_base()
+
+# Engine and sessions come from the shared registry (one pool per database URL) and
+# are created on first use; `engine` is resolved on access
+SessionLocal = LazySessionLocal(lambda: get_doctor_slot_settings().DATABASE_URL)
+__getattr__ = lazy_engine_getattr(__name__, lambda: get_doctor_slot_settings().DATABASE_URL)
+
+
+def get_db():
+    """Dependency for getting database session"""
+    db = SessionLocal()
+    try:
+        yield db
+    finally:
+        db.close()
+
+
+# ============ CUSTOM EXCEPTIONS ============
+
+class DoctorSlotException(Exception):
+    """Base exception for doctor slot calendar"""
+    pass
+
+
+# ============ UTILITY FUNCTIONS ============
+
+def get_calendar_window(today: Optional[date] = None) -> Tuple[date, date]:
+    """
+    Get the (first_date, last_date) the calendar is materialized for
+    The calendar covers today plus BOOKING_ADVANCE_DAYS from AppointmentSettings
+    """
+    today = today or date.today()
+    return (today, today + timedelta(days=get_appointment_settings().BOOKING_ADVANCE_DAYS))
+
+
+def clip_to_calendar(
+    start_date: Optional[date],
+    end_date: Optional[date],
+    today: Optional[date] = None
+) -> Optional[Tuple[date, date]]:
+    """
+    Clip a date range to the calendar window; open ends extend to the window edge
+    Returns None when the range lies entirely outside the window
+    """
+    first_date, last_date = get_calendar_window(today)
+    start_date = max(start_date or first_date, first_date)
+    end_date = min(end_date or last_date, last_date)
+    if start_date > end_date:
+        return None
+    return (start_date, end_date)
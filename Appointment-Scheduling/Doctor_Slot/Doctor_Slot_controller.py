@@ -0,0 +1,71 @@
+from fastapi import APIRouter, Depends, HTTPException, Query
+from sqlalchemy.orm import Session
+from typing import Optional
+from datetime import datetime
+from Doctor_Slot.Doctor_Slot_config import get_db
+from Doctor_Slot.Doctor_Slot_service import DoctorSlotService
+
+router = APIRouter()
+
+
+@router.get("/doctor/{doctor_id}/open")
+def get_open_slots(
+    doctor_id: int,
+    start_date: Optional[str] = Query(None, description="Start date (YYYY-MM-DD), defaults to today"),
+    end_date: Optional[str] = Query(None, description="End date (YYYY-MM-DD), defaults to a week from start_date"),
+    db: Session = Depends(get_db)
+):
+    """
+    Get a doctor's open slots with remaining capacity from the slot calendar
+    """
+    try:
+        return DoctorSlotService.get_open_slots(db, doctor_id, start_date, end_date)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Internal server error: {str(e)}")
+
+
+@router.post("/doctor/{doctor_id}/regenerate")
+def regenerate_doctor_slots(
+    doctor_id: int,
+    start_date: Optional[str] = Query(None, description="Start date (YYYY-MM-DD), defaults to today"),
+    end_date: Optional[str] = Query(None, description="End date (YYYY-MM-DD), defaults to the end of the booking window"),
+    db: Session = Depends(get_db)
+):
+    """
+    Regenerate a doctor's slot calendar over a date window
+    """
+    try:
+        start = datetime.strptime(start_date, "%Y-%m-%d").date() if start_date else None
+        end = datetime.strptime(end_date, "%Y-%m-%d").date() if end_date else None
+        result = DoctorSlotService.regenerate_doctor(db, doctor_id, start, end)
+        return {"message": "Slot calendar regenerated successfully", **result}
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Internal server error: {str(e)}")
+
+
+@router.post("/extend")
+def extend_slot_calendar(db: Session = Depends(get_db)):
+    """
+    Daily job: drop past days and generate the days that entered the booking window
+    """
+    try:
+        result = DoctorSlotService.extend_calendar(db)
+        return {"message": "Slot calendar extended successfully", **result}
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Internal server error: {str(e)}")
+
+
+@router.post("/rebuild")
+def rebuild_slot_calendar(db: Session = Depends(get_db)):
+    """
+    Rebuild the whole slot calendar (after migrating or restoring data)
+    """
+    try:
+        result = DoctorSlotService.rebuild_calendar(db)
+        return {"message": "Slot calendar rebuilt successfully", **result}
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Internal server error: {str(e)}")
@@ -0,0 +1,47 @@
+from sqlalchemy import Column, Integer, Date, Time, DateTime, Boolean, Index, UniqueConstraint, CheckConstraint, text
+from sqlalchemy.sql import func
+from Doctor_Slot.Doctor_Slot_config import Base
+
+
+class DoctorSlot(Base):
+    """
+    Doctor Slot model matching hms.doctor_slot table
+    One row per bookable slot, materialized from doctor_schedule for the booking window
+    """
+    __tablename__ = "doctor_slot"
+
+    doctor_slot_id = Column(Integer, primary_key=True, autoincrement=True)
+
+    # Foreign Keys - just integers, DB has the constraints
+    doctor_id = Column(Integer, nullable=False)
+    schedule_id = Column(Integer, nullable=True)
+
+    # Slot
+    slot_date = Column(Date, nullable=False)
+    start_time = Column(Time, nullable=False)
+    end_time = Column(Time, nullable=False)
+
+    # Capacity (max_patients_per_slot) and what is left of it
+    capacity = Column(Integer, nullable=False)
+    remaining = Column(Integer, nullable=False)
+
+    # Covered by a blocked slot
+    is_blocked = Column(Boolean, nullable=False, default=False)
+
+    # Audit fields
+    updated_at = Column(DateTime, nullable=False, server_default=func.now())
+
+    __table_args__ = (
+        UniqueConstraint("doctor_id", "slot_date", "start_time", "end_time", name="uq_doctor_slot"),
+        CheckConstraint("remaining >= 0 AND remaining <= capacity", name="doctor_slot_remaining_check"),
+        # "What's open" range scans across doctors only touch open slots
+        Index(
+            "ix_doctor_slot_open",
+            "slot_date", "start_time", "doctor_id",
+            postgresql_where=text("remaining > 0 AND NOT is_blocked")
+        ),
+        {"schema": "hms"}
+    )
+
+    def __repr__(self):
+        return f"<DoctorSlot {self.doctor_slot_id}: Dr.{self.doctor_id} on {self.slot_date} {self.start_time}-{self.end_time} ({self.remaining}/{self.capacity})>"
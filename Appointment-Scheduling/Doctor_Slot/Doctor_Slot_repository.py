@@ -0,0 +1,339 @@
+from sqlalchemy.orm import Session, aliased
+from sqlalchemy import and_, func, select, update, tuple_, values, column, Integer, Date, Time
+from sqlalchemy.dialects.postgresql import insert
+from datetime import date, time
+from typing import Dict, List, Optional, Set, Tuple
+from Doctor_Slot.Doctor_Slot_model import DoctorSlot
+from Doctor_Slot.Doctor_Slot_calendar import slots_taken_by
+
+
+SlotKey = Tuple[int, date, time, time]
+
+
+def overlaps_slot(doctor_id, slot_date, start_time, end_time):
+    """Filter for a doctor's slots on a date that overlap [start_time, end_time)"""
+    return and_(
+        DoctorSlot.doctor_id == doctor_id,
+        DoctorSlot.slot_date == slot_date,
+        DoctorSlot.start_time < end_time,
+        DoctorSlot.end_time > start_time
+    )
+
+
+def matches_slot(doctor_id, slot_date, start_time, end_time):
+    """Filter for the slot row with this (doctor_id, slot_date, start_time, end_time) key"""
+    return and_(
+        DoctorSlot.doctor_id == doctor_id,
+        DoctorSlot.slot_date == slot_date,
+        DoctorSlot.start_time == start_time,
+        DoctorSlot.end_time == end_time
+    )
+
+
+class DoctorSlotRepository:
+
+    @staticmethod
+    def get_by_id(db: Session, doctor_slot_id: int) -> Optional[DoctorSlot]:
+        """Get slot by ID"""
+        return db.query(DoctorSlot).filter(DoctorSlot.doctor_slot_id == doctor_slot_id).first()
+
+    @staticmethod
+    def get_by_doctor_and_date_range(
+        db: Session,
+        doctor_id: int,
+        start_date: date,
+        end_date: date
+    ) -> List[DoctorSlot]:
+        """Get every slot of a doctor within a date range"""
+        return db.query(DoctorSlot).filter(
+            and_(
+                DoctorSlot.doctor_id == doctor_id,
+                DoctorSlot.slot_date >= start_date,
+                DoctorSlot.slot_date <= end_date
+            )
+        ).order_by(DoctorSlot.slot_date, DoctorSlot.start_time).all()
+
+    @staticmethod
+    def get_open_slots(
+        db: Session,
+        doctor_id: int,
+        start_date: date,
+        end_date: date
+    ) -> List[DoctorSlot]:
+        """Get a doctor's slots with remaining capacity within a date range"""
+        return db.query(DoctorSlot).filter(
+            and_(
+                DoctorSlot.doctor_id == doctor_id,
+                DoctorSlot.slot_date >= start_date,
+                DoctorSlot.slot_date <= end_date,
+                DoctorSlot.remaining > 0,
+                DoctorSlot.is_blocked == False
+            )
+        ).order_by(DoctorSlot.slot_date, DoctorSlot.start_time).all()
+
+    @staticmethod
+    def get_slot(
+        db: Session,
+        doctor_id: int,
+        slot_date: date,
+        start_time: time,
+        end_time: time
+    ) -> Optional[DoctorSlot]:
+        """Get the slot with this exact doctor/date/time key"""
+        return db.query(DoctorSlot).filter(
+            matches_slot(doctor_id, slot_date, start_time, end_time)
+        ).first()
+
+    @staticmethod
+    def get_overlapping(
+        db: Session,
+        doctor_id: int,
+        slot_date: date,
+        start_time: time,
+        end_time: time
+    ) -> List[DoctorSlot]:
+        """Get a doctor's slots on a date that overlap [start_time, end_time)"""
+        return db.query(DoctorSlot).filter(
+            overlaps_slot(doctor_id, slot_date, start_time, end_time)
+        ).order_by(DoctorSlot.start_time).all()
+
+    @staticmethod
+    def has_slots_on(db: Session, doctor_id: int, slot_date: date) -> bool:
+        """Check if the calendar has any slot for a doctor on a date"""
+        return db.query(
+            db.query(DoctorSlot).filter(
+                and_(DoctorSlot.doctor_id == doctor_id, DoctorSlot.slot_date == slot_date)
+            ).exists()
+        ).scalar()
+
+    @staticmethod
+    def get_for_days(db: Session, days: List[Tuple[int, date]]) -> List[tuple]:
+        """
+        Get (doctor_id, slot_date, start_time, end_time, remaining, capacity, is_blocked) of
+        every slot on the given (doctor_id, slot_date) pairs
+        """
+        return db.query(
+            DoctorSlot.doctor_id,
+            DoctorSlot.slot_date,
+            DoctorSlot.start_time,
+            DoctorSlot.end_time,
+            DoctorSlot.remaining,
+            DoctorSlot.capacity,
+            DoctorSlot.is_blocked
+        ).filter(
+            tuple_(DoctorSlot.doctor_id, DoctorSlot.slot_date).in_(days)
+        ).all()
+
+    @staticmethod
+    def get_capacity_in_range(db: Session, doctor_id: int, start_date: date, end_date: date) -> List[tuple]:
+        """Get (slot_date, start_time, end_time, remaining, is_blocked) of a doctor's slots within a date range"""
+        return db.query(
+            DoctorSlot.slot_date,
+            DoctorSlot.start_time,
+            DoctorSlot.end_time,
+            DoctorSlot.remaining,
+            DoctorSlot.is_blocked
+        ).filter(
+            and_(
+                DoctorSlot.doctor_id == doctor_id,
+                DoctorSlot.slot_date >= start_date,
+                DoctorSlot.slot_date <= end_date
+            )
+        ).all()
+
+    @staticmethod
+    def get_capacity_for_doctors_in_range(
+        db: Session,
+        doctor_ids: List[int],
+        start_date: date,
+        end_date: date
+    ) -> List[tuple]:
+        """Get (doctor_id, slot_date, start_time, end_time, remaining, is_blocked) of several doctors' slots within a date range"""
+        return db.query(
+            DoctorSlot.doctor_id,
+            DoctorSlot.slot_date,
+            DoctorSlot.start_time,
+            DoctorSlot.end_time,
+            DoctorSlot.remaining,
+            DoctorSlot.is_blocked
+        ).filter(
+            and_(
+                DoctorSlot.doctor_id.in_(doctor_ids),
+                DoctorSlot.slot_date >= start_date,
+                DoctorSlot.slot_date <= end_date
+            )
+        ).all()
+
+    @staticmethod
+    def claim(
+        db: Session,
+        doctor_id: int,
+        slot_date: date,
+        start_time: time,
+        end_time: time
+    ) -> Optional[int]:
+        """
+        Take one unit of capacity from every slot a booking overlaps with one
+        UPDATE ... SET remaining = remaining - 1 WHERE ... AND remaining > 0 RETURNING
+        The booking is taken only if every overlapping slot is open with a place left and
+        together they cover it, so an off-grid booking takes every slot it touches and
+        overlapping slots of schedules with different slot durations cannot both sell the
+        same time: the rows returned are compared with the slots the booking overlaps.
+        Returns the largest capacity among the slots taken, or None when the booking cannot
+        be taken (the caller must roll back what was decremented) or overlaps no slot.
+        Does not commit: the caller commits it with the booking.
+        """
+        overlapping = aliased(DoctorSlot)
+        required = select(func.count()).select_from(overlapping).where(
+            and_(
+                overlapping.doctor_id == doctor_id,
+                overlapping.slot_date == slot_date,
+                overlapping.start_time < end_time,
+                overlapping.end_time > start_time
+            )
+        ).scalar_subquery().label("required")
+        rows = db.execute(
+            update(DoctorSlot)
+            .where(
+                and_(
+                    overlaps_slot(doctor_id, slot_date, start_time, end_time),
+                    DoctorSlot.is_blocked == False,
+                    DoctorSlot.remaining > 0
+                )
+            )
+            .values(remaining=DoctorSlot.remaining - 1)
+            .returning(DoctorSlot.start_time, DoctorSlot.end_time, DoctorSlot.capacity, required)
+        ).all()
+        if not rows or len(rows) < rows[0].required:
+            return None
+        if slots_taken_by([(row.start_time, row.end_time) for row in rows], start_time, end_time) is None:
+            return None
+        return max(row.capacity for row in rows)
+
+    @staticmethod
+    def claim_many(db: Session, claims: Dict[SlotKey, int]) -> Set[SlotKey]:
+        """
+        Take {slot key: quantity} units of capacity from many slots with one UPDATE ... FROM (VALUES ...)
+        A slot is only updated when it can cover its whole quantity. Returns the keys of the
+        slots updated; a key missing from it means the caller must roll back.
+        Does not commit.
+        """
+        if not claims:
+            return set()
+
+        requested = values(
+            column("doctor_id", Integer),
+            column("slot_date", Date),
+            column("start_time", Time),
+            column("end_time", Time),
+            column("quantity", Integer),
+            name="requested"
+        ).data([(*key, quantity) for key, quantity in claims.items()])
+
+        return set(db.execute(
+            update(DoctorSlot)
+            .where(
+                and_(
+                    DoctorSlot.doctor_id == requested.c.doctor_id,
+                    DoctorSlot.slot_date == requested.c.slot_date,
+                    DoctorSlot.start_time == requested.c.start_time,
+                    DoctorSlot.end_time == requested.c.end_time,
+                    DoctorSlot.is_blocked == False,
+                    DoctorSlot.remaining >= requested.c.quantity
+                )
+            )
+            .values(remaining=DoctorSlot.remaining - requested.c.quantity)
+            .returning(DoctorSlot.doctor_id, DoctorSlot.slot_date, DoctorSlot.start_time, DoctorSlot.end_time)
+        ).tuples().all())
+
+    @staticmethod
+    def release(
+        db: Session,
+        doctor_id: int,
+        slot_date: date,
+        start_time: time,
+        end_time: time
+    ) -> int:
+        """
+        Give back the unit of capacity a booking took from every slot it overlaps, after a
+        cancellation, no-show or move. Returns the number of slots released (0 when the day
+        is not in the calendar). Does not commit.
+        """
+        return len(db.execute(
+            update(DoctorSlot)
+            .where(
+                and_(
+                    overlaps_slot(doctor_id, slot_date, start_time, end_time),
+                    DoctorSlot.remaining < DoctorSlot.capacity
+                )
+            )
+            .values(remaining=DoctorSlot.remaining + 1)
+            .returning(DoctorSlot.doctor_slot_id)
+        ).all())
+
+    @staticmethod
+    def lock_window(db: Session, doctor_ids: List[int], start_date: date, end_date: date) -> None:
+        """
+        Lock the doctors' existing slots in a date window until the transaction ends
+        Taken before a rebuild reads appointments, so a booking that has already claimed
+        capacity commits first and is counted instead of being overwritten
+        """
+        db.query(DoctorSlot.doctor_slot_id).filter(
+            and_(
+                DoctorSlot.doctor_id.in_(doctor_ids),
+                DoctorSlot.slot_date >= start_date,
+                DoctorSlot.slot_date <= end_date
+            )
+        ).order_by(DoctorSlot.doctor_slot_id).with_for_update().all()
+
+    @staticmethod
+    def replace_window(
+        db: Session,
+        doctor_ids: List[int],
+        start_date: date,
+        end_date: date,
+        rows: List[dict]
+    ) -> int:
+        """
+        Make the doctors' slots from start_date to end_date match `rows`
+        Existing slots are updated in place (their ids stay stable), new ones are inserted
+        and slots no longer produced by any schedule are deleted. Returns count of slots kept.
+        Does not commit: the caller commits it together with the change that made the
+        rebuild necessary (a schedule or a block), so neither is ever saved without the other.
+        """
+        if rows:
+            statement = insert(DoctorSlot)
+            statement = statement.on_conflict_do_update(
+                constraint="uq_doctor_slot",
+                set_={
+                    "schedule_id": statement.excluded.schedule_id,
+                    "capacity": statement.excluded.capacity,
+                    "remaining": statement.excluded.remaining,
+                    "is_blocked": statement.excluded.is_blocked,
+                    "updated_at": func.now()
+                }
+            )
+            db.execute(statement, rows)
+
+        # Every row written above carries this transaction's now(); anything older is stale
+        db.query(DoctorSlot).filter(
+            and_(
+                DoctorSlot.doctor_id.in_(doctor_ids),
+                DoctorSlot.slot_date >= start_date,
+                DoctorSlot.slot_date <= end_date,
+                DoctorSlot.updated_at < func.now()
+            )
+        ).delete(synchronize_session=False)
+        return len(rows)
+
+    @staticmethod
+    def delete_before(db: Session, before_date: date) -> int:
+        """Delete slots dated before before_date. Returns count of deleted slots. Does not commit."""
+        return db.query(DoctorSlot).filter(
+            DoctorSlot.slot_date < before_date
+        ).delete(synchronize_session=False)
+
+    @staticmethod
+    def get_last_slot_date(db: Session) -> Optional[date]:
+        """Get the last date the calendar has been generated for"""
+        return db.query(func.max(DoctorSlot.slot_date)).scalar()
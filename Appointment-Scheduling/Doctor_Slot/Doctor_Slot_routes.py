@@ -0,0 +1,9 @@
+from fastapi import APIRouter
+from Doctor_Slot.Doctor_Slot_controller import router as doctor_slot_controller
+
+router = APIRouter(
+    prefix="/doctor-slots",
+    tags=["Doctor Slots"]
+)
+
+router.include_router(doctor_slot_controller)
@@ -0,0 +1,152 @@
+from sqlalchemy.orm import Session
+from datetime import date, datetime, timedelta
+from typing import Dict, List, Optional
+from Doctor_Slot.Doctor_Slot_model import DoctorSlot
+from Doctor_Slot.Doctor_Slot_repository import DoctorSlotRepository
+from Doctor_Slot.Doctor_Slot_calendar import build_calendar_rows
+from Doctor_Slot.Doctor_Slot_config import get_doctor_slot_settings, get_calendar_window, clip_to_calendar
+from Doctor_Schedule.Doctor_Schedule_repository import DoctorScheduleRepository
+from Blocked_Slots.Blocked_Slots_repository import BlockedSlotRepository
+from Appointment.Appointment_repository import AppointmentRepository
+
+
+class DoctorSlotService:
+
+    @staticmethod
+    def regenerate(
+        db: Session,
+        doctor_ids: List[int],
+        start_date: Optional[date] = None,
+        end_date: Optional[date] = None
+    ) -> Dict:
+        """
+        Rebuild the calendar of some doctors over a date window (clipped to the booking window)
+        Schedules, blocked periods and booked appointments are loaded with one query each.
+        Does not commit: runs in the transaction of the change that needs it
+        """
+        window = clip_to_calendar(start_date, end_date)
+        if not doctor_ids or window is None:
+            return {"doctor_ids": doctor_ids, "start_date": start_date, "end_date": end_date, "slots": 0}
+        start_date, end_date = window
+
+        DoctorSlotRepository.lock_window(db, doctor_ids, start_date, end_date)
+
+        rows = build_calendar_rows(
+            doctor_ids,
+            DoctorScheduleRepository.get_effective_schedules_for_doctors_in_range(db, doctor_ids, start_date, end_date),
+            BlockedSlotRepository.get_intervals_for_doctors_in_range(db, doctor_ids, start_date, end_date),
+            AppointmentRepository.get_scheduled_intervals_for_doctors_in_range(db, doctor_ids, start_date, end_date),
+            start_date,
+            end_date
+        )
+        count = DoctorSlotRepository.replace_window(db, doctor_ids, start_date, end_date, rows)
+
+        return {"doctor_ids": doctor_ids, "start_date": start_date, "end_date": end_date, "slots": count}
+
+    @staticmethod
+    def refresh_doctor(
+        db: Session,
+        doctor_id: int,
+        start_date: Optional[date] = None,
+        end_date: Optional[date] = None
+    ) -> Dict:
+        """Rebuild one doctor's calendar after a schedule or block change (not committed)"""
+        return DoctorSlotService.regenerate(db, [doctor_id], start_date, end_date)
+
+    @staticmethod
+    def regenerate_doctor(
+        db: Session,
+        doctor_id: int,
+        start_date: Optional[date] = None,
+        end_date: Optional[date] = None
+    ) -> Dict:
+        """Rebuild one doctor's calendar on its own, in a transaction of its own"""
+        try:
+            result = DoctorSlotService.refresh_doctor(db, doctor_id, start_date, end_date)
+            db.commit()
+        except Exception:
+            db.rollback()
+            raise
+        return result
+
+    @staticmethod
+    def rebuild_calendar(db: Session) -> Dict:
+        """Rebuild the whole booking window for every doctor with an active schedule"""
+        first_date, last_date = get_calendar_window()
+        try:
+            DoctorSlotRepository.delete_before(db, first_date)
+            doctor_ids = DoctorScheduleRepository.get_scheduled_doctor_ids(db, first_date, last_date)
+            result = DoctorSlotService.regenerate(db, doctor_ids, first_date, last_date)
+            db.commit()
+        except Exception:
+            db.rollback()
+            raise
+        return result
+
+    @staticmethod
+    def extend_calendar(db: Session) -> Dict:
+        """
+        Daily roll: drop past days and generate only the days that entered the booking
+        window since the calendar was last extended
+        """
+        first_date, last_date = get_calendar_window()
+        try:
+            DoctorSlotRepository.delete_before(db, first_date)
+
+            last_generated = DoctorSlotRepository.get_last_slot_date(db)
+            start_date = max(last_generated + timedelta(days=1), first_date) if last_generated else first_date
+            if start_date > last_date:
+                result = {"doctor_ids": [], "start_date": start_date, "end_date": last_date, "slots": 0}
+            else:
+                doctor_ids = DoctorScheduleRepository.get_scheduled_doctor_ids(db, start_date, last_date)
+                result = DoctorSlotService.regenerate(db, doctor_ids, start_date, last_date)
+            db.commit()
+        except Exception:
+            db.rollback()
+            raise
+        return result
+
+    @staticmethod
+    def get_open_slots(
+        db: Session,
+        doctor_id: int,
+        start_date: Optional[date] = None,
+        end_date: Optional[date] = None
+    ) -> Dict:
+        """Get a doctor's open slots (remaining capacity, not blocked) from the calendar"""
+        if isinstance(start_date, str):
+            start_date = datetime.strptime(start_date, "%Y-%m-%d").date()
+        if isinstance(end_date, str):
+            end_date = datetime.strptime(end_date, "%Y-%m-%d").date()
+
+        start_date = start_date or date.today()
+        end_date = end_date or start_date + timedelta(days=6)
+        if start_date > end_date:
+            raise ValueError("start_date must be before or equal to end_date")
+
+        settings = get_doctor_slot_settings()
+        if (end_date - start_date).days + 1 > settings.MAX_OPEN_SLOT_QUERY_DAYS:
+            raise ValueError(f"Date range cannot exceed {settings.MAX_OPEN_SLOT_QUERY_DAYS} days")
+
+        slots = DoctorSlotRepository.get_open_slots(db, doctor_id, start_date, end_date)
+
+        return {
+            "doctor_id": doctor_id,
+            "start_date": str(start_date),
+            "end_date": str(end_date),
+            "count": len(slots),
+            "open_slots": [DoctorSlotService.to_dict(slot) for slot in slots]
+        }
+
+    @staticmethod
+    def to_dict(slot: DoctorSlot) -> Dict:
+        """Serialize a slot for API responses"""
+        return {
+            "doctor_slot_id": slot.doctor_slot_id,
+            "doctor_id": slot.doctor_id,
+            "date": str(slot.slot_date),
+            "start_time": str(slot.start_time),
+            "end_time": str(slot.end_time),
+            "capacity": slot.capacity,
+            "remaining": slot.remaining
+        }
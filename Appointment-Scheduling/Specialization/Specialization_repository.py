@@ -1,5 +1,5 @@
 from sqlalchemy.orm import Session
-from .specialization_model import Specialization
+from .Specialization_model import Specialization
 
 
 class SpecializationRepository:
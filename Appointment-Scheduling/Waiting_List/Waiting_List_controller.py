@@ -2,8 +2,9 @@ from fastapi import APIRouter, Depends, HTTPException, Query
 from sqlalchemy.orm import Session
 from typing import List, Optional
 from datetime import date
-from Waiting_List_config import get_db
+from Waiting_List.Waiting_List_config import get_db
 from Waiting_List.Waiting_List_service import WaitingListService
+from pagination import DEFAULT_PAGE_SIZE, MAX_PAGE_SIZE, InvalidCursorException
 from pydantic import BaseModel, Field
 
 router = APIRouter()
@@ -16,6 +17,7 @@ class WaitingListCreate(BaseModel):
     preferred_time_start: str = Field(..., description="Preferred start time (HH:MM:SS)")
     preferred_time_end: str = Field(..., description="Preferred end time (HH:MM:SS)")
     reason: Optional[str] = Field(None, description="Reason for waiting list")
+    urgency: Optional[int] = Field(0, description="Clinical urgency, 0 (routine) to 5", ge=0, le=5)
     expiry_days: Optional[int] = Field(7, description="Days until entry expires", ge=1, le=30)
 
 class WaitingListUpdate(BaseModel):
@@ -23,6 +25,7 @@ class WaitingListUpdate(BaseModel):
     preferred_time_start: Optional[str] = None
     preferred_time_end: Optional[str] = None
     reason: Optional[str] = None
+    urgency: Optional[int] = Field(None, ge=0, le=5)
     status: Optional[str] = None
 
 class BulkCancel(BaseModel):
@@ -63,35 +66,37 @@ def get_waiting_entry(waiting_id: int, db: Session = Depends(get_db)):
 
 @router.get("/")
 def list_waiting_entries(
-    skip: int = Query(0, ge=0),
-    limit: int = Query(100, ge=1, le=1000),
+    cursor: Optional[str] = Query(None, description="next_cursor of the previous page"),
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
     db: Session = Depends(get_db)
 ):
     """
-    List all waiting list entries with pagination
+    List all waiting list entries, one page at a time (pass next_cursor to get the next page)
     """
     try:
-        waiting_entries = WaitingListService.list_waiting_entries(db, skip, limit)
-        return {
-            "count": len(waiting_entries),
-            "waiting_entries": waiting_entries
-        }
+        page = WaitingListService.list_waiting_entries(db, cursor, limit)
+        return page.as_response("waiting_entries")
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Internal server error: {str(e)}")
 
 
 @router.get("/patient/{patient_id}")
-def get_patient_waiting_entries(patient_id: int, db: Session = Depends(get_db)):
+def get_patient_waiting_entries(
+    patient_id: int,
+    cursor: Optional[str] = Query(None, description="next_cursor of the previous page"),
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+    db: Session = Depends(get_db)
+):
     """
     Get all waiting list entries for a specific patient
     """
     try:
-        waiting_entries = WaitingListService.get_patient_waiting_entries(db, patient_id)
-        return {
-            "patient_id": patient_id,
-            "count": len(waiting_entries),
-            "waiting_entries": waiting_entries
-        }
+        page = WaitingListService.get_patient_waiting_entries(db, patient_id, cursor, limit)
+        return {"patient_id": patient_id, **page.as_response("waiting_entries")}
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Internal server error: {str(e)}")
 
@@ -112,49 +117,58 @@ def get_patient_active_count(patient_id: int, db: Session = Depends(get_db)):
 
 
 @router.get("/doctor/{doctor_id}")
-def get_doctor_waiting_entries(doctor_id: int, db: Session = Depends(get_db)):
+def get_doctor_waiting_entries(
+    doctor_id: int,
+    cursor: Optional[str] = Query(None, description="next_cursor of the previous page"),
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+    db: Session = Depends(get_db)
+):
     """
     Get all waiting list entries for a specific doctor
     """
     try:
-        waiting_entries = WaitingListService.get_doctor_waiting_entries(db, doctor_id)
-        return {
-            "doctor_id": doctor_id,
-            "count": len(waiting_entries),
-            "waiting_entries": waiting_entries
-        }
+        page = WaitingListService.get_doctor_waiting_entries(db, doctor_id, cursor, limit)
+        return {"doctor_id": doctor_id, **page.as_response("waiting_entries")}
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Internal server error: {str(e)}")
 
 
 @router.get("/doctor/{doctor_id}/active")
-def get_doctor_active_entries(doctor_id: int, db: Session = Depends(get_db)):
+def get_doctor_active_entries(
+    doctor_id: int,
+    cursor: Optional[str] = Query(None, description="next_cursor of the previous page"),
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+    db: Session = Depends(get_db)
+):
     """
     Get all active waiting list entries for a doctor
     """
     try:
-        waiting_entries = WaitingListService.get_active_entries(db, doctor_id)
-        return {
-            "doctor_id": doctor_id,
-            "count": len(waiting_entries),
-            "waiting_entries": waiting_entries
-        }
+        page = WaitingListService.get_active_entries(db, doctor_id, cursor, limit)
+        return {"doctor_id": doctor_id, **page.as_response("waiting_entries")}
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Internal server error: {str(e)}")
 
 
 @router.get("/doctor/{doctor_id}/notified")
-def get_doctor_notified_entries(doctor_id: int, db: Session = Depends(get_db)):
+def get_doctor_notified_entries(
+    doctor_id: int,
+    cursor: Optional[str] = Query(None, description="next_cursor of the previous page"),
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+    db: Session = Depends(get_db)
+):
     """
     Get all notified waiting list entries for a doctor
     """
     try:
-        waiting_entries = WaitingListService.get_notified_entries(db, doctor_id)
-        return {
-            "doctor_id": doctor_id,
-            "count": len(waiting_entries),
-            "waiting_entries": waiting_entries
-        }
+        page = WaitingListService.get_notified_entries(db, doctor_id, cursor, limit)
+        return {"doctor_id": doctor_id, **page.as_response("waiting_entries")}
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Internal server error: {str(e)}")
 
@@ -175,21 +189,20 @@ def get_doctor_waiting_statistics(doctor_id: int, db: Session = Depends(get_db))
 def get_entries_by_date(
     doctor_id: int,
     preferred_date: str,
+    cursor: Optional[str] = Query(None, description="next_cursor of the previous page"),
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
     db: Session = Depends(get_db)
 ):
     """
-    Get waiting list entries for a doctor on a specific date (YYYY-MM-DD)
+    Get waiting list entries for a doctor on a specific date (YYYY-MM-DD), one page at a time
     """
     try:
         from datetime import datetime
         date_obj = datetime.strptime(preferred_date, "%Y-%m-%d").date()
-        waiting_entries = WaitingListService.get_entries_by_date(db, doctor_id, date_obj)
-        return {
-            "doctor_id": doctor_id,
-            "preferred_date": preferred_date,
-            "count": len(waiting_entries),
-            "waiting_entries": waiting_entries
-        }
+        page = WaitingListService.get_entries_by_date(db, doctor_id, date_obj, cursor, limit)
+        return {"doctor_id": doctor_id, "preferred_date": preferred_date, **page.as_response("waiting_entries")}
+    except InvalidCursorException as e:
+        raise HTTPException(status_code=400, detail=str(e))
     except ValueError as e:
         raise HTTPException(status_code=400, detail=f"Invalid date format. Use YYYY-MM-DD: {str(e)}")
     except Exception as e:
@@ -200,15 +213,16 @@ def get_entries_by_date(
 def get_priority_entries_by_date(
     doctor_id: int,
     preferred_date: str,
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
     db: Session = Depends(get_db)
 ):
     """
-    Get waiting list entries sorted by priority for a specific date
+    Get the highest-priority waiting list entries for a specific date
     """
     try:
         from datetime import datetime
         date_obj = datetime.strptime(preferred_date, "%Y-%m-%d").date()
-        waiting_entries = WaitingListService.get_priority_entries(db, doctor_id, date_obj)
+        waiting_entries = WaitingListService.get_priority_entries(db, doctor_id, date_obj, limit)
         return {
             "doctor_id": doctor_id,
             "preferred_date": preferred_date,
@@ -226,23 +240,24 @@ def get_entries_by_date_range(
     doctor_id: int,
     start_date: str = Query(..., description="Start date (YYYY-MM-DD)"),
     end_date: str = Query(..., description="End date (YYYY-MM-DD)"),
+    cursor: Optional[str] = Query(None, description="next_cursor of the previous page"),
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
     db: Session = Depends(get_db)
 ):
     """
-    Get waiting list entries for a doctor within a date range
+    Get waiting list entries for a doctor within a date range, one page at a time
     """
     try:
         from datetime import datetime
         start = datetime.strptime(start_date, "%Y-%m-%d").date()
         end = datetime.strptime(end_date, "%Y-%m-%d").date()
         
-        waiting_entries = WaitingListService.get_entries_by_date_range(db, doctor_id, start, end)
+        page = WaitingListService.get_entries_by_date_range(db, doctor_id, start, end, cursor, limit)
         return {
             "doctor_id": doctor_id,
             "start_date": start_date,
             "end_date": end_date,
-            "count": len(waiting_entries),
-            "waiting_entries": waiting_entries
+            **page.as_response("waiting_entries")
         }
     except ValueError as e:
         raise HTTPException(status_code=400, detail=str(e))
@@ -253,18 +268,18 @@ def get_entries_by_date_range(
 @router.get("/active")
 def get_all_active_entries(
     doctor_id: Optional[int] = Query(None, description="Filter by doctor ID"),
+    cursor: Optional[str] = Query(None, description="next_cursor of the previous page"),
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
     db: Session = Depends(get_db)
 ):
     """
-    Get all active waiting list entries (optionally filtered by doctor)
+    Get all active waiting list entries (optionally filtered by doctor), one page at a time
     """
     try:
-        waiting_entries = WaitingListService.get_active_entries(db, doctor_id)
-        return {
-            "doctor_id": doctor_id,
-            "count": len(waiting_entries),
-            "waiting_entries": waiting_entries
-        }
+        page = WaitingListService.get_active_entries(db, doctor_id, cursor, limit)
+        return {"doctor_id": doctor_id, **page.as_response("waiting_entries")}
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Internal server error: {str(e)}")
 
@@ -399,10 +414,12 @@ def expire_old_entries(db: Session = Depends(get_db)):
     Mark expired waiting list entries as EXPIRED (maintenance endpoint)
     """
     try:
-        count = WaitingListService.expire_old_entries(db)
+        result = WaitingListService.expire_old_entries(db)
         return {
-            "message": f"Expired {count} waiting list entries",
-            "count": count
+            "message": f"Expired {result['expired']} waiting list entries",
+            "count": result["expired"],
+            "batches": result["batches"],
+            "duration_seconds": result["duration_seconds"]
         }
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Internal server error: {str(e)}")
\ No newline at end of file
@@ -1,6 +1,6 @@
-from sqlalchemy import Column, Integer, Date, Time, Text, DateTime, Enum, ForeignKey
+from sqlalchemy import Column, Integer, SmallInteger, Date, Time, Text, DateTime, Enum, ForeignKey, Index, text
 from sqlalchemy.sql import func
-from Waiting_List_config import Base
+from Waiting_List.Waiting_List_config import Base
 import enum
 
 class WaitingListStatusEnum(enum.Enum):
@@ -27,6 +27,9 @@ class WaitingList(Base):
     
     # Reason for waiting
     reason = Column(Text, nullable=True)
+
+    # Clinical urgency (0 = routine), weighted into queue priority
+    urgency = Column(SmallInteger, nullable=False, default=0, server_default="0")
     
     # Status
     status = Column(
@@ -40,6 +43,18 @@ class WaitingList(Base):
     added_at = Column(DateTime, nullable=False, default=func.now())
     notified_at = Column(DateTime, nullable=True)
     expires_at = Column(DateTime, nullable=False)
+
+    __table_args__ = (
+        # Backfill lookups: a doctor's waiting entries for a date, oldest first
+        Index("ix_waiting_list_doctor_date_status_added", "doctor_id", "preferred_date", "status", "added_at"),
+        # Expiry sweeps only scan entries that are still waiting
+        Index("ix_waiting_list_active_expires", "expires_at", postgresql_where=text("status = 'ACTIVE'")),
+        # Keyset pagination of the per-patient, per-doctor and per-status listings
+        Index("ix_waiting_list_patient_added_id", "patient_id", "added_at", "waiting_id"),
+        Index("ix_waiting_list_doctor_added_id", "doctor_id", "added_at", "waiting_id"),
+        Index("ix_waiting_list_status_added_id", "status", "added_at", "waiting_id"),
+        {"schema": "hms"}
+    )
     
     def __repr__(self):
         return f"<WaitingList(id={self.waiting_id}, patient_id={self.patient_id}, doctor_id={self.doctor_id}, status={self.status})>"
\ No newline at end of file
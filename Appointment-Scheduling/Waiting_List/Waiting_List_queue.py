@@ -0,0 +1,218 @@
+"""
+Waiting List Entity - Priority Queue
+Heap-backed queue of the ACTIVE entries of one (doctor_id, preferred_date), hydrated
+from the database on first use and kept per process for WAITING_QUEUE_TTL_SECONDS.
+Writes made through WaitingListService drop or refresh the affected queue once they are
+committed. The database stays the source of truth: an entry read from a queue is
+confirmed with a conditional UPDATE before it is acted on.
+"""
+import heapq
+import threading
+import time as time_module
+from dataclasses import dataclass
+from datetime import date, datetime, time
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
+
+from sqlalchemy.orm import Session
+
+from Waiting_List.Waiting_List_config import get_waiting_list_settings
+
+
+@dataclass(frozen=True)
+class QueuedEntry:
+    """The fields of an ACTIVE waiting list entry the queue orders and matches on"""
+    waiting_id: int
+    patient_id: int
+    preferred_time_start: time
+    preferred_time_end: time
+    added_at: datetime
+    expires_at: datetime
+    urgency: int = 0
+    no_show_count: int = 0
+
+
+def priority_score(entry: QueuedEntry, current_time: datetime) -> float:
+    """
+    Priority of an entry at current_time (higher is served first)
+    Hours waited, urgency and the patient's past no-shows are weighted by settings
+    """
+    settings = get_waiting_list_settings()
+    hours_waiting = (current_time - entry.added_at).total_seconds() / 3600
+    return round(
+        settings.PRIORITY_WAIT_WEIGHT_PER_HOUR * hours_waiting
+        + settings.PRIORITY_URGENCY_WEIGHT * entry.urgency
+        - settings.PRIORITY_NO_SHOW_PENALTY * entry.no_show_count,
+        2
+    )
+
+
+def sort_key(entry: QueuedEntry) -> Tuple[float, datetime, int]:
+    """
+    Heap key of an entry (smallest is served first)
+    Every entry gains wait time at the same rate, so ranking by the score at any fixed
+    moment gives the same order; scoring at the epoch keeps keys valid forever
+    """
+    settings = get_waiting_list_settings()
+    score = (
+        -settings.PRIORITY_WAIT_WEIGHT_PER_HOUR * entry.added_at.timestamp() / 3600
+        + settings.PRIORITY_URGENCY_WEIGHT * entry.urgency
+        - settings.PRIORITY_NO_SHOW_PENALTY * entry.no_show_count
+    )
+    return (-score, entry.added_at, entry.waiting_id)
+
+
+class WaitingQueue:
+    """
+    Min-heap of entries with lazy deletion
+    push/pop are O(log n); remove is O(1) and leaves a tombstone that is skipped
+    (and discarded) when it reaches the top
+    """
+
+    def __init__(self, entries: Iterable[QueuedEntry] = ()):
+        # waiting_id -> (heap key, entry); heap items whose key no longer matches are stale
+        self._entries: Dict[int, Tuple[tuple, QueuedEntry]] = {
+            entry.waiting_id: (sort_key(entry), entry) for entry in entries
+        }
+        self._heap = [(key, waiting_id) for waiting_id, (key, _) in self._entries.items()]
+        heapq.heapify(self._heap)
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def push(self, entry: QueuedEntry) -> None:
+        """Add an entry, or replace the queued entry with the same waiting_id"""
+        key = sort_key(entry)
+        self._entries[entry.waiting_id] = (key, entry)
+        heapq.heappush(self._heap, (key, entry.waiting_id))
+
+    def remove(self, waiting_id: int) -> bool:
+        """Drop an entry; returns False when it was not queued"""
+        return self._entries.pop(waiting_id, None) is not None
+
+    def _prune(self) -> None:
+        """Discard tombstones and superseded keys from the top of the heap"""
+        while self._heap:
+            key, waiting_id = self._heap[0]
+            queued = self._entries.get(waiting_id)
+            if queued is not None and queued[0] == key:
+                return
+            heapq.heappop(self._heap)
+
+    def peek(self) -> Optional[QueuedEntry]:
+        """Get the highest-priority entry without removing it"""
+        self._prune()
+        return self._entries[self._heap[0][1]][1] if self._heap else None
+
+    def pop(self) -> Optional[QueuedEntry]:
+        """Remove and return the highest-priority entry"""
+        self._prune()
+        if not self._heap:
+            return None
+        _, waiting_id = heapq.heappop(self._heap)
+        return self._entries.pop(waiting_id)[1]
+
+    def pop_first(self, predicate: Callable[[QueuedEntry], bool]) -> Optional[QueuedEntry]:
+        """
+        Remove and return the highest-priority entry matching predicate
+        Entries passed over are put back, so this costs O(k log n) for k entries examined
+        """
+        skipped = []
+        found = None
+        while found is None:
+            entry = self.pop()
+            if entry is None:
+                break
+            if predicate(entry):
+                found = entry
+            else:
+                skipped.append(entry)
+        for entry in skipped:
+            self.push(entry)
+        return found
+
+    def first(self, predicate: Callable[[QueuedEntry], bool]) -> Optional[QueuedEntry]:
+        """Get the highest-priority entry matching predicate, leaving it queued"""
+        found = self.pop_first(predicate)
+        if found is not None:
+            self.push(found)
+        return found
+
+    def top(self, count: int) -> List[QueuedEntry]:
+        """Get the count highest-priority entries in order, leaving them queued"""
+        entries = []
+        while len(entries) < count:
+            entry = self.pop()
+            if entry is None:
+                break
+            entries.append(entry)
+        for entry in entries:
+            self.push(entry)
+        return entries
+
+    def ordered(self) -> List[QueuedEntry]:
+        """Get every queued entry in priority order"""
+        return [entry for _, entry in sorted(self._entries.values(), key=lambda queued: queued[0])]
+
+
+class WaitingQueueRegistry:
+    """
+    Per-process queues keyed by (doctor_id, preferred_date)
+    A queue is loaded with `loader(db, doctor_id, preferred_date)` when first needed or
+    once it is older than WAITING_QUEUE_TTL_SECONDS, which bounds how long changes made
+    by other processes go unseen. The lock only guards the in-memory queues: loading runs
+    outside it, and a load that overlaps a discard or invalidation is used once but not
+    cached.
+    """
+
+    def __init__(self, loader: Callable[[Session, int, date], Iterable[QueuedEntry]]):
+        self._loader = loader
+        self._queues: Dict[Tuple[int, date], Tuple[WaitingQueue, float]] = {}
+        self._generation = 0
+        self._lock = threading.Lock()
+
+    def _get(self, db: Session, doctor_id: int, preferred_date: date) -> WaitingQueue:
+        key = (doctor_id, preferred_date)
+        ttl = get_waiting_list_settings().WAITING_QUEUE_TTL_SECONDS
+        with self._lock:
+            cached = self._queues.get(key)
+            if cached is not None and time_module.monotonic() - cached[1] <= ttl:
+                return cached[0]
+            generation = self._generation
+
+        queue = WaitingQueue(self._loader(db, doctor_id, preferred_date))
+        with self._lock:
+            if generation == self._generation:
+                self._queues[key] = (queue, time_module.monotonic())
+        return queue
+
+    def first(
+        self,
+        db: Session,
+        doctor_id: int,
+        preferred_date: date,
+        predicate: Callable[[QueuedEntry], bool]
+    ) -> Optional[QueuedEntry]:
+        """Get the highest-priority entry of a doctor's date matching predicate, leaving it queued"""
+        queue = self._get(db, doctor_id, preferred_date)
+        with self._lock:
+            return queue.first(predicate)
+
+    def discard(self, doctor_id: int, preferred_date: date, waiting_id: int) -> None:
+        """Drop an entry that is no longer ACTIVE from its queue, if that queue is loaded"""
+        with self._lock:
+            self._generation += 1
+            cached = self._queues.get((doctor_id, preferred_date))
+            if cached is not None:
+                cached[0].remove(waiting_id)
+
+    def invalidate(self, doctor_id: int, preferred_date: date) -> None:
+        """Forget a queue so it is reloaded on next use"""
+        with self._lock:
+            self._generation += 1
+            self._queues.pop((doctor_id, preferred_date), None)
+
+    def clear(self) -> None:
+        """Forget every queue"""
+        with self._lock:
+            self._generation += 1
+            self._queues.clear()
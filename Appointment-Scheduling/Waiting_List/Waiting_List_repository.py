@@ -1,8 +1,24 @@
 from sqlalchemy.orm import Session
-from sqlalchemy import and_, or_
+from sqlalchemy import and_, or_, extract, func, literal, select, update
 from datetime import date, time, datetime
 from typing import List, Optional
 from Waiting_List.Waiting_List_model import WaitingList, WaitingListStatusEnum
+from Waiting_List.Waiting_List_config import get_waiting_list_settings
+from Waiting_List.Waiting_List_queue import QueuedEntry
+from Appointment.Appointment_model import Appointment, AppointmentStatusEnum
+from statistics_cache import count_by
+from pagination import DEFAULT_PAGE_SIZE, Page, paginate
+
+# Sort key of waiting list listings, in order of joining (see migrations/015)
+WAITING_ORDER = (WaitingList.added_at, WaitingList.waiting_id)
+
+# The entry's patient's past no-shows, correlated to the waiting list row
+PATIENT_NO_SHOWS = select(func.count(Appointment.appointment_id)).where(
+    and_(
+        Appointment.patient_id == WaitingList.patient_id,
+        Appointment.status == AppointmentStatusEnum.no_show
+    )
+).scalar_subquery()
 
 class WaitingListRepository:
 
@@ -12,32 +28,55 @@ class WaitingListRepository:
         return db.query(WaitingList).filter(WaitingList.waiting_id == waiting_id).first()
 
     @staticmethod
-    def get_all(db: Session, skip: int = 0, limit: int = 100) -> List[WaitingList]:
-        """Get all waiting list entries with pagination"""
-        return db.query(WaitingList).offset(skip).limit(limit).all()
+    def get_all(db: Session, cursor: Optional[str] = None, limit: int = DEFAULT_PAGE_SIZE) -> Page:
+        """Get a page of all waiting list entries (by ID)"""
+        return paginate(db.query(WaitingList), [WaitingList.waiting_id], cursor, limit)
 
     @staticmethod
-    def get_by_patient_id(db: Session, patient_id: int) -> List[WaitingList]:
-        """Get all waiting list entries for a specific patient"""
-        return db.query(WaitingList).filter(WaitingList.patient_id == patient_id).order_by(WaitingList.added_at.desc()).all()
+    def get_by_patient_id(
+        db: Session,
+        patient_id: int,
+        cursor: Optional[str] = None,
+        limit: int = DEFAULT_PAGE_SIZE
+    ) -> Page:
+        """Get a page of a patient's waiting list entries (newest first)"""
+        query = db.query(WaitingList).filter(WaitingList.patient_id == patient_id)
+        return paginate(query, WAITING_ORDER, cursor, limit, descending=True)
 
     @staticmethod
-    def get_by_doctor_id(db: Session, doctor_id: int) -> List[WaitingList]:
-        """Get all waiting list entries for a specific doctor"""
-        return db.query(WaitingList).filter(WaitingList.doctor_id == doctor_id).order_by(WaitingList.added_at).all()
+    def get_by_doctor_id(
+        db: Session,
+        doctor_id: int,
+        cursor: Optional[str] = None,
+        limit: int = DEFAULT_PAGE_SIZE
+    ) -> Page:
+        """Get a page of a doctor's waiting list entries"""
+        query = db.query(WaitingList).filter(WaitingList.doctor_id == doctor_id)
+        return paginate(query, WAITING_ORDER, cursor, limit)
 
     @staticmethod
-    def get_by_status(db: Session, status: WaitingListStatusEnum) -> List[WaitingList]:
-        """Get all waiting list entries with a specific status"""
-        return db.query(WaitingList).filter(WaitingList.status == status).all()
+    def get_by_status(
+        db: Session,
+        status: WaitingListStatusEnum,
+        cursor: Optional[str] = None,
+        limit: int = DEFAULT_PAGE_SIZE
+    ) -> Page:
+        """Get a page of the waiting list entries with a specific status"""
+        query = db.query(WaitingList).filter(WaitingList.status == status)
+        return paginate(query, WAITING_ORDER, cursor, limit)
 
     @staticmethod
-    def get_active_entries(db: Session, doctor_id: int = None) -> List[WaitingList]:
-        """Get all active waiting list entries"""
+    def get_active_entries(
+        db: Session,
+        doctor_id: int = None,
+        cursor: Optional[str] = None,
+        limit: int = DEFAULT_PAGE_SIZE
+    ) -> Page:
+        """Get a page of the active waiting list entries"""
         query = db.query(WaitingList).filter(WaitingList.status == WaitingListStatusEnum.ACTIVE)
         if doctor_id:
             query = query.filter(WaitingList.doctor_id == doctor_id)
-        return query.order_by(WaitingList.added_at).all()
+        return paginate(query, WAITING_ORDER, cursor, limit)
 
     @staticmethod
     def get_by_patient_and_doctor(db: Session, patient_id: int, doctor_id: int) -> List[WaitingList]:
@@ -50,25 +89,34 @@ class WaitingListRepository:
         ).all()
 
     @staticmethod
-    def get_by_preferred_date(db: Session, doctor_id: int, preferred_date: date) -> List[WaitingList]:
-        """Get waiting list entries for a doctor on a specific preferred date"""
-        return db.query(WaitingList).filter(
+    def get_by_preferred_date(
+        db: Session,
+        doctor_id: int,
+        preferred_date: date,
+        cursor: Optional[str] = None,
+        limit: int = DEFAULT_PAGE_SIZE
+    ) -> Page:
+        """Get a page of a doctor's active waiting list entries for a specific preferred date"""
+        query = db.query(WaitingList).filter(
             and_(
                 WaitingList.doctor_id == doctor_id,
                 WaitingList.preferred_date == preferred_date,
                 WaitingList.status == WaitingListStatusEnum.ACTIVE
             )
-        ).order_by(WaitingList.added_at).all()
+        )
+        return paginate(query, WAITING_ORDER, cursor, limit)
 
     @staticmethod
     def get_by_date_range(
         db: Session,
         doctor_id: int,
         start_date: date,
-        end_date: date
-    ) -> List[WaitingList]:
-        """Get waiting list entries within a date range"""
-        return db.query(WaitingList).filter(
+        end_date: date,
+        cursor: Optional[str] = None,
+        limit: int = DEFAULT_PAGE_SIZE
+    ) -> Page:
+        """Get a page of the waiting list entries within a date range (by preferred date)"""
+        query = db.query(WaitingList).filter(
             and_(
                 WaitingList.doctor_id == doctor_id,
                 WaitingList.preferred_date >= start_date,
@@ -78,7 +126,9 @@ class WaitingListRepository:
                     WaitingListStatusEnum.NOTIFIED
                 ])
             )
-        ).order_by(WaitingList.preferred_date, WaitingList.added_at).all()
+        )
+        order_by = (WaitingList.preferred_date, WaitingList.added_at, WaitingList.waiting_id)
+        return paginate(query, order_by, cursor, limit)
 
     @staticmethod
     def get_expired_entries(db: Session, current_time: datetime) -> List[WaitingList]:
@@ -90,6 +140,29 @@ class WaitingListRepository:
             )
         ).all()
 
+    @staticmethod
+    def expire_due_batch(db: Session, current_time: datetime, batch_size: int) -> int:
+        """
+        Mark up to batch_size expired ACTIVE entries as EXPIRED with one UPDATE and commit
+        Candidates are locked with FOR UPDATE SKIP LOCKED, so concurrent sweepers (or a
+        backfill holding a row) never wait on each other. Returns count of expired entries.
+        """
+        batch = select(WaitingList.waiting_id).where(
+            and_(
+                WaitingList.status == WaitingListStatusEnum.ACTIVE,
+                WaitingList.expires_at <= current_time
+            )
+        ).limit(batch_size).with_for_update(skip_locked=True)
+
+        count = db.execute(
+            update(WaitingList)
+            .where(WaitingList.waiting_id.in_(batch.scalar_subquery()))
+            .values(status=WaitingListStatusEnum.EXPIRED)
+            .execution_options(synchronize_session=False)
+        ).rowcount
+        db.commit()
+        return count
+
     @staticmethod
     def get_entries_to_notify(db: Session, notification_window: datetime) -> List[WaitingList]:
         """Get waiting list entries that need notification"""
@@ -147,27 +220,123 @@ class WaitingListRepository:
         return existing is not None
 
     @staticmethod
-    def get_notified_entries(db: Session, doctor_id: int = None) -> List[WaitingList]:
-        """Get waiting list entries that have been notified"""
+    def get_notified_entries(
+        db: Session,
+        doctor_id: int = None,
+        cursor: Optional[str] = None,
+        limit: int = DEFAULT_PAGE_SIZE
+    ) -> Page:
+        """Get a page of the waiting list entries that have been notified (newest first)"""
         query = db.query(WaitingList).filter(WaitingList.status == WaitingListStatusEnum.NOTIFIED)
         if doctor_id:
             query = query.filter(WaitingList.doctor_id == doctor_id)
-        return query.order_by(WaitingList.notified_at.desc()).all()
+        return paginate(query, WAITING_ORDER, cursor, limit, descending=True)
+
+    @staticmethod
+    def _by_priority(db: Session, doctor_id: int, current_time: datetime, *leading_order):
+        """
+        Query a doctor's unexpired ACTIVE entries as (entry, no_show_count, priority) rows,
+        ordered by leading_order and then as the priority queue serves them
+        (priority as in Waiting_List_queue.priority_score, highest first)
+        """
+        settings = get_waiting_list_settings()
+        hours_waiting = extract("epoch", literal(current_time, WaitingList.added_at.type) - WaitingList.added_at) / 3600
+        priority = (
+            settings.PRIORITY_WAIT_WEIGHT_PER_HOUR * hours_waiting
+            + settings.PRIORITY_URGENCY_WEIGHT * WaitingList.urgency
+            - settings.PRIORITY_NO_SHOW_PENALTY * PATIENT_NO_SHOWS
+        )
+        return db.query(WaitingList, PATIENT_NO_SHOWS, priority).filter(
+            and_(
+                WaitingList.doctor_id == doctor_id,
+                WaitingList.status == WaitingListStatusEnum.ACTIVE,
+                WaitingList.expires_at > current_time
+            )
+        ).order_by(*leading_order, priority.desc(), *WAITING_ORDER)
 
     @staticmethod
     def get_priority_sorted_entries(
         db: Session,
         doctor_id: int,
-        preferred_date: date
+        preferred_date: date,
+        current_time: datetime,
+        limit: int
     ) -> List[WaitingList]:
-        """Get waiting list entries sorted by priority (added_at)"""
-        return db.query(WaitingList).filter(
+        """Get the first `limit` unexpired ACTIVE entries of a doctor's date in queue priority order"""
+        rows = WaitingListRepository._by_priority(db, doctor_id, current_time).filter(
+            WaitingList.preferred_date == preferred_date
+        ).limit(limit).all()
+        return [row[0] for row in rows]
+
+    @staticmethod
+    def get_next_by_priority(
+        db: Session,
+        doctor_id: int,
+        from_date: date,
+        current_time: datetime,
+        limit: int
+    ) -> List[tuple]:
+        """
+        Get the first `limit` unexpired ACTIVE entries of a doctor from from_date on as
+        (entry, no_show_count, priority) rows: earliest preferred date first, in queue
+        priority within a date
+        """
+        return WaitingListRepository._by_priority(
+            db, doctor_id, current_time, WaitingList.preferred_date
+        ).filter(WaitingList.preferred_date >= from_date).limit(limit).all()
+
+    @staticmethod
+    def get_queue_entries(
+        db: Session,
+        doctor_id: int,
+        preferred_date: date,
+        current_time: datetime
+    ) -> List[QueuedEntry]:
+        """
+        Load the unexpired ACTIVE entries of a doctor's date for the priority queue
+        Each patient's past no-shows are counted in the same query
+        """
+        rows = db.query(
+            WaitingList.waiting_id,
+            WaitingList.patient_id,
+            WaitingList.preferred_time_start,
+            WaitingList.preferred_time_end,
+            WaitingList.added_at,
+            WaitingList.expires_at,
+            WaitingList.urgency,
+            PATIENT_NO_SHOWS
+        ).filter(
             and_(
                 WaitingList.doctor_id == doctor_id,
                 WaitingList.preferred_date == preferred_date,
-                WaitingList.status == WaitingListStatusEnum.ACTIVE
+                WaitingList.status == WaitingListStatusEnum.ACTIVE,
+                WaitingList.expires_at > current_time
+            )
+        ).all()
+        return [QueuedEntry(*row) for row in rows]
+
+    @staticmethod
+    def notify_if_active(db: Session, waiting_id: int, current_time: datetime) -> bool:
+        """
+        Move an entry to NOTIFIED only if it is still ACTIVE and unexpired, with one UPDATE
+        A row another transaction holds is skipped (FOR UPDATE SKIP LOCKED), never waited on.
+        Does not commit.
+        """
+        candidate = select(WaitingList.waiting_id).where(
+            and_(
+                WaitingList.waiting_id == waiting_id,
+                WaitingList.status == WaitingListStatusEnum.ACTIVE,
+                WaitingList.expires_at > current_time
             )
-        ).order_by(WaitingList.added_at).all()
+        ).with_for_update(skip_locked=True).scalar_subquery()
+
+        return db.execute(
+            update(WaitingList)
+            .where(WaitingList.waiting_id == candidate)
+            .values(status=WaitingListStatusEnum.NOTIFIED, notified_at=current_time)
+            .returning(WaitingList.waiting_id)
+            .execution_options(synchronize_session=False)
+        ).scalar() is not None
 
     @staticmethod
     def create(db: Session, waiting_entry: WaitingList) -> WaitingList:
@@ -208,23 +377,10 @@ class WaitingListRepository:
 
     @staticmethod
     def get_statistics_by_doctor(db: Session, doctor_id: int) -> dict:
-        """Get waiting list statistics for a doctor"""
-        total = db.query(WaitingList).filter(WaitingList.doctor_id == doctor_id).count()
-        active = db.query(WaitingList).filter(
-            and_(
-                WaitingList.doctor_id == doctor_id,
-                WaitingList.status == WaitingListStatusEnum.ACTIVE
-            )
-        ).count()
-        notified = db.query(WaitingList).filter(
-            and_(
-                WaitingList.doctor_id == doctor_id,
-                WaitingList.status == WaitingListStatusEnum.NOTIFIED
-            )
-        ).count()
-        
+        """Get waiting list statistics for a doctor (one grouped query)"""
+        counts = count_by(db, WaitingList.status, WaitingList.doctor_id == doctor_id)
         return {
-            "total": total,
-            "active": active,
-            "notified": notified
-        }
\ No newline at end of file
+            "total": sum(counts.values()),
+            "active": counts.get(WaitingListStatusEnum.ACTIVE, 0),
+            "notified": counts.get(WaitingListStatusEnum.NOTIFIED, 0)
+        }
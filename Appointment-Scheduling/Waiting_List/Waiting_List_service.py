@@ -1,9 +1,28 @@
+from sqlalchemy import event
 from sqlalchemy.orm import Session
+import time as time_module
 from datetime import date, time, datetime, timedelta
 from typing import List, Optional, Dict
 from Waiting_List.Waiting_List_model import WaitingList, WaitingListStatusEnum
-from Repository.Waiting_List_repository import WaitingListRepository
-from Waiting_List_config import get_waiting_list_settings
+from Waiting_List.Waiting_List_repository import WaitingListRepository
+from Waiting_List.Waiting_List_config import get_waiting_list_settings
+from Waiting_List.Waiting_List_queue import QueuedEntry, WaitingQueueRegistry
+from Appointment.Appointment_events import on_slot_freed
+from statistics_cache import statistics_cache, table_key
+from pagination import DEFAULT_PAGE_SIZE, MAX_PAGE_SIZE, Page
+
+
+# ACTIVE entries per (doctor_id, preferred_date) in priority order, loaded on first use
+waiting_queues = WaitingQueueRegistry(
+    lambda db, doctor_id, preferred_date: WaitingListRepository.get_queue_entries(
+        db, doctor_id, preferred_date, datetime.now()
+    )
+)
+
+# session.info key: (doctor_id, preferred_date, waiting_id) of the entries the backfill
+# notified in the session's open transaction, dropped from their queues on commit
+NOTIFIED_ENTRIES_KEY = "waiting_list_notified_entries"
+
 
 class WaitingListService:
 
@@ -41,6 +60,10 @@ class WaitingListService:
 
         # Check if patient already has too many active entries
         settings = get_waiting_list_settings()
+        urgency = data.get("urgency") or 0
+        if not 0 <= urgency <= settings.MAX_URGENCY:
+            raise ValueError(f"Urgency must be between 0 and {settings.MAX_URGENCY}")
+
         active_count = WaitingListRepository.count_active_by_patient(db, patient_id)
         if active_count >= settings.MAX_ACTIVE_WAITING_ENTRIES_PER_PATIENT:
             raise ValueError(f"Patient already has {active_count} active waiting list entries. Maximum allowed is {settings.MAX_ACTIVE_WAITING_ENTRIES_PER_PATIENT}")
@@ -65,12 +88,15 @@ class WaitingListService:
             preferred_time_start=preferred_time_start,
             preferred_time_end=preferred_time_end,
             reason=data.get("reason"),
+            urgency=urgency,
             status=WaitingListStatusEnum.ACTIVE,
             added_at=added_at,
             expires_at=expires_at
         )
 
-        return WaitingListRepository.create(db, waiting_entry)
+        waiting_entry = WaitingListRepository.create(db, waiting_entry)
+        waiting_queues.invalidate(doctor_id, preferred_date)
+        return waiting_entry
 
     @staticmethod
     def get_waiting_entry(db: Session, waiting_id: int) -> WaitingList:
@@ -81,40 +107,63 @@ class WaitingListService:
         return waiting_entry
 
     @staticmethod
-    def list_waiting_entries(db: Session, skip: int = 0, limit: int = 100) -> List[WaitingList]:
-        """List all waiting list entries with pagination"""
-        return WaitingListRepository.get_all(db, skip, limit)
+    def list_waiting_entries(db: Session, cursor: Optional[str] = None, limit: int = DEFAULT_PAGE_SIZE) -> Page:
+        """List all waiting list entries, one page at a time"""
+        return WaitingListRepository.get_all(db, cursor, limit)
 
     @staticmethod
-    def get_patient_waiting_entries(db: Session, patient_id: int) -> List[WaitingList]:
-        """Get all waiting list entries for a patient"""
-        return WaitingListRepository.get_by_patient_id(db, patient_id)
+    def get_patient_waiting_entries(
+        db: Session,
+        patient_id: int,
+        cursor: Optional[str] = None,
+        limit: int = DEFAULT_PAGE_SIZE
+    ) -> Page:
+        """Get a page of a patient's waiting list entries"""
+        return WaitingListRepository.get_by_patient_id(db, patient_id, cursor, limit)
 
     @staticmethod
-    def get_doctor_waiting_entries(db: Session, doctor_id: int) -> List[WaitingList]:
-        """Get all waiting list entries for a doctor"""
-        return WaitingListRepository.get_by_doctor_id(db, doctor_id)
+    def get_doctor_waiting_entries(
+        db: Session,
+        doctor_id: int,
+        cursor: Optional[str] = None,
+        limit: int = DEFAULT_PAGE_SIZE
+    ) -> Page:
+        """Get a page of a doctor's waiting list entries"""
+        return WaitingListRepository.get_by_doctor_id(db, doctor_id, cursor, limit)
 
     @staticmethod
-    def get_active_entries(db: Session, doctor_id: int = None) -> List[WaitingList]:
-        """Get all active waiting list entries"""
-        return WaitingListRepository.get_active_entries(db, doctor_id)
+    def get_active_entries(
+        db: Session,
+        doctor_id: int = None,
+        cursor: Optional[str] = None,
+        limit: int = DEFAULT_PAGE_SIZE
+    ) -> Page:
+        """Get a page of the active waiting list entries"""
+        return WaitingListRepository.get_active_entries(db, doctor_id, cursor, limit)
 
     @staticmethod
-    def get_entries_by_date(db: Session, doctor_id: int, preferred_date: date) -> List[WaitingList]:
-        """Get waiting list entries for a doctor on a specific date"""
+    def get_entries_by_date(
+        db: Session,
+        doctor_id: int,
+        preferred_date: date,
+        cursor: Optional[str] = None,
+        limit: int = DEFAULT_PAGE_SIZE
+    ) -> Page:
+        """Get a page of a doctor's waiting list entries for a specific date"""
         if isinstance(preferred_date, str):
             preferred_date = datetime.strptime(preferred_date, "%Y-%m-%d").date()
-        return WaitingListRepository.get_by_preferred_date(db, doctor_id, preferred_date)
+        return WaitingListRepository.get_by_preferred_date(db, doctor_id, preferred_date, cursor, limit)
 
     @staticmethod
     def get_entries_by_date_range(
         db: Session,
         doctor_id: int,
         start_date: date,
-        end_date: date
-    ) -> List[WaitingList]:
-        """Get waiting list entries within a date range"""
+        end_date: date,
+        cursor: Optional[str] = None,
+        limit: int = DEFAULT_PAGE_SIZE
+    ) -> Page:
+        """Get a page of the waiting list entries within a date range"""
         if isinstance(start_date, str):
             start_date = datetime.strptime(start_date, "%Y-%m-%d").date()
         if isinstance(end_date, str):
@@ -123,7 +172,7 @@ class WaitingListService:
         if start_date > end_date:
             raise ValueError("start_date must be before or equal to end_date")
 
-        return WaitingListRepository.get_by_date_range(db, doctor_id, start_date, end_date)
+        return WaitingListRepository.get_by_date_range(db, doctor_id, start_date, end_date, cursor, limit)
 
     @staticmethod
     def update_waiting_entry(db: Session, waiting_id: int, data: dict) -> WaitingList:
@@ -157,6 +206,7 @@ class WaitingListService:
                 raise ValueError("Preferred start time must be before end time")
 
         # Update fields
+        previous_date = waiting_entry.preferred_date
         for key, value in data.items():
             if key == "status" and isinstance(value, str):
                 value = WaitingListStatusEnum[value]
@@ -164,7 +214,10 @@ class WaitingListService:
             if hasattr(waiting_entry, key):
                 setattr(waiting_entry, key, value)
 
-        return WaitingListRepository.update(db, waiting_entry)
+        waiting_entry = WaitingListRepository.update(db, waiting_entry)
+        waiting_queues.invalidate(waiting_entry.doctor_id, previous_date)
+        waiting_queues.invalidate(waiting_entry.doctor_id, waiting_entry.preferred_date)
+        return waiting_entry
 
     @staticmethod
     def notify_patient(db: Session, waiting_id: int) -> WaitingList:
@@ -181,7 +234,49 @@ class WaitingListService:
         waiting_entry.status = WaitingListStatusEnum.NOTIFIED
         waiting_entry.notified_at = datetime.now()
 
-        return WaitingListRepository.update(db, waiting_entry)
+        waiting_entry = WaitingListRepository.update(db, waiting_entry)
+        waiting_queues.discard(waiting_entry.doctor_id, waiting_entry.preferred_date, waiting_id)
+        return waiting_entry
+
+    @staticmethod
+    def backfill_freed_slot(
+        db: Session,
+        doctor_id: int,
+        slot_date: date,
+        start_time: time,
+        end_time: time
+    ) -> Optional[int]:
+        """
+        Offer a freed slot to the highest-priority waiting patient whose window overlaps it
+        Runs inside the transaction that freed the slot (not committed); the notified entry
+        leaves its queue only once that transaction commits. Slots that have already
+        started cannot be refilled and are skipped. Returns the notified waiting_id.
+        """
+        current_time = datetime.now()
+        if datetime.combine(slot_date, start_time) <= current_time:
+            return None
+
+        tried = set()
+
+        def fits(entry: QueuedEntry) -> bool:
+            return (
+                entry.waiting_id not in tried
+                and entry.preferred_time_start < end_time
+                and entry.preferred_time_end > start_time
+                and entry.expires_at > current_time
+            )
+
+        # The queue may trail other processes by up to WAITING_QUEUE_TTL_SECONDS; an entry
+        # that is no longer ACTIVE (or is locked by another transaction) fails the
+        # conditional UPDATE, stays queued, and the next one is tried
+        while True:
+            entry = waiting_queues.first(db, doctor_id, slot_date, fits)
+            if entry is None:
+                return None
+            if WaitingListRepository.notify_if_active(db, entry.waiting_id, current_time):
+                db.info.setdefault(NOTIFIED_ENTRIES_KEY, []).append((doctor_id, slot_date, entry.waiting_id))
+                return entry.waiting_id
+            tried.add(entry.waiting_id)
 
     @staticmethod
     def accept_entry(db: Session, waiting_id: int) -> WaitingList:
@@ -229,7 +324,9 @@ class WaitingListService:
 
         waiting_entry.status = WaitingListStatusEnum.CANCELLED
 
-        return WaitingListRepository.update(db, waiting_entry)
+        waiting_entry = WaitingListRepository.update(db, waiting_entry)
+        waiting_queues.discard(waiting_entry.doctor_id, waiting_entry.preferred_date, waiting_id)
+        return waiting_entry
 
     @staticmethod
     def delete_waiting_entry(db: Session, waiting_id: int) -> None:
@@ -241,68 +338,103 @@ class WaitingListService:
             raise ValueError(f"Waiting list entry with ID {waiting_id} not found")
 
         WaitingListRepository.delete(db, waiting_entry)
+        waiting_queues.discard(waiting_entry.doctor_id, waiting_entry.preferred_date, waiting_id)
 
     @staticmethod
-    def expire_old_entries(db: Session) -> int:
+    def expire_old_entries(db: Session, batch_size: int = None, max_batches: int = None) -> Dict:
         """
-        Mark expired waiting list entries as EXPIRED
-        Returns count of expired entries
+        Mark expired waiting list entries as EXPIRED, EXPIRY_BATCH_SIZE rows per UPDATE/commit
+        Runs until a batch expires nothing: a short batch only means rows locked by another
+        transaction were skipped, not that the backlog is done.
+        Returns run metrics: {"expired", "batches", "duration_seconds"}
         """
+        batch_size = batch_size or get_waiting_list_settings().EXPIRY_BATCH_SIZE
+        started = time_module.monotonic()
         current_time = datetime.now()
-        expired_entries = WaitingListRepository.get_expired_entries(db, current_time)
-        
-        count = 0
-        for entry in expired_entries:
-            entry.status = WaitingListStatusEnum.EXPIRED
-            WaitingListRepository.update(db, entry)
-            count += 1
-        
-        return count
+
+        expired = 0
+        batches = 0
+        while max_batches is None or batches < max_batches:
+            count = WaitingListRepository.expire_due_batch(db, current_time, batch_size)
+            if count == 0:
+                break
+            expired += count
+            batches += 1
+
+        if expired:
+            waiting_queues.clear()
+
+        return {
+            "expired": expired,
+            "batches": batches,
+            "duration_seconds": round(time_module.monotonic() - started, 3)
+        }
 
     @staticmethod
     def get_waiting_statistics(db: Session, doctor_id: int) -> Dict:
         """
         Get waiting list statistics for a doctor
         """
-        stats = WaitingListRepository.get_statistics_by_doctor(db, doctor_id)
-        
-        # Get next few entries
-        active_entries = WaitingListRepository.get_active_entries(db, doctor_id)
-        next_entries = active_entries[:5] if active_entries else []
-        
+        stats = statistics_cache.get_or_compute(
+            table_key(WaitingList), ("doctor", doctor_id),
+            lambda: WaitingListRepository.get_statistics_by_doctor(db, doctor_id)
+        )
+
+        # Next entries: earliest preferred date first, in queue priority within a date
+        rows = WaitingListRepository.get_next_by_priority(
+            db, doctor_id, date.today(), datetime.now(), get_waiting_list_settings().STATISTICS_NEXT_ENTRIES
+        )
+        next_entries = [WaitingListService.to_queue_dict(*row) for row in rows]
+
         return {
             "doctor_id": doctor_id,
             "statistics": stats,
-            "next_entries": [
-                {
-                    "waiting_id": entry.waiting_id,
-                    "patient_id": entry.patient_id,
-                    "preferred_date": str(entry.preferred_date),
-                    "added_at": entry.added_at.isoformat(),
-                    "expires_at": entry.expires_at.isoformat()
-                }
-                for entry in next_entries
-            ]
+            "next_entries": next_entries
         }
 
     @staticmethod
     def get_priority_entries(
         db: Session,
         doctor_id: int,
-        preferred_date: date
+        preferred_date: date,
+        limit: int = DEFAULT_PAGE_SIZE
     ) -> List[WaitingList]:
         """
-        Get waiting list entries sorted by priority for a specific date
+        Get the first `limit` of a date's ACTIVE waiting list entries in queue priority order
+        Priorities shift as entries wait, so this is a top-N read rather than a cursor listing
         """
         if isinstance(preferred_date, str):
             preferred_date = datetime.strptime(preferred_date, "%Y-%m-%d").date()
-        
-        return WaitingListRepository.get_priority_sorted_entries(db, doctor_id, preferred_date)
+
+        return WaitingListRepository.get_priority_sorted_entries(
+            db, doctor_id, preferred_date, datetime.now(), min(limit, MAX_PAGE_SIZE)
+        )
 
     @staticmethod
-    def get_notified_entries(db: Session, doctor_id: int = None) -> List[WaitingList]:
-        """Get all notified waiting list entries"""
-        return WaitingListRepository.get_notified_entries(db, doctor_id)
+    def to_queue_dict(entry: WaitingList, no_show_count: int, priority: float) -> Dict:
+        """Serialize an entry with its patient's no-shows and its current priority score"""
+        return {
+            "waiting_id": entry.waiting_id,
+            "patient_id": entry.patient_id,
+            "preferred_date": str(entry.preferred_date),
+            "preferred_time_start": str(entry.preferred_time_start),
+            "preferred_time_end": str(entry.preferred_time_end),
+            "urgency": entry.urgency,
+            "no_show_count": no_show_count,
+            "priority": round(float(priority), 2),
+            "added_at": entry.added_at.isoformat(),
+            "expires_at": entry.expires_at.isoformat()
+        }
+
+    @staticmethod
+    def get_notified_entries(
+        db: Session,
+        doctor_id: int = None,
+        cursor: Optional[str] = None,
+        limit: int = DEFAULT_PAGE_SIZE
+    ) -> Page:
+        """Get a page of the notified waiting list entries"""
+        return WaitingListRepository.get_notified_entries(db, doctor_id, cursor, limit)
 
     @staticmethod
     def bulk_cancel_entries(db: Session, waiting_ids: List[int]) -> int:
@@ -315,9 +447,30 @@ class WaitingListService:
         count = WaitingListRepository.bulk_update_status(
             db, waiting_ids, WaitingListStatusEnum.CANCELLED
         )
+        waiting_queues.clear()
         return count
 
     @staticmethod
     def get_patient_active_count(db: Session, patient_id: int) -> int:
         """Get count of active waiting list entries for a patient"""
-        return WaitingListRepository.count_active_by_patient(db, patient_id)
\ No newline at end of file
+        return WaitingListRepository.count_active_by_patient(db, patient_id)
+
+
+# Cancellations and no-shows in Appointment announce the freed window here
+on_slot_freed(WaitingListService.backfill_freed_slot)
+
+
+# ============ SESSION EVENTS ============
+
+@event.listens_for(Session, "after_commit")
+def _drop_notified_entries(db: Session) -> None:
+    for doctor_id, preferred_date, waiting_id in db.info.pop(NOTIFIED_ENTRIES_KEY, ()):
+        waiting_queues.discard(doctor_id, preferred_date, waiting_id)
+
+
+@event.listens_for(Session, "after_transaction_end")
+def _keep_rolled_back_entries(db: Session, transaction) -> None:
+    # Only the outermost transaction settles the notifications; after a rollback the
+    # entries were never notified and stay queued
+    if transaction.parent is None:
+        db.info.pop(NOTIFIED_ENTRIES_KEY, None)
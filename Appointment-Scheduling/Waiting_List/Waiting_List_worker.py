@@ -0,0 +1,34 @@
+"""
+Waiting List Entity - Expiry Sweeper
+Long-running process that expires overdue ACTIVE entries in short batches:
+    python -m Waiting_List.Waiting_List_worker
+"""
+import time
+
+from Waiting_List.Waiting_List_config import SessionLocal, get_waiting_list_settings
+from Waiting_List.Waiting_List_service import WaitingListService
+
+
+def run_sweeper() -> None:
+    """Expire overdue entries every EXPIRY_SWEEP_INTERVAL_SECONDS and print the run metrics"""
+    settings = get_waiting_list_settings()
+
+    while True:
+        db = SessionLocal()
+        try:
+            result = WaitingListService.expire_old_entries(db)
+            print(
+                f"Waiting list expiry: {result['expired']} expired in "
+                f"{result['batches']} batches ({result['duration_seconds']}s)"
+            )
+        except Exception as e:
+            print(f"❌ Waiting list expiry failed: {e}")
+            db.rollback()
+        finally:
+            db.close()
+
+        time.sleep(settings.EXPIRY_SWEEP_INTERVAL_SECONDS)
+
+
+if __name__ == "__main__":
+    run_sweeper()
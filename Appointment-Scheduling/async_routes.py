@@ -0,0 +1,82 @@
+"""
+Shared Async Routes
+Builds the async variant of a module's router (ASYNC_ROUTE_HANDLERS). Every endpoint
+becomes an `async def` handler that hands the module's own sync endpoint, with its sync
+Session, to the threadpool (starlette's run_in_threadpool): repositories, services,
+session events (history capture, statistics invalidation, slot backfill) and error
+mapping are the same code as the sync API. Nothing of a request runs on the event loop,
+so thread locks and CPU work in services never stall other requests. Database access is
+not async: each request still holds a threadpool thread while it waits on the database.
+"""
+import inspect
+from typing import Callable, Iterable
+
+from fastapi import APIRouter, Depends
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import Response
+from fastapi.routing import APIRoute
+from sqlalchemy.orm import Session
+from starlette.concurrency import run_in_threadpool
+
+
+def async_endpoint(endpoint: Callable, get_db: Callable) -> Callable:
+    """
+    Async version of a sync endpoint that takes `db: Session = Depends(get_db)`
+    The result is encoded in the worker thread, while lazy loads can still reach the database
+    """
+    signature = inspect.signature(endpoint)
+    parameters = [
+        parameter.replace(annotation=Session, default=Depends(get_db)) if name == "db" else parameter
+        for name, parameter in signature.parameters.items()
+    ]
+
+    async def handler(**kwargs):
+        def call():
+            result = endpoint(**kwargs)
+            return result if isinstance(result, Response) else jsonable_encoder(result)
+
+        return await run_in_threadpool(call)
+
+    # Not functools.wraps: FastAPI must see this coroutine function, not the sync __wrapped__
+    handler.__name__ = endpoint.__name__
+    handler.__qualname__ = endpoint.__qualname__
+    handler.__doc__ = endpoint.__doc__
+    handler.__signature__ = signature.replace(parameters=parameters)
+    return handler
+
+
+def build_async_router(router: APIRouter, get_db: Callable, keep_sync: Iterable[str] = ()) -> APIRouter:
+    """
+    Copy of a controller router with async endpoints, in the same order and with the same
+    paths, status codes and docs
+    Endpoints named in keep_sync (e.g. streaming exports, which read the session after
+    the handler returns) and endpoints without a `db` parameter are copied unchanged.
+    """
+    keep_sync = set(keep_sync)
+    async_router = APIRouter()
+    for route in router.routes:
+        if not isinstance(route, APIRoute):
+            async_router.routes.append(route)
+            continue
+
+        endpoint = route.endpoint
+        if endpoint.__name__ not in keep_sync and "db" in inspect.signature(endpoint).parameters:
+            endpoint = async_endpoint(endpoint, get_db)
+
+        async_router.add_api_route(
+            route.path,
+            endpoint,
+            methods=list(route.methods),
+            status_code=route.status_code,
+            response_model=route.response_model,
+            response_class=route.response_class,
+            responses=route.responses,
+            dependencies=route.dependencies,
+            tags=route.tags,
+            summary=route.summary,
+            description=route.description,
+            deprecated=route.deprecated,
+            include_in_schema=route.include_in_schema,
+            name=route.name
+        )
+    return async_router
@@ -0,0 +1,88 @@
+"""
+Import-time benchmark for the Appointment Scheduling application
+Imports `main` in fresh interpreters under `python -X importtime`, reports the median
+total and the slowest modules, and fails when the median exceeds the budget. Run it
+before and after changes that add imports or import-time work:
+
+    python benchmark_import_time.py [--runs 5] [--budget-ms 1200] [--top 15]
+"""
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+from typing import Dict, List, Tuple
+
+
+# ============ CONFIGURATION ============
+
+IMPORT_TIME_BUDGET_MS = 1200  # Max median time to import main (worker boot, test collection)
+DEFAULT_RUNS = 5
+DEFAULT_TOP = 15
+
+APP_DIR = os.path.dirname(os.path.abspath(__file__))
+
+
+# ============ MEASUREMENT ============
+
+def parse_importtime(output: str) -> Dict[str, Tuple[int, int]]:
+    """
+    Parse `-X importtime` output into {module: (self_us, cumulative_us)}
+    Lines look like: "import time:       412 |       1830 |   sqlalchemy.orm"
+    """
+    timings = {}
+    for line in output.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        self_us, cumulative_us, module = line[len("import time:"):].split("|")
+        timings[module.strip()] = (int(self_us), int(cumulative_us))
+    return timings
+
+
+def measure_once(module: str = "main") -> Dict[str, Tuple[int, int]]:
+    """Import a module in a fresh interpreter and return its import timings"""
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        cwd=APP_DIR,
+        capture_output=True,
+        text=True,
+        check=True
+    )
+    return parse_importtime(result.stderr)
+
+
+def slowest_modules(timings: Dict[str, Tuple[int, int]], top: int) -> List[Tuple[str, int]]:
+    """Modules with the largest self time (microseconds), slowest first"""
+    ranked = sorted(((module, self_us) for module, (self_us, _) in timings.items()), key=lambda item: -item[1])
+    return ranked[:top]
+
+
+def run_benchmark(runs: int = DEFAULT_RUNS, budget_ms: float = IMPORT_TIME_BUDGET_MS, top: int = DEFAULT_TOP) -> bool:
+    """Measure `import main` runs times; returns True when the median is within budget"""
+    samples = [measure_once() for _ in range(runs)]
+    totals_ms = [timings["main"][1] / 1000 for timings in samples]
+    median_ms = statistics.median(totals_ms)
+
+    print("=" * 50)
+    print("⏱️  IMPORT TIME: import main")
+    print("=" * 50)
+    print(f"Runs: {runs}  min: {min(totals_ms):.0f} ms  median: {median_ms:.0f} ms  max: {max(totals_ms):.0f} ms")
+    print(f"\nSlowest modules (self time, last run):")
+    for module, self_us in slowest_modules(samples[-1], top):
+        print(f"  {self_us / 1000:8.1f} ms  {module}")
+
+    within_budget = median_ms <= budget_ms
+    if within_budget:
+        print(f"\n✅ Within budget ({median_ms:.0f} ms <= {budget_ms:.0f} ms)")
+    else:
+        print(f"\n❌ Over budget ({median_ms:.0f} ms > {budget_ms:.0f} ms)")
+    return within_budget
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--runs", type=int, default=DEFAULT_RUNS)
+    parser.add_argument("--budget-ms", type=float, default=IMPORT_TIME_BUDGET_MS)
+    parser.add_argument("--top", type=int, default=DEFAULT_TOP)
+    args = parser.parse_args()
+    sys.exit(0 if run_benchmark(args.runs, args.budget_ms, args.top) else 1)
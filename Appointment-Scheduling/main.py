@@ -1,91 +1,164 @@
 """
 Main FastAPI Application for Appointment Scheduling Module
+The app is built by create_app on first access to `main.app` (or with
+`uvicorn main:create_app --factory`), so importing this module reads no settings.
 """
+import asyncio
+import logging
+from contextlib import asynccontextmanager
+from functools import lru_cache
+
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
+from starlette.concurrency import run_in_threadpool
 
 # Import routers from your modules
-from Appointment.Appointment_routes import router as appointment_router
-from Doctor_Schedule.Doctor_Schedule_routes import router as doctor_schedule_router
-from Blocked_Slots.Blocked_Slots_routes import router as blocked_slots_router
-
-# Create FastAPI app
-app = FastAPI(
-    title="Hospital Appointment Scheduling API",
-    description="API for managing hospital appointments, doctor schedules, and blocked slots",
-    version="1.0.0",
-    docs_url="/docs",
-    redoc_url="/redoc"
-)
-
-# CORS middleware (optional - for frontend access)
-app.add_middleware(
-    CORSMiddleware,
-    allow_origins=["*"],  # Change to specific origins in production
-    allow_credentials=True,
-    allow_methods=["*"],
-    allow_headers=["*"],
-)
-
-# Register routers
-app.include_router(appointment_router, prefix="/appointments", tags=["Appointments"])
-app.include_router(doctor_schedule_router, prefix="/doctor-schedules", tags=["Doctor Schedules"])
-app.include_router(blocked_slots_router, prefix="/blocked-slots", tags=["Blocked Slots"])
-
-# Root endpoint
-@app.get("/", tags=["Root"])
-def root():
-    """Root endpoint - API status"""
-    return {
-        "status": "Appointment Scheduling API running",
-        "version": "1.0.0",
-        "module": "Appointment Scheduling",
-        "endpoints": {
-            "appointments": "/appointments",
-            "doctor_schedules": "/doctor-schedules",
-            "blocked_slots": "/blocked-slots",
-            "documentation": "/docs",
-            "redoc": "/redoc"
-        }
-    }
-
-# Health check endpoint
-@app.get("/health", tags=["Health"])
-def health_check():
-    """Health check endpoint"""
-    return {
-        "status": "healthy",
-        "service": "Appointment Scheduling Module",
-        "database": "connected"
-    }
-
-# API info endpoint
-@app.get("/info", tags=["Info"])
-def api_info():
-    """API information"""
-    return {
-        "title": "Hospital Appointment Scheduling API",
-        "version": "1.0.0",
-        "description": "Manage appointments, doctor schedules, and blocked time slots",
-        "modules": [
-            {
-                "name": "Appointments",
-                "description": "Create, update, and manage patient appointments",
-                "endpoints": 17
-            },
-            {
-                "name": "Doctor Schedules",
-                "description": "Manage doctor working hours and availability",
-                "endpoints": 18
-            },
-            {
-                "name": "Blocked Slots",
-                "description": "Block time slots for meetings, leaves, etc.",
-                "endpoints": 20
+from database import get_database_settings
+from Appointment import Appointment_routes
+from Doctor_Schedule import Doctor_Schedule_routes
+from Blocked_Slots import Blocked_Slots_routes
+from Doctor_Slot.Doctor_Slot_routes import router as doctor_slot_router
+
+# Subscribes the waiting-list backfill to freed appointment slots
+import Waiting_List.Waiting_List_service
+
+logger = logging.getLogger(__name__)
+
+
+async def maintain_history_partitions():
+    """Create the upcoming appointment_history partitions now and every HISTORY_PARTITION_CHECK_INTERVAL_SECONDS"""
+    from Appointment_History.Appointment_History_config import get_history_settings
+    from Appointment_History.Appointment_History_service import AppointmentHistoryService
+
+    while True:
+        try:
+            await run_in_threadpool(AppointmentHistoryService.maintain_partitions)
+        except Exception:
+            logger.exception("Creating appointment history partitions failed")
+        await asyncio.sleep(get_history_settings().HISTORY_PARTITION_CHECK_INTERVAL_SECONDS)
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Background upkeep starts with the server, not when this module is imported
+    partitions = asyncio.create_task(maintain_history_partitions())
+    yield
+    partitions.cancel()
+
+
+def create_app() -> FastAPI:
+    """Build the application with the routers the current settings select"""
+    # ASYNC_ROUTE_HANDLERS serves the same endpoints as async def handlers
+    if get_database_settings().ASYNC_ROUTE_HANDLERS:
+        appointment_router = Appointment_routes.async_router
+        doctor_schedule_router = Doctor_Schedule_routes.async_router
+        blocked_slots_router = Blocked_Slots_routes.async_router
+    else:
+        appointment_router = Appointment_routes.router
+        doctor_schedule_router = Doctor_Schedule_routes.router
+        blocked_slots_router = Blocked_Slots_routes.router
+
+    # Create FastAPI app
+    app = FastAPI(
+        title="Hospital Appointment Scheduling API",
+        description="API for managing hospital appointments, doctor schedules, and blocked slots",
+        version="1.0.0",
+        docs_url="/docs",
+        redoc_url="/redoc",
+        lifespan=lifespan
+    )
+
+    # CORS middleware (optional - for frontend access)
+    app.add_middleware(
+        CORSMiddleware,
+        allow_origins=["*"],  # Change to specific origins in production
+        allow_credentials=True,
+        allow_methods=["*"],
+        allow_headers=["*"],
+    )
+
+    # Register routers
+    app.include_router(appointment_router, prefix="/appointments", tags=["Appointments"])
+    app.include_router(doctor_schedule_router, prefix="/doctor-schedules", tags=["Doctor Schedules"])
+    app.include_router(blocked_slots_router, prefix="/blocked-slots", tags=["Blocked Slots"])
+    app.include_router(doctor_slot_router, prefix="/doctor-slots", tags=["Doctor Slots"])
+
+    # Root endpoint
+    @app.get("/", tags=["Root"])
+    def root():
+        """Root endpoint - API status"""
+        return {
+            "status": "Appointment Scheduling API running",
+            "version": "1.0.0",
+            "module": "Appointment Scheduling",
+            "endpoints": {
+                "appointments": "/appointments",
+                "doctor_schedules": "/doctor-schedules",
+                "blocked_slots": "/blocked-slots",
+                "doctor_slots": "/doctor-slots",
+                "documentation": "/docs",
+                "redoc": "/redoc"
             }
-        ],
-        "total_endpoints": 55
-    }
+        }
+
+    # Health check endpoint
+    @app.get("/health", tags=["Health"])
+    def health_check():
+        """Health check endpoint"""
+        return {
+            "status": "healthy",
+            "service": "Appointment Scheduling Module",
+            "database": "connected"
+        }
+
+    # API info endpoint
+    @app.get("/info", tags=["Info"])
+    def api_info():
+        """API information"""
+        return {
+            "title": "Hospital Appointment Scheduling API",
+            "version": "1.0.0",
+            "description": "Manage appointments, doctor schedules, and blocked time slots",
+            "modules": [
+                {
+                    "name": "Appointments",
+                    "description": "Create, update, and manage patient appointments",
+                    "endpoints": 20
+                },
+                {
+                    "name": "Doctor Schedules",
+                    "description": "Manage doctor working hours and availability",
+                    "endpoints": 19
+                },
+                {
+                    "name": "Blocked Slots",
+                    "description": "Block time slots for meetings, leaves, etc.",
+                    "endpoints": 20
+                },
+                {
+                    "name": "Doctor Slots",
+                    "description": "Materialized slot calendar with remaining capacity",
+                    "endpoints": 4
+                }
+            ],
+            "total_endpoints": 63
+        }
+
+    return app
+
+
+@lru_cache()
+def get_app() -> FastAPI:
+    """The process's application, built on first use"""
+    return create_app()
+
+
+def __getattr__(name: str):
+    # `main:app` (uvicorn, tests) resolves here, so the app is built on access, not import
+    if name == "app":
+        return get_app()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
 
 if __name__ == "__main__":
     import uvicorn
@@ -0,0 +1,31 @@
+-- ============================================================
+-- 001 - Prevent overlapping scheduled appointments per doctor
+-- ============================================================
+-- Two concurrent bookings can both pass the availability check before either
+-- inserts. This exclusion constraint lets the database reject the second one,
+-- so booking workers can run in parallel without table locks.
+--
+-- Run once against the hospitalmanagement database:
+--   psql -d hospitalmanagement -f migrations/001_appointment_no_overlap.sql
+--
+-- Existing overlapping scheduled rows must be resolved before the constraint
+-- can be added; list them with:
+--   SELECT a.appointment_id, b.appointment_id
+--   FROM hms.appointment a
+--   JOIN hms.appointment b
+--     ON a.doctor_id = b.doctor_id
+--    AND a.appointment_date = b.appointment_date
+--    AND a.appointment_id < b.appointment_id
+--    AND a.start_time < b.end_time
+--    AND b.start_time < a.end_time
+--   WHERE a.status = 'scheduled' AND b.status = 'scheduled';
+
+CREATE EXTENSION IF NOT EXISTS btree_gist;
+
+ALTER TABLE hms.appointment
+    ADD CONSTRAINT appointment_no_overlap
+    EXCLUDE USING gist (
+        doctor_id WITH =,
+        tsrange(appointment_date + start_time, appointment_date + end_time) WITH &&
+    )
+    WHERE (status = 'scheduled');
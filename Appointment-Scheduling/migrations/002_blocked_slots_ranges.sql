@@ -0,0 +1,86 @@
+-- ============================================================
+-- 002 - Store blocked slots as one datetime range per block
+-- ============================================================
+-- Blocked slots used to be stored as one row per day (blocked_date,
+-- start_time, end_time), so a long leave produced hundreds of rows per
+-- doctor. Each block is now a half-open period [blocked_from, blocked_until)
+-- and overlap tests use a GiST index on (doctor_id, tsrange(...)).
+--
+-- Existing rows are converted in place; consecutive full-day rows of the same
+-- doctor, reason and creator are merged into a single period.
+--
+-- Run once against the hospitalmanagement database:
+--   psql -d hospitalmanagement -f migrations/002_blocked_slots_ranges.sql
+
+BEGIN;
+
+CREATE EXTENSION IF NOT EXISTS btree_gist;
+
+ALTER TABLE hms.blocked_slots
+    ADD COLUMN blocked_from timestamp,
+    ADD COLUMN blocked_until timestamp;
+
+-- A full-day block ended at 23:59:59; it now runs up to the next midnight
+UPDATE hms.blocked_slots
+SET blocked_from = blocked_date + start_time,
+    blocked_until = CASE
+        WHEN end_time = '23:59:59' THEN (blocked_date + 1)::timestamp
+        ELSE blocked_date + end_time
+    END;
+
+-- Group consecutive full days into islands
+CREATE TEMP TABLE blocked_slot_runs ON COMMIT DROP AS
+SELECT
+    blocked_slot_id,
+    doctor_id,
+    reason,
+    created_by,
+    blocked_from,
+    blocked_until,
+    blocked_date - (ROW_NUMBER() OVER (
+        PARTITION BY doctor_id, reason, created_by
+        ORDER BY blocked_date
+    ))::int AS run_key
+FROM hms.blocked_slots
+WHERE start_time = '00:00:00' AND end_time = '23:59:59';
+
+CREATE TEMP TABLE blocked_slot_merged ON COMMIT DROP AS
+SELECT
+    MIN(blocked_slot_id) AS keep_id,
+    doctor_id,
+    reason,
+    created_by,
+    run_key,
+    MIN(blocked_from) AS blocked_from,
+    MAX(blocked_until) AS blocked_until
+FROM blocked_slot_runs
+GROUP BY doctor_id, reason, created_by, run_key;
+
+UPDATE hms.blocked_slots b
+SET blocked_from = m.blocked_from,
+    blocked_until = m.blocked_until
+FROM blocked_slot_merged m
+WHERE b.blocked_slot_id = m.keep_id;
+
+DELETE FROM hms.blocked_slots b
+USING blocked_slot_runs r, blocked_slot_merged m
+WHERE b.blocked_slot_id = r.blocked_slot_id
+  AND r.doctor_id = m.doctor_id
+  AND r.reason = m.reason
+  AND r.created_by = m.created_by
+  AND r.run_key = m.run_key
+  AND b.blocked_slot_id <> m.keep_id;
+
+ALTER TABLE hms.blocked_slots
+    ALTER COLUMN blocked_from SET NOT NULL,
+    ALTER COLUMN blocked_until SET NOT NULL,
+    ADD CONSTRAINT blocked_slots_period_check CHECK (blocked_from < blocked_until),
+    DROP COLUMN blocked_date,
+    DROP COLUMN start_time,
+    DROP COLUMN end_time;
+
+CREATE INDEX ix_blocked_slots_doctor_period
+    ON hms.blocked_slots
+    USING gist (doctor_id, tsrange(blocked_from, blocked_until));
+
+COMMIT;
@@ -0,0 +1,33 @@
+-- ============================================================
+-- 003 - Materialized slot calendar
+-- ============================================================
+-- One row per bookable slot for the booking window (today plus
+-- BOOKING_ADVANCE_DAYS), generated from hms.doctor_schedule with the
+-- remaining capacity of each slot. The application regenerates only the
+-- doctor/date window touched by a schedule, blocked slot or appointment
+-- change, and POST /doctor-slots/extend rolls the window forward daily.
+--
+-- Run once against the hospitalmanagement database:
+--   psql -d hospitalmanagement -f migrations/003_doctor_slot_calendar.sql
+-- then fill the calendar with:
+--   POST /doctor-slots/rebuild
+
+CREATE TABLE IF NOT EXISTS hms.doctor_slot (
+    doctor_slot_id SERIAL PRIMARY KEY,
+    doctor_id INTEGER NOT NULL REFERENCES hms.doctor (doctor_id),
+    schedule_id INTEGER REFERENCES hms.doctor_schedule (schedule_id) ON DELETE SET NULL,
+    slot_date DATE NOT NULL,
+    start_time TIME NOT NULL,
+    end_time TIME NOT NULL,
+    capacity INTEGER NOT NULL,
+    remaining INTEGER NOT NULL,
+    is_blocked BOOLEAN NOT NULL DEFAULT FALSE,
+    updated_at TIMESTAMP NOT NULL DEFAULT now(),
+    CONSTRAINT uq_doctor_slot UNIQUE (doctor_id, slot_date, start_time, end_time),
+    CONSTRAINT doctor_slot_remaining_check CHECK (remaining >= 0 AND remaining <= capacity)
+);
+
+-- "What's open" range scans across doctors
+CREATE INDEX IF NOT EXISTS ix_doctor_slot_open
+    ON hms.doctor_slot (slot_date, start_time, doctor_id)
+    WHERE remaining > 0 AND NOT is_blocked;
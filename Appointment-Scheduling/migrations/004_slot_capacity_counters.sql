@@ -0,0 +1,17 @@
+-- ============================================================
+-- 004 - Enforce max_patients_per_slot with slot capacity counters
+-- ============================================================
+-- Bookings now take capacity from hms.doctor_slot.remaining with one
+-- conditional UPDATE ... WHERE remaining > 0 RETURNING, and cancellations,
+-- no-shows and deletions give it back. Group slots (max_patients_per_slot > 1)
+-- legitimately hold overlapping scheduled appointments, so the overlap
+-- exclusion constraint from 001 has to go. Days that are not in the slot
+-- calendar are serialized per doctor-day with pg_advisory_xact_lock instead.
+--
+-- Run once against the hospitalmanagement database:
+--   psql -d hospitalmanagement -f migrations/004_slot_capacity_counters.sql
+-- then recount remaining capacity from the current bookings with:
+--   POST /doctor-slots/rebuild
+
+ALTER TABLE hms.appointment
+    DROP CONSTRAINT IF EXISTS appointment_no_overlap;
@@ -0,0 +1,31 @@
+-- ============================================================
+-- 005 - Per-doctor daily booking counters
+-- ============================================================
+-- One row per (doctor, date) holding the number of scheduled appointments.
+-- Booking takes a unit with one
+--   INSERT ... ON CONFLICT DO UPDATE SET booked = booked + 1
+--   WHERE booked + 1 <= MAX_APPOINTMENTS_PER_DAY_PER_DOCTOR RETURNING
+-- in the booking transaction; cancellation, no-show, deletion and
+-- rescheduling give it back. Dashboards read the counters directly:
+--   GET /appointments/date/{date}/load
+--   GET /appointments/doctor/{doctor_id}/load
+--
+-- Run once against the hospitalmanagement database:
+--   psql -d hospitalmanagement -f migrations/005_doctor_daily_load.sql
+
+CREATE TABLE IF NOT EXISTS hms.doctor_daily_load (
+    doctor_id INTEGER NOT NULL REFERENCES hms.doctor (doctor_id),
+    load_date DATE NOT NULL,
+    booked INTEGER NOT NULL DEFAULT 0,
+    updated_at TIMESTAMP NOT NULL DEFAULT now(),
+    PRIMARY KEY (doctor_id, load_date),
+    CONSTRAINT doctor_daily_load_booked_check CHECK (booked >= 0)
+);
+
+-- Count the appointments booked before this migration
+INSERT INTO hms.doctor_daily_load (doctor_id, load_date, booked)
+SELECT doctor_id, appointment_date, count(*)
+FROM hms.appointment
+WHERE status = 'scheduled'
+GROUP BY doctor_id, appointment_date
+ON CONFLICT (doctor_id, load_date) DO UPDATE SET booked = EXCLUDED.booked, updated_at = now();
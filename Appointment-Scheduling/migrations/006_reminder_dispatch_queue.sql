@@ -0,0 +1,17 @@
+-- ============================================================
+-- 006 - Reminder dispatch queue
+-- ============================================================
+-- Dispatch workers claim due reminders in batches with
+--   SELECT ... WHERE status = 'PENDING' AND reminder_time <= now()
+--   ORDER BY reminder_time LIMIT n FOR UPDATE SKIP LOCKED
+-- This partial index keeps that scan on pending rows only, however many
+-- sent reminders accumulate.
+--
+-- Run once against the hospitalmanagement database:
+--   psql -d hospitalmanagement -f migrations/006_reminder_dispatch_queue.sql
+-- then start one or more workers with:
+--   python -m Appointment_Reminder.Appointment_Reminder_worker
+
+CREATE INDEX IF NOT EXISTS ix_appointment_reminder_pending_due
+    ON hms.appointment_reminder (reminder_time)
+    WHERE status = 'PENDING';
@@ -0,0 +1,30 @@
+-- ============================================================
+-- 007 - Automatic reminder generation
+-- ============================================================
+-- POST /appointment-reminders/generate creates the reminder of every upcoming
+-- scheduled appointment with one INSERT ... SELECT. Each run is recorded so
+-- the next one only scans appointments booked since then, and the unique
+-- constraint makes reruns (or two runs at once) insert nothing twice.
+--
+-- Run once against the hospitalmanagement database:
+--   psql -d hospitalmanagement -f migrations/007_reminder_generation.sql
+--
+-- Existing duplicate reminders must be removed before the constraint can be
+-- added; list them with:
+--   SELECT appointment_id, reminder_type, reminder_time, count(*)
+--   FROM hms.appointment_reminder
+--   GROUP BY appointment_id, reminder_type, reminder_time
+--   HAVING count(*) > 1;
+
+ALTER TABLE hms.appointment_reminder
+    ADD CONSTRAINT uq_appointment_reminder_time UNIQUE (appointment_id, reminder_type, reminder_time);
+
+CREATE INDEX IF NOT EXISTS ix_hms_appointment_booking_date
+    ON hms.appointment (booking_date);
+
+CREATE TABLE IF NOT EXISTS hms.reminder_generation_run (
+    run_id SERIAL PRIMARY KEY,
+    started_at TIMESTAMP NOT NULL,
+    booked_since TIMESTAMP,
+    created_count INTEGER NOT NULL DEFAULT 0
+);
@@ -0,0 +1,21 @@
+-- ============================================================
+-- 008 - Reminder retries with capped exponential backoff
+-- ============================================================
+-- A failed send records its reason in failure_reason (message_content is no
+-- longer appended to), bumps attempt_count and schedules next_attempt_at
+-- REMINDER_RETRY_BASE_MINUTES * 2^(attempt - 1) later, capped at
+-- FAILED_REMINDER_RETRY_HOURS. After MAX_REMINDER_ATTEMPTS next_attempt_at
+-- stays NULL and the reminder leaves the retry queue. Dispatch workers only
+-- read failed rows through the partial index below.
+--
+-- Run once against the hospitalmanagement database:
+--   psql -d hospitalmanagement -f migrations/008_reminder_retry_queue.sql
+
+ALTER TABLE hms.appointment_reminder
+    ADD COLUMN IF NOT EXISTS attempt_count INTEGER NOT NULL DEFAULT 0,
+    ADD COLUMN IF NOT EXISTS next_attempt_at TIMESTAMP,
+    ADD COLUMN IF NOT EXISTS failure_reason TEXT;
+
+CREATE INDEX IF NOT EXISTS ix_appointment_reminder_retry_due
+    ON hms.appointment_reminder (next_attempt_at)
+    WHERE status = 'FAILED' AND next_attempt_at IS NOT NULL;
@@ -0,0 +1,12 @@
+-- ============================================================
+-- 009 - Set-based reminder cancellation
+-- ============================================================
+-- Reminders are cancelled with one UPDATE keyed by appointment_id, for one
+-- appointment, a list of appointments or all of a doctor's appointments on a
+-- date. The model has always declared this index; make sure it exists.
+--
+-- Run once against the hospitalmanagement database:
+--   psql -d hospitalmanagement -f migrations/009_reminder_cancel_by_appointment.sql
+
+CREATE INDEX IF NOT EXISTS ix_hms_appointment_reminder_appointment_id
+    ON hms.appointment_reminder (appointment_id);
@@ -0,0 +1,13 @@
+-- ============================================================
+-- 010 - Waiting-list backfill index
+-- ============================================================
+-- When an appointment is cancelled or marked no-show, the freed window is
+-- offered to the oldest ACTIVE waiting-list entry of that doctor and date
+-- whose preferred window overlaps it. This index serves that lookup (and the
+-- per-date priority listing) as an ordered range scan.
+--
+-- Run once against the hospitalmanagement database:
+--   psql -d hospitalmanagement -f migrations/010_waiting_list_backfill.sql
+
+CREATE INDEX IF NOT EXISTS ix_waiting_list_doctor_date_status_added
+    ON hms.waiting_list (doctor_id, preferred_date, status, added_at);
@@ -0,0 +1,13 @@
+-- ============================================================
+-- 011 - Batched waiting-list expiry
+-- ============================================================
+-- The expiry sweeper marks overdue ACTIVE entries as EXPIRED a bounded batch
+-- at a time. A partial index keeps each batch lookup to the entries that are
+-- still waiting, however large the history of expired entries grows.
+--
+-- Run once against the hospitalmanagement database:
+--   psql -d hospitalmanagement -f migrations/011_waiting_list_expiry.sql
+
+CREATE INDEX IF NOT EXISTS ix_waiting_list_active_expires
+    ON hms.waiting_list (expires_at)
+    WHERE status = 'ACTIVE';
@@ -0,0 +1,16 @@
+-- ============================================================
+-- 012 - Waiting-list urgency
+-- ============================================================
+-- Waiting-list entries are served per (doctor, preferred date) from a priority
+-- queue. Priority weighs time waited, clinical urgency and the patient's past
+-- no-shows; urgency is stored on the entry (0 = routine ... 5).
+--
+-- Run once against the hospitalmanagement database:
+--   psql -d hospitalmanagement -f migrations/012_waiting_list_urgency.sql
+
+ALTER TABLE hms.waiting_list
+    ADD COLUMN IF NOT EXISTS urgency smallint NOT NULL DEFAULT 0;
+
+-- No-show counts are looked up per patient when a queue is loaded
+CREATE INDEX IF NOT EXISTS ix_hms_appointment_patient_id
+    ON hms.appointment (patient_id);
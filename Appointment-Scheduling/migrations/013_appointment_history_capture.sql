@@ -0,0 +1,16 @@
+-- ============================================================
+-- 013 - Automatic appointment history capture
+-- ============================================================
+-- Appointment date/time/status changes are now recorded automatically and
+-- written in multi-row INSERT ... SELECT batches that skip appointments
+-- already at MAX_HISTORY_PER_APPOINTMENT. That per-appointment count and the
+-- timeline queries are served by an index on appointment_id.
+--
+-- Run once against the hospitalmanagement database:
+--   psql -d hospitalmanagement -f migrations/013_appointment_history_capture.sql
+
+CREATE INDEX IF NOT EXISTS ix_hms_appointment_history_appointment_id
+    ON hms.appointment_history (appointment_id);
+
+CREATE INDEX IF NOT EXISTS ix_hms_appointment_history_changed_at
+    ON hms.appointment_history (changed_at);
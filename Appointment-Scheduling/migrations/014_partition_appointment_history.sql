@@ -0,0 +1,88 @@
+-- ============================================================
+-- 014 - Monthly partitions for appointment_history
+-- ============================================================
+-- appointment_history becomes range-partitioned by changed_at, one partition
+-- per month (hms.appointment_history_pYYYYMM) plus a default partition that
+-- catches anything outside the created months. Retention then drops whole
+-- partitions (POST /appointment-history/cleanup) instead of running a
+-- table-wide DELETE, and date-range queries only touch the months they cover.
+--
+-- The app (at startup, then daily) and the cleanup job keep
+-- HISTORY_PARTITION_MONTHS_AHEAD future months created; rows the default
+-- partition holds for a month are moved into it when it is created.
+-- Existing rows are copied over, so run this in a maintenance window.
+--
+-- Run once against the hospitalmanagement database (after 013):
+--   psql -d hospitalmanagement -f migrations/014_partition_appointment_history.sql
+
+BEGIN;
+
+ALTER TABLE hms.appointment_history RENAME TO appointment_history_unpartitioned;
+ALTER TABLE hms.appointment_history_unpartitioned
+    RENAME CONSTRAINT appointment_history_pkey TO appointment_history_unpartitioned_pkey;
+ALTER SEQUENCE hms.appointment_history_history_id_seq OWNED BY NONE;
+DROP INDEX IF EXISTS hms.ix_hms_appointment_history_appointment_id;
+DROP INDEX IF EXISTS hms.ix_hms_appointment_history_changed_at;
+
+CREATE TABLE hms.appointment_history (
+    history_id integer NOT NULL DEFAULT nextval('hms.appointment_history_history_id_seq'),
+    appointment_id integer REFERENCES hms.appointment(appointment_id),
+    changed_by integer REFERENCES hms.users(user_id),
+    change_type character varying(30),
+    old_date date,
+    new_date date,
+    old_time time without time zone,
+    new_time time without time zone,
+    old_status character varying(30),
+    new_status character varying(30),
+    change_reason text,
+    changed_at timestamp without time zone NOT NULL DEFAULT CURRENT_TIMESTAMP,
+    -- The partition key has to be part of the primary key
+    CONSTRAINT appointment_history_pkey PRIMARY KEY (history_id, changed_at)
+) PARTITION BY RANGE (changed_at);
+
+ALTER SEQUENCE hms.appointment_history_history_id_seq OWNED BY hms.appointment_history.history_id;
+
+CREATE INDEX ix_hms_appointment_history_appointment_id
+    ON hms.appointment_history (appointment_id, changed_at);
+CREATE INDEX ix_hms_appointment_history_changed_at
+    ON hms.appointment_history (changed_at);
+CREATE INDEX ix_hms_appointment_history_change_type
+    ON hms.appointment_history (change_type);
+
+CREATE TABLE hms.appointment_history_default
+    PARTITION OF hms.appointment_history DEFAULT;
+
+-- One partition per month from the oldest record to HISTORY_PARTITION_MONTHS_AHEAD (3) months ahead
+DO $$
+DECLARE
+    month_start date;
+    last_month date := (date_trunc('month', now()) + interval '3 months')::date;
+BEGIN
+    SELECT date_trunc('month', coalesce(min(changed_at), now()))::date
+      INTO month_start
+      FROM hms.appointment_history_unpartitioned;
+
+    WHILE month_start <= last_month LOOP
+        EXECUTE format(
+            'CREATE TABLE IF NOT EXISTS hms.%I PARTITION OF hms.appointment_history FOR VALUES FROM (%L) TO (%L)',
+            'appointment_history_p' || to_char(month_start, 'YYYYMM'),
+            month_start,
+            (month_start + interval '1 month')::date
+        );
+        month_start := (month_start + interval '1 month')::date;
+    END LOOP;
+END $$;
+
+INSERT INTO hms.appointment_history (
+    history_id, appointment_id, changed_by, change_type, old_date, new_date,
+    old_time, new_time, old_status, new_status, change_reason, changed_at
+)
+SELECT
+    history_id, appointment_id, changed_by, change_type, old_date, new_date,
+    old_time, new_time, old_status, new_status, change_reason, coalesce(changed_at, now())
+FROM hms.appointment_history_unpartitioned;
+
+DROP TABLE hms.appointment_history_unpartitioned;
+
+COMMIT;
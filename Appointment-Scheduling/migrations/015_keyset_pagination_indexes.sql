@@ -0,0 +1,49 @@
+-- ============================================================
+-- 015 - Keyset pagination indexes
+-- ============================================================
+-- List endpoints page with a cursor: WHERE (sort key..., id) > (last row seen)
+-- ORDER BY sort key, id LIMIT n. With an index whose columns are the listing's
+-- filter followed by its sort key, every page (however deep) is one index range
+-- scan of n rows instead of an OFFSET scan over all the rows before it.
+--
+-- Run once against the hospitalmanagement database:
+--   psql -d hospitalmanagement -f migrations/015_keyset_pagination_indexes.sql
+
+-- Appointments per patient / per doctor / per date, by date and time
+CREATE INDEX IF NOT EXISTS ix_appointment_patient_date_time_id
+    ON hms.appointment (patient_id, appointment_date, start_time, appointment_id);
+CREATE INDEX IF NOT EXISTS ix_appointment_doctor_date_time_id
+    ON hms.appointment (doctor_id, appointment_date, start_time, appointment_id);
+CREATE INDEX IF NOT EXISTS ix_appointment_date_time_id
+    ON hms.appointment (appointment_date, start_time, appointment_id);
+
+-- Appointment history per change type / per user, newest first
+-- (created on the partitioned table, so every monthly partition gets them)
+CREATE INDEX IF NOT EXISTS ix_hms_appointment_history_change_type_changed_at
+    ON hms.appointment_history (change_type, changed_at, history_id);
+CREATE INDEX IF NOT EXISTS ix_hms_appointment_history_changed_by_changed_at
+    ON hms.appointment_history (changed_by, changed_at, history_id);
+
+-- Reminders per status / per type, by reminder time
+CREATE INDEX IF NOT EXISTS ix_appointment_reminder_status_time_id
+    ON hms.appointment_reminder (status, reminder_time, reminder_id);
+CREATE INDEX IF NOT EXISTS ix_appointment_reminder_type_time_id
+    ON hms.appointment_reminder (reminder_type, reminder_time, reminder_id);
+
+-- Blocked periods per doctor, by start
+CREATE INDEX IF NOT EXISTS ix_blocked_slots_doctor_from_id
+    ON hms.blocked_slots (doctor_id, blocked_from, blocked_slot_id);
+
+-- Schedules per doctor / per weekday, by ID
+CREATE INDEX IF NOT EXISTS ix_doctor_schedule_doctor_id_schedule_id
+    ON hms.doctor_schedule (doctor_id, schedule_id);
+CREATE INDEX IF NOT EXISTS ix_doctor_schedule_day_schedule_id
+    ON hms.doctor_schedule (day_of_week, schedule_id);
+
+-- Waiting list per patient / per doctor / per status, in order of joining
+CREATE INDEX IF NOT EXISTS ix_waiting_list_patient_added_id
+    ON hms.waiting_list (patient_id, added_at, waiting_id);
+CREATE INDEX IF NOT EXISTS ix_waiting_list_doctor_added_id
+    ON hms.waiting_list (doctor_id, added_at, waiting_id);
+CREATE INDEX IF NOT EXISTS ix_waiting_list_status_added_id
+    ON hms.waiting_list (status, added_at, waiting_id);
@@ -0,0 +1,15 @@
+-- ============================================================
+-- 016 - Version of each doctor-day's scheduled appointments
+-- ============================================================
+-- Every worker process keeps its own in-memory slot index of scheduled
+-- appointments per (doctor, date). doctor_daily_load.version is bumped in the
+-- same transaction as every change to a doctor-day's scheduled appointments
+-- (booking, cancellation, status change, deletion, move to another time), so
+-- an availability check reads it by primary key and reloads the cached day
+-- when another worker has changed it.
+--
+-- Run once against the hospitalmanagement database:
+--   psql -d hospitalmanagement -f migrations/016_doctor_day_version.sql
+
+ALTER TABLE hms.doctor_daily_load
+    ADD COLUMN IF NOT EXISTS version BIGINT NOT NULL DEFAULT 0;
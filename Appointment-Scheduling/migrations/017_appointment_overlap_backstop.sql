@@ -0,0 +1,54 @@
+-- ============================================================
+-- 017 - Claim every overlapping slot; overlap constraint as a backstop
+-- ============================================================
+-- A booking now takes one unit from every hms.doctor_slot row it overlaps,
+-- so slots of schedules with different slot durations cannot both sell the
+-- same time and off-grid bookings take the slots they reach into.
+-- appointment.shares_slot marks bookings in group slots
+-- (max_patients_per_slot > 1); every other scheduled booking is covered
+-- again by the appointment_no_overlap exclusion constraint that 004 dropped,
+-- as a backstop behind the slot counters and the doctor-day locks.
+--
+-- Run once against the hospitalmanagement database:
+--   psql -d hospitalmanagement -f migrations/017_appointment_overlap_backstop.sql
+-- then recount remaining capacity from the current bookings with:
+--   POST /doctor-slots/rebuild
+--
+-- Overlapping scheduled rows outside group slots must be resolved before the
+-- constraint can be added; list them (after the UPDATE below) with:
+--   SELECT a.appointment_id, b.appointment_id
+--   FROM hms.appointment a
+--   JOIN hms.appointment b
+--     ON a.doctor_id = b.doctor_id
+--    AND a.appointment_date = b.appointment_date
+--    AND a.appointment_id < b.appointment_id
+--    AND a.start_time < b.end_time
+--    AND b.start_time < a.end_time
+--   WHERE a.status = 'scheduled' AND b.status = 'scheduled'
+--     AND NOT a.shares_slot AND NOT b.shares_slot;
+
+CREATE EXTENSION IF NOT EXISTS btree_gist;
+
+ALTER TABLE hms.appointment
+    ADD COLUMN IF NOT EXISTS shares_slot BOOLEAN NOT NULL DEFAULT FALSE;
+
+UPDATE hms.appointment a
+SET shares_slot = TRUE
+WHERE a.status = 'scheduled'
+  AND EXISTS (
+      SELECT 1
+      FROM hms.doctor_slot s
+      WHERE s.doctor_id = a.doctor_id
+        AND s.slot_date = a.appointment_date
+        AND s.start_time < a.end_time
+        AND s.end_time > a.start_time
+        AND s.capacity > 1
+  );
+
+ALTER TABLE hms.appointment
+    ADD CONSTRAINT appointment_no_overlap
+    EXCLUDE USING gist (
+        doctor_id WITH =,
+        tsrange(appointment_date + start_time, appointment_date + end_time) WITH &&
+    )
+    WHERE (status = 'scheduled' AND NOT shares_slot);
@@ -0,0 +1,16 @@
+-- ============================================================
+-- 018 - No reminder retries once the appointment has started
+-- ============================================================
+-- Dispatch now drops a retry that would fall at or after the appointment's
+-- start (next_attempt_at stays NULL and the reminder leaves the retry queue).
+-- This clears the retries already scheduled past their appointment's start.
+--
+-- Run once against the hospitalmanagement database:
+--   psql -d hospitalmanagement -f migrations/018_reminder_retry_cutoff.sql
+
+UPDATE hms.appointment_reminder r
+SET next_attempt_at = NULL
+FROM hms.appointment a
+WHERE a.appointment_id = r.appointment_id
+  AND r.status = 'FAILED'
+  AND r.next_attempt_at >= a.appointment_date + a.start_time;
@@ -0,0 +1,141 @@
+"""
+Shared Pagination
+Keyset (cursor) pagination for the list endpoints of this service. A page is read with
+WHERE (sort columns..., primary key) > (key of the last row already seen), ordered by the
+same columns, so page 1000 costs the same index range scan as page one, and rows added
+or removed between requests never shift or repeat later pages. Clients get the key of
+a page's last row back as an opaque cursor to pass with the next request.
+
+Appointment-Scheduling and Financial-Accounting-Management each carry this file. The
+services are deployed separately, each with its own directory as the import root and no
+package they both install, so the module is copied rather than shared. Change both copies
+together: test_pagination fails when they differ.
+"""
+import base64
+import binascii
+import enum
+import hashlib
+import json
+from dataclasses import dataclass, field
+from datetime import date, datetime, time
+from decimal import Decimal
+from typing import Any, Callable, List, Optional, Sequence
+
+from sqlalchemy import literal, tuple_
+
+
+# ============ CONFIGURATION ============
+
+DEFAULT_PAGE_SIZE = 100  # Rows per page when the client does not ask for a size
+MAX_PAGE_SIZE = 500  # Largest page a client may ask for
+
+
+class InvalidCursorException(ValueError):
+    """Raised when a cursor is malformed or belongs to a different listing"""
+    pass
+
+
+@dataclass
+class Page:
+    """One page of a listing; next_cursor is None on the last page"""
+    items: List[Any] = field(default_factory=list)
+    next_cursor: Optional[str] = None
+
+    def __len__(self) -> int:
+        return len(self.items)
+
+    def map(self, function: Callable[[Any], Any]) -> "Page":
+        """Same page with every item transformed (e.g. serialized)"""
+        return Page([function(item) for item in self.items], self.next_cursor)
+
+    def as_response(self, key: str) -> dict:
+        """Response fields of the page: count, the items under `key`, next_cursor"""
+        return {"count": len(self.items), key: self.items, "next_cursor": self.next_cursor}
+
+
+# ============ CURSORS ============
+
+def _signature(order_by: Sequence, descending: bool) -> str:
+    """Short fingerprint of the sort key a cursor was made for"""
+    key = ",".join(str(column) for column in order_by) + (":desc" if descending else ":asc")
+    return hashlib.sha1(key.encode()).hexdigest()[:8]
+
+
+def _encode_value(value: Any) -> Any:
+    if isinstance(value, enum.Enum):
+        return value.name
+    if isinstance(value, (date, time)):  # datetime is a date
+        return value.isoformat()
+    if isinstance(value, Decimal):
+        return str(value)
+    return value
+
+
+def _decode_value(column, value: Any) -> Any:
+    if value is None:
+        return None
+    python_type = column.type.python_type
+    if issubclass(python_type, enum.Enum):
+        return python_type[value]
+    if python_type is datetime:
+        return datetime.fromisoformat(value)
+    if python_type is date:
+        return date.fromisoformat(value)
+    if python_type is time:
+        return time.fromisoformat(value)
+    if python_type is Decimal:
+        return Decimal(value)
+    return python_type(value)
+
+
+def encode_cursor(row: Any, order_by: Sequence, descending: bool = False) -> str:
+    """Opaque cursor pointing just past `row` in a listing sorted by order_by"""
+    payload = {
+        "k": _signature(order_by, descending),
+        "v": [_encode_value(getattr(row, column.key)) for column in order_by]
+    }
+    raw = json.dumps(payload, separators=(",", ":")).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str, order_by: Sequence, descending: bool = False) -> List[Any]:
+    """Key values held by a cursor, checked against the listing's sort key"""
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        payload = json.loads(raw)
+        if payload["k"] != _signature(order_by, descending) or len(payload["v"]) != len(order_by):
+            raise InvalidCursorException("Cursor does not belong to this listing")
+        return [_decode_value(column, value) for column, value in zip(order_by, payload["v"])]
+    except InvalidCursorException:
+        raise
+    except (binascii.Error, ValueError, TypeError, KeyError, AttributeError) as e:
+        raise InvalidCursorException(f"Invalid cursor: {e}")
+
+
+# ============ PAGINATION ============
+
+def paginate(
+    query,
+    order_by: Sequence,
+    cursor: Optional[str] = None,
+    limit: int = DEFAULT_PAGE_SIZE,
+    descending: bool = False
+) -> Page:
+    """
+    Read one page of `query` (which must not be ordered yet)
+    order_by lists non-null columns ending with the primary key, so the key is unique;
+    an index on them makes every page a single range scan. The limit is clamped to
+    MAX_PAGE_SIZE.
+    """
+    limit = max(1, min(limit, MAX_PAGE_SIZE))
+    if cursor:
+        values = decode_cursor(cursor, order_by, descending)
+        key = tuple_(*order_by)
+        after = tuple_(*[literal(value, column.type) for column, value in zip(order_by, values)])
+        query = query.filter(key < after if descending else key > after)
+
+    query = query.order_by(*[column.desc() if descending else column.asc() for column in order_by])
+    rows = query.limit(limit + 1).all()
+
+    next_cursor = encode_cursor(rows[limit - 1], order_by, descending) if len(rows) > limit else None
+    return Page(rows[:limit], next_cursor)
@@ -0,0 +1,108 @@
+"""
+Shared Statistics
+Grouped counts for the statistics endpoints of all modules, computed with one GROUP BY
+query each and cached per process for a short TTL. Cached results are keyed by the table
+they count: committing a session that wrote to that table (ORM flush, or an ORM-enabled
+INSERT/UPDATE/DELETE) drops them at once, and writes from other processes show up when
+the TTL runs out.
+"""
+import threading
+import time
+from typing import Any, Callable, Dict, Hashable, Tuple
+
+from sqlalchemy import event, func, inspect
+from sqlalchemy.orm import Session
+
+
+# ============ CONFIGURATION ============
+
+STATISTICS_CACHE_TTL_SECONDS = 10  # Max age of a cached result (dashboards poll every few seconds)
+
+WRITTEN_TABLES_KEY = "statistics_written_tables"
+
+
+# ============ AGGREGATION ============
+
+def count_by(db: Session, column, *criteria) -> Dict[Any, int]:
+    """Count rows per value of a column (optionally filtered) with one GROUP BY query"""
+    rows = db.query(column, func.count()).filter(*criteria).group_by(column).all()
+    return {value: count for value, count in rows}
+
+
+# ============ CACHE ============
+
+class StatisticsCache:
+    """Thread-safe TTL cache of statistics results, invalidated per table"""
+
+    def __init__(self, ttl_seconds: float = STATISTICS_CACHE_TTL_SECONDS):
+        self.ttl_seconds = ttl_seconds
+        self._entries: Dict[Tuple[str, Hashable], Tuple[float, Any]] = {}
+        self._lock = threading.Lock()
+
+    def get_or_compute(self, table: str, key: Hashable, compute: Callable[[], Any]) -> Any:
+        """Get the cached result for (table, key), computing and caching it when missing or expired"""
+        now = time.monotonic()
+        with self._lock:
+            cached = self._entries.get((table, key))
+        if cached is not None and cached[0] > now:
+            return cached[1]
+
+        value = compute()
+        with self._lock:
+            self._entries[(table, key)] = (now + self.ttl_seconds, value)
+        return value
+
+    def invalidate(self, *tables: str) -> None:
+        """Drop every cached result computed from the given tables"""
+        with self._lock:
+            for entry_key in [entry_key for entry_key in self._entries if entry_key[0] in tables]:
+                del self._entries[entry_key]
+
+    def clear(self) -> None:
+        """Drop every cached result"""
+        with self._lock:
+            self._entries.clear()
+
+
+statistics_cache = StatisticsCache()
+
+
+def table_key(model) -> str:
+    """Cache key of a mapped class's table (schema-qualified name)"""
+    return model.__table__.fullname
+
+
+# ============ SESSION EVENTS ============
+
+def _written(db: Session) -> set:
+    return db.info.setdefault(WRITTEN_TABLES_KEY, set())
+
+
+@event.listens_for(Session, "after_flush")
+def _track_flushed_tables(db: Session, flush_context) -> None:
+    written = _written(db)
+    for instance in list(db.new) + list(db.dirty) + list(db.deleted):
+        written.add(inspect(instance).mapper.local_table.fullname)
+
+
+@event.listens_for(Session, "do_orm_execute")
+def _track_bulk_writes(orm_execute_state) -> None:
+    if orm_execute_state.is_insert or orm_execute_state.is_update or orm_execute_state.is_delete:
+        mapper = orm_execute_state.bind_mapper
+        if mapper is not None:
+            _written(orm_execute_state.session).add(mapper.local_table.fullname)
+
+
+@event.listens_for(Session, "after_commit")
+def _invalidate_written_tables(db: Session) -> None:
+    written = db.info.pop(WRITTEN_TABLES_KEY, None)
+    if written:
+        statistics_cache.invalidate(*written)
+
+
+@event.listens_for(Session, "after_transaction_end")
+def _forget_written_tables(db: Session, transaction) -> None:
+    # A savepoint rolling back leaves the outer transaction's writes tracked (at worst a
+    # cached result is dropped early); only the outermost transaction ending forgets them
+    if transaction.parent is None:
+        db.info.pop(WRITTEN_TABLES_KEY, None)
@@ -0,0 +1,121 @@
+"""
+Test free-slot expansion from schedules, blocked slots and bookings (no database required)
+"""
+from datetime import date, time, datetime
+from types import SimpleNamespace
+from itertools import islice
+from Appointment.Appointment_availability import iter_free_slots, iter_earliest_free_slots, merge_intervals, subtract_busy
+from Doctor_Schedule.Doctor_Schedule_model import DayOfWeekEnum
+
+
+def make_schedule(day, start, end, slot_duration=30, effective_from=date(2030, 1, 1), effective_to=None, doctor_id=1):
+    return SimpleNamespace(
+        doctor_id=doctor_id,
+        day_of_week=day,
+        start_time=start,
+        end_time=end,
+        slot_duration=slot_duration,
+        max_patients_per_slot=1,
+        is_active=True,
+        effective_from=effective_from,
+        effective_to=effective_to
+    )
+
+
+def test_merge_and_subtract():
+    busy = merge_intervals([(time(10, 0), time(10, 30)), (time(9, 0), time(9, 45)), (time(9, 30), time(10, 0))])
+    assert busy == [(time(9, 0), time(10, 30))]
+
+    slots = [(time(8, 30), time(9, 0)), (time(9, 0), time(9, 30)), (time(10, 30), time(11, 0))]
+    assert subtract_busy(slots, busy) == [(time(8, 30), time(9, 0)), (time(10, 30), time(11, 0))]
+
+
+def test_iter_free_slots():
+    # 2030-01-07 is a Monday
+    monday = date(2030, 1, 7)
+    schedules = [
+        make_schedule(DayOfWeekEnum.mon, time(9, 0), time(11, 0)),
+        make_schedule(DayOfWeekEnum.tue, time(9, 0), time(10, 0), effective_to=date(2030, 1, 1)),
+    ]
+    blocked = [(monday, time(10, 0), time(10, 45))]
+    booked = [(monday, time(9, 0), time(9, 30))]
+
+    free = list(iter_free_slots(schedules, blocked, booked, monday, date(2030, 1, 8)))
+    assert free == [(monday, time(9, 30), time(10, 0))]
+
+
+def test_iter_free_slots_skips_past_slots():
+    monday = date(2030, 1, 7)
+    schedules = [make_schedule(DayOfWeekEnum.mon, time(9, 0), time(10, 0))]
+
+    free = list(iter_free_slots(schedules, [], [], monday, monday, not_before=datetime(2030, 1, 7, 9, 15)))
+    assert free == [(monday, time(9, 30), time(10, 0))]
+
+
+def test_iter_earliest_free_slots_merges_doctors_and_stops_early():
+    monday = date(2030, 1, 7)
+    schedules = [
+        make_schedule(DayOfWeekEnum.mon, time(9, 0), time(10, 0), doctor_id=1),
+        make_schedule(DayOfWeekEnum.mon, time(9, 15), time(9, 45), slot_duration=15, doctor_id=2),
+        make_schedule(DayOfWeekEnum.wed, time(9, 0), time(10, 0), doctor_id=3),
+    ]
+    booked = [(1, monday, time(9, 0), time(9, 30))]
+    windows = []
+
+    def load_window(window_start, window_end):
+        windows.append((window_start, window_end))
+        return schedules, [], booked, []
+
+    slots = list(islice(
+        iter_earliest_free_slots(load_window, [1, 2, 3], monday, date(2030, 1, 31), window_days=2),
+        3
+    ))
+
+    assert slots == [
+        (2, monday, time(9, 15), time(9, 30)),
+        (1, monday, time(9, 30), time(10, 0)),
+        (2, monday, time(9, 30), time(9, 45)),
+    ]
+    assert windows == [(monday, date(2030, 1, 8))]
+
+
+def test_calendar_days_are_answered_from_remaining_capacity():
+    monday = date(2030, 1, 7)
+    tuesday = date(2030, 1, 8)
+    schedules = [
+        make_schedule(DayOfWeekEnum.mon, time(9, 0), time(10, 0)),
+        make_schedule(DayOfWeekEnum.tue, time(9, 0), time(10, 0)),
+    ]
+    # 9:00 is a group slot with one booking and two places left
+    booked = [(monday, time(9, 0), time(9, 30))]
+    calendar = [
+        (monday, time(9, 0), time(9, 30), 2, False),
+        (monday, time(9, 30), time(10, 0), 0, False),
+        # An hour-long slot of another schedule overlaps both half hours and is full
+        (monday, time(11, 0), time(12, 0), 0, False),
+        (monday, time(11, 30), time(12, 0), 1, False),
+        (monday, time(12, 0), time(12, 30), 1, True),
+    ]
+
+    free = list(iter_free_slots(schedules, [], booked, monday, tuesday, calendar_rows=calendar))
+    # Tuesday is outside the calendar and falls back to the schedules
+    assert free == [
+        (monday, time(9, 0), time(9, 30)),
+        (tuesday, time(9, 0), time(9, 30)),
+        (tuesday, time(9, 30), time(10, 0)),
+    ]
+
+    def load_window(window_start, window_end):
+        return schedules, [], [(1, *row) for row in booked], [(1, *row) for row in calendar]
+
+    earliest = list(islice(iter_earliest_free_slots(load_window, [1], monday, tuesday), 1))
+    assert earliest == [(1, monday, time(9, 0), time(9, 30))]
+
+
+if __name__ == "__main__":
+    test_merge_and_subtract()
+    test_iter_free_slots()
+    test_iter_free_slots_skips_past_slots()
+    test_iter_earliest_free_slots_merges_doctors_and_stops_early()
+    test_calendar_days_are_answered_from_remaining_capacity()
+    print("✅ ALL AVAILABILITY TESTS PASSED!")
@@ -0,0 +1,190 @@
+"""
+Test bulk booking conflict detection (no database required; repository calls are faked)
+"""
+import sys
+from datetime import date, time, timedelta
+
+import pytest
+from Appointment.Appointment_config import get_appointment_settings
+from Appointment.Appointment_repository import AppointmentRepository
+from Appointment.Appointment_service import AppointmentService
+from Doctor_Slot.Doctor_Slot_repository import DoctorSlotRepository
+
+
+class FakeSession:
+    def __init__(self):
+        self.rollbacks = 0
+
+    def rollback(self):
+        self.rollbacks += 1
+
+
+def booking(doctor_id, start, end, day=None, patient_id=1):
+    return {
+        "doctor_id": doctor_id,
+        "patient_id": patient_id,
+        "appointment_date": (day or date.today() + timedelta(days=1)).strftime("%Y-%m-%d"),
+        "start_time": start,
+        "end_time": end,
+    }
+
+
+def test_bulk_booking_reports_each_item(monkeypatch):
+    tomorrow = date.today() + timedelta(days=1)
+    inserted = []
+
+    def fake_bulk_create(db, appointments):
+        inserted.extend(appointments)
+        return [1000 + i for i in range(len(appointments))]
+
+    # Doctor 1 already has 09:00-09:30 booked
+    monkeypatch.setattr(
+        AppointmentRepository, "get_scheduled_intervals_for_days",
+        lambda db, days: [(1, tomorrow, 99, time(9, 0), time(9, 30))]
+    )
+    monkeypatch.setattr(AppointmentRepository, "bulk_create", fake_bulk_create)
+    monkeypatch.setattr(AppointmentRepository, "lock_doctor_day", lambda db, doctor_id, appointment_date: None)
+    monkeypatch.setattr(AppointmentRepository, "get_daily_loads_for_days", lambda db, days: [])
+    monkeypatch.setattr(AppointmentRepository, "take_daily_capacity", lambda db, quantities, limit: set(quantities))
+    monkeypatch.setattr(DoctorSlotRepository, "get_for_days", lambda db, days: [])
+
+    result = AppointmentService.create_appointments_bulk(FakeSession(), [
+        booking(1, "09:15:00", "09:45:00"),   # clashes with the existing booking
+        booking(1, "09:30:00", "10:00:00"),   # free
+        booking(1, "09:45:00", "10:15:00"),   # clashes with the item above
+        booking(2, "09:00:00", "09:30:00"),   # other doctor, free
+        booking(2, "10:00:00", "09:00:00"),   # invalid
+    ])
+
+    assert result["total"] == 5
+    assert result["created"] == 2
+    assert result["failed"] == 3
+    assert [item["status"] for item in result["results"]] == ["failed", "created", "failed", "created", "failed"]
+    assert result["results"][1]["appointment_id"] == 1000
+    assert result["results"][3]["appointment_id"] == 1001
+    assert [(a.doctor_id, a.start_time) for a in inserted] == [(1, time(9, 30)), (2, time(9, 0))]
+
+
+def test_bulk_booking_respects_slot_and_daily_capacity(monkeypatch):
+    tomorrow = date.today() + timedelta(days=1)
+    limit = get_appointment_settings().MAX_APPOINTMENTS_PER_DAY_PER_DOCTOR
+    claimed = {}
+    counted = {}
+
+    def fake_take_daily_capacity(db, quantities, daily_limit):
+        counted.update(quantities)
+        return set(quantities)
+
+    def fake_claim_many(db, claims):
+        claimed.update(claims)
+        return set(claims)
+
+    # Doctor 3 runs a group slot with 2 places left and a blocked slot after it;
+    # doctor 4 has one booking left for the day
+    monkeypatch.setattr(AppointmentRepository, "get_daily_loads_for_days", lambda db, days: [(4, tomorrow, limit - 1)])
+    monkeypatch.setattr(DoctorSlotRepository, "get_for_days", lambda db, days: [
+        (3, tomorrow, time(9, 0), time(9, 30), 2, 3, False),
+        (3, tomorrow, time(9, 30), time(10, 0), 5, 5, True),
+        (4, tomorrow, time(9, 0), time(9, 30), 1, 1, False),
+        (4, tomorrow, time(9, 30), time(10, 0), 1, 1, False),
+    ])
+    monkeypatch.setattr(AppointmentRepository, "take_daily_capacity", fake_take_daily_capacity)
+    monkeypatch.setattr(DoctorSlotRepository, "claim_many", fake_claim_many)
+    monkeypatch.setattr(AppointmentRepository, "bulk_create", lambda db, appointments: list(range(len(appointments))))
+
+    result = AppointmentService.create_appointments_bulk(FakeSession(), [
+        booking(3, "09:00:00", "09:30:00", patient_id=1),
+        booking(3, "09:00:00", "09:30:00", patient_id=2),
+        booking(3, "09:00:00", "09:30:00", patient_id=3),   # slot is full
+        booking(3, "09:30:00", "10:00:00", patient_id=4),   # slot is blocked
+        booking(3, "09:10:00", "09:40:00", patient_id=5),   # overlaps the full and the blocked slot
+        booking(4, "09:00:00", "09:30:00", patient_id=6),
+        booking(4, "09:30:00", "10:00:00", patient_id=7),   # daily limit reached
+    ])
+
+    assert [item["status"] for item in result["results"]] == [
+        "created", "created", "failed", "failed", "failed", "created", "failed"
+    ]
+    assert "fully booked" in result["results"][6]["error"]
+    assert claimed == {(3, tomorrow, time(9, 0), time(9, 30)): 2, (4, tomorrow, time(9, 0), time(9, 30)): 1}
+    assert counted == {(3, tomorrow): 2, (4, tomorrow): 1}
+
+
+def test_bulk_booking_claims_every_overlapping_slot(monkeypatch):
+    """Schedules with 30- and 15-minute slots on the same hours never sell the same time twice"""
+    tomorrow = date.today() + timedelta(days=1)
+    claimed = {}
+    inserted = []
+
+    def fake_claim_many(db, claims):
+        claimed.update(claims)
+        return set(claims)
+
+    def fake_bulk_create(db, appointments):
+        inserted.extend(appointments)
+        return list(range(len(appointments)))
+
+    monkeypatch.setattr(AppointmentRepository, "get_daily_loads_for_days", lambda db, days: [])
+    monkeypatch.setattr(DoctorSlotRepository, "get_for_days", lambda db, days: [
+        (6, tomorrow, time(9, 0), time(9, 30), 1, 1, False),
+        (6, tomorrow, time(9, 0), time(9, 15), 1, 1, False),
+        (6, tomorrow, time(9, 15), time(9, 30), 1, 1, False),
+        (6, tomorrow, time(10, 0), time(10, 30), 2, 2, False),
+        (6, tomorrow, time(10, 30), time(11, 0), 2, 2, False),
+    ])
+    monkeypatch.setattr(AppointmentRepository, "take_daily_capacity", lambda db, quantities, limit: set(quantities))
+    monkeypatch.setattr(DoctorSlotRepository, "claim_many", fake_claim_many)
+    monkeypatch.setattr(AppointmentRepository, "bulk_create", fake_bulk_create)
+
+    result = AppointmentService.create_appointments_bulk(FakeSession(), [
+        booking(6, "09:00:00", "09:15:00", patient_id=1),
+        booking(6, "09:15:00", "09:30:00", patient_id=2),   # its half hour is taken
+        booking(6, "10:10:00", "10:40:00", patient_id=3),   # off the grid, across two group slots
+        booking(6, "11:00:00", "11:30:00", patient_id=4),   # outside the doctor's hours
+    ])
+
+    assert [item["status"] for item in result["results"]] == ["created", "failed", "created", "failed"]
+    assert claimed == {
+        (6, tomorrow, time(9, 0), time(9, 15)): 1,
+        (6, tomorrow, time(9, 0), time(9, 30)): 1,
+        (6, tomorrow, time(10, 0), time(10, 30)): 1,
+        (6, tomorrow, time(10, 30), time(11, 0)): 1,
+    }
+    assert [a.shares_slot for a in inserted] == [False, True]
+
+
+def test_bulk_booking_fails_only_items_on_counters_lost_twice(monkeypatch):
+    """When the retry is beaten too, only the items on the lost counters fail"""
+    tomorrow = date.today() + timedelta(days=1)
+    contested = (5, tomorrow, time(9, 0), time(9, 30))
+    claim_calls = []
+
+    def fake_claim_many(db, claims):
+        # Every attempt, a concurrent booking takes the last place of the contested slot first
+        claim_calls.append(dict(claims))
+        return {key for key in claims if key != contested}
+
+    monkeypatch.setattr(AppointmentRepository, "get_daily_loads_for_days", lambda db, days: [])
+    monkeypatch.setattr(DoctorSlotRepository, "get_for_days", lambda db, days: [
+        (5, tomorrow, time(9, 0), time(9, 30), 1, 1, False),
+        (5, tomorrow, time(9, 30), time(10, 0), 1, 1, False),
+    ])
+    monkeypatch.setattr(AppointmentRepository, "take_daily_capacity", lambda db, quantities, limit: set(quantities))
+    monkeypatch.setattr(DoctorSlotRepository, "claim_many", fake_claim_many)
+    monkeypatch.setattr(AppointmentRepository, "bulk_create", lambda db, appointments: [700 + i for i in range(len(appointments))])
+
+    db = FakeSession()
+    result = AppointmentService.create_appointments_bulk(db, [
+        booking(5, "09:00:00", "09:30:00", patient_id=1),
+        booking(5, "09:30:00", "10:00:00", patient_id=2),
+    ])
+
+    assert [item["status"] for item in result["results"]] == ["failed", "created"]
+    assert result["results"][0]["error"].startswith("Time slot is not available")
+    assert result["results"][1]["appointment_id"] == 700
+    assert db.rollbacks == 2
+    assert claim_calls[-1] == {(5, tomorrow, time(9, 30), time(10, 0)): 1}
+
+
+if __name__ == "__main__":
+    sys.exit(pytest.main(["-q", __file__]))
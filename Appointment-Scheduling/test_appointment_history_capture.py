@@ -0,0 +1,100 @@
+"""
+Test automatic appointment history capture (no database required; repository calls are faked)
+"""
+import sys
+from datetime import date, time
+
+import pytest
+from sqlalchemy import create_engine, text
+from sqlalchemy.orm import Session
+from sqlalchemy.orm.attributes import set_committed_value
+from Appointment.Appointment_model import Appointment, AppointmentStatusEnum
+from Appointment_History import Appointment_History_capture
+from Appointment_History.Appointment_History_capture import HistoryBuffer, build_history_record, stage_history
+from Appointment_History.Appointment_History_repository import AppointmentHistoryRepository
+
+
+def loaded_appointment():
+    appointment = Appointment()
+    for key, value in {
+        "appointment_id": 9,
+        "appointment_date": date(2026, 5, 4),
+        "start_time": time(9, 0),
+        "end_time": time(9, 30),
+        "status": AppointmentStatusEnum.scheduled,
+    }.items():
+        set_committed_value(appointment, key, value)
+    return appointment
+
+
+def test_records_are_built_from_tracked_changes():
+    unchanged = loaded_appointment()
+    unchanged.notes = "not tracked"
+    assert build_history_record(unchanged) is None
+
+    cancelled = loaded_appointment()
+    cancelled.status = AppointmentStatusEnum.cancelled
+    record = build_history_record(cancelled, changed_by=3, change_reason="Patient request")
+    assert record["change_type"] == "CANCELLED"
+    assert (record["old_status"], record["new_status"]) == ("SCHEDULED", "CANCELLED")
+    assert (record["changed_by"], record["change_reason"]) == (3, "Patient request")
+
+    moved = loaded_appointment()
+    moved.appointment_date = date(2026, 5, 6)
+    moved.start_time = time(11, 0)
+    record = build_history_record(moved)
+    assert record["change_type"] == "RESCHEDULED"
+    assert (record["old_date"], record["new_date"]) == (date(2026, 5, 4), date(2026, 5, 6))
+    assert (record["old_time"], record["new_time"]) == (time(9, 0), time(11, 0))
+
+    assert build_history_record(loaded_appointment(), created=True)["change_type"] == "CREATED"
+
+
+def test_buffer_writes_batches_and_keeps_records_on_failure(monkeypatch):
+    buffer = HistoryBuffer()
+    buffer._thread = object()   # keep the background writer out of the test
+    batches = []
+    fail = [True]
+
+    def fake_insert_many(db, rows, max_per_appointment):
+        if fail[0]:
+            raise RuntimeError("database unavailable")
+        batches.append(len(rows))
+        return len(rows)
+
+    monkeypatch.setattr(AppointmentHistoryRepository, "insert_many", fake_insert_many)
+
+    buffer.add([{"appointment_id": i} for i in range(1200)])
+    assert buffer.flush() == 0
+    assert len(buffer) == 1200
+
+    fail[0] = False
+    assert buffer.flush() == 1200
+    assert batches == [500, 500, 200]
+    assert len(buffer) == 0
+
+
+def test_savepoint_rollback_keeps_the_outer_transactions_history(monkeypatch):
+    buffered = []
+    monkeypatch.setattr(Appointment_History_capture.history_buffer, "add", buffered.extend)
+    db = Session(create_engine("sqlite://"))
+    try:
+        db.execute(text("SELECT 1"))
+        stage_history(db, [{"appointment_id": 9}])
+        with pytest.raises(RuntimeError):
+            with db.begin_nested():
+                raise RuntimeError("listener failed")
+        db.commit()
+        assert buffered == [{"appointment_id": 9}]
+
+        db.execute(text("SELECT 1"))
+        stage_history(db, [{"appointment_id": 10}])
+        db.rollback()
+        db.commit()
+        assert buffered == [{"appointment_id": 9}]
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    sys.exit(pytest.main(["-q", __file__]))
@@ -0,0 +1,109 @@
+"""
+Test partition-based appointment history retention (no database required; repository calls are faked)
+"""
+import asyncio
+import sys
+from datetime import date, datetime, timedelta
+
+import pytest
+import main
+from Appointment_History.Appointment_History_config import (
+    add_months,
+    get_month_start,
+    get_partition_name,
+    parse_partition_month,
+    get_history_settings
+)
+from Appointment_History.Appointment_History_repository import AppointmentHistoryRepository
+from Appointment_History.Appointment_History_service import AppointmentHistoryService
+
+
+class RecordingSession:
+    """Records the SQL it is given; to_regclass finds no table"""
+
+    def __init__(self):
+        self.statements = []
+        self.commits = 0
+
+    def execute(self, statement, params=None):
+        self.statements.append(str(statement))
+        return self
+
+    def scalar(self):
+        return None
+
+    @property
+    def rowcount(self):
+        return 4
+
+    def commit(self):
+        self.commits += 1
+
+
+def test_partition_names_round_trip():
+    assert add_months(date(2025, 11, 1), 3) == date(2026, 2, 1)
+    assert add_months(date(2026, 1, 1), -1) == date(2025, 12, 1)
+    assert get_partition_name(date(2026, 2, 1)) == "appointment_history_p202602"
+    assert parse_partition_month("appointment_history_p202602") == date(2026, 2, 1)
+    assert parse_partition_month("appointment_history_default") is None
+
+
+def test_cleanup_drops_only_whole_months_past_retention(monkeypatch):
+    current = get_month_start(date.today())
+    months = [add_months(current, offset) for offset in range(-6, 2)]
+    dropped = []
+    created = []
+    purged = []
+
+    monkeypatch.setattr(AppointmentHistoryRepository, "get_partition_months", lambda db: list(months))
+    monkeypatch.setattr(AppointmentHistoryRepository, "drop_month_partition", lambda db, month: dropped.append(month) or 10)
+    monkeypatch.setattr(AppointmentHistoryRepository, "create_month_partition", lambda db, month: created.append(month) or 0)
+    monkeypatch.setattr(
+        AppointmentHistoryRepository, "delete_default_partition_rows", lambda db, before: purged.append(before) or 3
+    )
+
+    # Keeping 95 days means every month that ended more than 95 days ago goes
+    result = AppointmentHistoryService.cleanup_old_records(None, days_to_keep=95)
+
+    assert dropped == months[:len(dropped)]
+    assert 2 <= len(dropped) <= 3
+    # The default partition loses the rows of the same months
+    assert purged == [add_months(dropped[-1], 1)] == [get_month_start(datetime.now() - timedelta(days=95))]
+    assert result["estimated_rows"] == 10 * len(dropped) + 3
+    ahead = get_history_settings().HISTORY_PARTITION_MONTHS_AHEAD
+    assert created == [add_months(current, offset) for offset in range(2, ahead + 1)]
+
+
+def test_new_partition_takes_its_rows_from_the_default_partition_before_attaching():
+    db = RecordingSession()
+
+    moved = AppointmentHistoryRepository.create_month_partition(db, date(2026, 7, 1))
+
+    assert moved == 4
+    assert db.commits == 1
+    create, move, attach = db.statements[2:]
+    assert create.startswith("CREATE TABLE hms.appointment_history_p202607 (LIKE hms.appointment_history")
+    assert "DELETE FROM hms.appointment_history_default" in move and "INSERT INTO hms.appointment_history_p202607" in move
+    assert attach == (
+        "ALTER TABLE hms.appointment_history ATTACH PARTITION hms.appointment_history_p202607 "
+        "FOR VALUES FROM ('2026-07-01') TO ('2026-08-01')"
+    )
+
+
+def test_app_creates_partitions_while_it_runs(monkeypatch):
+    runs = []
+    monkeypatch.setattr(AppointmentHistoryService, "maintain_partitions", lambda: runs.append(1) or [])
+
+    async def serve():
+        async with main.lifespan(main.app):
+            for _ in range(20):
+                if runs:
+                    break
+                await asyncio.sleep(0.01)
+
+    asyncio.run(serve())
+    assert runs == [1]
+
+
+if __name__ == "__main__":
+    sys.exit(pytest.main(["-q", __file__]))
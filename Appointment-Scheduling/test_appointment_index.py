@@ -0,0 +1,186 @@
+"""
+Test the in-memory appointment slot index (no database required)
+"""
+import sys
+from datetime import date, time, timedelta
+
+import pytest
+from Appointment.Appointment_index import AppointmentSlotIndex, DayIntervals, appointment_slot_index
+from Appointment.Appointment_repository import AppointmentRepository
+from Appointment.Appointment_service import AppointmentService
+from Doctor_Slot.Doctor_Slot_repository import DoctorSlotRepository
+
+
+class FakeSession:
+    """Stands in for a session whose doctor_daily_load row is at `version`"""
+
+    def __init__(self, version):
+        self.info = {}
+        self.version = version
+
+    def execute(self, statement):
+        # The daily-load upsert bumps the version and returns it
+        self.version += 1
+        rows = [(7, self.day, self.version)]
+        return type("Result", (), {"all": lambda result: rows})()
+
+    def add(self, appointment):
+        pass
+
+    def commit(self):
+        pass
+
+    def refresh(self, appointment):
+        appointment.appointment_id = 11
+
+
+def test_day_intervals_conflicts():
+    """Overlap checks against a doctor's day"""
+    day = DayIntervals([
+        (1, time(9, 0), time(9, 30)),
+        (2, time(10, 0), time(11, 0)),
+        (3, time(14, 0), time(14, 15)),
+    ])
+
+    assert day.conflicts(time(9, 30), time(10, 0)) == []
+    assert day.conflicts(time(9, 15), time(9, 45)) == [1]
+    assert day.conflicts(time(10, 15), time(10, 30)) == [2]
+    assert day.conflicts(time(8, 0), time(18, 0)) == [1, 2, 3]
+    assert day.conflicts(time(10, 15), time(10, 30), exclude_appointment_id=2) == []
+
+    assert day.remove(2)
+    assert day.conflicts(time(10, 15), time(10, 30)) == []
+
+
+def test_day_intervals_overlapping_rows():
+    """A long interval that started early is still found"""
+    day = DayIntervals([
+        (1, time(8, 0), time(16, 0)),
+        (2, time(9, 0), time(9, 15)),
+    ])
+    assert day.conflicts(time(15, 0), time(15, 30)) == [1]
+
+
+def test_slot_index_loads_once_and_stays_in_sync():
+    """The loader is only hit on a miss; add/discard keep the cached day current"""
+    calls = []
+
+    def loader():
+        calls.append(1)
+        return [(1, time(9, 0), time(9, 30))]
+
+    index = AppointmentSlotIndex(ttl_seconds=0, max_days=10)
+    day = date(2030, 1, 7)
+
+    assert not index.is_available(5, day, time(9, 0), time(9, 30), loader)
+    assert index.is_available(5, day, time(9, 30), time(10, 0), loader)
+    assert len(calls) == 1
+
+    index.add(2, 5, day, time(9, 30), time(10, 0))
+    assert not index.is_available(5, day, time(9, 45), time(10, 15), loader)
+
+    index.discard(1)
+    assert index.is_available(5, day, time(9, 0), time(9, 30), loader)
+
+    # Moving an appointment to another day removes it from the old one
+    index.add(2, 5, date(2030, 1, 8), time(9, 30), time(10, 0))
+    assert index.is_available(5, day, time(9, 45), time(10, 15), loader)
+    assert len(calls) == 1
+
+
+def test_slot_index_evicts_least_recently_used_day():
+    index = AppointmentSlotIndex(ttl_seconds=0, max_days=1)
+    loads = []
+
+    def loader():
+        loads.append(1)
+        return []
+
+    index.is_available(1, date(2030, 1, 7), time(9, 0), time(9, 30), loader)
+    index.is_available(2, date(2030, 1, 7), time(9, 0), time(9, 30), loader)
+    index.is_available(1, date(2030, 1, 7), time(9, 0), time(9, 30), loader)
+    assert len(loads) == 3
+
+
+def test_slot_index_reloads_day_changed_by_another_worker():
+    """A cached day loaded at another version of the doctor-day is reloaded"""
+    rows = [(1, time(9, 0), time(9, 30))]
+    loads = []
+
+    def loader():
+        loads.append(1)
+        return list(rows)
+
+    index = AppointmentSlotIndex(ttl_seconds=0, max_days=10)
+    day = date(2030, 1, 7)
+
+    assert index.is_available(5, day, time(10, 0), time(10, 30), loader, version=3)
+    assert index.is_available(5, day, time(10, 0), time(10, 30), loader, version=3)
+    assert len(loads) == 1
+
+    # Another worker booked 10:00 and bumped the day's version
+    rows.append((2, time(10, 0), time(10, 30)))
+    assert not index.is_available(5, day, time(10, 0), time(10, 30), loader, version=4)
+    assert len(loads) == 2
+
+
+def test_slot_index_does_not_cache_a_load_that_raced_a_change():
+    """A booking recorded while a day was loading is not overwritten by the stale load"""
+    index = AppointmentSlotIndex(ttl_seconds=0, max_days=10)
+    day = date(2030, 1, 7)
+    loads = []
+
+    def stale_loader():
+        loads.append(1)
+        if len(loads) == 1:
+            # Committed and recorded by another thread after this load read the day
+            index.add(2, 5, day, time(10, 0), time(10, 30))
+            return []
+        return [(2, time(10, 0), time(10, 30))]
+
+    assert index.is_available(5, day, time(10, 0), time(10, 30), stale_loader)
+    assert not index.is_available(5, day, time(10, 0), time(10, 30), stale_loader)
+    assert len(loads) == 2
+
+
+def test_a_local_booking_keeps_the_cached_day_current(monkeypatch):
+    """Create then check: neither the booking's own check nor the next one reloads the day"""
+    day = date.today() + timedelta(days=1)
+    loads = []
+    version_reads = []
+    db = FakeSession(version=3)
+    db.day = day
+
+    def get_day_version(db, doctor_id, load_date):
+        version_reads.append(load_date)
+        return db.version
+
+    def get_scheduled_intervals(db, doctor_id, appointment_date):
+        loads.append(appointment_date)
+        return [(1, time(9, 0), time(9, 30))]
+
+    monkeypatch.setattr(AppointmentRepository, "get_day_version", get_day_version)
+    monkeypatch.setattr(AppointmentRepository, "get_scheduled_intervals", get_scheduled_intervals)
+    monkeypatch.setattr(AppointmentRepository, "lock_doctor_day", lambda db, doctor_id, appointment_date: None)
+    monkeypatch.setattr(DoctorSlotRepository, "claim", lambda db, doctor_id, slot_date, start_time, end_time: None)
+    monkeypatch.setattr(DoctorSlotRepository, "has_slots_on", lambda db, doctor_id, slot_date: False)
+    appointment_slot_index.clear()
+
+    assert AppointmentRepository.check_time_slot_availability(db, 7, day, time(10, 0), time(10, 30))
+    assert loads == [day] and version_reads == [day]
+
+    AppointmentService.create_appointment(db, {
+        "doctor_id": 7, "patient_id": 3, "appointment_date": day,
+        "start_time": time(10, 0), "end_time": time(10, 30)
+    })
+    # The booking's check used the version its own upsert replaced: no read, no reload
+    assert version_reads == [day]
+
+    assert not AppointmentRepository.check_time_slot_availability(db, 7, day, time(10, 15), time(10, 45))
+    assert AppointmentRepository.check_time_slot_availability(db, 7, day, time(11, 0), time(11, 30))
+    assert loads == [day]
+    appointment_slot_index.clear()
+
+
+if __name__ == "__main__":
+    sys.exit(pytest.main(["-q", __file__]))
@@ -0,0 +1,170 @@
+"""
+Test that every appointment status change applies the same capacity rule (no database required; repository calls are faked)
+"""
+import sys
+from datetime import date, time, timedelta
+
+import pytest
+import Appointment.Appointment_service as appointment_service
+from Appointment.Appointment_model import Appointment, AppointmentStatusEnum
+from Appointment.Appointment_repository import AppointmentRepository
+from Appointment.Appointment_service import AppointmentService
+from Appointment_Reminder.Appointment_Reminder_repository import AppointmentReminderRepository
+from Appointment_Reminder.Appointment_Reminder_service import AppointmentReminderService
+from Doctor_Slot.Doctor_Slot_repository import DoctorSlotRepository
+
+
+class FakeSession:
+    def __init__(self, calls=None):
+        self.info = {}
+        self.calls = calls if calls is not None else []
+
+    def commit(self):
+        self.calls.append(("commit",))
+
+    def rollback(self):
+        self.calls.append(("rollback",))
+
+
+@pytest.fixture
+def calls(monkeypatch):
+    """Fake repositories over one scheduled appointment; returns the calls made"""
+    tomorrow = date.today() + timedelta(days=1)
+    appointment = Appointment(
+        appointment_id=1, doctor_id=7, appointment_date=tomorrow, start_time=time(9, 0), end_time=time(9, 30),
+        status=AppointmentStatusEnum.scheduled, shares_slot=False
+    )
+    made = []
+
+    monkeypatch.setattr(AppointmentRepository, "get_by_id", lambda db, appointment_id: appointment)
+    monkeypatch.setattr(AppointmentRepository, "update", lambda db, appointment: db.commit() or appointment)
+    monkeypatch.setattr(
+        AppointmentRepository, "release_daily_capacity",
+        lambda db, doctor_id, load_date: made.append(("release_day", doctor_id, load_date))
+    )
+    monkeypatch.setattr(
+        AppointmentRepository, "take_daily_capacity",
+        lambda db, quantities, limit: made.append(("take_day",) + next(iter(quantities))) or set(quantities)
+    )
+    monkeypatch.setattr(
+        AppointmentRepository, "touch_day",
+        lambda db, doctor_id, load_date: made.append(("touch_day", doctor_id, load_date))
+    )
+    monkeypatch.setattr(
+        DoctorSlotRepository, "release",
+        lambda db, doctor_id, slot_date, start_time, end_time: made.append(("release_slot", start_time)) or 1
+    )
+    monkeypatch.setattr(
+        DoctorSlotRepository, "claim",
+        lambda db, doctor_id, slot_date, start_time, end_time: made.append(("claim_slot", start_time)) or 1
+    )
+    monkeypatch.setattr(
+        appointment_service, "emit_slot_freed",
+        lambda db, doctor_id, slot_date, start_time, end_time: made.append(("freed", start_time))
+    )
+    monkeypatch.setattr(
+        AppointmentReminderRepository, "cancel_pending_for_appointments",
+        lambda db, appointment_ids: made.append(("cancel_reminders", appointment_ids)) or 1
+    )
+    monkeypatch.setattr(
+        AppointmentReminderService, "reschedule_reminders",
+        lambda db, appointment: made.append(("reminders", appointment.start_time))
+    )
+    return made
+
+
+def test_complete_releases_like_an_update_to_completed(calls):
+    tomorrow = date.today() + timedelta(days=1)
+
+    AppointmentService.complete_appointment(FakeSession(calls), 1)
+    completed = list(calls)
+    calls.clear()
+
+    # Same transition through update_appointment on a scheduled appointment
+    AppointmentService.update_appointment(FakeSession(), 1, {"status": "scheduled"})
+    assert calls[-1] == ("reminders", time(9, 0))
+    calls.clear()
+    AppointmentService.update_appointment(FakeSession(calls), 1, {"status": "completed"})
+
+    assert completed == calls == [("release_slot", time(9, 0)), ("release_day", 7, tomorrow), ("commit",)]
+
+
+def test_no_show_and_cancel_release_and_announce_the_slot(calls):
+    tomorrow = date.today() + timedelta(days=1)
+
+    appointment = AppointmentService.mark_no_show(FakeSession(calls), 1)
+    assert appointment.status == AppointmentStatusEnum.no_show
+    assert calls == [("release_slot", time(9, 0)), ("release_day", 7, tomorrow), ("freed", time(9, 0)), ("commit",)]
+
+    # Already released: no second release
+    calls.clear()
+    AppointmentService.update_appointment(FakeSession(calls), 1, {"status": "cancelled"})
+    assert calls == [("cancel_reminders", [1]), ("commit",)]
+
+
+def test_cancel_with_a_move_releases_where_the_booking_was(calls):
+    tomorrow = date.today() + timedelta(days=1)
+
+    appointment = AppointmentService.update_appointment(
+        FakeSession(), 1, {"status": "cancelled", "start_time": "11:00:00", "end_time": "11:30:00"}
+    )
+
+    assert appointment.start_time == time(11, 0)
+    assert calls == [
+        ("release_slot", time(9, 0)), ("release_day", 7, tomorrow), ("freed", time(9, 0)), ("cancel_reminders", [1])
+    ]
+
+
+def test_cancel_cancels_reminders_in_the_same_commit(calls):
+    tomorrow = date.today() + timedelta(days=1)
+
+    appointment = AppointmentService.cancel_appointment(FakeSession(calls), 1, cancelled_by=3, reason="Travelling")
+
+    assert appointment.status == AppointmentStatusEnum.cancelled
+    assert calls == [
+        ("release_slot", time(9, 0)), ("release_day", 7, tomorrow), ("freed", time(9, 0)),
+        ("cancel_reminders", [1]), ("commit",)
+    ]
+
+
+def test_failed_reminder_cancel_rolls_the_cancellation_back(calls, monkeypatch):
+    def failing_cancel(db, appointment_ids):
+        raise RuntimeError("reminder table unavailable")
+
+    monkeypatch.setattr(AppointmentReminderRepository, "cancel_pending_for_appointments", failing_cancel)
+    db = FakeSession(calls)
+
+    with pytest.raises(RuntimeError):
+        AppointmentService.cancel_appointment(db, 1, cancelled_by=3, reason="Travelling")
+    assert ("commit",) not in calls and calls[-1] == ("rollback",)
+
+
+def test_rescheduling_takes_capacity_at_the_new_time(calls):
+    tomorrow = date.today() + timedelta(days=1)
+    AppointmentService.complete_appointment(FakeSession(), 1)
+    calls.clear()
+
+    appointment = AppointmentService.update_appointment(
+        FakeSession(), 1, {"status": "scheduled", "start_time": "10:00:00", "end_time": "10:30:00"}
+    )
+
+    assert appointment.status == AppointmentStatusEnum.scheduled
+    assert calls == [("take_day", 7, tomorrow), ("claim_slot", time(10, 0)), ("reminders", time(10, 0))]
+
+
+def test_moving_a_booking_moves_its_reminders(calls):
+    tomorrow = date.today() + timedelta(days=1)
+
+    AppointmentService.update_appointment(FakeSession(), 1, {"start_time": "10:00:00", "end_time": "10:30:00"})
+    assert calls == [
+        ("touch_day", 7, tomorrow), ("release_slot", time(9, 0)), ("claim_slot", time(10, 0)), ("reminders", time(10, 0))
+    ]
+
+    # Notes alone leave the reminders alone
+    calls.clear()
+    AppointmentService.update_appointment(FakeSession(), 1, {"notes": "Bring earlier reports"})
+    assert calls == []
+
+
+if __name__ == "__main__":
+    sys.exit(pytest.main(["-q", __file__]))
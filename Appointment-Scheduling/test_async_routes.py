@@ -0,0 +1,90 @@
+"""
+Test the async variant of the scheduling API (no database required; service calls are faked)
+"""
+import asyncio
+import inspect
+import sys
+import threading
+from datetime import date, time
+
+import pytest
+from fastapi import FastAPI, HTTPException
+from fastapi.routing import APIRoute
+import main
+from Appointment import Appointment_routes
+from Appointment.Appointment_config import get_db
+from Appointment.Appointment_controller import router as appointment_controller
+from Appointment.Appointment_model import Appointment, AppointmentStatusEnum
+from Appointment.Appointment_service import AppointmentService
+from async_routes import build_async_router
+from database import DatabaseSettings
+
+
+def async_routes():
+    return build_async_router(appointment_controller, get_db, keep_sync=["export_appointments"]).routes
+
+
+def test_async_router_mirrors_sync_routes():
+    sync_routes = [route for route in appointment_controller.routes if isinstance(route, APIRoute)]
+    routes = async_routes()
+    assert [(r.path, r.methods, r.status_code, r.name) for r in routes] == [
+        (r.path, r.methods, r.status_code, r.name) for r in sync_routes
+    ]
+    assert [r.name for r in routes if not inspect.iscoroutinefunction(r.endpoint)] == ["export_appointments"]
+
+    # The db parameter keeps the module's own session dependency
+    endpoint = next(r.endpoint for r in routes if r.name == "get_appointment")
+    parameters = inspect.signature(endpoint).parameters
+    assert list(parameters) == ["appointment_id", "db"]
+    assert parameters["db"].default.dependency is get_db
+
+
+def test_async_endpoint_runs_sync_endpoint_in_the_threadpool(monkeypatch):
+    endpoint = next(r.endpoint for r in async_routes() if r.name == "get_appointment")
+    calls = []
+
+    def fake_get(db, appointment_id):
+        calls.append((db, threading.get_ident()))
+        if appointment_id != 5:
+            raise ValueError(f"Appointment with ID {appointment_id} not found")
+        return Appointment(
+            appointment_id=5, patient_id=1, doctor_id=2, appointment_date=date(2026, 3, 2),
+            start_time=time(9, 0), end_time=time(9, 30), status=AppointmentStatusEnum.scheduled
+        )
+
+    monkeypatch.setattr(AppointmentService, "get_appointment", fake_get)
+    db = object()
+
+    async def request(appointment_id):
+        return threading.get_ident(), await endpoint(appointment_id=appointment_id, db=db)
+
+    loop_thread, result = asyncio.run(request(5))
+    [(session, worker_thread)] = calls
+    assert session is db and worker_thread != loop_thread
+    # Encoded in the worker thread
+    assert result["appointment_id"] == 5
+    assert result["appointment_date"] == "2026-03-02"
+    assert result["status"] == "scheduled"
+
+    # Errors map to the same HTTP responses as the sync endpoint
+    with pytest.raises(HTTPException) as error:
+        asyncio.run(request(6))
+    assert error.value.status_code == 404
+
+
+def test_app_picks_its_routers_when_built(monkeypatch):
+    included = []
+    monkeypatch.setattr(FastAPI, "include_router", lambda self, router, **kwargs: included.append(router))
+
+    main.create_app()
+    assert Appointment_routes.router in included
+
+    # The setting is read by create_app, not when main is imported
+    included.clear()
+    monkeypatch.setattr(main, "get_database_settings", lambda: DatabaseSettings(ASYNC_ROUTE_HANDLERS=True))
+    main.create_app()
+    assert Appointment_routes.async_router in included and Appointment_routes.router not in included
+
+
+if __name__ == "__main__":
+    sys.exit(pytest.main(["-q", __file__]))
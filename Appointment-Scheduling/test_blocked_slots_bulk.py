@@ -0,0 +1,191 @@
+"""
+Test set-based multi-day blocking (no database required; repository calls are faked)
+"""
+import sys
+from datetime import date, time, datetime, timedelta
+
+import pytest
+from Blocked_Slots.Blocked_Slots_config import to_blocked_period, split_period_by_day
+from Blocked_Slots.Blocked_Slots_model import BlockedSlot
+from Blocked_Slots.Blocked_Slots_repository import BlockedSlotRepository
+from Blocked_Slots.Blocked_Slots_service import BlockedSlotService
+from Doctor_Slot.Doctor_Slot_service import DoctorSlotService
+from pagination import Page
+
+
+def test_blocked_period_round_trip():
+    """A full day runs to the next midnight and expands back to 00:00-23:59:59"""
+    day = date(2030, 1, 7)
+    blocked_from, blocked_until = to_blocked_period(day, time(0, 0), time(23, 59, 59))
+    assert (blocked_from, blocked_until) == (datetime(2030, 1, 7), datetime(2030, 1, 8))
+    assert list(split_period_by_day(blocked_from, blocked_until)) == [(day, time(0, 0), time(23, 59, 59))]
+
+    assert to_blocked_period(day, time(14, 0), time(16, 0)) == (datetime(2030, 1, 7, 14), datetime(2030, 1, 7, 16))
+
+
+def test_split_period_by_day_clips_to_range():
+    """A leave stored as one period is only expanded for the days asked for"""
+    days = list(split_period_by_day(
+        datetime(2030, 1, 1, 12, 0), datetime(2030, 12, 31, 10, 0),
+        date(2029, 12, 30), date(2030, 1, 2)
+    ))
+    assert days == [
+        (date(2030, 1, 1), time(12, 0), time(23, 59, 59)),
+        (date(2030, 1, 2), time(0, 0), time(23, 59, 59)),
+    ]
+
+    last = list(split_period_by_day(datetime(2030, 1, 1, 12, 0), datetime(2030, 12, 31, 10, 0), date(2030, 12, 31)))
+    assert last == [(date(2030, 12, 31), time(0, 0), time(10, 0))]
+
+
+def test_blocked_slots_are_served_in_the_per_day_shape():
+    """Responses keep blocked_date/start_time/end_time, one entry per day of a period"""
+    created_at = datetime(2030, 1, 1, 8, 0)
+    afternoon = BlockedSlot(
+        blocked_slot_id=4, doctor_id=7, blocked_from=datetime(2030, 1, 7, 14), blocked_until=datetime(2030, 1, 7, 16),
+        reason="Medical conference", created_at=created_at, created_by=2
+    )
+    assert (afternoon.blocked_date, afternoon.start_time, afternoon.end_time) == (date(2030, 1, 7), time(14), time(16))
+    assert BlockedSlotService.to_dict(afternoon) == {
+        "blocked_slot_id": 4,
+        "doctor_id": 7,
+        "blocked_date": date(2030, 1, 7),
+        "start_time": time(14),
+        "end_time": time(16),
+        "reason": "Medical conference",
+        "created_at": created_at,
+        "created_by": 2
+    }
+
+    vacation = BlockedSlot(
+        blocked_slot_id=5, doctor_id=7, blocked_from=datetime(2030, 1, 8), blocked_until=datetime(2030, 1, 11),
+        reason="Vacation", created_at=created_at, created_by=2
+    )
+    assert vacation.end_time == time(23, 59, 59)
+    page = BlockedSlotService.to_day_page(lambda cursor, limit: Page([afternoon, vacation]), end_date=date(2030, 1, 9))
+    assert [(entry["blocked_slot_id"], entry["blocked_date"]) for entry in page.items] == [
+        (4, date(2030, 1, 7)), (5, date(2030, 1, 8)), (5, date(2030, 1, 9))
+    ]
+    assert page.next_cursor is None
+
+
+def test_day_pages_split_long_periods():
+    """A page holds at most `limit` day entries, however many days a period covers"""
+    periods = [
+        BlockedSlot(blocked_slot_id=blocked_slot_id, doctor_id=7, blocked_from=blocked_from,
+                    blocked_until=blocked_until, reason="Leave", created_by=2)
+        for blocked_slot_id, blocked_from, blocked_until in [
+            (1, datetime(2030, 1, 1), datetime(2031, 1, 1)),
+            (2, datetime(2031, 2, 1, 9), datetime(2031, 2, 1, 12)),
+            (3, datetime(2031, 3, 1), datetime(2031, 3, 3)),
+        ]
+    ]
+    fetched = []
+
+    def fetch_periods(cursor, limit):
+        # Keyset pages of periods; the cursor is the position after the page
+        start = int(cursor or 0)
+        fetched.append((start, limit))
+        end = start + limit
+        return Page(periods[start:end], str(end) if end < len(periods) else None)
+
+    served = []
+    cursor = None
+    while True:
+        page = BlockedSlotService.to_day_page(fetch_periods, cursor, limit=100)
+        assert len(page.items) <= 100
+        served.extend((entry["blocked_slot_id"], entry["blocked_date"]) for entry in page.items)
+        cursor = page.next_cursor
+        if cursor is None:
+            break
+
+    assert len(served) == 365 + 1 + 2
+    assert served[:2] == [(1, date(2030, 1, 1)), (1, date(2030, 1, 2))]
+    assert served[-3:] == [(2, date(2031, 2, 1)), (3, date(2031, 3, 1)), (3, date(2031, 3, 2))]
+    assert len(set(served)) == len(served)
+    assert all(limit == 100 for _, limit in fetched)
+
+    with pytest.raises(ValueError):
+        BlockedSlotService.to_day_page(fetch_periods, "not a cursor")
+
+
+class FakeSession:
+    """Records the order of commits and rollbacks"""
+
+    def __init__(self, calls):
+        self.calls = calls
+
+    def commit(self):
+        self.calls.append("commit")
+
+    def rollback(self):
+        self.calls.append("rollback")
+
+
+def test_block_multiple_days_reports_each_day(monkeypatch):
+    today = date.today()
+    calls = []
+    inserted = []
+
+    def fake_conflicts(db, doctor_id, start_date, end_date, start_time, end_time):
+        calls.append("conflicts")
+        return {today + timedelta(days=1)}
+
+    def fake_bulk_create(db, blocked_slots, commit=True):
+        assert not commit
+        calls.append("insert")
+        inserted.extend(blocked_slots)
+        return [500 + i for i in range(len(blocked_slots))]
+
+    monkeypatch.setattr(BlockedSlotRepository, "get_conflicting_dates", fake_conflicts)
+    monkeypatch.setattr(BlockedSlotRepository, "bulk_create", fake_bulk_create)
+    monkeypatch.setattr(
+        DoctorSlotService, "refresh_doctor",
+        lambda db, doctor_id, start_date, end_date: calls.append(("refresh", start_date, end_date))
+    )
+
+    result = BlockedSlotService.block_multiple_days(
+        FakeSession(calls), 7, today - timedelta(days=1), today + timedelta(days=4), "Vacation", 1
+    )
+
+    # The blocks and the rebuilt calendar are committed once, together
+    assert calls == ["conflicts", "insert", ("refresh", today, today + timedelta(days=4)), "commit"]
+    assert result["blocked_count"] == 4
+    assert result["skipped_count"] == 2
+    assert [day["status"] for day in result["days"]] == ["skipped", "blocked", "skipped", "blocked", "blocked", "blocked"]
+    assert [day.get("blocked_slot_id") for day in result["days"]] == [None, 500, None, 501, 501, 501]
+
+    # Consecutive free days are stored as one period
+    assert [(slot.blocked_from.date(), slot.blocked_until.date()) for slot in inserted] == [
+        (today, today + timedelta(days=1)),
+        (today + timedelta(days=2), today + timedelta(days=5)),
+    ]
+
+
+def test_block_is_not_saved_when_the_calendar_rebuild_fails(monkeypatch):
+    calls = []
+
+    def failing_refresh(db, doctor_id, start_date, end_date):
+        raise RuntimeError("lock timeout")
+
+    monkeypatch.setattr(BlockedSlotRepository, "check_period_conflict", lambda db, *args, **kwargs: [])
+    monkeypatch.setattr(
+        BlockedSlotRepository, "create",
+        lambda db, blocked_slot, commit=True: calls.append(("insert", commit)) or blocked_slot
+    )
+    monkeypatch.setattr(DoctorSlotService, "refresh_doctor", failing_refresh)
+
+    with pytest.raises(RuntimeError):
+        BlockedSlotService.create_blocked_slot(FakeSession(calls), {
+            "doctor_id": 7,
+            "blocked_date": (date.today() + timedelta(days=3)).strftime("%Y-%m-%d"),
+            "start_time": "14:00:00",
+            "end_time": "16:00:00",
+            "reason": "Medical conference",
+            "created_by": 2
+        })
+    assert calls == [("insert", False), "rollback"]
+
+
+if __name__ == "__main__":
+    sys.exit(pytest.main(["-q", __file__]))
@@ -0,0 +1,136 @@
+"""
+Test building the materialized slot calendar (no database required)
+"""
+from datetime import date, time
+from types import SimpleNamespace
+from sqlalchemy.dialects import postgresql
+from Doctor_Schedule.Doctor_Schedule_model import DayOfWeekEnum
+from Doctor_Slot.Doctor_Slot_calendar import build_slot_rows, build_calendar_rows, slots_taken_by
+from Doctor_Slot.Doctor_Slot_config import clip_to_calendar, get_calendar_window
+from Doctor_Slot.Doctor_Slot_repository import DoctorSlotRepository
+
+
+def make_schedule(day, start, end, slot_duration=30, capacity=1, doctor_id=1, schedule_id=10):
+    return SimpleNamespace(
+        schedule_id=schedule_id,
+        doctor_id=doctor_id,
+        day_of_week=day,
+        start_time=start,
+        end_time=end,
+        slot_duration=slot_duration,
+        max_patients_per_slot=capacity,
+        is_active=True,
+        effective_from=date(2030, 1, 1),
+        effective_to=None
+    )
+
+
+def test_build_slot_rows_counts_capacity_and_blocks():
+    # 2030-01-07 is a Monday
+    monday = date(2030, 1, 7)
+    schedules = [make_schedule(DayOfWeekEnum.mon, time(9, 0), time(10, 30), capacity=3)]
+    blocked = [(monday, time(10, 0), time(10, 30))]
+    booked = [
+        (monday, time(9, 0), time(9, 30)),
+        (monday, time(9, 0), time(9, 30)),
+        (monday, time(9, 30), time(10, 0)),
+    ]
+
+    rows = build_slot_rows(1, schedules, blocked, booked, monday, date(2030, 1, 8))
+
+    assert [(r["start_time"], r["capacity"], r["remaining"], r["is_blocked"]) for r in rows] == [
+        (time(9, 0), 3, 1, False),
+        (time(9, 30), 3, 2, False),
+        (time(10, 0), 3, 3, True),
+    ]
+    assert all(r["slot_date"] == monday and r["schedule_id"] == 10 for r in rows)
+
+
+def test_build_calendar_rows_skips_unscheduled_doctors():
+    monday = date(2030, 1, 7)
+    schedules = [make_schedule(DayOfWeekEnum.mon, time(9, 0), time(9, 30), doctor_id=2)]
+    booked = [(2, monday, time(9, 0), time(9, 30))]
+
+    rows = build_calendar_rows([1, 2], schedules, [], booked, monday, monday)
+
+    assert [(r["doctor_id"], r["remaining"]) for r in rows] == [(2, 0)]
+
+
+def test_overlapping_schedules_of_different_durations_do_not_double_book():
+    monday = date(2030, 1, 7)
+    schedules = [
+        make_schedule(DayOfWeekEnum.mon, time(9, 0), time(10, 0), slot_duration=30, schedule_id=10),
+        make_schedule(DayOfWeekEnum.mon, time(9, 0), time(10, 0), slot_duration=15, schedule_id=11),
+    ]
+    slots = [(r["start_time"], r["end_time"]) for r in build_slot_rows(1, schedules, [], [], monday, monday)]
+
+    # A 15-minute booking takes its own slot and the 30-minute slot around it
+    first = slots_taken_by(slots, time(9, 0), time(9, 15))
+    assert first == [(time(9, 0), time(9, 15)), (time(9, 0), time(9, 30))]
+
+    # Once it is booked, the other quarter of that half hour has no place left
+    rows = build_slot_rows(1, schedules, [], [(monday, time(9, 0), time(9, 15))], monday, monday)
+    remaining = {(r["start_time"], r["end_time"]): r["remaining"] for r in rows}
+    second = slots_taken_by(remaining, time(9, 15), time(9, 30))
+    assert second == [(time(9, 0), time(9, 30)), (time(9, 15), time(9, 30))]
+    assert [remaining[slot] for slot in second] == [0, 1]
+    assert remaining[(time(9, 30), time(9, 45))] == 1
+
+
+def test_off_grid_booking_takes_every_slot_it_touches():
+    slots = [(time(9, 0), time(9, 30)), (time(9, 30), time(10, 0)), (time(11, 0), time(11, 30))]
+
+    assert slots_taken_by(slots, time(9, 10), time(9, 40)) == slots[:2]
+    # Partly outside the doctor's hours
+    assert slots_taken_by(slots, time(8, 50), time(9, 10)) is None
+    assert slots_taken_by(slots, time(9, 45), time(11, 15)) is None
+    assert slots_taken_by(slots, time(10, 0), time(11, 0)) is None
+
+
+def test_claim_is_one_conditional_update():
+    """Rows returned by the UPDATE must be every slot the booking overlaps"""
+    class ClaimSession:
+        def __init__(self, rows):
+            self.rows = rows
+            self.statements = []
+
+        def execute(self, statement):
+            self.statements.append(str(statement.compile(dialect=postgresql.dialect())))
+            return SimpleNamespace(all=lambda: self.rows)
+
+    def row(start, end, capacity, required):
+        return SimpleNamespace(start_time=start, end_time=end, capacity=capacity, required=required)
+
+    monday = date(2030, 1, 7)
+    db = ClaimSession([row(time(9, 0), time(9, 30), 1, 2), row(time(9, 30), time(10, 0), 3, 2)])
+    assert DoctorSlotRepository.claim(db, 1, monday, time(9, 10), time(9, 40)) == 3
+    [sql] = db.statements
+    assert sql.startswith("UPDATE hms.doctor_slot SET remaining=(hms.doctor_slot.remaining - ")
+    assert "hms.doctor_slot.remaining > " in sql and " RETURNING " in sql
+
+    # A full or blocked slot among those overlapped is not returned: the booking is refused
+    db = ClaimSession([row(time(9, 0), time(9, 30), 1, 2)])
+    assert DoctorSlotRepository.claim(db, 1, monday, time(9, 10), time(9, 40)) is None
+    # Open slots that leave part of the booking uncovered
+    db = ClaimSession([row(time(9, 0), time(9, 30), 1, 1)])
+    assert DoctorSlotRepository.claim(db, 1, monday, time(9, 10), time(9, 40)) is None
+    assert DoctorSlotRepository.claim(ClaimSession([]), 1, monday, time(9, 10), time(9, 40)) is None
+
+
+def test_clip_to_calendar():
+    today = date(2030, 1, 1)
+    first_date, last_date = get_calendar_window(today)
+
+    assert clip_to_calendar(None, None, today) == (first_date, last_date)
+    assert clip_to_calendar(date(2029, 1, 1), date(2030, 1, 5), today) == (today, date(2030, 1, 5))
+    assert clip_to_calendar(date(2029, 1, 1), date(2029, 12, 31), today) is None
+
+
+if __name__ == "__main__":
+    test_build_slot_rows_counts_capacity_and_blocks()
+    test_build_calendar_rows_skips_unscheduled_doctors()
+    test_overlapping_schedules_of_different_durations_do_not_double_book()
+    test_off_grid_booking_takes_every_slot_it_touches()
+    test_claim_is_one_conditional_update()
+    test_clip_to_calendar()
+    print("✅ ALL SLOT CALENDAR TESTS PASSED!")
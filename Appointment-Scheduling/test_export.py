@@ -0,0 +1,92 @@
+"""
+Test streaming NDJSON/CSV export (no database required; repository calls are faked)
+"""
+import json
+import sys
+from datetime import date, time
+from decimal import Decimal
+
+import pytest
+from sqlalchemy.orm import Session
+from Appointment.Appointment_model import AppointmentStatusEnum
+from Appointment.Appointment_repository import AppointmentRepository, APPOINTMENT_EXPORT_COLUMNS
+from Appointment.Appointment_service import AppointmentService
+from export import (
+    EXPORT_BATCH_SIZE,
+    EXPORT_CHUNK_ROWS,
+    InvalidExportFormatException,
+    export_response,
+    iter_csv,
+    iter_ndjson
+)
+
+
+FIELDS = ["appointment_id", "appointment_date", "start_time", "status", "consultation_fee", "notes"]
+
+
+def make_rows(count: int):
+    for i in range(count):
+        yield (i, date(2026, 3, 1), time(9, 30), AppointmentStatusEnum.scheduled, Decimal("250.00"), None)
+
+
+def test_ndjson_encodes_rows_in_chunks():
+    chunks = list(iter_ndjson(make_rows(EXPORT_CHUNK_ROWS + 1), FIELDS))
+    assert len(chunks) == 2
+    lines = "".join(chunks).splitlines()
+    assert len(lines) == EXPORT_CHUNK_ROWS + 1
+    assert json.loads(lines[0]) == {
+        "appointment_id": 0,
+        "appointment_date": "2026-03-01",
+        "start_time": "09:30:00",
+        "status": "scheduled",
+        "consultation_fee": "250.00",
+        "notes": None
+    }
+
+
+def test_csv_writes_header_then_rows_in_chunks():
+    chunks = list(iter_csv(make_rows(EXPORT_CHUNK_ROWS + 1), FIELDS))
+    assert len(chunks) == 2
+    lines = "".join(chunks).splitlines()
+    assert lines[0] == ",".join(FIELDS)
+    assert lines[1] == "0,2026-03-01,09:30:00,scheduled,250.00,"
+    assert len(lines) == EXPORT_CHUNK_ROWS + 2
+
+    # An empty export is just the header
+    assert list(iter_csv([], FIELDS)) == [",".join(FIELDS) + "\r\n"]
+
+
+def test_export_response_rejects_unknown_format():
+    response = export_response(make_rows(1), FIELDS, "CSV", "appointments")
+    assert response.media_type == "text/csv"
+    assert response.headers["content-disposition"] == 'attachment; filename="appointments.csv"'
+    with pytest.raises(InvalidExportFormatException):
+        export_response(make_rows(1), FIELDS, "xlsx", "appointments")
+
+
+def test_appointment_export_validates_filters_and_streams_columns(monkeypatch):
+    calls = []
+
+    def fake_stream(db, doctor_id, start_date, end_date, status):
+        calls.append((doctor_id, start_date, end_date, status))
+        return iter([])
+
+    monkeypatch.setattr(AppointmentRepository, "stream_for_export", fake_stream)
+
+    fields, rows = AppointmentService.export_appointments(None, 7, "2026-03-01", "2026-03-31", "Completed")
+    assert fields == [column.key for column in APPOINTMENT_EXPORT_COLUMNS]
+    assert calls == [(7, date(2026, 3, 1), date(2026, 3, 31), AppointmentStatusEnum.completed)]
+
+    for bad in [("2026-03-31", "2026-03-01", None), (None, None, "pending")]:
+        with pytest.raises(ValueError):
+            AppointmentService.export_appointments(None, None, *bad)
+    assert len(calls) == 1
+
+
+def test_export_query_reads_from_server_side_cursor():
+    query = AppointmentRepository.stream_for_export(Session(), doctor_id=7)
+    assert query.get_execution_options()["yield_per"] == EXPORT_BATCH_SIZE
+
+
+if __name__ == "__main__":
+    sys.exit(pytest.main(["-q", __file__]))
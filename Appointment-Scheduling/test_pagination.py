@@ -0,0 +1,113 @@
+"""
+Test keyset pagination cursors and paging (no database required; queries are faked)
+"""
+import os
+from datetime import date, time
+from types import SimpleNamespace
+
+from sqlalchemy.dialects import postgresql
+from Appointment.Appointment_model import Appointment, AppointmentStatusEnum
+from Appointment.Appointment_repository import APPOINTMENT_ORDER
+from pagination import MAX_PAGE_SIZE, InvalidCursorException, decode_cursor, encode_cursor, paginate
+
+
+class FakeQuery:
+    """Records what paginate asks for and returns the first `limit` of its rows"""
+
+    def __init__(self, rows):
+        self.rows = rows
+        self.filters = []
+        self.ordering = []
+        self.limit_value = None
+
+    def filter(self, *criteria):
+        self.filters.extend(criteria)
+        return self
+
+    def order_by(self, *columns):
+        self.ordering.extend(columns)
+        return self
+
+    def limit(self, count):
+        self.limit_value = count
+        return self
+
+    def all(self):
+        return self.rows[:self.limit_value]
+
+
+def make_row(appointment_id: int):
+    return SimpleNamespace(
+        appointment_id=appointment_id,
+        appointment_date=date(2026, 3, 1),
+        start_time=time(9, appointment_id % 60),
+        status=AppointmentStatusEnum.scheduled
+    )
+
+
+def test_cursor_round_trips_key_values():
+    row = make_row(7)
+    cursor = encode_cursor(row, APPOINTMENT_ORDER)
+    assert decode_cursor(cursor, APPOINTMENT_ORDER) == [date(2026, 3, 1), time(9, 7), 7]
+
+
+def test_cursor_is_rejected_by_another_listing():
+    cursor = encode_cursor(make_row(7), APPOINTMENT_ORDER)
+    for order_by, descending in [(APPOINTMENT_ORDER, True), ([Appointment.appointment_id], False)]:
+        try:
+            decode_cursor(cursor, order_by, descending)
+            assert False, "cursor of a different listing was accepted"
+        except InvalidCursorException:
+            pass
+
+    try:
+        decode_cursor("not a cursor", APPOINTMENT_ORDER)
+        assert False, "malformed cursor was accepted"
+    except InvalidCursorException:
+        pass
+
+
+def test_paginate_returns_next_cursor_until_the_last_page():
+    rows = [make_row(i) for i in range(1, 6)]
+
+    query = FakeQuery(rows)
+    page = paginate(query, APPOINTMENT_ORDER, limit=2)
+    assert [row.appointment_id for row in page.items] == [1, 2]
+    assert query.limit_value == 3 and query.filters == []
+    assert decode_cursor(page.next_cursor, APPOINTMENT_ORDER) == [date(2026, 3, 1), time(9, 2), 2]
+
+    # The next page seeks past the cursor's key instead of skipping rows
+    query = FakeQuery(rows[2:])
+    page = paginate(query, APPOINTMENT_ORDER, cursor=page.next_cursor, limit=2)
+    sql = str(query.filters[0].compile(dialect=postgresql.dialect()))
+    assert "(hms.appointment.appointment_date, hms.appointment.start_time, hms.appointment.appointment_id) >" in sql
+    assert [row.appointment_id for row in page.items] == [3, 4]
+    assert page.next_cursor is not None
+
+    page = paginate(FakeQuery(rows[4:]), APPOINTMENT_ORDER, cursor=page.next_cursor, limit=2)
+    assert [row.appointment_id for row in page.items] == [5]
+    assert page.next_cursor is None
+    assert page.as_response("appointments")["count"] == 1
+
+
+def test_paginate_clamps_limit():
+    query = FakeQuery([])
+    paginate(query, APPOINTMENT_ORDER, limit=10 * MAX_PAGE_SIZE)
+    assert query.limit_value == MAX_PAGE_SIZE + 1
+
+
+def test_financial_accounting_copy_matches():
+    # Financial-Accounting-Management carries its own copy of this module (see its docstring)
+    here = os.path.dirname(os.path.abspath(__file__))
+    with open(os.path.join(here, "pagination.py"), encoding="utf-8") as ours:
+        with open(os.path.join(here, "..", "Financial-Accounting-Management", "pagination.py"), encoding="utf-8") as theirs:
+            assert ours.read() == theirs.read()
+
+
+if __name__ == "__main__":
+    test_cursor_round_trips_key_values()
+    test_cursor_is_rejected_by_another_listing()
+    test_paginate_returns_next_cursor_until_the_last_page()
+    test_paginate_clamps_limit()
+    test_financial_accounting_copy_matches()
+    print("✅ ALL PAGINATION TESTS PASSED!")
@@ -0,0 +1,172 @@
+"""
+Test batched reminder dispatch (no database required; repository calls are faked)
+"""
+import sys
+from datetime import datetime, timedelta
+
+import pytest
+from sqlalchemy.dialects import postgresql
+from Appointment_Reminder.Appointment_Reminder_config import get_reminder_settings, calculate_retry_delay, get_next_attempt_at
+from Appointment_Reminder.Appointment_Reminder_model import AppointmentReminder, ReminderTypeEnum, ReminderStatusEnum
+from Appointment_Reminder.Appointment_Reminder_repository import AppointmentReminderRepository
+from Appointment_Reminder.Appointment_Reminder_service import AppointmentReminderService
+from Appointment_Reminder.Appointment_Reminder_transport import FakeReminderTransport, ReminderTransport
+
+
+class ClaimQuery:
+    """Stands in for db.query(...): records the query built and returns its rows"""
+
+    def __init__(self, rows):
+        self.rows = rows
+        self.criteria = []
+
+    def filter(self, *criteria):
+        self.criteria.extend(criteria)
+        return self
+
+    def order_by(self, *columns):
+        self.ordering = columns
+        return self
+
+    def limit(self, count):
+        self.limit_value = count
+        return self
+
+    def with_for_update(self, **kwargs):
+        self.lock = kwargs
+        return self
+
+    def all(self):
+        return self.rows
+
+
+class FakeSession:
+    def __init__(self, *query_rows):
+        self.statements = []
+        self.queries = []
+        self.query_rows = list(query_rows)
+
+    def commit(self):
+        pass
+
+    def execute(self, statement):
+        self.statements.append(statement)
+        return type("Result", (), {"rowcount": 1})()
+
+    def query(self, entity):
+        query = ClaimQuery(self.query_rows.pop(0) if self.query_rows else [])
+        self.queries.append(query)
+        return query
+
+
+def compiled(statement) -> str:
+    return str(statement.compile(dialect=postgresql.dialect()))
+
+
+def test_dispatch_claims_batches_and_writes_back_once_per_batch(monkeypatch):
+    due = [
+        AppointmentReminder(
+            reminder_id=reminder_id,
+            appointment_id=100 + reminder_id,
+            reminder_type=ReminderTypeEnum.SMS,
+            reminder_time=datetime.now() - timedelta(minutes=5),
+            status=ReminderStatusEnum.PENDING,
+            message_content=f"Reminder {reminder_id}",
+            attempt_count=0
+        )
+        for reminder_id in range(1, 6)
+    ]
+    claimed_sizes = []
+    written = []
+
+    def fake_claim_due_batch(db, current_time, batch_size):
+        batch = due[:batch_size]
+        del due[:batch_size]
+        claimed_sizes.append(len(batch))
+        return batch
+
+    def fake_apply_dispatch_results(db, results):
+        written.append(results)
+        return len(results)
+
+    monkeypatch.setattr(AppointmentReminderRepository, "claim_due_batch", fake_claim_due_batch)
+    monkeypatch.setattr(AppointmentReminderRepository, "apply_dispatch_results", fake_apply_dispatch_results)
+    transport = FakeReminderTransport(fail_ids=[4])
+    result = AppointmentReminderService.dispatch_due_reminders(FakeSession(), transport, batch_size=2)
+
+    assert result == {"batches": 3, "sent": 4, "failed": 1}
+    assert claimed_sizes == [2, 2, 1, 0]
+    assert [len(results) for results in written] == [2, 2, 1]
+    rows = {result[0]: result for results in written for result in results}
+    reminder_id, status, sent_at, attempt_count, next_attempt_at, failure_reason = rows[4]
+    assert status == ReminderStatusEnum.FAILED
+    assert sent_at is None and attempt_count == 1
+    assert next_attempt_at > datetime.now()
+    assert "refused" in failure_reason
+    assert all(rows[reminder_id][1] == ReminderStatusEnum.SENT for reminder_id in (1, 2, 3, 5))
+    assert sorted(message["reminder_id"] for message in transport.sent) == [1, 2, 3, 5]
+
+
+def test_claim_locks_each_queue_and_merges_them_in_due_order():
+    now = datetime.now()
+
+    def reminder(reminder_id, status, minutes_ago):
+        due_at = now - timedelta(minutes=minutes_ago)
+        if status == ReminderStatusEnum.FAILED:
+            return AppointmentReminder(reminder_id=reminder_id, status=status,
+                                       reminder_time=now - timedelta(days=1), next_attempt_at=due_at)
+        return AppointmentReminder(reminder_id=reminder_id, status=status, reminder_time=due_at)
+
+    pending = [reminder(1, ReminderStatusEnum.PENDING, 30), reminder(2, ReminderStatusEnum.PENDING, 10),
+               reminder(3, ReminderStatusEnum.PENDING, 5)]
+    retries = [reminder(4, ReminderStatusEnum.FAILED, 20), reminder(5, ReminderStatusEnum.FAILED, 1)]
+    db = FakeSession(pending, retries)
+
+    batch = AppointmentReminderRepository.claim_due_batch(db, now, 3)
+
+    # Retries are due by next_attempt_at, not by their original reminder_time
+    assert [r.reminder_id for r in batch] == [1, 4, 2]
+    pending_query, retry_query = db.queries
+    for query, order in ((pending_query, "reminder_time"), (retry_query, "next_attempt_at")):
+        assert query.lock == {"skip_locked": True}
+        assert query.limit_value == 3
+        assert [compiled(column) for column in query.ordering] == [f"hms.appointment_reminder.{order}"]
+        assert f"hms.appointment_reminder.{order} <=" in compiled(query.criteria[0])
+
+
+def test_no_retry_is_scheduled_after_the_appointment_starts():
+    db = FakeSession()
+    AppointmentReminderRepository.apply_dispatch_results(
+        db, [(1, ReminderStatusEnum.FAILED, None, 1, datetime.now() + timedelta(hours=1), "refused")]
+    )
+
+    sql = compiled(db.statements[0])
+    assert "THEN CAST(outcome.next_attempt_at AS TIMESTAMP WITHOUT TIME ZONE) END" in sql
+    assert "< hms.appointment.appointment_date + hms.appointment.start_time" in sql
+
+
+def test_transports_must_implement_send():
+    class SilentTransport(ReminderTransport):
+        pass
+
+    with pytest.raises(TypeError):
+        SilentTransport()
+
+
+def test_retry_backoff_doubles_up_to_the_cap():
+    settings = get_reminder_settings()
+    base = timedelta(minutes=settings.REMINDER_RETRY_BASE_MINUTES)
+    cap = timedelta(hours=settings.FAILED_REMINDER_RETRY_HOURS)
+
+    assert calculate_retry_delay(1) == min(base, cap)
+    assert calculate_retry_delay(2) == min(base * 2, cap)
+    assert calculate_retry_delay(3) == min(base * 4, cap)
+    assert calculate_retry_delay(50) == cap
+
+    failed_at = datetime(2026, 3, 1, 8, 0)
+    assert get_next_attempt_at(failed_at, 1) == failed_at + calculate_retry_delay(1)
+    assert get_next_attempt_at(failed_at, settings.MAX_REMINDER_ATTEMPTS) is None
+
+
+if __name__ == "__main__":
+    sys.exit(pytest.main(["-q", __file__]))
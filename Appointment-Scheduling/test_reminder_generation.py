@@ -0,0 +1,80 @@
+"""
+Test incremental reminder generation (no database required; repository calls are faked)
+"""
+import sys
+from datetime import date, datetime, time, timedelta
+
+import pytest
+from Appointment.Appointment_model import Appointment
+from Appointment_Reminder.Appointment_Reminder_config import get_reminder_settings
+from Appointment_Reminder.Appointment_Reminder_model import ReminderGenerationRun, ReminderTypeEnum
+from Appointment_Reminder.Appointment_Reminder_repository import AppointmentReminderRepository
+from Appointment_Reminder.Appointment_Reminder_service import AppointmentReminderService
+
+
+def test_generation_scans_only_bookings_since_last_run(monkeypatch):
+    settings = get_reminder_settings()
+    last_started = datetime(2026, 3, 1, 2, 0)
+    calls = []
+    runs = []
+
+    def fake_generate(db, current_time, hours_before, reminder_type, max_per_appointment, booked_since=None):
+        calls.append((hours_before, reminder_type, max_per_appointment, booked_since))
+        return 7
+
+    monkeypatch.setattr(
+        AppointmentReminderRepository, "get_last_generation_run",
+        lambda db: ReminderGenerationRun(started_at=last_started, created_count=3)
+    )
+    monkeypatch.setattr(AppointmentReminderRepository, "generate_for_upcoming_appointments", fake_generate)
+    monkeypatch.setattr(AppointmentReminderRepository, "create_generation_run", lambda db, run: runs.append(run) or run)
+
+    incremental = AppointmentReminderService.generate_reminders(None)
+    full = AppointmentReminderService.generate_reminders(None, full=True)
+
+    since = last_started - timedelta(minutes=settings.AUTO_REMINDER_OVERLAP_MINUTES)
+    assert incremental["booked_since"] == since
+    assert full["booked_since"] is None
+    assert calls == [
+        (settings.DEFAULT_REMINDER_HOURS_BEFORE, ReminderTypeEnum[settings.AUTO_REMINDER_TYPE], settings.MAX_REMINDERS_PER_APPOINTMENT, since),
+        (settings.DEFAULT_REMINDER_HOURS_BEFORE, ReminderTypeEnum[settings.AUTO_REMINDER_TYPE], settings.MAX_REMINDERS_PER_APPOINTMENT, None),
+    ]
+    assert [run.created_count for run in runs] == [7, 7]
+
+
+def test_rescheduled_appointment_gets_a_reminder_at_its_new_time(monkeypatch):
+    settings = get_reminder_settings()
+    calls = []
+    monkeypatch.setattr(
+        AppointmentReminderRepository, "cancel_pending_for_appointments",
+        lambda db, appointment_ids: calls.append(("cancel", appointment_ids)) or 1
+    )
+    monkeypatch.setattr(
+        AppointmentReminderRepository, "schedule_pending",
+        lambda db, appointment_id, reminder_type, reminder_time, message_content: calls.append(
+            ("schedule", appointment_id, reminder_type, reminder_time, message_content)
+        )
+    )
+
+    new_date = date.today() + timedelta(days=10)
+    AppointmentReminderService.reschedule_reminders(
+        None, Appointment(appointment_id=5, appointment_date=new_date, start_time=time(14, 30))
+    )
+
+    reminder_time = datetime.combine(new_date, time(14, 30)) - timedelta(hours=settings.DEFAULT_REMINDER_HOURS_BEFORE)
+    assert calls == [
+        ("cancel", [5]),
+        ("schedule", 5, ReminderTypeEnum[settings.AUTO_REMINDER_TYPE], reminder_time,
+         f"Reminder: you have an appointment on {new_date.strftime('%B %d, %Y')} at 02:30 PM."),
+    ]
+
+    # Moved too close to send a reminder: the old one is still cancelled
+    calls.clear()
+    AppointmentReminderService.reschedule_reminders(
+        None, Appointment(appointment_id=5, appointment_date=date.today(), start_time=time(0, 0))
+    )
+    assert calls == [("cancel", [5])]
+
+
+if __name__ == "__main__":
+    sys.exit(pytest.main(["-q", __file__]))
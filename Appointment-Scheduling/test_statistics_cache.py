@@ -0,0 +1,80 @@
+"""
+Test the shared statistics cache and grouped statistics (no database required; repository calls are faked)
+"""
+import sys
+
+import pytest
+from sqlalchemy import create_engine, text
+from sqlalchemy.orm import Session
+from Appointment_Reminder.Appointment_Reminder_model import AppointmentReminder, ReminderStatusEnum
+from Appointment_Reminder.Appointment_Reminder_repository import AppointmentReminderRepository
+from Appointment_Reminder.Appointment_Reminder_service import AppointmentReminderService
+from statistics_cache import StatisticsCache, WRITTEN_TABLES_KEY, statistics_cache, table_key
+
+
+@pytest.fixture
+def queries(monkeypatch):
+    """Fake grouped reminder counts on an empty cache; returns one entry per query run"""
+    made = []
+
+    def fake_grouped(db):
+        made.append(1)
+        return {ReminderStatusEnum.PENDING: 3, ReminderStatusEnum.SENT: 5}
+
+    monkeypatch.setattr(AppointmentReminderRepository, "count_grouped_by_status", fake_grouped)
+    statistics_cache.clear()
+    yield made
+    statistics_cache.clear()
+
+
+def test_cache_expires_and_invalidates_per_table():
+    cache = StatisticsCache(ttl_seconds=60)
+    calls = []
+    compute = lambda: calls.append(1) or len(calls)
+
+    assert cache.get_or_compute("hms.a", "k", compute) == 1
+    assert cache.get_or_compute("hms.a", "k", compute) == 1
+    cache.invalidate("hms.b")
+    assert cache.get_or_compute("hms.a", "k", compute) == 1
+    cache.invalidate("hms.a")
+    assert cache.get_or_compute("hms.a", "k", compute) == 2
+
+    expired = StatisticsCache(ttl_seconds=0)
+    assert expired.get_or_compute("hms.a", "k", compute) == 3
+    assert expired.get_or_compute("hms.a", "k", compute) == 4
+
+
+def test_reminder_statistics_use_one_grouped_query_until_a_commit_writes_reminders(queries):
+    stats = AppointmentReminderService.get_reminder_statistics(None)
+    AppointmentReminderService.get_reminder_statistics(None)
+    assert queries == [1]
+    assert stats == {"total_reminders": 8, "pending": 3, "sent": 5, "failed": 0, "cancelled": 0}
+
+    # A committed transaction that wrote appointment_reminder drops the cached result
+    db = Session()
+    db.begin()
+    db.info[WRITTEN_TABLES_KEY] = {table_key(AppointmentReminder)}
+    db.commit()
+    AppointmentReminderService.get_reminder_statistics(None)
+    assert queries == [1, 1]
+
+
+def test_savepoint_rollback_keeps_the_outer_writes_tracked(queries):
+    AppointmentReminderService.get_reminder_statistics(None)
+    db = Session(create_engine("sqlite://"))
+    try:
+        db.execute(text("SELECT 1"))
+        db.info[WRITTEN_TABLES_KEY] = {table_key(AppointmentReminder)}
+        with pytest.raises(RuntimeError):
+            with db.begin_nested():
+                raise RuntimeError("listener failed")
+        db.commit()
+    finally:
+        db.close()
+
+    AppointmentReminderService.get_reminder_statistics(None)
+    assert queries == [1, 1]
+
+
+if __name__ == "__main__":
+    sys.exit(pytest.main(["-q", __file__]))
@@ -0,0 +1,149 @@
+"""
+Test waiting-list backfill on freed slots (no database required; repository calls are faked)
+"""
+import logging
+import sys
+from contextlib import contextmanager
+from datetime import date, datetime, time, timedelta
+
+import pytest
+from sqlalchemy.orm import Session
+from Appointment.Appointment_events import emit_slot_freed, on_slot_freed, remove_slot_freed_listener
+from Appointment.Appointment_model import Appointment, AppointmentStatusEnum
+from Appointment.Appointment_repository import AppointmentRepository
+from Appointment.Appointment_service import AppointmentService
+from Appointment_Reminder.Appointment_Reminder_repository import AppointmentReminderRepository
+from Doctor_Slot.Doctor_Slot_repository import DoctorSlotRepository
+from Waiting_List.Waiting_List_repository import WaitingListRepository
+from Waiting_List.Waiting_List_queue import QueuedEntry
+from Waiting_List.Waiting_List_service import WaitingListService, waiting_queues
+
+
+class FakeSession:
+    def __init__(self):
+        self.info = {}
+
+    @contextmanager
+    def begin_nested(self):
+        yield
+
+
+def test_cancel_and_no_show_offer_the_slot_to_the_waiting_list(monkeypatch):
+    tomorrow = date.today() + timedelta(days=1)
+    yesterday = date.today() - timedelta(days=1)
+    appointments = {
+        1: Appointment(appointment_id=1, doctor_id=7, appointment_date=tomorrow,
+                       start_time=time(9, 0), end_time=time(9, 30), status=AppointmentStatusEnum.scheduled),
+        2: Appointment(appointment_id=2, doctor_id=7, appointment_date=yesterday,
+                       start_time=time(9, 0), end_time=time(9, 30), status=AppointmentStatusEnum.scheduled),
+        3: Appointment(appointment_id=3, doctor_id=7, appointment_date=tomorrow,
+                       start_time=time(10, 0), end_time=time(10, 30), status=AppointmentStatusEnum.no_show),
+    }
+    added = datetime.now() - timedelta(days=2)
+    expires = datetime.now() + timedelta(days=5)
+    queued = [
+        QueuedEntry(40, 4, time(8, 0), time(9, 0), added, expires),                  # window ends at 9:00
+        QueuedEntry(41, 5, time(9, 0), time(12, 0), added, expires),                 # taken elsewhere
+        QueuedEntry(42, 6, time(9, 0), time(12, 0), added + timedelta(hours=1), expires),
+    ]
+    loads = []
+    attempts = []
+
+    def fake_load(db, doctor_id, preferred_date, current_time):
+        loads.append((doctor_id, preferred_date))
+        return queued
+
+    def fake_notify(db, waiting_id, current_time):
+        attempts.append(waiting_id)
+        return waiting_id != 41
+
+    monkeypatch.setattr(AppointmentRepository, "get_by_id", lambda db, appointment_id: appointments[appointment_id])
+    monkeypatch.setattr(AppointmentRepository, "update", lambda db, appointment: appointment)
+    monkeypatch.setattr(AppointmentRepository, "release_daily_capacity", lambda db, doctor_id, load_date: None)
+    monkeypatch.setattr(DoctorSlotRepository, "release", lambda db, doctor_id, slot_date, start_time, end_time: 1)
+    monkeypatch.setattr(AppointmentReminderRepository, "cancel_pending_for_appointments", lambda db, ids: 0)
+    monkeypatch.setattr(WaitingListRepository, "get_queue_entries", fake_load)
+    monkeypatch.setattr(WaitingListRepository, "notify_if_active", fake_notify)
+    waiting_queues.clear()
+    try:
+        AppointmentService.cancel_appointment(FakeSession(), 1, cancelled_by=1, reason="")
+        AppointmentService.mark_no_show(FakeSession(), 2)   # already started: nothing to refill
+        AppointmentService.mark_no_show(FakeSession(), 3)   # was not holding a slot
+        # 40 stays queued for a window it fits; nobody waits for the afternoon
+        assert WaitingListService.backfill_freed_slot(FakeSession(), 7, tomorrow, time(8, 0), time(8, 30)) == 40
+        assert WaitingListService.backfill_freed_slot(FakeSession(), 7, tomorrow, time(12, 0), time(12, 30)) is None
+    finally:
+        waiting_queues.clear()
+
+    assert loads == [(7, tomorrow)]
+    assert attempts == [41, 42, 40]
+    assert appointments[1].status == AppointmentStatusEnum.cancelled
+
+
+def test_notified_entry_leaves_the_queue_only_on_commit(monkeypatch):
+    tomorrow = date.today() + timedelta(days=1)
+    added = datetime.now() - timedelta(days=2)
+    expires = datetime.now() + timedelta(days=5)
+    queued = [
+        QueuedEntry(51, 5, time(9, 0), time(12, 0), added, expires),
+        QueuedEntry(52, 6, time(9, 0), time(12, 0), added + timedelta(hours=1), expires),
+    ]
+    skipped = {51}
+
+    def fake_notify(db, waiting_id, current_time):
+        # 51 is held by another transaction the first time round: still ACTIVE, just skipped
+        if waiting_id in skipped:
+            skipped.discard(waiting_id)
+            return False
+        return True
+
+    monkeypatch.setattr(WaitingListRepository, "get_queue_entries", lambda db, doctor_id, preferred_date, current_time: queued)
+    monkeypatch.setattr(WaitingListRepository, "notify_if_active", fake_notify)
+    waiting_queues.clear()
+    db = Session()
+    try:
+        db.begin()
+        assert WaitingListService.backfill_freed_slot(db, 7, tomorrow, time(9, 0), time(9, 30)) == 52
+        db.rollback()
+
+        # Rolled back: 52 was never notified and the skipped 51 is still first in line
+        db.begin()
+        assert WaitingListService.backfill_freed_slot(db, 7, tomorrow, time(9, 0), time(9, 30)) == 51
+        db.commit()
+
+        db.begin()
+        assert WaitingListService.backfill_freed_slot(db, 7, tomorrow, time(9, 0), time(9, 30)) == 52
+        db.commit()
+
+        assert WaitingListService.backfill_freed_slot(db, 7, tomorrow, time(9, 0), time(9, 30)) is None
+    finally:
+        db.close()
+        waiting_queues.clear()
+
+
+def test_failing_listener_is_logged_and_skipped(caplog):
+    calls = []
+
+    def broken(db, doctor_id, slot_date, start_time, end_time):
+        raise RuntimeError("queue unavailable")
+
+    def working(db, doctor_id, slot_date, start_time, end_time):
+        calls.append(doctor_id)
+
+    on_slot_freed(broken)
+    on_slot_freed(working)
+    # The waiting-list backfill is registered too; it fails on the fake session and is logged the same way
+    try:
+        with caplog.at_level(logging.ERROR, logger="Appointment.Appointment_events"):
+            emit_slot_freed(FakeSession(), 7, date.today(), time(9, 0), time(9, 30))
+    finally:
+        remove_slot_freed_listener(broken)
+        remove_slot_freed_listener(working)
+
+    assert calls == [7]
+    [record] = [record for record in caplog.records if "broken" in record.getMessage()]
+    assert record.exc_info[0] is RuntimeError
+
+
+if __name__ == "__main__":
+    sys.exit(pytest.main(["-q", __file__]))
@@ -0,0 +1,47 @@
+"""
+Test batched waiting-list expiry (no database required; repository calls are faked)
+"""
+import sys
+
+import pytest
+from Waiting_List.Waiting_List_repository import WaitingListRepository
+from Waiting_List.Waiting_List_service import WaitingListService
+
+
+def test_expiry_runs_in_bounded_batches_until_drained(monkeypatch):
+    overdue = [2500]
+    batches = []
+
+    def fake_expire(db, current_time, batch_size):
+        count = min(batch_size, overdue[0])
+        overdue[0] -= count
+        batches.append(count)
+        return count
+
+    monkeypatch.setattr(WaitingListRepository, "expire_due_batch", fake_expire)
+
+    result = WaitingListService.expire_old_entries(None, batch_size=1000)
+    assert result["expired"] == 2500
+    assert result["batches"] == 3
+    assert batches == [1000, 1000, 500, 0]
+
+    overdue[0] = 5000
+    batches.clear()
+    limited = WaitingListService.expire_old_entries(None, batch_size=1000, max_batches=2)
+    assert limited["expired"] == 2000
+    assert batches == [1000, 1000]
+
+
+def test_expiry_keeps_going_after_a_batch_shortened_by_locked_rows(monkeypatch):
+    # SKIP LOCKED passes over rows another transaction holds, so a batch can come back short
+    counts = iter([1000, 400, 1000, 300, 0])
+    monkeypatch.setattr(WaitingListRepository, "expire_due_batch", lambda db, current_time, batch_size: next(counts))
+
+    result = WaitingListService.expire_old_entries(None, batch_size=1000)
+
+    assert result["expired"] == 2700
+    assert result["batches"] == 4
+
+
+if __name__ == "__main__":
+    sys.exit(pytest.main(["-q", __file__]))
@@ -0,0 +1,141 @@
+"""
+Test the waiting-list priority queue (no database required; repository calls are faked)
+"""
+import sys
+from datetime import date, datetime, time, timedelta
+
+import pytest
+from sqlalchemy.dialects import postgresql
+from Waiting_List.Waiting_List_model import WaitingList
+from Waiting_List.Waiting_List_queue import QueuedEntry, WaitingQueue, WaitingQueueRegistry
+from Waiting_List.Waiting_List_repository import WaitingListRepository
+from Waiting_List.Waiting_List_service import WaitingListService
+from pagination import MAX_PAGE_SIZE
+
+
+NOW = datetime(2026, 5, 4, 12, 0)
+
+
+def entry(waiting_id, hours_waiting, urgency=0, no_shows=0):
+    return QueuedEntry(
+        waiting_id, waiting_id, time(9, 0), time(12, 0),
+        NOW - timedelta(hours=hours_waiting), NOW + timedelta(days=7), urgency, no_shows
+    )
+
+
+class RecordingQuery:
+    """Stands in for db.query(...): records the query built and returns no rows"""
+
+    def __init__(self, *entities):
+        self.statement_entities = entities
+        self.clauses = []
+
+    def filter(self, *criteria):
+        self.clauses.extend(criteria)
+        return self
+
+    def order_by(self, *columns):
+        self.ordering = columns
+        return self
+
+    def limit(self, limit):
+        self.limit_value = limit
+        return self
+
+    def all(self):
+        return []
+
+
+class FakeSession:
+    def __init__(self):
+        self.info = {}
+        self.queries = []
+
+    def query(self, *entities):
+        query = RecordingQuery(*entities)
+        self.queries.append(query)
+        return query
+
+
+def test_priority_weighs_wait_urgency_and_no_shows():
+    queue = WaitingQueue([
+        entry(1, hours_waiting=30),
+        entry(2, hours_waiting=10, urgency=1),              # 10 + 24 beats 30
+        entry(3, hours_waiting=90, no_shows=1),             # 90 - 48 beats 34
+        entry(4, hours_waiting=5),
+    ])
+    assert [e.waiting_id for e in queue.ordered()] == [3, 2, 1, 4]
+    assert queue.peek().waiting_id == 3
+    assert [e.waiting_id for e in queue.top(2)] == [3, 2]
+    assert len(queue) == 4
+
+
+def test_remove_and_pop_first_skip_without_losing_entries():
+    queue = WaitingQueue([entry(1, 30), entry(2, 20), entry(3, 10)])
+    assert queue.remove(1)
+    assert not queue.remove(1)
+    assert queue.first(lambda e: e.waiting_id == 3).waiting_id == 3
+    assert len(queue) == 2
+    assert queue.pop_first(lambda e: e.waiting_id == 3).waiting_id == 3
+    assert queue.pop().waiting_id == 2
+    assert queue.pop() is None
+
+
+def test_a_load_overlapping_a_discard_is_not_cached():
+    day = date.today() + timedelta(days=1)
+    loads = []
+
+    def loader(db, doctor_id, preferred_date):
+        loads.append(preferred_date)
+        if len(loads) == 1:
+            # Another request marks entry 1 notified while this load is running
+            registry.discard(doctor_id, preferred_date, 1)
+        return [entry(1, 30), entry(2, 20)]
+
+    registry = WaitingQueueRegistry(loader)
+    assert registry.first(None, 7, day, lambda e: True).waiting_id == 1
+    assert registry.first(None, 7, day, lambda e: True).waiting_id == 1
+    assert registry.first(None, 7, day, lambda e: True).waiting_id == 1
+    assert len(loads) == 2
+
+
+def test_statistics_list_next_entries_from_the_database(monkeypatch):
+    day_one = date.today() + timedelta(days=1)
+    rows = [
+        (WaitingList(waiting_id=2, patient_id=5, preferred_date=day_one, preferred_time_start=time(9, 0),
+                     preferred_time_end=time(12, 0), urgency=1, added_at=NOW, expires_at=NOW + timedelta(days=7)),
+         1, 12.3456),
+    ]
+    requested = []
+
+    def fake_next_by_priority(db, doctor_id, from_date, current_time, limit):
+        requested.append((doctor_id, from_date, limit))
+        return rows
+
+    monkeypatch.setattr(WaitingListRepository, "get_statistics_by_doctor", lambda db, doctor_id: {"active": 1})
+    monkeypatch.setattr(WaitingListRepository, "get_next_by_priority", fake_next_by_priority)
+
+    statistics = WaitingListService.get_waiting_statistics(None, 7)
+
+    assert requested == [(7, date.today(), 5)]
+    [next_entry] = statistics["next_entries"]
+    assert next_entry["waiting_id"] == 2
+    assert next_entry["no_show_count"] == 1
+    assert next_entry["priority"] == 12.35
+
+
+def test_priority_entries_are_read_in_queue_order_from_the_database():
+    db = FakeSession()
+
+    WaitingListService.get_priority_entries(db, 7, "2026-05-05", limit=MAX_PAGE_SIZE + 1)
+
+    [query] = db.queries
+    assert query.statement_entities[0] is WaitingList
+    ordering = [str(column.compile(dialect=postgresql.dialect())) for column in query.ordering]
+    assert ordering[0].endswith("DESC") and "EXTRACT(epoch FROM" in ordering[0]
+    assert ordering[1:] == ["hms.waiting_list.added_at", "hms.waiting_list.waiting_id"]
+    assert query.limit_value == MAX_PAGE_SIZE
+
+
+if __name__ == "__main__":
+    sys.exit(pytest.main(["-q", __file__]))
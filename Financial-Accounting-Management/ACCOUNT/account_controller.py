@@ -1,7 +1,9 @@
-from fastapi import APIRouter, Depends, HTTPException, status
+from typing import Optional
+from fastapi import APIRouter, Depends, HTTPException, Query, status
 from sqlalchemy.orm import Session
 from database import get_db
 from ACCOUNT.account_service import AccountService
+from pagination import DEFAULT_PAGE_SIZE, MAX_PAGE_SIZE, InvalidCursorException
 
 router = APIRouter(prefix="/accounts", tags=["Accounts"])
 
@@ -22,23 +24,53 @@ def get_account(account_id: int, db: Session = Depends(get_db)):
 
 
 @router.get("/")
-def list_accounts(db: Session = Depends(get_db)):
-    return AccountService.list_accounts(db)
+def list_accounts(
+    cursor: Optional[str] = Query(None, description="next_cursor of the previous page"),
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+    db: Session = Depends(get_db)
+):
+    try:
+        return AccountService.list_accounts(db, cursor, limit).as_response("accounts")
+    except InvalidCursorException as e:
+        raise HTTPException(status_code=400, detail=str(e))
 
 
 @router.get("/active")
-def list_active_accounts(db: Session = Depends(get_db)):
-    return AccountService.list_active_accounts(db)
+def list_active_accounts(
+    cursor: Optional[str] = Query(None, description="next_cursor of the previous page"),
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+    db: Session = Depends(get_db)
+):
+    try:
+        return AccountService.list_active_accounts(db, cursor, limit).as_response("accounts")
+    except InvalidCursorException as e:
+        raise HTTPException(status_code=400, detail=str(e))
 
 
 @router.get("/type/{account_type}")
-def list_accounts_by_type(account_type: str, db: Session = Depends(get_db)):
-    return AccountService.list_accounts_by_type(db, account_type)
+def list_accounts_by_type(
+    account_type: str,
+    cursor: Optional[str] = Query(None, description="next_cursor of the previous page"),
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+    db: Session = Depends(get_db)
+):
+    try:
+        return AccountService.list_accounts_by_type(db, account_type, cursor, limit).as_response("accounts")
+    except InvalidCursorException as e:
+        raise HTTPException(status_code=400, detail=str(e))
 
 
 @router.get("/children/{parent_account_id}")
-def list_child_accounts(parent_account_id: int, db: Session = Depends(get_db)):
-    return AccountService.list_child_accounts(db, parent_account_id)
+def list_child_accounts(
+    parent_account_id: int,
+    cursor: Optional[str] = Query(None, description="next_cursor of the previous page"),
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+    db: Session = Depends(get_db)
+):
+    try:
+        return AccountService.list_child_accounts(db, parent_account_id, cursor, limit).as_response("accounts")
+    except InvalidCursorException as e:
+        raise HTTPException(status_code=400, detail=str(e))
 
 
 @router.put("/{account_id}")
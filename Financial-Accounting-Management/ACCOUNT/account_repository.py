@@ -1,6 +1,7 @@
 from sqlalchemy.orm import Session
 from typing import List, Optional
 from ACCOUNT.account_model import Account  # Adjust import path if needed
+from pagination import DEFAULT_PAGE_SIZE, Page, paginate
 
 
 class AccountRepository:
@@ -9,20 +10,27 @@ class AccountRepository:
         return db.query(Account).filter(Account.account_id == account_id).first()
 
     @staticmethod
-    def get_all(db: Session) -> List[Account]:
-        return db.query(Account).all()
+    def get_all(db: Session, cursor: Optional[str] = None, limit: int = DEFAULT_PAGE_SIZE) -> Page:
+        return paginate(db.query(Account), [Account.account_id], cursor, limit)
 
     @staticmethod
-    def get_active_accounts(db: Session) -> List[Account]:
-        return db.query(Account).filter(Account.is_active == True).all()
+    def get_active_accounts(db: Session, cursor: Optional[str] = None, limit: int = DEFAULT_PAGE_SIZE) -> Page:
+        query = db.query(Account).filter(Account.is_active == True)
+        return paginate(query, [Account.account_id], cursor, limit)
 
     @staticmethod
-    def get_by_type(db: Session, account_type: str) -> List[Account]:
-        return db.query(Account).filter(Account.account_type == account_type).all()
+    def get_by_type(
+        db: Session, account_type: str, cursor: Optional[str] = None, limit: int = DEFAULT_PAGE_SIZE
+    ) -> Page:
+        query = db.query(Account).filter(Account.account_type == account_type)
+        return paginate(query, [Account.account_id], cursor, limit)
 
     @staticmethod
-    def get_children(db: Session, parent_account_id: int) -> List[Account]:
-        return db.query(Account).filter(Account.parent_account_id == parent_account_id).all()
+    def get_children(
+        db: Session, parent_account_id: int, cursor: Optional[str] = None, limit: int = DEFAULT_PAGE_SIZE
+    ) -> Page:
+        query = db.query(Account).filter(Account.parent_account_id == parent_account_id)
+        return paginate(query, [Account.account_id], cursor, limit)
 
     @staticmethod
     def create(db: Session, account: Account) -> Account:
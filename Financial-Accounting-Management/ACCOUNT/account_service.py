@@ -2,6 +2,7 @@ from typing import List, Optional, Dict
 from sqlalchemy.orm import Session
 from ACCOUNT.account_model import Account
 from ACCOUNT.account_repository import AccountRepository
+from pagination import DEFAULT_PAGE_SIZE, Page
 
 
 class AccountService:
@@ -13,20 +14,28 @@ class AccountService:
         return account
 
     @staticmethod
-    def list_accounts(db: Session) -> List[Account]:
-        return AccountRepository.get_all(db)
+    def list_accounts(
+        db: Session, cursor: Optional[str] = None, limit: int = DEFAULT_PAGE_SIZE
+    ) -> Page:
+        return AccountRepository.get_all(db, cursor, limit)
 
     @staticmethod
-    def list_active_accounts(db: Session) -> List[Account]:
-        return AccountRepository.get_active_accounts(db)
+    def list_active_accounts(
+        db: Session, cursor: Optional[str] = None, limit: int = DEFAULT_PAGE_SIZE
+    ) -> Page:
+        return AccountRepository.get_active_accounts(db, cursor, limit)
 
     @staticmethod
-    def list_accounts_by_type(db: Session, account_type: str) -> List[Account]:
-        return AccountRepository.get_by_type(db, account_type)
+    def list_accounts_by_type(
+        db: Session, account_type: str, cursor: Optional[str] = None, limit: int = DEFAULT_PAGE_SIZE
+    ) -> Page:
+        return AccountRepository.get_by_type(db, account_type, cursor, limit)
 
     @staticmethod
-    def list_child_accounts(db: Session, parent_account_id: int) -> List[Account]:
-        return AccountRepository.get_children(db, parent_account_id)
+    def list_child_accounts(
+        db: Session, parent_account_id: int, cursor: Optional[str] = None, limit: int = DEFAULT_PAGE_SIZE
+    ) -> Page:
+        return AccountRepository.get_children(db, parent_account_id, cursor, limit)
 
     @staticmethod
     def create_account(db: Session, data: dict) -> Account:
@@ -1,8 +1,10 @@
-from fastapi import APIRouter, Depends, HTTPException, status
+from typing import Optional
+from fastapi import APIRouter, Depends, HTTPException, Query, status
 from sqlalchemy.orm import Session
 from datetime import date
 from database import get_db
 from BILL.bill_service import BillService
+from pagination import DEFAULT_PAGE_SIZE, MAX_PAGE_SIZE, InvalidCursorException
 
 router = APIRouter(prefix="/bills", tags=["Bills"])
 
@@ -23,27 +25,55 @@ def get_bill(bill_id: int, db: Session = Depends(get_db)):
 
 
 @router.get("/")
-def list_all_bills(db: Session = Depends(get_db)):
-    return BillService.list_all_bills(db)
+def list_all_bills(
+    cursor: Optional[str] = Query(None, description="next_cursor of the previous page"),
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+    db: Session = Depends(get_db)
+):
+    try:
+        return BillService.list_all_bills(db, cursor, limit).as_response("bills")
+    except InvalidCursorException as e:
+        raise HTTPException(status_code=400, detail=str(e))
 
 
 @router.get("/vendor/{vendor_id}")
-def list_bills_by_vendor(vendor_id: int, db: Session = Depends(get_db)):
-    return BillService.list_bills_by_vendor(db, vendor_id)
+def list_bills_by_vendor(
+    vendor_id: int,
+    cursor: Optional[str] = Query(None, description="next_cursor of the previous page"),
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+    db: Session = Depends(get_db)
+):
+    try:
+        return BillService.list_bills_by_vendor(db, vendor_id, cursor, limit).as_response("bills")
+    except InvalidCursorException as e:
+        raise HTTPException(status_code=400, detail=str(e))
 
 
 @router.get("/status/{status}")
-def list_bills_by_status(status: str, db: Session = Depends(get_db)):
-    return BillService.list_bills_by_status(db, status)
+def list_bills_by_status(
+    status: str,
+    cursor: Optional[str] = Query(None, description="next_cursor of the previous page"),
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+    db: Session = Depends(get_db)
+):
+    try:
+        return BillService.list_bills_by_status(db, status, cursor, limit).as_response("bills")
+    except InvalidCursorException as e:
+        raise HTTPException(status_code=400, detail=str(e))
 
 
 @router.get("/date-range/")
 def list_bills_by_date_range(
     start_date: date,
     end_date: date,
+    cursor: Optional[str] = Query(None, description="next_cursor of the previous page"),
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
     db: Session = Depends(get_db)
 ):
-    return BillService.list_bills_by_date_range(db, start_date, end_date)
+    try:
+        return BillService.list_bills_by_date_range(db, start_date, end_date, cursor, limit).as_response("bills")
+    except InvalidCursorException as e:
+        raise HTTPException(status_code=400, detail=str(e))
 
 
 @router.put("/{bill_id}")
@@ -2,6 +2,7 @@ from sqlalchemy.orm import Session
 from typing import List, Optional
 from datetime import date
 from BILL.bill_model import Bill
+from pagination import DEFAULT_PAGE_SIZE, Page, paginate
 
 
 class BillRepository:
@@ -11,24 +12,32 @@ class BillRepository:
         return db.query(Bill).filter(Bill.bill_id == bill_id).first()
 
     @staticmethod
-    def get_all(db: Session) -> List[Bill]:
-        return db.query(Bill).all()
+    def get_all(db: Session, cursor: Optional[str] = None, limit: int = DEFAULT_PAGE_SIZE) -> Page:
+        return paginate(db.query(Bill), [Bill.bill_id], cursor, limit)
 
     @staticmethod
-    def get_by_vendor(db: Session, vendor_id: int) -> List[Bill]:
-        return db.query(Bill).filter(Bill.vendor_id == vendor_id).all()
+    def get_by_vendor(
+        db: Session, vendor_id: int, cursor: Optional[str] = None, limit: int = DEFAULT_PAGE_SIZE
+    ) -> Page:
+        query = db.query(Bill).filter(Bill.vendor_id == vendor_id)
+        return paginate(query, [Bill.bill_id], cursor, limit)
 
     @staticmethod
-    def get_by_status(db: Session, status: str) -> List[Bill]:
-        return db.query(Bill).filter(Bill.status == status).all()
+    def get_by_status(
+        db: Session, status: str, cursor: Optional[str] = None, limit: int = DEFAULT_PAGE_SIZE
+    ) -> Page:
+        query = db.query(Bill).filter(Bill.status == status)
+        return paginate(query, [Bill.bill_id], cursor, limit)
 
     @staticmethod
     def get_by_date_range(
-        db: Session, start_date: date, end_date: date
-    ) -> List[Bill]:
-        return db.query(Bill).filter(
+        db: Session, start_date: date, end_date: date,
+        cursor: Optional[str] = None, limit: int = DEFAULT_PAGE_SIZE
+    ) -> Page:
+        query = db.query(Bill).filter(
             Bill.bill_date.between(start_date, end_date)
-        ).all()
+        )
+        return paginate(query, [Bill.bill_id], cursor, limit)
 
     @staticmethod
     def create(db: Session, bill: Bill) -> Bill:
@@ -3,6 +3,7 @@ from sqlalchemy.orm import Session
 from datetime import date
 from BILL.bill_model import Bill
 from BILL.bill_repository import BillRepository
+from pagination import DEFAULT_PAGE_SIZE, Page
 
 
 class BillService:
@@ -14,22 +15,29 @@ class BillService:
         return bill
 
     @staticmethod
-    def list_all_bills(db: Session) -> List[Bill]:
-        return BillRepository.get_all(db)
+    def list_all_bills(
+        db: Session, cursor: Optional[str] = None, limit: int = DEFAULT_PAGE_SIZE
+    ) -> Page:
+        return BillRepository.get_all(db, cursor, limit)
 
     @staticmethod
-    def list_bills_by_vendor(db: Session, vendor_id: int) -> List[Bill]:
-        return BillRepository.get_by_vendor(db, vendor_id)
+    def list_bills_by_vendor(
+        db: Session, vendor_id: int, cursor: Optional[str] = None, limit: int = DEFAULT_PAGE_SIZE
+    ) -> Page:
+        return BillRepository.get_by_vendor(db, vendor_id, cursor, limit)
 
     @staticmethod
-    def list_bills_by_status(db: Session, status: str) -> List[Bill]:
-        return BillRepository.get_by_status(db, status)
+    def list_bills_by_status(
+        db: Session, status: str, cursor: Optional[str] = None, limit: int = DEFAULT_PAGE_SIZE
+    ) -> Page:
+        return BillRepository.get_by_status(db, status, cursor, limit)
 
     @staticmethod
     def list_bills_by_date_range(
-        db: Session, start_date: date, end_date: date
-    ) -> List[Bill]:
-        return BillRepository.get_by_date_range(db, start_date, end_date)
+        db: Session, start_date: date, end_date: date,
+        cursor: Optional[str] = None, limit: int = DEFAULT_PAGE_SIZE
+    ) -> Page:
+        return BillRepository.get_by_date_range(db, start_date, end_date, cursor, limit)
 
     @staticmethod
     def create_bill(db: Session, data: dict) -> Bill:
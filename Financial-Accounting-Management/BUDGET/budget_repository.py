@@ -1,5 +1,6 @@
 from sqlalchemy.orm import Session
 from BUDGET.budget_model import Budget
+from pagination import DEFAULT_PAGE_SIZE, Page, paginate
 
 class BudgetRepository:
 
@@ -15,8 +16,8 @@ class BudgetRepository:
         ).first()
 
     @staticmethod
-    def get_all(db: Session):
-        return db.query(Budget).all()
+    def get_all(db: Session, cursor=None, limit: int = DEFAULT_PAGE_SIZE):
+        return paginate(db.query(Budget), [Budget.budget_id], cursor, limit)
 
     @staticmethod
     def create(db: Session, budget: Budget):
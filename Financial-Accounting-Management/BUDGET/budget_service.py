@@ -1,4 +1,5 @@
 from sqlalchemy.orm import Session
+from pagination import DEFAULT_PAGE_SIZE
 
 from BUDGET.budget_model import Budget
 from BUDGET.budget_repository import BudgetRepository
@@ -27,8 +28,8 @@ class BudgetService:
         return budget
 
     @staticmethod
-    def list_budgets(db: Session):
-        return BudgetRepository.get_all(db)
+    def list_budgets(db: Session, cursor=None, limit: int = DEFAULT_PAGE_SIZE):
+        return BudgetRepository.get_all(db, cursor, limit)
 
     @staticmethod
     def update_budget(db: Session, budget_id: int, data: dict):
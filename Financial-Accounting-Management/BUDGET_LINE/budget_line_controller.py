@@ -1,7 +1,9 @@
-from fastapi import APIRouter, Depends, HTTPException
+from typing import Optional
+from fastapi import APIRouter, Depends, HTTPException, Query
 from sqlalchemy.orm import Session
 from BUDGET_LINE.database import get_db
 from BUDGET_LINE.budget_line_service import BudgetLineService
+from pagination import DEFAULT_PAGE_SIZE, MAX_PAGE_SIZE, InvalidCursorException
 
 
 router = APIRouter()
@@ -23,8 +25,15 @@ def get_budget_line(budget_line_id: int, db: Session = Depends(get_db)):
 
 
 @router.get("/")
-def list_budget_lines(db: Session = Depends(get_db)):
-    return BudgetLineService.list_budget_lines(db)
+def list_budget_lines(
+    cursor: Optional[str] = Query(None, description="next_cursor of the previous page"),
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+    db: Session = Depends(get_db)
+):
+    try:
+        return BudgetLineService.list_budget_lines(db, cursor, limit).as_response("budget_lines")
+    except InvalidCursorException as e:
+        raise HTTPException(status_code=400, detail=str(e))
 
 
 @router.put("/{budget_line_id}")
@@ -1,6 +1,7 @@
 from sqlalchemy.orm import Session
 from sqlalchemy import func
 from .budget_line_model import BudgetLine
+from pagination import DEFAULT_PAGE_SIZE, Page, paginate
 
 class BudgetLineRepository:
 
@@ -26,8 +27,8 @@ class BudgetLineRepository:
         return total
 
     @staticmethod
-    def get_all(db: Session):
-        return db.query(BudgetLine).all()
+    def get_all(db: Session, cursor=None, limit: int = DEFAULT_PAGE_SIZE):
+        return paginate(db.query(BudgetLine), [BudgetLine.budget_line_id], cursor, limit)
 
     @staticmethod
     def create(db: Session, line: BudgetLine):
@@ -1,4 +1,5 @@
 from sqlalchemy.orm import Session
+from pagination import DEFAULT_PAGE_SIZE
 
 from BUDGET_LINE.budget_line_model import BudgetLine
 from BUDGET_LINE.budget_line_repository import BudgetLineRepository
@@ -28,8 +29,8 @@ class BudgetLineService:
         return line
 
     @staticmethod
-    def list_budget_lines(db: Session):
-        return BudgetLineRepository.get_all(db)
+    def list_budget_lines(db: Session, cursor=None, limit: int = DEFAULT_PAGE_SIZE):
+        return BudgetLineRepository.get_all(db, cursor, limit)
 
     @staticmethod
     def update_budget_line(db: Session, budget_line_id: int, data: dict):
@@ -1,10 +1,12 @@
 # EXPENSE/expense_controller.py
 
-from fastapi import APIRouter, Depends, HTTPException, status
+from typing import Optional
+from fastapi import APIRouter, Depends, HTTPException, Query, status
 from sqlalchemy.orm import Session
 from datetime import date
 from database import get_db
 from EXPENSE.expense_service import ExpenseService
+from pagination import DEFAULT_PAGE_SIZE, MAX_PAGE_SIZE, InvalidCursorException
 
 router = APIRouter(prefix="/expenses", tags=["Expenses"])
 
@@ -25,27 +27,55 @@ def get_expense(expense_id: int, db: Session = Depends(get_db)):
 
 
 @router.get("/")
-def list_all_expenses(db: Session = Depends(get_db)):
-    return ExpenseService.list_all_expenses(db)
+def list_all_expenses(
+    cursor: Optional[str] = Query(None, description="next_cursor of the previous page"),
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+    db: Session = Depends(get_db)
+):
+    try:
+        return ExpenseService.list_all_expenses(db, cursor, limit).as_response("expenses")
+    except InvalidCursorException as e:
+        raise HTTPException(status_code=400, detail=str(e))
 
 
 @router.get("/account/{account_id}")
-def list_expenses_by_account(account_id: int, db: Session = Depends(get_db)):
-    return ExpenseService.list_expenses_by_account(db, account_id)
+def list_expenses_by_account(
+    account_id: int,
+    cursor: Optional[str] = Query(None, description="next_cursor of the previous page"),
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+    db: Session = Depends(get_db)
+):
+    try:
+        return ExpenseService.list_expenses_by_account(db, account_id, cursor, limit).as_response("expenses")
+    except InvalidCursorException as e:
+        raise HTTPException(status_code=400, detail=str(e))
 
 
 @router.get("/department/{department}")
-def list_expenses_by_department(department: str, db: Session = Depends(get_db)):
-    return ExpenseService.list_expenses_by_department(db, department)
+def list_expenses_by_department(
+    department: str,
+    cursor: Optional[str] = Query(None, description="next_cursor of the previous page"),
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+    db: Session = Depends(get_db)
+):
+    try:
+        return ExpenseService.list_expenses_by_department(db, department, cursor, limit).as_response("expenses")
+    except InvalidCursorException as e:
+        raise HTTPException(status_code=400, detail=str(e))
 
 
 @router.get("/date-range/")
 def list_expenses_by_date_range(
     start_date: date,
     end_date: date,
+    cursor: Optional[str] = Query(None, description="next_cursor of the previous page"),
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
     db: Session = Depends(get_db)
 ):
-    return ExpenseService.list_expenses_by_date_range(db, start_date, end_date)
+    try:
+        return ExpenseService.list_expenses_by_date_range(db, start_date, end_date, cursor, limit).as_response("expenses")
+    except InvalidCursorException as e:
+        raise HTTPException(status_code=400, detail=str(e))
 
 
 @router.put("/{expense_id}")
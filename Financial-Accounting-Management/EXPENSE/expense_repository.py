@@ -2,6 +2,7 @@ from sqlalchemy.orm import Session
 from typing import List, Optional
 from datetime import date
 from EXPENSE.expense_model import Expense
+from pagination import DEFAULT_PAGE_SIZE, Page, paginate
 
 
 class ExpenseRepository:
@@ -10,22 +11,32 @@ class ExpenseRepository:
         return db.query(Expense).filter(Expense.expense_id == expense_id).first()
 
     @staticmethod
-    def get_all(db: Session) -> List[Expense]:
-        return db.query(Expense).all()
+    def get_all(db: Session, cursor: Optional[str] = None, limit: int = DEFAULT_PAGE_SIZE) -> Page:
+        return paginate(db.query(Expense), [Expense.expense_id], cursor, limit)
 
     @staticmethod
-    def get_by_account(db: Session, account_id: int) -> List[Expense]:
-        return db.query(Expense).filter(Expense.account_id == account_id).all()
+    def get_by_account(
+        db: Session, account_id: int, cursor: Optional[str] = None, limit: int = DEFAULT_PAGE_SIZE
+    ) -> Page:
+        query = db.query(Expense).filter(Expense.account_id == account_id)
+        return paginate(query, [Expense.expense_id], cursor, limit)
 
     @staticmethod
-    def get_by_department(db: Session, department: str) -> List[Expense]:
-        return db.query(Expense).filter(Expense.department == department).all()
+    def get_by_department(
+        db: Session, department: str, cursor: Optional[str] = None, limit: int = DEFAULT_PAGE_SIZE
+    ) -> Page:
+        query = db.query(Expense).filter(Expense.department == department)
+        return paginate(query, [Expense.expense_id], cursor, limit)
 
     @staticmethod
-    def get_by_date_range(db: Session, start_date: date, end_date: date) -> List[Expense]:
-        return db.query(Expense).filter(
+    def get_by_date_range(
+        db: Session, start_date: date, end_date: date,
+        cursor: Optional[str] = None, limit: int = DEFAULT_PAGE_SIZE
+    ) -> Page:
+        query = db.query(Expense).filter(
             Expense.expense_date.between(start_date, end_date)
-        ).all()
+        )
+        return paginate(query, [Expense.expense_id], cursor, limit)
 
     @staticmethod
     def create(db: Session, expense: Expense) -> Expense:
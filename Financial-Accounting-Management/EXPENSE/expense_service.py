@@ -3,6 +3,7 @@ from sqlalchemy.orm import Session
 from datetime import date
 from EXPENSE.expense_model import Expense
 from EXPENSE.expense_repository import ExpenseRepository
+from pagination import DEFAULT_PAGE_SIZE, Page
 
 
 class ExpenseService:
@@ -14,22 +15,29 @@ class ExpenseService:
         return expense
 
     @staticmethod
-    def list_all_expenses(db: Session) -> List[Expense]:
-        return ExpenseRepository.get_all(db)
+    def list_all_expenses(
+        db: Session, cursor: Optional[str] = None, limit: int = DEFAULT_PAGE_SIZE
+    ) -> Page:
+        return ExpenseRepository.get_all(db, cursor, limit)
 
     @staticmethod
-    def list_expenses_by_account(db: Session, account_id: int) -> List[Expense]:
-        return ExpenseRepository.get_by_account(db, account_id)
+    def list_expenses_by_account(
+        db: Session, account_id: int, cursor: Optional[str] = None, limit: int = DEFAULT_PAGE_SIZE
+    ) -> Page:
+        return ExpenseRepository.get_by_account(db, account_id, cursor, limit)
 
     @staticmethod
-    def list_expenses_by_department(db: Session, department: str) -> List[Expense]:
-        return ExpenseRepository.get_by_department(db, department)
+    def list_expenses_by_department(
+        db: Session, department: str, cursor: Optional[str] = None, limit: int = DEFAULT_PAGE_SIZE
+    ) -> Page:
+        return ExpenseRepository.get_by_department(db, department, cursor, limit)
 
     @staticmethod
     def list_expenses_by_date_range(
-        db: Session, start_date: date, end_date: date
-    ) -> List[Expense]:
-        return ExpenseRepository.get_by_date_range(db, start_date, end_date)
+        db: Session, start_date: date, end_date: date,
+        cursor: Optional[str] = None, limit: int = DEFAULT_PAGE_SIZE
+    ) -> Page:
+        return ExpenseRepository.get_by_date_range(db, start_date, end_date, cursor, limit)
 
     @staticmethod
     def create_expense(db: Session, data: dict) -> Expense:
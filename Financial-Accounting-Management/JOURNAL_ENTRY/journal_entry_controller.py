@@ -1,7 +1,9 @@
-from fastapi import APIRouter, Depends, HTTPException
+from typing import Optional
+from fastapi import APIRouter, Depends, HTTPException, Query
 from sqlalchemy.orm import Session
 from JOURNAL_ENTRY.database import get_db
 from JOURNAL_ENTRY.journal_entry_service import JournalEntryService
+from pagination import DEFAULT_PAGE_SIZE, MAX_PAGE_SIZE, InvalidCursorException
 
 router = APIRouter()
 
@@ -22,8 +24,15 @@ def get_journal_entry(journal_id: int, db: Session = Depends(get_db)):
 
 
 @router.get("/")
-def list_journal_entries(db: Session = Depends(get_db)):
-    return JournalEntryService.list_journal_entries(db)
+def list_journal_entries(
+    cursor: Optional[str] = Query(None, description="next_cursor of the previous page"),
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+    db: Session = Depends(get_db)
+):
+    try:
+        return JournalEntryService.list_journal_entries(db, cursor, limit).as_response("journal_entries")
+    except InvalidCursorException as e:
+        raise HTTPException(status_code=400, detail=str(e))
 
 
 @router.put("/{journal_id}")
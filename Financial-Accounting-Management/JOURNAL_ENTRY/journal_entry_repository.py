@@ -1,5 +1,6 @@
 from sqlalchemy.orm import Session
 from JOURNAL_ENTRY.journal_entry_model import JournalEntry
+from pagination import DEFAULT_PAGE_SIZE, Page, paginate
 
 class JournalEntryRepository:
 
@@ -8,8 +9,8 @@ class JournalEntryRepository:
         return db.query(JournalEntry).filter(JournalEntry.journal_id == journal_id).first()
 
     @staticmethod
-    def get_all(db: Session):
-        return db.query(JournalEntry).all()
+    def get_all(db: Session, cursor=None, limit: int = DEFAULT_PAGE_SIZE):
+        return paginate(db.query(JournalEntry), [JournalEntry.journal_id], cursor, limit)
 
     @staticmethod
     def create(db: Session, journal: JournalEntry):
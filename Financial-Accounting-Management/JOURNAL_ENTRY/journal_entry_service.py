@@ -1,4 +1,5 @@
 from sqlalchemy.orm import Session
+from pagination import DEFAULT_PAGE_SIZE
 from JOURNAL_ENTRY.journal_entry_model import JournalEntry
 from JOURNAL_ENTRY.journal_entry_repository import JournalEntryRepository
 from JOURNAL_LINE.journal_line_repository import JournalLineRepository
@@ -20,8 +21,8 @@ class JournalEntryService:
         return journal
 
     @staticmethod
-    def list_journal_entries(db: Session):
-        return JournalEntryRepository.get_all(db)
+    def list_journal_entries(db: Session, cursor=None, limit: int = DEFAULT_PAGE_SIZE):
+        return JournalEntryRepository.get_all(db, cursor, limit)
 
     @staticmethod
     def update_journal_entry(db: Session, journal_id: int, data: dict):
@@ -1,7 +1,9 @@
-from fastapi import APIRouter, Depends, HTTPException
+from typing import Optional
+from fastapi import APIRouter, Depends, HTTPException, Query
 from sqlalchemy.orm import Session
 from JOURNAL_LINE.database import get_db
 from JOURNAL_LINE.journal_line_service import JournalLineService
+from pagination import DEFAULT_PAGE_SIZE, MAX_PAGE_SIZE, InvalidCursorException
 
 router = APIRouter()
 
@@ -22,8 +24,15 @@ def get_journal_line(journal_line_id: int, db: Session = Depends(get_db)):
 
 
 @router.get("/")
-def list_journal_lines(db: Session = Depends(get_db)):
-    return JournalLineService.list_journal_lines(db)
+def list_journal_lines(
+    cursor: Optional[str] = Query(None, description="next_cursor of the previous page"),
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+    db: Session = Depends(get_db)
+):
+    try:
+        return JournalLineService.list_journal_lines(db, cursor, limit).as_response("journal_lines")
+    except InvalidCursorException as e:
+        raise HTTPException(status_code=400, detail=str(e))
 
 
 @router.put("/{journal_line_id}")
@@ -1,6 +1,7 @@
 from sqlalchemy.orm import Session
 from sqlalchemy import func
 from JOURNAL_LINE.journal_line_model import JournalLine
+from pagination import DEFAULT_PAGE_SIZE, Page, paginate
 
 class JournalLineRepository:
 
@@ -17,8 +18,8 @@ class JournalLineRepository:
         ).all()
 
     @staticmethod
-    def get_all(db: Session):
-        return db.query(JournalLine).all()
+    def get_all(db: Session, cursor=None, limit: int = DEFAULT_PAGE_SIZE):
+        return paginate(db.query(JournalLine), [JournalLine.journal_line_id], cursor, limit)
 
     @staticmethod
     def create(db: Session, line: JournalLine):
@@ -1,4 +1,5 @@
 from sqlalchemy.orm import Session
+from pagination import DEFAULT_PAGE_SIZE
 
 from JOURNAL_LINE.journal_line_model import JournalLine
 from JOURNAL_LINE.journal_line_repository import JournalLineRepository
@@ -33,8 +34,8 @@ class JournalLineService:
         return line
 
     @staticmethod
-    def list_journal_lines(db: Session):
-        return JournalLineRepository.get_all(db)
+    def list_journal_lines(db: Session, cursor=None, limit: int = DEFAULT_PAGE_SIZE):
+        return JournalLineRepository.get_all(db, cursor, limit)
 
     @staticmethod
     def update_journal_line(db: Session, journal_line_id: int, data: dict):
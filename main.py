@@ -1,3 +1,5 @@
+from contextlib import asynccontextmanager
+
 from fastapi import FastAPI
 from Patient_Registration_Management.database import Base, engine
 
@@ -8,8 +10,14 @@ from Patient_Registration_Management.doctor.models import Doctor
 
 from Patient_Registration_Management.doctor.routes import router as doctor_router
 
-app = FastAPI(title="Hospital Management System")
 
-Base.metadata.create_all(bind=engine)
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Create missing tables when the server starts, not when this module is imported
+    Base.metadata.create_all(bind=engine)
+    yield
+
+
+app = FastAPI(title="Hospital Management System", lifespan=lifespan)
 
 app.include_router(doctor_router, prefix="/doctors", tags=["Doctors"])